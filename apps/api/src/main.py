@@ -20,7 +20,12 @@ sys.path.insert(0, str(packages_path))
 
 # 导入路由
 from routes.events import router as events_router
-from routes.project_memory import router as project_memory_router
+from routes.project_memory import (
+    router as project_memory_router,
+    get_memory_sync_worker,
+    get_retrieval_analytics_worker,
+    get_memory_compaction_worker
+)
 from routes.architect import router as architect_router
 from routes.listener import router as listener_router
 from routes.conversations import router as conversations_router
@@ -31,6 +36,7 @@ from routes.task_board import router as task_board_router
 from routes.features import router as features_router
 from routes.issues import router as issues_router
 from routes.suggestions import router as suggestions_router
+from services.event_queue import shutdown_write_behind_emitters
 
 
 # ============================================================================
@@ -78,6 +84,52 @@ app.include_router(issues_router, tags=["issues"])
 app.include_router(suggestions_router, tags=["suggestions"])
 
 
+# ============================================================================
+# 生命周期
+# ============================================================================
+
+@app.on_event("startup")
+async def start_memory_sync():
+    """启动外部记忆同步任务（发件箱 -> Ultra Memory / Session Memory）"""
+    await get_memory_sync_worker().start()
+
+
+@app.on_event("shutdown")
+async def stop_memory_sync():
+    """停止外部记忆同步任务，未完成的记录留在发件箱中"""
+    await get_memory_sync_worker().stop()
+
+
+@app.on_event("startup")
+async def start_retrieval_analytics():
+    """启动检索历史汇总与热点缓存预热任务"""
+    await get_retrieval_analytics_worker().start()
+
+
+@app.on_event("shutdown")
+async def stop_retrieval_analytics():
+    """停止检索历史汇总任务（未汇总的记录下次启动时继续）"""
+    await get_retrieval_analytics_worker().stop()
+
+
+@app.on_event("startup")
+async def start_memory_compaction():
+    """启动记忆压实任务（近似重复合并、冷数据归档）"""
+    await get_memory_compaction_worker().start()
+
+
+@app.on_event("shutdown")
+async def stop_memory_compaction():
+    """停止记忆压实任务"""
+    await get_memory_compaction_worker().stop()
+
+
+@app.on_event("shutdown")
+async def flush_event_queues():
+    """关闭时将写后队列中的事件全部落库"""
+    shutdown_write_behind_emitters()
+
+
 # ============================================================================
 # 根端点
 # ============================================================================
@@ -9,7 +9,8 @@
 4. 触发事件流通知
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -29,6 +30,7 @@ if str(packages_path) not in sys.path:
 from services.project_memory_service import (
     create_project_memory_service,
 )
+from services.conversation_classifier import classify_turns
 from services.event_service import (
     create_event_emitter,
     EventCategory,
@@ -55,7 +57,6 @@ def get_memory_service():
             / "tasks.db"
         )
         _memory_service = create_project_memory_service(
-            state_manager=object(),
             db_path=str(db_path),
             session_memory_enabled=True,
             ultra_memory_enabled=True,
@@ -206,21 +207,28 @@ async def batch_auto_record(
     批量自动记录多轮对话
     
     **用途**: 会话结束时批量处理多轮对话
+    
+    全部轮次先一次性分类（轮次多时使用进程池并行），只有需要记录的轮次才写入记忆。
     """
     try:
         results = []
         total_recorded = 0
         
         service = get_memory_service()
+        classifications = await run_in_threadpool(
+            classify_turns,
+            [(turn.user_input, turn.ai_response) for turn in turns]
+        )
         
-        for turn in turns:
+        for turn, classification in zip(turns, classifications):
             result = service.auto_record_conversation(
                 project_id=project_code,
                 user_input=turn.user_input,
                 ai_response=turn.ai_response,
                 conversation_id=turn.conversation_id,
                 actor=turn.actor,
-                ai_role=turn.ai_role
+                ai_role=turn.ai_role,
+                classification=classification
             )
             
             if result.get("should_record"):
@@ -248,6 +256,41 @@ async def batch_auto_record(
         )
 
 
+@router.post("/hook/classify")
+async def classify_conversation_turns(
+    turns: list[ConversationTurn],
+    include_spans: bool = Query(False, description="是否返回关键词命中位置")
+) -> Dict[str, Any]:
+    """
+    批量分类对话（不写入记忆）
+    
+    **用途**: 预览哪些轮次会被自动记录，以及类别得分、关键词、精炼内容
+    """
+    try:
+        classifications = await run_in_threadpool(
+            classify_turns,
+            [(turn.user_input, turn.ai_response) for turn in turns],
+            include_spans
+        )
+        
+        return {
+            "success": True,
+            "total_turns": len(turns),
+            "total_recordable": sum(1 for c in classifications if c.should_record),
+            "results": [
+                {"turn": turn.conversation_id, **classification.to_dict()}
+                for turn, classification in zip(turns, classifications)
+            ],
+            "processed_at": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"对话分类失败: {str(e)}"
+        )
+
+
 @router.get("/hook/stats")
 async def get_auto_record_stats(project_code: str) -> Dict[str, Any]:
     """
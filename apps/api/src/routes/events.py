@@ -6,6 +6,7 @@
 """
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -68,6 +69,7 @@ class QueryEventsRequest(BaseModel):
     end_time: Optional[str] = Field(None, description="结束时间过滤（ISO格式）")
     limit: int = Field(100, ge=1, le=1000, description="返回数量限制")
     offset: int = Field(0, ge=0, description="偏移量")
+    after: Optional[str] = Field(None, description="分页游标（上一页返回的next_cursor）")
 
 
 # ============================================================================
@@ -90,10 +92,17 @@ def get_event_store() -> EventStore:
 
 
 def get_event_emitter() -> EventEmitter:
-    """获取事件发射器实例"""
+    """获取事件发射器实例
+
+    使用写后（write-behind）发射器：事件经队列组提交落库，
+    await_commit 模式保证返回时事件已提交，同时不阻塞事件循环。
+    """
     global _event_emitter
     if _event_emitter is None:
-        _event_emitter = create_event_emitter()
+        _event_emitter = create_event_emitter(
+            write_behind=True,
+            durability="await_commit"
+        )
     return _event_emitter
 
 
@@ -131,7 +140,7 @@ async def emit_event(request: EmitEventRequest) -> Dict[str, Any]:
     """
     try:
         emitter = get_event_emitter()
-        event = emitter.emit(
+        event = await emitter.emit_async(
             project_id=request.project_id,
             event_type=request.event_type,
             title=request.title,
@@ -162,7 +171,7 @@ async def emit_event(request: EmitEventRequest) -> Dict[str, Any]:
 @router.post(
     "/batch",
     summary="批量发射事件",
-    description="批量发射多个事件"
+    description="批量发射多个事件（单事务批量写入，适合导入历史事件）"
 )
 async def emit_batch_events(request: EmitBatchEventsRequest) -> Dict[str, Any]:
     """
@@ -170,6 +179,9 @@ async def emit_batch_events(request: EmitBatchEventsRequest) -> Dict[str, Any]:
     
     **用途**: 一次性发射多个事件，提高效率
     
+    所有事件在一个事务内批量写入 project_events，event_stats 每个项目只更新一次，
+    导入数千条历史事件只需数秒。
+    
     **示例**:
     ```json
     {
@@ -191,7 +203,9 @@ async def emit_batch_events(request: EmitBatchEventsRequest) -> Dict[str, Any]:
     """
     try:
         emitter = get_event_emitter()
-        events = emitter.emit_batch(
+        # 批量写入（含WAL提交时的fsync）放到线程池中执行，不阻塞事件循环
+        events = await run_in_threadpool(
+            emitter.emit_batch,
             project_id=request.project_id,
             events=request.events
         )
@@ -229,21 +243,32 @@ async def query_events(
     start_time: Optional[str] = Query(None, description="开始时间（ISO格式）"),
     end_time: Optional[str] = Query(None, description="结束时间（ISO格式）"),
     limit: int = Query(100, ge=1, le=1000, description="返回数量限制"),
-    offset: int = Query(0, ge=0, description="偏移量")
+    offset: int = Query(0, ge=0, description="偏移量（建议改用after游标）"),
+    after: Optional[str] = Query(None, description="分页游标（上一页返回的next_cursor）"),
+    order_direction: str = Query("DESC", description="按发生时间排序方向（ASC/DESC）")
 ) -> Dict[str, Any]:
     """
     查询事件
     
     **用途**: 查询项目的历史事件
     
+    **分页**: 响应中的 next_cursor 作为下一次请求的 after 参数；
+    为 null 表示已到最后一页
+    
     **示例**:
     - GET /api/events?project_id=TASKFLOW
     - GET /api/events?project_id=TASKFLOW&category=task&limit=50
     - GET /api/events?project_id=TASKFLOW&severity=error
     - GET /api/events?actor=AI%20Architect
+    - GET /api/events?project_id=TASKFLOW&after=<next_cursor>
     """
+    store = get_event_store()
+    try:
+        cursor = store.decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
     try:
-        store = get_event_store()
         events = store.query(
             project_id=project_id,
             event_type=event_type,
@@ -255,7 +280,9 @@ async def query_events(
             start_time=start_time,
             end_time=end_time,
             limit=limit,
-            offset=offset
+            offset=offset,
+            order_direction=order_direction,
+            after=cursor
         )
         
         return {
@@ -264,6 +291,7 @@ async def query_events(
             "count": len(events),
             "limit": limit,
             "offset": offset,
+            "next_cursor": store.encode_cursor(events[-1]) if len(events) == limit else None,
             "filters": {
                 "project_id": project_id,
                 "event_type": event_type,
@@ -276,6 +304,8 @@ async def query_events(
                 "end_time": end_time
             }
         }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -417,6 +447,40 @@ async def get_event_stats(project_id: str) -> Dict[str, Any]:
         )
 
 
+@router.post(
+    "/stats/rebuild",
+    summary="重建事件统计",
+    description="从原始事件表重建event_stats计数（对账）"
+)
+async def rebuild_event_stats(
+    project_id: Optional[str] = Query(None, description="只重建指定项目，默认全部")
+) -> Dict[str, Any]:
+    """
+    重建事件统计
+    
+    **用途**: 统计计数与原始事件不一致时（如手工导入数据后）执行对账
+    
+    **示例**:
+    - POST /api/events/stats/rebuild
+    - POST /api/events/stats/rebuild?project_id=TASKFLOW
+    """
+    try:
+        store = get_event_store()
+        rebuilt = store.rebuild_stats(project_id)
+        
+        return {
+            "success": True,
+            "project_id": project_id,
+            "projects_rebuilt": rebuilt,
+            "rebuilt_at": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild event stats: {str(e)}"
+        )
+
+
 # ============================================================================
 # 便捷端点 - 按实体查询
 # ============================================================================
@@ -489,6 +553,7 @@ async def health_check() -> Dict[str, Any]:
                 "get_event": "GET /api/events/{event_id}",
                 "get_types": "GET /api/events/types",
                 "get_stats": "GET /api/events/stats/{project_id}",
+                "rebuild_stats": "POST /api/events/stats/rebuild",
                 "query_by_entity": "GET /api/events/by-entity/{entity_type}/{entity_id}"
             }
         }
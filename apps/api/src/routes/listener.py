@@ -23,8 +23,8 @@ from services.notification_service import NotificationService, create_notificati
 class StartListenerRequest(BaseModel):
     """启动监听器请求"""
     project_id: str = Field(default="TASKFLOW", description="项目ID")
-    poll_interval: int = Field(default=5, ge=1, le=300, description="轮询间隔（秒）")
-    max_notifications: int = Field(default=1000, ge=100, le=10000, description="最大通知数量")
+    poll_interval: int = Field(default=5, ge=1, le=300, description="兜底追赶间隔（秒），新事件由事件总线即时推送")
+    max_notifications: int = Field(default=1000, ge=100, le=10000, description="保留的最大通知数量（超出后压缩最旧通知）")
 
 
 class RuleConfigRequest(BaseModel):
@@ -123,6 +123,8 @@ async def start_listener(
         # 更新配置
         listener.project_id = request.project_id
         listener.poll_interval = request.poll_interval
+        if _notification_service is not None:
+            _notification_service.max_notifications = request.max_notifications
         
         # 在后台启动监听器
         background_tasks.add_task(listener.start)
@@ -132,7 +134,8 @@ async def start_listener(
             "message": "Listener started successfully",
             "config": {
                 "project_id": request.project_id,
-                "poll_interval": request.poll_interval
+                "poll_interval": request.poll_interval,
+                "max_notifications": request.max_notifications
             },
             "timestamp": datetime.now().isoformat()
         }
@@ -228,6 +231,37 @@ async def get_listener_status() -> Dict[str, Any]:
         )
 
 
+@router.get(
+    "/dead-letters",
+    summary="获取死信事件",
+    description="获取处理失败且重试用尽的事件（已越过高水位线，需人工处理）"
+)
+async def get_dead_letters(limit: int = 100) -> Dict[str, Any]:
+    """
+    获取死信事件
+    
+    **示例**:
+    - GET /api/listener/dead-letters?limit=20
+    """
+    try:
+        listener = get_or_create_listener()
+        dead_letters = listener.get_dead_letters(limit)
+        
+        return {
+            "success": True,
+            "consumer_id": listener.offset_key,
+            "dead_letters": dead_letters,
+            "count": len(dead_letters),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get dead letters: {str(e)}"
+        )
+
+
 # ============================================================================
 # 规则管理端点
 # ============================================================================
@@ -245,6 +279,7 @@ async def get_rules() -> Dict[str, Any]:
     - 规则总数
     - 启用的规则数
     - 每个规则的详细信息和统计
+    - 每个规则的动作执行延迟直方图（latency: p50/p95/p99 及分桶计数）
     
     **示例**:
     - GET /api/listener/rules
@@ -579,7 +614,7 @@ async def health_check() -> Dict[str, Any]:
             },
             "notification_service": {
                 "initialized": _notification_service is not None,
-                "notifications_count": len(_notification_service.notifications) if _notification_service else 0
+                "notifications_count": _notification_service.get_count() if _notification_service else 0
             }
         },
         "endpoints": {
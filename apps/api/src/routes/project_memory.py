@@ -6,6 +6,7 @@
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -38,6 +39,9 @@ from services.project_memory_service import (  # type: ignore[import]
     RelationType,
     create_project_memory_service,
 )
+from services.memory_sync import MemorySyncWorker  # type: ignore[import]
+from services.memory_analytics import RetrievalAnalyticsWorker  # type: ignore[import]
+from services.memory_compaction import MemoryCompactionWorker  # type: ignore[import]
 from services.event_service import (  # type: ignore[import]
     create_event_emitter,
     EventCategory,
@@ -111,6 +115,9 @@ router = APIRouter(prefix="/api/projects", tags=["project-memory"])
 # 全局服务与事件发射器实例（惰性初始化）
 _project_memory_service: Optional[ProjectMemoryService] = None
 _event_emitter = None
+_memory_sync_worker: Optional[MemorySyncWorker] = None
+_retrieval_analytics_worker: Optional[RetrievalAnalyticsWorker] = None
+_memory_compaction_worker: Optional[MemoryCompactionWorker] = None
 
 
 def get_project_memory_service() -> ProjectMemoryService:
@@ -123,9 +130,7 @@ def get_project_memory_service() -> ProjectMemoryService:
             / "data"
             / "tasks.db"
         )
-        # state_manager 仅作为启用 DB 持久化的标记，不参与具体逻辑
         _project_memory_service = create_project_memory_service(
-            state_manager=object(),
             db_path=str(db_path),
             session_memory_enabled=True,
             ultra_memory_enabled=True,
@@ -133,6 +138,38 @@ def get_project_memory_service() -> ProjectMemoryService:
     return _project_memory_service
 
 
+def get_memory_sync_worker() -> MemorySyncWorker:
+    """获取外部记忆同步任务单例（由应用启动事件启动）"""
+    global _memory_sync_worker
+    if _memory_sync_worker is None:
+        _memory_sync_worker = MemorySyncWorker(get_project_memory_service().sync_outbox)
+    return _memory_sync_worker
+
+
+def get_retrieval_analytics_worker() -> RetrievalAnalyticsWorker:
+    """获取检索汇总与缓存预热任务单例（由应用启动事件启动）"""
+    global _retrieval_analytics_worker
+    if _retrieval_analytics_worker is None:
+        service = get_project_memory_service()
+        _retrieval_analytics_worker = RetrievalAnalyticsWorker(
+            service.retrieval_analytics,
+            warm=service.warm_hot_cache
+        )
+    return _retrieval_analytics_worker
+
+
+def get_memory_compaction_worker() -> MemoryCompactionWorker:
+    """获取记忆压实任务单例（由应用启动事件启动）"""
+    global _memory_compaction_worker
+    if _memory_compaction_worker is None:
+        service = get_project_memory_service()
+        _memory_compaction_worker = MemoryCompactionWorker(
+            service.compactor,
+            rollup=service.retrieval_analytics.rollup
+        )
+    return _memory_compaction_worker
+
+
 def get_event_emitter():
     """获取事件发射器单例，用于记忆相关事件流。"""
     global _event_emitter
@@ -234,7 +271,11 @@ async def retrieve_project_memories(
     category: Optional[str] = Query(None, description="分类过滤"),
     memory_type: Optional[str] = Query(None, description="类型过滤"),
     tags: Optional[str] = Query(None, description="标签过滤（逗号分隔）"),
-    limit: int = Query(10, ge=1, le=100, description="返回数量")
+    tag_mode: str = Query("any", description="多标签匹配方式：any（任意一个）/ all（全部包含）"),
+    task_id: Optional[str] = Query(None, description="关联任务过滤"),
+    issue_id: Optional[str] = Query(None, description="关联问题过滤"),
+    limit: int = Query(10, ge=1, le=100, description="返回数量"),
+    record: bool = Query(True, description="是否写入检索历史（只读浏览传 false）")
 ) -> Dict[str, Any]:
     """
     检索项目记忆
@@ -244,18 +285,25 @@ async def retrieve_project_memories(
     **示例**:
     - GET /api/projects/TASKFLOW/memories?query=如何优化性能
     - GET /api/projects/TASKFLOW/memories?category=solution&limit=20
+    - GET /api/projects/TASKFLOW/memories?tags=api,perf&tag_mode=all&task_id=TASK-A-1
     """
     try:
-        tags_list = tags.split(",") if tags else None
+        tags_list = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else None
         
         service = get_project_memory_service()
-        memories = service.retrieve_memories(
+        # 启用远程检索时可能发起网络请求，放到线程池中执行，不阻塞事件循环
+        memories = await run_in_threadpool(
+            service.retrieve_memories,
             project_id=project_code,
             query=query,
             category=category,
             memory_type=memory_type,
             tags=tags_list,
-            limit=limit
+            limit=limit,
+            tag_mode=tag_mode,
+            task_id=task_id,
+            issue_id=issue_id,
+            record_retrieval=record
         )
         
         return {
@@ -265,12 +313,119 @@ async def retrieve_project_memories(
             "filters": {
                 "category": category,
                 "memory_type": memory_type,
-                "tags": tags_list
+                "tags": tags_list,
+                "tag_mode": tag_mode,
+                "task_id": task_id,
+                "issue_id": issue_id
             },
             "memories": memories,
             "count": len(memories),
             "retrieved_at": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{project_code}/memory-tags")
+async def get_project_memory_tags(
+    project_code: str,
+    limit: int = Query(100, ge=1, le=1000, description="返回数量")
+) -> Dict[str, Any]:
+    """
+    获取项目记忆标签
+
+    **用途**: 列出项目使用的标签及对应记忆数量（基于标签索引表）
+    """
+    try:
+        service = get_project_memory_service()
+        tags = await run_in_threadpool(service.get_tag_counts, project_code, limit)
+        return {
+            "success": True,
+            "project_id": project_code,
+            "tags": tags,
+            "count": len(tags)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{project_code}/memory-analytics")
+async def get_project_memory_analytics(
+    project_code: str,
+    limit: int = Query(20, ge=1, le=200, description="每类返回数量")
+) -> Dict[str, Any]:
+    """
+    获取记忆检索统计
+
+    **用途**: 查看热点记忆、常见查询及热点缓存命中情况（由后台任务定期汇总检索历史）
+    """
+    try:
+        service = get_project_memory_service()
+        analytics = await run_in_threadpool(service.get_retrieval_analytics, project_code, limit)
+        return {
+            "success": True,
+            "project_id": project_code,
+            **analytics,
+            "worker": get_retrieval_analytics_worker().get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{project_code}/memories/stats")
+async def get_memory_stats(project_code: str) -> Dict[str, Any]:
+    """
+    获取项目记忆统计
+    
+    **用途**: Dashboard展示项目的记忆统计信息
+    
+    **返回内容**:
+    - 总记忆数
+    - 按类型分类统计
+    - 按分类统计
+    - 按重要性分档统计与直方图
+
+    统计由触发器随记忆写入维护，这里只读取一行（需注册在 /memories/{memory_id} 之前）。
+    """
+    try:
+        service = get_project_memory_service()
+        stats = await run_in_threadpool(service.get_memory_stats, project_code)
+        return {
+            "success": True,
+            "project_id": project_code,
+            "stats": stats
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{project_code}/memory-overview")
+async def get_memory_overview(
+    project_code: str,
+    category: Optional[str] = Query(None, description="分类过滤"),
+    memory_type: Optional[str] = Query(None, description="类型过滤"),
+    limit: int = Query(50, ge=1, le=200, description="返回数量")
+) -> Dict[str, Any]:
+    """
+    获取记忆列表与统计
+
+    **用途**: Dashboard 记忆页一次请求取得列表和统计（同一快照，不写检索历史）
+    """
+    try:
+        service = get_project_memory_service()
+        overview = await run_in_threadpool(
+            service.get_memory_overview,
+            project_id=project_code,
+            category=category,
+            memory_type=memory_type,
+            limit=limit
+        )
+        return {
+            "success": True,
+            **overview
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -287,33 +442,21 @@ async def get_memory_detail(
     """
     try:
         service = get_project_memory_service()
-        with service._get_connection() as conn:  # type: ignore[attr-defined]
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT *
-                FROM project_memories
-                WHERE id = ? AND project_id = ?
-                """,
-                (memory_id, project_code),
-            )
-            row = cursor.fetchone()
+        memory = await run_in_threadpool(service.get_memory, project_code, memory_id)
 
-        if not row:
+        if memory is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Memory not found: {memory_id}",
             )
 
-        memory = dict(row)
-        # 解析 JSON 字段，保持与服务内部一致的格式
-        for field in ("context", "tags", "related_tasks", "related_issues"):
-            if memory.get(field):
+        # 空数组字段保持为列表，与原接口格式一致
+        for field in ("tags", "related_tasks", "related_issues"):
+            if isinstance(memory.get(field), str):
                 try:
                     memory[field] = json.loads(memory[field])
                 except Exception:
-                    if field in ("tags", "related_tasks", "related_issues"):
-                        memory[field] = []
+                    memory[field] = []
 
         return {
             "success": True,
@@ -481,7 +624,8 @@ async def auto_record_problem_solution(
 async def inherit_project_knowledge(
     project_code: str,
     context: Optional[str] = Query(None, description="当前上下文"),
-    limit: int = Query(20, ge=1, le=100, description="返回记忆数量")
+    limit: int = Query(20, ge=1, le=100, description="返回记忆数量"),
+    token_budget: Optional[int] = Query(None, ge=1, description="token 预算（超出时服务端裁剪）")
 ) -> Dict[str, Any]:
     """
     跨会话知识继承
@@ -495,6 +639,8 @@ async def inherit_project_knowledge(
     - 最近记忆
     - 相关记忆（如果提供context）
     
+    结果按项目缓存，记忆写入后自动失效；提供 token_budget 时按分区优先级裁剪。
+    
     **使用场景**:
     ```
     新架构师接手项目时：
@@ -509,10 +655,12 @@ async def inherit_project_knowledge(
     """
     try:
         service = get_project_memory_service()
-        knowledge_package = service.inherit_knowledge(
+        knowledge_package = await run_in_threadpool(
+            service.inherit_knowledge,
             project_id=project_code,
             context=context,
-            limit=limit
+            limit=limit,
+            token_budget=token_budget
         )
         
         return {
@@ -567,26 +715,30 @@ async def get_related_memories(
     project_code: str,
     memory_id: str,
     relation_types: Optional[str] = Query(None, description="关系类型过滤（逗号分隔）"),
-    min_strength: float = Query(0.5, ge=0.0, le=1.0, description="最小关系强度")
+    min_strength: float = Query(0.5, ge=0.0, le=1.0, description="最小关系强度"),
+    depth: int = Query(1, ge=1, le=5, description="最大跳数（>1 时按最强关联路径返回多跳记忆）")
 ) -> Dict[str, Any]:
     """
     获取相关记忆
     
-    **用途**: 查询与指定记忆相关的其他记忆
+    **用途**: 查询与指定记忆相关的其他记忆，支持多跳（基于内存关系图）
     """
     try:
         relation_types_list = relation_types.split(",") if relation_types else None
         
         service = get_project_memory_service()
-        related = service.get_related_memories(
+        related = await run_in_threadpool(
+            service.get_related_memories,
             memory_id=memory_id,
             relation_types=relation_types_list,
-            min_strength=min_strength
+            min_strength=min_strength,
+            depth=depth
         )
         
         return {
             "success": True,
             "memory_id": memory_id,
+            "depth": depth,
             "related_memories": related,
             "count": len(related)
         }
@@ -594,99 +746,84 @@ async def get_related_memories(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ============================================================================
-# 统计和管理
-# ============================================================================
-
-@router.get("/{project_code}/memories/stats")
-async def get_memory_stats(project_code: str) -> Dict[str, Any]:
+@router.get("/{project_code}/memory-graph")
+async def get_memory_graph(
+    project_code: str,
+    relation_types: Optional[str] = Query(None, description="关系类型过滤（逗号分隔）"),
+    min_strength: float = Query(0.0, ge=0.0, le=1.0, description="最小关系强度"),
+    include_isolated: bool = Query(True, description="是否包含没有关系的记忆"),
+    center: Optional[str] = Query(None, description="中心记忆ID（只返回其邻域子图）"),
+    depth: int = Query(2, ge=1, le=5, description="邻域跳数（配合 center）")
+) -> Dict[str, Any]:
     """
-    获取项目记忆统计
+    获取项目记忆关系图
     
-    **用途**: Dashboard展示项目的记忆统计信息
+    **用途**: 知识星图（/memory-constellation）一次请求渲染整个项目图谱
     
-    **返回内容**:
-    - 总记忆数
-    - 按类型分类统计
-    - 按分类统计
-    - 最近活动
+    **返回**: nodes（id/title/type/importance/component）、links（source/target/type/strength）
     """
     try:
+        relation_types_list = relation_types.split(",") if relation_types else None
+        
         service = get_project_memory_service()
-        base_stats = service.get_memory_stats(project_id=project_code) or {}
-
-        # 额外按分类和重要性分桶统计
-        by_category = {
-            "architecture": 0,
-            "problem": 0,
-            "solution": 0,
-            "decision": 0,
-            "knowledge": 0
-        }
-        by_importance = {
-            "critical (9-10)": 0,
-            "high (7-8)": 0,
-            "medium (5-6)": 0,
-            "low (1-4)": 0
+        graph = await run_in_threadpool(
+            service.get_memory_graph,
+            project_id=project_code,
+            relation_types=relation_types_list,
+            min_strength=min_strength,
+            include_isolated=include_isolated,
+            center_id=center,
+            depth=depth
+        )
+        
+        return {
+            "success": True,
+            **graph
         }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        with service._get_connection() as conn:  # type: ignore[attr-defined]
-            cursor = conn.cursor()
-
-            # 按分类统计
-            cursor.execute(
-                """
-                SELECT category, COUNT(*) AS cnt
-                FROM project_memories
-                WHERE project_id = ?
-                GROUP BY category
-                """,
-                (project_code,),
-            )
-            for category, cnt in cursor.fetchall():
-                if category in by_category:
-                    by_category[category] = cnt
-
-            # 按重要性分桶
-            cursor.execute(
-                """
-                SELECT importance, COUNT(*) AS cnt
-                FROM project_memories
-                WHERE project_id = ?
-                GROUP BY importance
-                """,
-                (project_code,),
-            )
-            for importance, cnt in cursor.fetchall():
-                if importance >= 9:
-                    by_importance["critical (9-10)"] += cnt
-                elif importance >= 7:
-                    by_importance["high (7-8)"] += cnt
-                elif importance >= 5:
-                    by_importance["medium (5-6)"] += cnt
-                else:
-                    by_importance["low (1-4)"] += cnt
-
-        stats = {
-            "total_memories": base_stats.get("total_memories", 0),
-            "session_memories": base_stats.get("session_memories", 0),
-            "ultra_memories": base_stats.get("ultra_memories", 0),
-            "decision_memories": base_stats.get("decision_memories", 0),
-            "solution_memories": base_stats.get("solution_memories", 0),
-            "by_category": by_category,
-            "by_importance": by_importance,
-            "last_updated": datetime.now().isoformat()
-        }
 
+@router.get("/{project_code}/memory-graph/path")
+async def find_memory_path(
+    project_code: str,
+    source: str = Query(..., description="起点记忆ID"),
+    target: str = Query(..., description="终点记忆ID"),
+    relation_types: Optional[str] = Query(None, description="关系类型过滤（逗号分隔）"),
+    min_strength: float = Query(0.0, ge=0.0, le=1.0, description="最小关系强度")
+) -> Dict[str, Any]:
+    """
+    查找两个记忆之间的最强关联路径
+    
+    **用途**: 解释两个记忆如何关联（路径强度为各边强度乘积）
+    """
+    try:
+        relation_types_list = relation_types.split(",") if relation_types else None
+        
+        service = get_project_memory_service()
+        result = await run_in_threadpool(
+            service.find_memory_path,
+            project_id=project_code,
+            source_memory_id=source,
+            target_memory_id=target,
+            relation_types=relation_types_list,
+            min_strength=min_strength
+        )
+        
         return {
             "success": True,
-            "project_id": project_code,
-            "stats": stats
+            "source": source,
+            "target": target,
+            **result
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# 统计和管理
+# ============================================================================
+
 @router.delete("/{project_code}/memories/{memory_id}")
 async def delete_memory(
     project_code: str,
@@ -749,13 +886,133 @@ async def check_memory_system_health(project_code: str) -> Dict[str, Any]:
     检查记忆系统健康状态
     
     **用途**: 验证本地数据库和外部记忆系统的连接状态
+
+    外部系统状态取自同步任务的熔断器：closed 为正常，open 为熔断中，half_open 为探测中。
     """
+    worker = get_memory_sync_worker()
     return {
         "success": True,
         "project_id": project_code,
         "local_db": "healthy",
-        "session_memory": "healthy",  # TODO: 实际检查
-        "ultra_memory": "healthy",    # TODO: 实际检查
+        "session_memory": worker.breakers["session"].state,
+        "ultra_memory": worker.breakers["ultra"].state,
         "checked_at": datetime.now().isoformat()
     }
 
+
+@router.get("/{project_code}/memory-sync")
+async def get_memory_sync_status(project_code: str) -> Dict[str, Any]:
+    """
+    获取外部记忆同步状态
+
+    **用途**: 查看发件箱中各目标系统的待同步/已同步/失败数量及同步任务统计
+    """
+    try:
+        worker = get_memory_sync_worker()
+        outbox_stats = await run_in_threadpool(worker.outbox.get_stats, project_code)
+        return {
+            "success": True,
+            "project_id": project_code,
+            "outbox": outbox_stats,
+            "worker": worker.get_stats(),
+            "checked_at": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{project_code}/memory-sync/retry")
+async def retry_failed_memory_sync(project_code: str) -> Dict[str, Any]:
+    """
+    重新同步失败记录
+
+    **用途**: 外部系统恢复后，将超过最大重试次数的记录重新排队
+    """
+    try:
+        worker = get_memory_sync_worker()
+        count = await run_in_threadpool(worker.outbox.requeue_failed, project_code)
+        return {
+            "success": True,
+            "project_id": project_code,
+            "requeued": count
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================================================
+# 压实与归档
+# ============================================================================
+
+@router.post("/{project_code}/memory-compaction")
+async def compact_project_memories(
+    project_code: str,
+    older_than_days: int = Query(90, ge=0, description="归档的最小记忆年龄（天）"),
+    max_importance: int = Query(3, ge=1, le=10, description="归档的最大重要性"),
+    dry_run: bool = Query(True, description="只返回将要合并/归档的记忆")
+) -> Dict[str, Any]:
+    """
+    压实项目记忆
+
+    **用途**: 合并近似重复记忆、归档低重要性且从未被检索的旧记忆（默认只预览）
+    """
+    try:
+        service = get_project_memory_service()
+        report = await run_in_threadpool(
+            service.compact_memories,
+            project_code,
+            older_than_days,
+            max_importance,
+            dry_run
+        )
+        return {
+            "success": True,
+            **report,
+            "worker": get_memory_compaction_worker().get_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{project_code}/memory-archive")
+async def list_archived_memories(
+    project_code: str,
+    reason: Optional[str] = Query(None, description="归档原因: merged/stale"),
+    limit: int = Query(100, ge=1, le=1000, description="返回数量")
+) -> Dict[str, Any]:
+    """
+    列出归档记忆
+
+    **用途**: 查看被合并的重复记忆与归档的冷数据
+    """
+    try:
+        service = get_project_memory_service()
+        archived = await run_in_threadpool(service.list_archived_memories, project_code, limit, reason)
+        return {
+            "success": True,
+            "project_id": project_code,
+            "archived": archived,
+            "count": len(archived)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{project_code}/memory-archive/{memory_id}/restore")
+async def restore_archived_memory(project_code: str, memory_id: str) -> Dict[str, Any]:
+    """
+    恢复归档记忆
+
+    **用途**: 将归档记忆及其关系恢复到项目记忆中
+    """
+    try:
+        service = get_project_memory_service()
+        memory = await run_in_threadpool(service.restore_archived_memory, project_code, memory_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if memory is None:
+        raise HTTPException(status_code=404, detail=f"Archived memory not found: {memory_id}")
+    return {
+        "success": True,
+        "memory": memory
+    }
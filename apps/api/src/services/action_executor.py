@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+规则动作执行器（Action Executor）
+
+功能：
+1. 异步动作（async def）在事件循环中并发执行
+2. 同步动作提交到有界线程池，不阻塞监听器事件循环
+3. 每个动作独立的超时与重试策略，单个动作失败不影响其他动作
+4. 按规则统计执行延迟直方图
+5. 按规则限制在途执行数：超时的同步动作仍占用线程直到真正结束，
+   在途数达到上限时不再提交，避免挂起的动作占满线程池
+6. 超时后只有声明为幂等的规则才会重试（超时的动作可能仍在执行或已产生副作用）
+"""
+
+import asyncio
+import bisect
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.rule_engine import Rule, RuleEngine
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# 重试策略
+# ============================================================================
+
+@dataclass
+class RetryPolicy:
+    """重试策略：首次执行 + 最多 max_attempts-1 次重试，间隔指数退避"""
+    max_attempts: int = 1
+    backoff_seconds: float = 0.5
+    backoff_multiplier: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间（attempt 从1开始）"""
+        return self.backoff_seconds * (self.backoff_multiplier ** (attempt - 1))
+
+
+# ============================================================================
+# 执行结果
+# ============================================================================
+
+class ActionOutcome(str, Enum):
+    """单个规则动作的最终执行结果"""
+    SUCCEEDED = "succeeded"  # 执行成功
+    FAILED = "failed"        # 动作报错，或因在途数达到上限未执行；重新执行是安全的
+    TIMED_OUT = "timed_out"  # 超时：动作可能仍在执行，只有幂等规则可以重新执行
+
+
+# ============================================================================
+# 延迟直方图
+# ============================================================================
+
+class LatencyHistogram:
+    """
+    固定桶延迟直方图（毫秒）
+
+    桶边界为上界（含），最后一个桶为 +Inf。
+    """
+
+    BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: List[int] = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency_ms: float) -> None:
+        """记录一次执行延迟"""
+        index = bisect.bisect_left(self.BUCKETS_MS, latency_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """估算分位数（返回所在桶的上界，+Inf 桶返回最大值）"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                cumulative += bucket_count
+                if cumulative >= rank:
+                    if index < len(self.BUCKETS_MS):
+                        return float(self.BUCKETS_MS[index])
+                    return self.max_ms
+            return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为字典（用于API）"""
+        buckets = {f"le_{bound}ms": count for bound, count in zip(self.BUCKETS_MS, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": buckets
+        }
+
+
+# ============================================================================
+# 动作执行器
+# ============================================================================
+
+class ActionExecutor:
+    """
+    规则动作执行器
+
+    run_all() 并发执行一个事件匹配到的全部规则动作。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        default_timeout: Optional[float] = 10.0,
+        default_retry: Optional[RetryPolicy] = None,
+        default_max_concurrency: int = 2
+    ):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 同步动作线程池大小
+            default_timeout: 默认单次执行超时（秒），None表示不限
+            default_retry: 默认重试策略（默认不重试）
+            default_max_concurrency: 单个规则默认的最大在途执行数（含已超时但仍在运行的动作）
+        """
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.default_retry = default_retry or RetryPolicy()
+        self.default_max_concurrency = default_max_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rule-action")
+        self._in_flight: Dict[str, int] = {}
+        self._in_flight_lock = threading.Lock()
+
+    async def run_all(self, rules: List["Rule"], event: Dict[str, Any], engine: "RuleEngine") -> List[ActionOutcome]:
+        """
+        并发执行多个规则动作
+
+        Returns:
+            与 rules 对应的执行结果
+        """
+        return list(await asyncio.gather(*(self.run(rule, event, engine) for rule in rules)))
+
+    async def run(self, rule: "Rule", event: Dict[str, Any], engine: "RuleEngine") -> ActionOutcome:
+        """
+        执行单个规则动作（含超时与重试），不抛出异常
+
+        超时后只有 rule.idempotent 为 True 时才重试；
+        规则在途执行数达到上限时本次尝试不提交，按失败处理（可重试）。
+
+        Returns:
+            执行结果
+        """
+        timeout = rule.timeout if rule.timeout is not None else self.default_timeout
+        retry = rule.retry or self.default_retry
+        rule.mark_triggered()
+
+        if rule.action is None:
+            rule.record_result(True)
+            return ActionOutcome.SUCCEEDED
+
+        outcome = ActionOutcome.FAILED
+        for attempt in range(1, max(retry.max_attempts, 1) + 1):
+            if not self._try_acquire(rule):
+                rule.stats["rejected_count"] += 1
+                outcome = ActionOutcome.FAILED
+                logger.warning(
+                    f"Rule {rule.rule_id} has {self._concurrency_limit(rule)} runs in flight, "
+                    f"attempt {attempt} not started"
+                )
+            else:
+                start = time.perf_counter()
+                try:
+                    await asyncio.wait_for(self._invoke(rule, event, engine), timeout=timeout)
+                    rule.latency.observe((time.perf_counter() - start) * 1000)
+                    rule.record_result(True)
+                    return ActionOutcome.SUCCEEDED
+                except asyncio.TimeoutError:
+                    rule.latency.observe((time.perf_counter() - start) * 1000)
+                    rule.stats["timeout_count"] += 1
+                    outcome = ActionOutcome.TIMED_OUT
+                    logger.warning(f"Rule {rule.rule_id} timed out after {timeout}s (attempt {attempt})")
+                    if not rule.idempotent:
+                        # 动作可能仍在执行，重复提交会重复产生副作用
+                        break
+                except Exception as e:
+                    rule.latency.observe((time.perf_counter() - start) * 1000)
+                    outcome = ActionOutcome.FAILED
+                    logger.error(f"Error executing rule {rule.rule_id} (attempt {attempt}): {e}", exc_info=True)
+
+            if attempt < retry.max_attempts:
+                rule.stats["retry_count"] += 1
+                await asyncio.sleep(retry.delay(attempt))
+
+        rule.record_result(False)
+        return outcome
+
+    def _concurrency_limit(self, rule: "Rule") -> int:
+        return rule.max_concurrency if rule.max_concurrency is not None else self.default_max_concurrency
+
+    def _try_acquire(self, rule: "Rule") -> bool:
+        """占用规则的一个在途名额，已达上限时返回False"""
+        with self._in_flight_lock:
+            count = self._in_flight.get(rule.rule_id, 0)
+            if count >= self._concurrency_limit(rule):
+                return False
+            self._in_flight[rule.rule_id] = count + 1
+            return True
+
+    def _release(self, rule_id: str) -> None:
+        """动作真正结束（含超时后才结束的同步动作）时归还名额"""
+        with self._in_flight_lock:
+            count = self._in_flight.get(rule_id, 0) - 1
+            if count > 0:
+                self._in_flight[rule_id] = count
+            else:
+                self._in_flight.pop(rule_id, None)
+
+    def in_flight(self, rule_id: str) -> int:
+        """规则当前的在途执行数"""
+        with self._in_flight_lock:
+            return self._in_flight.get(rule_id, 0)
+
+    def _invoke(self, rule: "Rule", event: Dict[str, Any], engine: "RuleEngine"):
+        """返回执行动作的awaitable：异步动作直接调用，同步动作提交到线程池
+
+        调用前已占用在途名额，动作结束时归还。同步动作超时后线程中的调用无法中断，
+        名额在线程真正返回后才归还。
+        """
+        rule_id = rule.rule_id
+        if inspect.iscoroutinefunction(rule.action):
+            async def run_action():
+                try:
+                    return await rule.action(event, engine)
+                finally:
+                    self._release(rule_id)
+            return run_action()
+        try:
+            future = self._pool.submit(rule.action, event, engine)
+        except Exception:
+            self._release(rule_id)
+            raise
+        future.add_done_callback(lambda _: self._release(rule_id))
+        return asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        self._pool.shutdown(wait=wait)
@@ -14,8 +14,6 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 import json
-import sqlite3
-from contextlib import contextmanager
 
 from pydantic import BaseModel, Field
 
@@ -33,6 +31,7 @@ from services.event_service import (
     EventSource,
     EventSeverity,
 )
+from services.db_pool import get_connection_pool
 
 
 # ============================================================================
@@ -146,9 +145,15 @@ class ArchitectOrchestrator:
                 / "tasks.db"
             )
 
+        self._pool = get_connection_pool(str(self.db_path))
+
         # 事件发射器：用于记录架构师分析提交、任务/问题/知识创建等事件
+        # 使用写后队列，事件落库不阻塞API请求
         try:
-            self._event_emitter = create_event_emitter(db_path=str(self.db_path))
+            self._event_emitter = create_event_emitter(
+                db_path=str(self.db_path),
+                write_behind=True
+            )
         except Exception:
             # 如果事件系统初始化失败，不阻塞主流程，只在发射事件时静默忽略
             self._event_emitter = None
@@ -157,18 +162,9 @@ class ArchitectOrchestrator:
     # 数据库连接辅助方法
     # -------------------------------------------------------------------------
 
-    @contextmanager
-    def _get_db_connection(self) -> sqlite3.Connection:
-        """获取到 tasks.db 的连接（上下文管理器）"""
-        conn = sqlite3.connect(str(self.db_path))
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+    def _get_db_connection(self):
+        """获取到 tasks.db 的连接（上下文管理器，来自共享连接池）"""
+        return self._pool.connection()
         
     def process_analysis(
         self,
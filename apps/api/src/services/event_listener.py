@@ -3,20 +3,23 @@
 事件监听器（Event Listener）
 
 功能：
-1. 轮询事件流，监听新事件
+1. 订阅进程内事件总线，事件提交后立即处理
 2. 根据规则引擎处理事件
 3. 触发通知机制
 
 设计：
-- 采用轮询方式（简单可靠）
-- 可扩展为WebSocket（Phase 2）
+- 总线只负责唤醒，事件按 rowid 高水位线从数据库顺序读取，不漏不跳
+- 高水位线持久化（event_consumer_offsets），重启后从上次位置继续
+- 高水位线只推进到已处理的事件：处理失败时按指数退避重试，重试用尽后登记死信
+  （event_dead_letters）再推进；死信登记失败则停止本批次，下次唤醒时从失败事件重新处理
+- poll_interval 作为兜底追赶间隔（覆盖其他进程写入的事件）
 - 支持多规则并发执行
 """
 
 import asyncio
 import logging
 from typing import Dict, Any, Optional, List, Callable
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import sys
 
@@ -25,6 +28,8 @@ packages_path = Path(__file__).parent.parent.parent.parent.parent / "packages" /
 sys.path.insert(0, str(packages_path))
 
 from services.event_service import EventStore, create_event_store, EventCategory, EventSeverity
+from services.event_bus import EventBus, get_event_bus
+from services.rule_engine import RuleExecutionError
 
 
 # ============================================================================
@@ -35,32 +40,48 @@ class EventListener:
     """
     事件监听器
     
-    采用轮询方式监听事件，并根据规则引擎处理
+    由事件总线唤醒，按 rowid 高水位线读取新事件，并根据规则引擎处理
     """
     
     def __init__(
         self, 
         event_store: Optional[EventStore] = None,
         poll_interval: int = 5,
-        project_id: str = "TASKFLOW"
+        project_id: str = "TASKFLOW",
+        event_bus: Optional[EventBus] = None,
+        consumer_id: Optional[str] = None,
+        batch_size: int = 500,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
     ):
         """
         初始化事件监听器
         
         Args:
             event_store: 事件存储实例，如果为None则创建新实例
-            poll_interval: 轮询间隔（秒）
+            poll_interval: 兜底追赶间隔（秒），无总线通知时按此间隔检查新事件
             project_id: 监听的项目ID
+            event_bus: 事件总线，默认为进程级总线
+            consumer_id: 高水位线持久化使用的消费者ID，默认 listener:{project_id}
+            batch_size: 单次从数据库读取的事件数
+            max_retries: 单个事件处理失败后的最大重试次数，用尽后登记死信
+            retry_backoff: 首次重试前的等待时间（秒），之后每次翻倍
         """
         self.event_store = event_store or create_event_store()
+        self.event_bus = event_bus or get_event_bus()
         self.poll_interval = poll_interval
         self.project_id = project_id
+        self.consumer_id = consumer_id
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
         self.logger = logging.getLogger(__name__)
         
         # 监听状态
         self.is_running = False
         self.last_poll_time: Optional[datetime] = None
-        self.processed_event_ids: set = set()
+        self.last_rowid: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
         
         # 规则引擎和通知服务（延迟注入）
         self.rule_engine: Optional['RuleEngine'] = None
@@ -71,10 +92,18 @@ class EventListener:
             "total_polled": 0,
             "total_processed": 0,
             "total_errors": 0,
+            "total_retries": 0,
+            "total_dead_lettered": 0,
             "started_at": None,
-            "last_poll_at": None
+            "last_poll_at": None,
+            "bus_wakeups": 0
         }
     
+    @property
+    def offset_key(self) -> str:
+        """高水位线持久化键"""
+        return self.consumer_id or f"listener:{self.project_id}"
+    
     def set_rule_engine(self, rule_engine: 'RuleEngine') -> None:
         """设置规则引擎"""
         self.rule_engine = rule_engine
@@ -93,87 +122,182 @@ class EventListener:
         
         self.is_running = True
         self.stats["started_at"] = datetime.now().isoformat()
-        self.last_poll_time = datetime.now() - timedelta(seconds=self.poll_interval)
+        
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        
+        # 恢复高水位线；首次启动从当前位置开始，只处理之后的新事件
+        self.last_rowid = await loop.run_in_executor(
+            None, self.event_store.get_consumer_offset, self.offset_key
+        )
+        if self.last_rowid is None:
+            self.last_rowid = await loop.run_in_executor(None, self.event_store.get_max_rowid)
+            await loop.run_in_executor(
+                None, self.event_store.save_consumer_offset, self.offset_key, self.last_rowid
+            )
+        
+        def on_events(events: List[Dict[str, Any]]) -> None:
+            # 在发布方线程中调用，只做唤醒
+            try:
+                loop.call_soon_threadsafe(self._notify)
+            except RuntimeError:
+                pass  # 事件循环已关闭
+        
+        unsubscribe = self.event_bus.subscribe(on_events, project_id=self.project_id)
         
         self.logger.info(f"EventListener started for project: {self.project_id}")
-        self.logger.info(f"Poll interval: {self.poll_interval}s")
+        self.logger.info(f"Resuming after rowid {self.last_rowid}, catch-up interval: {self.poll_interval}s")
         
-        # 开始轮询循环
         try:
             while self.is_running:
+                self._wakeup.clear()
                 await self._poll_and_process()
-                await asyncio.sleep(self.poll_interval)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
         except Exception as e:
             self.logger.error(f"EventListener error: {e}", exc_info=True)
             self.is_running = False
+        finally:
+            unsubscribe()
+    
+    def _notify(self) -> None:
+        """总线唤醒（事件循环线程中执行）"""
+        self.stats["bus_wakeups"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
     
     async def stop(self) -> None:
         """停止监听器"""
         self.logger.info("Stopping EventListener...")
         self.is_running = False
+        if self._wakeup is not None:
+            self._wakeup.set()
     
     async def _poll_and_process(self) -> None:
-        """轮询并处理新事件"""
+        """读取高水位线之后的全部新事件并处理"""
+        loop = asyncio.get_running_loop()
         try:
-            # 查询从上次轮询以来的新事件
-            now = datetime.now()
-            start_time = self.last_poll_time.isoformat() if self.last_poll_time else None
-            
-            # 查询新事件
-            events = self.event_store.query(
-                project_id=self.project_id,
-                start_time=start_time,
-                limit=100
-            )
-            
-            # 更新轮询时间
-            self.last_poll_time = now
-            self.stats["last_poll_at"] = now.isoformat()
-            self.stats["total_polled"] += len(events)
-            
-            # 过滤未处理的事件
-            new_events = [
-                event for event in events 
-                if event["id"] not in self.processed_event_ids
-            ]
-            
-            if new_events:
-                self.logger.info(f"Found {len(new_events)} new events to process")
+            while self.is_running:
+                events, high_water = await loop.run_in_executor(
+                    None,
+                    self.event_store.read_since,
+                    self.last_rowid,
+                    self.project_id,
+                    self.batch_size
+                )
+                
+                now = datetime.now()
+                self.last_poll_time = now
+                self.stats["last_poll_at"] = now.isoformat()
+                self.stats["total_polled"] += len(events)
+                
+                if events:
+                    self.logger.info(f"Found {len(events)} new events to process")
                 
-                # 处理每个新事件
-                for event in new_events:
-                    await self._process_event(event)
+                # 按提交顺序处理；某个事件未能处理（也未能登记死信）时停止本批次
+                handled_rowid = self.last_rowid
+                completed = True
+                for event in events:
+                    if not await self._handle_event(event):
+                        completed = False
+                        break
+                    handled_rowid = event["rowid"]
+                
+                # 高水位线只推进到最后一个已处理的事件（至少一次语义）；
+                # 整批处理完成时推进到读取上界（跳过其他项目的事件）
+                mark = high_water if completed else handled_rowid
+                if mark != self.last_rowid:
+                    self.last_rowid = mark
+                    await loop.run_in_executor(
+                        None, self.event_store.save_consumer_offset, self.offset_key, mark
+                    )
+                
+                if not completed or len(events) < self.batch_size:
+                    break
             
         except Exception as e:
             self.logger.error(f"Error in poll_and_process: {e}", exc_info=True)
             self.stats["total_errors"] += 1
     
-    async def _process_event(self, event: Dict[str, Any]) -> None:
+    async def _handle_event(self, event: Dict[str, Any]) -> bool:
         """
-        处理单个事件
+        处理单个事件：失败时指数退避重试，重试用尽后登记死信
+        
+        规则引擎报告部分规则失败时，重试只重新执行失败的规则。
         
         Args:
-            event: 事件对象
+            event: 事件对象（含 rowid）
+        
+        Returns:
+            事件是否已处理（成功或已登记死信），False 时高水位线不能越过该事件
         """
-        try:
-            event_id = event["id"]
-            event_type = event["event_type"]
-            
-            self.logger.debug(f"Processing event: {event_id} ({event_type})")
-            
-            # 标记为已处理
-            self.processed_event_ids.add(event_id)
-            self.stats["total_processed"] += 1
+        rule_ids: Optional[List[str]] = None
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await self._process_event(event, rule_ids)
+                return True
+            except Exception as e:
+                error = e
+                self.stats["total_errors"] += 1
+                if isinstance(e, RuleExecutionError):
+                    rule_ids = e.retry_rule_ids
+                    if not rule_ids:
+                        break  # 失败的规则都不能重新执行
             
-            # 如果有规则引擎，执行规则匹配
-            if self.rule_engine:
-                await self.rule_engine.process_event(event)
-            else:
-                self.logger.warning("No rule engine configured, event not processed")
+            if attempts > self.max_retries:
+                break
+            if not self.is_running:
+                # 停止中：不登记死信，重启后从该事件继续
+                return False
             
+            delay = self.retry_backoff * (2 ** (attempts - 1))
+            self.stats["total_retries"] += 1
+            self.logger.warning(
+                f"Event {event.get('id')} failed (attempt {attempts}), retrying in {delay}s: {error}"
+            )
+            await asyncio.sleep(delay)
+        
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                None, self.event_store.save_dead_letter, self.offset_key, event, str(error), attempts
+            )
         except Exception as e:
-            self.logger.error(f"Error processing event {event.get('id', 'unknown')}: {e}", exc_info=True)
-            self.stats["total_errors"] += 1
+            self.logger.error(f"Failed to dead-letter event {event.get('id')}: {e}", exc_info=True)
+            return False
+        
+        self.stats["total_dead_lettered"] += 1
+        self.logger.error(f"Event {event.get('id')} dead-lettered after {attempts} attempts: {error}")
+        return True
+    
+    async def _process_event(self, event: Dict[str, Any], rule_ids: Optional[List[str]] = None) -> None:
+        """
+        处理单个事件（失败时抛出异常，由 _handle_event 重试）
+        
+        Args:
+            event: 事件对象
+            rule_ids: 只重新执行这些规则，None表示全部匹配规则
+        """
+        event_id = event["id"]
+        event_type = event["event_type"]
+        
+        self.logger.debug(f"Processing event: {event_id} ({event_type})")
+        
+        # 如果有规则引擎，执行规则匹配
+        if self.rule_engine:
+            await self.rule_engine.process_event(event, rule_ids)
+        else:
+            self.logger.warning("No rule engine configured, event not processed")
+        
+        self.stats["total_processed"] += 1
+    
+    def get_dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """获取本监听器登记的死信事件"""
+        return self.event_store.list_dead_letters(self.offset_key, limit)
     
     def get_stats(self) -> Dict[str, Any]:
         """获取监听器统计信息"""
@@ -182,7 +306,9 @@ class EventListener:
             "is_running": self.is_running,
             "project_id": self.project_id,
             "poll_interval": self.poll_interval,
-            "processed_event_count": len(self.processed_event_ids)
+            "processed_event_count": self.stats["total_processed"],
+            "consumer_id": self.offset_key,
+            "last_rowid": self.last_rowid
         }
     
     def reset_stats(self) -> None:
@@ -191,10 +317,12 @@ class EventListener:
             "total_polled": 0,
             "total_processed": 0,
             "total_errors": 0,
+            "total_retries": 0,
+            "total_dead_lettered": 0,
             "started_at": self.stats.get("started_at"),
-            "last_poll_at": None
+            "last_poll_at": None,
+            "bus_wakeups": 0
         }
-        self.processed_event_ids.clear()
         self.logger.info("EventListener stats reset")
 
 
@@ -211,7 +339,7 @@ def create_event_listener(
     
     Args:
         project_id: 项目ID
-        poll_interval: 轮询间隔（秒）
+        poll_interval: 兜底追赶间隔（秒）
     
     Returns:
         EventListener实例
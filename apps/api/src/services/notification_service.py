@@ -9,18 +9,29 @@
 4. （可选）系统托盘通知
 
 设计：
-- 通知存储在内存队列中
+- 通知持久化在 SQLite（与事件系统共用 tasks.db 连接池），重启不丢失，多个API进程共享
+- 按ID唯一索引查找；未读/类型部分索引支撑最新优先的列表查询
+- 总数/未读数/发送数由触发器增量维护在计数表中，读取为O(1)
+- 超出保留上限后批量删除最旧通知（保留压缩），代替内存队列的 maxlen
 - Dashboard通过API轮询获取通知
-- 未来可扩展WebSocket推送
 """
 
+import json
 import logging
+import sys
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from collections import deque
 from enum import Enum
+from pathlib import Path
 import uuid
 
+# 添加packages路径
+packages_path = Path(__file__).parent.parent.parent.parent.parent / "packages" / "core-domain" / "src"
+if str(packages_path) not in sys.path:
+    sys.path.insert(0, str(packages_path))
+
+from services.db_pool import get_connection_pool
+
 
 # ============================================================================
 # 通知类型枚举
@@ -34,6 +45,67 @@ class NotificationType(str, Enum):
     ERROR = "error"
 
 
+# ============================================================================
+# 存储结构（与 database/migrations/009_notifications.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        type TEXT NOT NULL,
+        data TEXT,
+        duration INTEGER NOT NULL DEFAULT 5000,
+        priority INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        read INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(seq) WHERE read = 0",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_type ON notifications(type, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_type_unread ON notifications(type, seq) WHERE read = 0",
+    """
+    CREATE TABLE IF NOT EXISTS notification_counters (
+        scope TEXT PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        unread INTEGER NOT NULL DEFAULT 0,
+        sent INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_insert AFTER INSERT ON notifications
+    BEGIN
+        INSERT INTO notification_counters (scope, total, unread, sent)
+        VALUES ('*', 1, NEW.read = 0, 1), ('type:' || NEW.type, 1, NEW.read = 0, 1)
+        ON CONFLICT(scope) DO UPDATE SET
+            total = total + 1,
+            unread = unread + excluded.unread,
+            sent = sent + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_delete AFTER DELETE ON notifications
+    BEGIN
+        UPDATE notification_counters
+        SET total = total - 1, unread = unread - (OLD.read = 0)
+        WHERE scope IN ('*', 'type:' || OLD.type);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_read AFTER UPDATE OF read ON notifications
+    WHEN OLD.read <> NEW.read
+    BEGIN
+        UPDATE notification_counters
+        SET unread = unread + (CASE WHEN NEW.read = 0 THEN 1 ELSE -1 END)
+        WHERE scope IN ('*', 'type:' || NEW.type);
+    END
+    """
+)
+
+
 # ============================================================================
 # 通知服务
 # ============================================================================
@@ -45,26 +117,72 @@ class NotificationService:
     管理通知的创建、存储和获取
     """
     
-    def __init__(self, max_notifications: int = 1000):
+    def __init__(
+        self,
+        max_notifications: int = 1000,
+        db_path: str = "database/data/tasks.db"
+    ):
         """
         初始化通知服务
         
         Args:
-            max_notifications: 最大通知数量（超过时删除旧通知）
+            max_notifications: 保留的最大通知数量（超过一定余量后批量删除旧通知）
+            db_path: 数据库文件路径
         """
-        self.notifications: deque = deque(maxlen=max_notifications)
+        self.max_notifications = max_notifications
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = get_connection_pool(str(self.db_path))
+        self._schema_checked = False
         self.logger = logging.getLogger(__name__)
         
-        # 统计信息
+        # 进程内统计（发送计数等持久化统计见 get_stats）
         self.stats = {
-            "total_sent": 0,
-            "info_count": 0,
-            "success_count": 0,
-            "warning_count": 0,
-            "error_count": 0,
+            "compactions": 0,
+            "compacted_count": 0,
             "started_at": datetime.now().isoformat()
         }
     
+    def _get_connection(self):
+        """获取数据库连接（上下文管理器）"""
+        return self._pool.connection()
+    
+    def _ensure_schema(self, conn) -> None:
+        """确保通知表、索引与计数触发器存在（兼容未执行 migration 009 的数据库）"""
+        if self._schema_checked:
+            return
+        for statement in _SCHEMA_STATEMENTS:
+            conn.execute(statement)
+        self._pool.call_after_commit(lambda: setattr(self, "_schema_checked", True))
+    
+    @property
+    def compaction_slack(self) -> int:
+        """保留压缩余量：超过 max_notifications + 余量 时才压缩，摊薄删除成本"""
+        return max(1, self.max_notifications // 10)
+    
+    @staticmethod
+    def _row_to_notification(row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "title": row[1],
+            "message": row[2],
+            "type": row[3],
+            "data": json.loads(row[4]) if row[4] else {},
+            "duration": row[5],
+            "priority": row[6],
+            "created_at": row[7],
+            "read": bool(row[8])
+        }
+    
+    def _read_counter(self, conn, scope: str = "*") -> Dict[str, int]:
+        row = conn.execute(
+            "SELECT total, unread, sent FROM notification_counters WHERE scope = ?",
+            (scope,)
+        ).fetchone()
+        if row is None:
+            return {"total": 0, "unread": 0, "sent": 0}
+        return {"total": row[0], "unread": row[1], "sent": row[2]}
+    
     def send_notification(
         self,
         title: str,
@@ -88,13 +206,14 @@ class NotificationService:
         Returns:
             创建的通知对象
         """
-        notification_id = f"NOTIF-{uuid.uuid4().hex[:8]}"
+        notification_id = f"NOTIF-{uuid.uuid4().hex[:12]}"
+        type_value = type.value if isinstance(type, NotificationType) else str(type)
         
         notification = {
             "id": notification_id,
             "title": title,
             "message": message,
-            "type": type,
+            "type": type_value,
             "data": data or {},
             "duration": duration,
             "priority": priority,
@@ -102,21 +221,28 @@ class NotificationService:
             "read": False
         }
         
-        # 添加到队列
-        self.notifications.append(notification)
-        
-        # 更新统计
-        self.stats["total_sent"] += 1
-        if type == NotificationType.INFO:
-            self.stats["info_count"] += 1
-        elif type == NotificationType.SUCCESS:
-            self.stats["success_count"] += 1
-        elif type == NotificationType.WARNING:
-            self.stats["warning_count"] += 1
-        elif type == NotificationType.ERROR:
-            self.stats["error_count"] += 1
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            conn.execute("""
+                INSERT INTO notifications (
+                    id, title, message, type, data, duration, priority, created_at, read
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """, (
+                notification_id,
+                title,
+                message,
+                type_value,
+                json.dumps(notification["data"], ensure_ascii=False, default=str),
+                duration,
+                priority,
+                notification["created_at"]
+            ))
+            
+            # 保留压缩（摊还：每 compaction_slack 条触发一次批量删除）
+            if self._read_counter(conn)["total"] > self.max_notifications + self.compaction_slack:
+                self._compact(conn)
         
-        self.logger.info(f"Notification sent: [{type}] {title}")
+        self.logger.info(f"Notification sent: [{type_value}] {title}")
         
         return notification
     
@@ -137,18 +263,28 @@ class NotificationService:
         Returns:
             通知列表（最新的在前）
         """
-        # 转换为列表（最新的在前）
-        notifications = list(reversed(self.notifications))
-        
-        # 过滤
+        # read = 0 以字面量写入，使查询规划器可以选用未读部分索引
+        conditions = []
+        params: List[Any] = []
         if unread_only:
-            notifications = [n for n in notifications if not n["read"]]
-        
+            conditions.append("read = 0")
         if type_filter:
-            notifications = [n for n in notifications if n["type"] == type_filter]
+            conditions.append("type = ?")
+            params.append(type_filter)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            rows = conn.execute(f"""
+                SELECT id, title, message, type, data, duration, priority, created_at, read
+                FROM notifications
+                {where}
+                ORDER BY seq DESC
+                LIMIT ?
+            """, params).fetchall()
         
-        # 限制数量
-        return notifications[:limit]
+        return [self._row_to_notification(row) for row in rows]
     
     def mark_as_read(self, notification_id: str) -> bool:
         """
@@ -160,12 +296,17 @@ class NotificationService:
         Returns:
             是否成功
         """
-        for notification in self.notifications:
-            if notification["id"] == notification_id:
-                notification["read"] = True
-                self.logger.debug(f"Notification marked as read: {notification_id}")
-                return True
-        return False
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            cursor = conn.execute(
+                "UPDATE notifications SET read = 1 WHERE id = ?",
+                (notification_id,)
+            )
+            found = cursor.rowcount > 0
+        
+        if found:
+            self.logger.debug(f"Notification marked as read: {notification_id}")
+        return found
     
     def mark_all_as_read(self) -> int:
         """
@@ -174,11 +315,10 @@ class NotificationService:
         Returns:
             标记数量
         """
-        count = 0
-        for notification in self.notifications:
-            if not notification["read"]:
-                notification["read"] = True
-                count += 1
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            cursor = conn.execute("UPDATE notifications SET read = 1 WHERE read = 0")
+            count = cursor.rowcount
         
         self.logger.info(f"Marked {count} notifications as read")
         return count
@@ -193,12 +333,17 @@ class NotificationService:
         Returns:
             是否成功
         """
-        for i, notification in enumerate(self.notifications):
-            if notification["id"] == notification_id:
-                del self.notifications[i]
-                self.logger.debug(f"Notification deleted: {notification_id}")
-                return True
-        return False
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            cursor = conn.execute(
+                "DELETE FROM notifications WHERE id = ?",
+                (notification_id,)
+            )
+            found = cursor.rowcount > 0
+        
+        if found:
+            self.logger.debug(f"Notification deleted: {notification_id}")
+        return found
     
     def clear_all(self, type_filter: Optional[str] = None) -> int:
         """
@@ -210,33 +355,85 @@ class NotificationService:
         Returns:
             清除数量
         """
-        if type_filter:
-            # 只清除指定类型
-            before_count = len(self.notifications)
-            self.notifications = deque(
-                [n for n in self.notifications if n["type"] != type_filter],
-                maxlen=self.notifications.maxlen
-            )
-            count = before_count - len(self.notifications)
-        else:
-            # 清空全部
-            count = len(self.notifications)
-            self.notifications.clear()
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            if type_filter:
+                # 只清除指定类型
+                cursor = conn.execute("DELETE FROM notifications WHERE type = ?", (type_filter,))
+            else:
+                # 清空全部
+                cursor = conn.execute("DELETE FROM notifications")
+            count = cursor.rowcount
         
         self.logger.info(f"Cleared {count} notifications")
         return count
     
-    def get_unread_count(self) -> int:
-        """获取未读通知数量"""
-        return sum(1 for n in self.notifications if not n["read"])
+    def compact(self) -> int:
+        """
+        立即执行保留压缩，只保留最新的 max_notifications 条
+        
+        Returns:
+            删除数量
+        """
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            return self._compact(conn)
+    
+    def _compact(self, conn) -> int:
+        row = conn.execute(
+            "SELECT seq FROM notifications ORDER BY seq DESC LIMIT 1 OFFSET ?",
+            (self.max_notifications,)
+        ).fetchone()
+        if row is None:
+            return 0
+        count = conn.execute("DELETE FROM notifications WHERE seq <= ?", (row[0],)).rowcount
+        self.stats["compactions"] += 1
+        self.stats["compacted_count"] += count
+        self.logger.info(f"Compacted {count} old notifications")
+        return count
+    
+    def get_count(self) -> int:
+        """获取当前保留的通知数量"""
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            return self._read_counter(conn)["total"]
+    
+    def get_unread_count(self, type_filter: Optional[str] = None) -> int:
+        """获取未读通知数量（可按类型）"""
+        scope = f"type:{type_filter}" if type_filter else "*"
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            return self._read_counter(conn, scope)["unread"]
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
+        with self._get_connection() as conn:
+            self._ensure_schema(conn)
+            rows = conn.execute(
+                "SELECT scope, total, unread, sent FROM notification_counters"
+            ).fetchall()
+        
+        counters = {row[0]: {"total": row[1], "unread": row[2], "sent": row[3]} for row in rows}
+        overall = counters.get("*", {"total": 0, "unread": 0, "sent": 0})
+        by_type = {
+            scope[len("type:"):]: counter
+            for scope, counter in counters.items()
+            if scope.startswith("type:")
+        }
+        
+        stats = {"total_sent": overall["sent"]}
+        for notification_type in NotificationType:
+            stats[f"{notification_type.value}_count"] = by_type.get(
+                notification_type.value, {}
+            ).get("sent", 0)
+        
         return {
+            **stats,
             **self.stats,
-            "current_count": len(self.notifications),
-            "unread_count": self.get_unread_count(),
-            "max_notifications": self.notifications.maxlen
+            "current_count": overall["total"],
+            "unread_count": overall["unread"],
+            "by_type": by_type,
+            "max_notifications": self.max_notifications
         }
 
 
@@ -332,17 +529,21 @@ class NotificationHelper:
 # 便捷函数
 # ============================================================================
 
-def create_notification_service(max_notifications: int = 1000) -> NotificationService:
+def create_notification_service(
+    max_notifications: int = 1000,
+    db_path: str = "database/data/tasks.db"
+) -> NotificationService:
     """
     创建通知服务实例
     
     Args:
         max_notifications: 最大通知数量
+        db_path: 数据库文件路径
     
     Returns:
         NotificationService实例
     """
-    return NotificationService(max_notifications=max_notifications)
+    return NotificationService(max_notifications=max_notifications, db_path=db_path)
 
 
 def create_notification_helper(service: NotificationService) -> NotificationHelper:
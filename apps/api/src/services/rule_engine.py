@@ -14,8 +14,10 @@
 """
 
 import logging
-from typing import Dict, Any, Optional, List, Callable
+import re
+from typing import Dict, Any, Optional, List, Callable, Union
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import sys
 
@@ -24,12 +26,73 @@ packages_path = Path(__file__).parent.parent.parent.parent.parent / "packages" /
 sys.path.insert(0, str(packages_path))
 
 from services.event_service import EventEmitter, create_event_emitter
+from services.action_executor import ActionExecutor, ActionOutcome, LatencyHistogram, RetryPolicy
+
+
+# ============================================================================
+# 异常
+# ============================================================================
+
+class RuleExecutionError(Exception):
+    """事件匹配的部分规则执行失败（各规则自身的超时/重试已用尽）"""
+
+    def __init__(self, event_id: Optional[str], failed_rule_ids: List[str], retry_rule_ids: Optional[List[str]] = None):
+        """
+        Args:
+            event_id: 事件ID
+            failed_rule_ids: 执行失败的规则
+            retry_rule_ids: 可以重新投递的规则，默认与 failed_rule_ids 相同
+        """
+        self.event_id = event_id
+        self.failed_rule_ids = list(failed_rule_ids)
+        self.retry_rule_ids = list(failed_rule_ids if retry_rule_ids is None else retry_rule_ids)
+        super().__init__(f"Rules failed for event {event_id}: {', '.join(self.failed_rule_ids)}")
 
 
 # ============================================================================
 # 规则定义
 # ============================================================================
 
+@lru_cache(maxsize=4096)
+def _compile_pattern(pattern: str) -> Optional["re.Pattern"]:
+    """编译通配符模式（*匹配任意字符序列）；无通配符时返回None（精确匹配）"""
+    if "*" not in pattern:
+        return None
+    return re.compile("^" + ".*".join(re.escape(part) for part in pattern.split("*")) + "$", re.DOTALL)
+
+
+def _compile_condition(
+    condition: Union[Callable[[Dict[str, Any]], bool], Dict[str, Any], None]
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """
+    编译条件为谓词函数
+    
+    Args:
+        condition: 条件函数；或 {字段: 期望值} 字典，期望值为列表/集合时表示"属于其一"
+    
+    Returns:
+        谓词函数，None表示无条件
+    """
+    if condition is None or callable(condition):
+        return condition
+    
+    checks = []
+    for field_name, expected in condition.items():
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            checks.append((field_name, frozenset(expected), True))
+        else:
+            checks.append((field_name, expected, False))
+    
+    def predicate(event: Dict[str, Any]) -> bool:
+        for field_name, expected, is_set in checks:
+            value = event.get(field_name)
+            if (value not in expected) if is_set else (value != expected):
+                return False
+        return True
+    
+    return predicate
+
+
 class Rule:
     """
     规则类
@@ -43,8 +106,12 @@ class Rule:
         name: str,
         description: str,
         event_type_pattern: str,
-        condition: Optional[Callable[[Dict[str, Any]], bool]] = None,
-        action: Callable[[Dict[str, Any], 'RuleEngine'], None] = None
+        condition: Union[Callable[[Dict[str, Any]], bool], Dict[str, Any], None] = None,
+        action: Callable[[Dict[str, Any], 'RuleEngine'], None] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        idempotent: bool = False,
+        max_concurrency: Optional[int] = None
     ):
         """
         初始化规则
@@ -53,16 +120,25 @@ class Rule:
             rule_id: 规则ID
             name: 规则名称
             description: 规则描述
-            event_type_pattern: 事件类型模式（支持通配符*）
-            condition: 条件函数（可选），返回True表示匹配
-            action: 动作函数，接收事件和规则引擎作为参数
+            event_type_pattern: 事件类型模式（支持通配符*，可出现多次）
+            condition: 条件（可选）：函数返回True表示匹配，或 {字段: 期望值} 字典
+            action: 动作函数（同步或async），接收事件和规则引擎作为参数
+            timeout: 单次执行超时（秒），None表示使用执行器默认值
+            retry: 重试策略，None表示使用执行器默认值
+            idempotent: 动作是否幂等；只有幂等规则在超时后才会重试
+            max_concurrency: 最大在途执行数（含超时后仍在运行的动作），None表示使用执行器默认值
         """
         self.rule_id = rule_id
         self.name = name
         self.description = description
+        self._indexes: List['RuleIndex'] = []  # 已注册到的规则索引
         self.event_type_pattern = event_type_pattern
         self.condition = condition
         self.action = action
+        self.timeout = timeout
+        self.retry = retry
+        self.idempotent = idempotent
+        self.max_concurrency = max_concurrency
         self.is_enabled = True
         
         # 统计信息
@@ -70,8 +146,47 @@ class Rule:
             "triggered_count": 0,
             "success_count": 0,
             "error_count": 0,
+            "timeout_count": 0,
+            "retry_count": 0,
+            "rejected_count": 0,
             "last_triggered": None
         }
+        self.latency = LatencyHistogram()
+    
+    @property
+    def event_type_pattern(self) -> str:
+        return self._event_type_pattern
+    
+    @event_type_pattern.setter
+    def event_type_pattern(self, pattern: str) -> None:
+        # 已注册的规则按旧模式移出索引，改完后按新模式放回
+        for index in self._indexes:
+            index._discard(self)
+        # 模式在赋值时编译一次，匹配时不再切分字符串
+        self._event_type_pattern = pattern
+        self._pattern_regex = _compile_pattern(pattern)
+        self.literal_prefix = pattern.split("*", 1)[0]
+        for index in self._indexes:
+            index._insert(self)
+    
+    @property
+    def condition(self) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        return self._condition
+    
+    @condition.setter
+    def condition(self, condition) -> None:
+        self._condition = _compile_condition(condition)
+    
+    @property
+    def is_wildcard(self) -> bool:
+        """是否为通配符模式"""
+        return self._pattern_regex is not None
+    
+    def matches_event_type(self, event_type: str) -> bool:
+        """检查事件类型是否匹配（使用预编译模式）"""
+        if self._pattern_regex is None:
+            return event_type == self._event_type_pattern
+        return self._pattern_regex.match(event_type) is not None
     
     def matches(self, event: Dict[str, Any]) -> bool:
         """
@@ -87,17 +202,18 @@ class Rule:
             return False
         
         # 匹配事件类型
-        event_type = event.get("event_type", "")
-        if not self._match_pattern(event_type, self.event_type_pattern):
+        if not self.matches_event_type(event.get("event_type", "")):
             return False
         
-        # 如果有条件函数，执行条件检查
-        if self.condition:
+        return self.check_condition(event)
+    
+    def check_condition(self, event: Dict[str, Any]) -> bool:
+        """执行条件检查（无条件时返回True）"""
+        if self._condition:
             try:
-                return self.condition(event)
+                return bool(self._condition(event))
             except Exception:
                 return False
-        
         return True
     
     def _match_pattern(self, text: str, pattern: str) -> bool:
@@ -115,14 +231,9 @@ class Rule:
         if pattern == text:
             return True
         
-        # 通配符匹配
-        if "*" in pattern:
-            parts = pattern.split("*")
-            if len(parts) == 2:
-                prefix, suffix = parts
-                return text.startswith(prefix) and text.endswith(suffix)
-        
-        return False
+        # 通配符匹配（编译结果按模式缓存）
+        regex = _compile_pattern(pattern)
+        return regex is not None and regex.match(text) is not None
     
     def execute(self, event: Dict[str, Any], engine: 'RuleEngine') -> bool:
         """
@@ -136,19 +247,144 @@ class Rule:
             是否执行成功
         """
         try:
-            self.stats["triggered_count"] += 1
-            self.stats["last_triggered"] = datetime.now().isoformat()
+            self.mark_triggered()
             
             if self.action:
                 self.action(event, engine)
             
-            self.stats["success_count"] += 1
+            self.record_result(True)
             return True
             
         except Exception as e:
             logging.error(f"Error executing rule {self.rule_id}: {e}", exc_info=True)
-            self.stats["error_count"] += 1
+            self.record_result(False)
             return False
+    
+    def mark_triggered(self) -> None:
+        """记录一次触发"""
+        self.stats["triggered_count"] += 1
+        self.stats["last_triggered"] = datetime.now().isoformat()
+    
+    def record_result(self, success: bool) -> None:
+        """记录执行结果"""
+        self.stats["success_count" if success else "error_count"] += 1
+
+
+# ============================================================================
+# 规则索引
+# ============================================================================
+
+class _PrefixTrie:
+    """通配符规则的前缀树：按模式中第一个*之前的字面前缀挂载规则"""
+    
+    __slots__ = ("children", "rules")
+    
+    def __init__(self):
+        self.children: Dict[str, "_PrefixTrie"] = {}
+        self.rules: List[Rule] = []
+    
+    def insert(self, prefix: str, rule: Rule) -> None:
+        node = self
+        for char in prefix:
+            node = node.children.setdefault(char, _PrefixTrie())
+        node.rules.append(rule)
+    
+    def remove(self, prefix: str, rule: Rule) -> None:
+        path = [self]
+        for char in prefix:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if rule in path[-1].rules:
+            path[-1].rules.remove(rule)
+        # 清理空分支
+        for depth in range(len(prefix), 0, -1):
+            node = path[depth]
+            if node.rules or node.children:
+                break
+            del path[depth - 1].children[prefix[depth - 1]]
+    
+    def collect(self, text: str) -> List[Rule]:
+        """收集字面前缀是 text 前缀的全部规则"""
+        found = list(self.rules)
+        node = self
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                break
+            found.extend(node.rules)
+        return found
+
+
+class RuleIndex:
+    """
+    规则索引
+    
+    - 精确模式：event_type → 规则列表（哈希桶）
+    - 通配符模式：字面前缀树，查找代价与事件类型长度相关，与规则总数无关
+    - rule_id → 规则字典
+    
+    已注册规则修改 event_type_pattern 时自动按新模式重新索引。
+    """
+    
+    def __init__(self):
+        self.by_id: Dict[str, Rule] = {}
+        self._exact: Dict[str, List[Rule]] = {}
+        self._wildcards = _PrefixTrie()
+        self._order: Dict[str, int] = {}
+        self._sequence = 0
+    
+    def add(self, rule: Rule) -> None:
+        self.by_id[rule.rule_id] = rule
+        self._order[rule.rule_id] = self._sequence
+        self._sequence += 1
+        self._insert(rule)
+        rule._indexes.append(self)
+    
+    def remove(self, rule_id: str) -> Optional[Rule]:
+        rule = self.by_id.pop(rule_id, None)
+        if rule is None:
+            return None
+        self._order.pop(rule_id, None)
+        self._discard(rule)
+        if self in rule._indexes:
+            rule._indexes.remove(self)
+        return rule
+    
+    def _insert(self, rule: Rule) -> None:
+        """按规则当前模式放入精确桶或前缀树"""
+        if rule.is_wildcard:
+            self._wildcards.insert(rule.literal_prefix, rule)
+        else:
+            bucket = self._exact.setdefault(rule.event_type_pattern, [])
+            bucket.append(rule)
+            # 重新索引的规则也保持桶内按注册顺序
+            if len(bucket) > 1 and self._order[bucket[-2].rule_id] > self._order[rule.rule_id]:
+                bucket.sort(key=lambda r: self._order[r.rule_id])
+    
+    def _discard(self, rule: Rule) -> None:
+        """按规则当前模式从精确桶或前缀树中移出"""
+        if rule.is_wildcard:
+            self._wildcards.remove(rule.literal_prefix, rule)
+        else:
+            bucket = self._exact.get(rule.event_type_pattern, [])
+            if rule in bucket:
+                bucket.remove(rule)
+            if not bucket:
+                self._exact.pop(rule.event_type_pattern, None)
+    
+    def candidates(self, event_type: str) -> List[Rule]:
+        """返回事件类型匹配的规则（按注册顺序）"""
+        matched = list(self._exact.get(event_type, ()))
+        wildcard_rules = [
+            rule for rule in self._wildcards.collect(event_type)
+            if rule.matches_event_type(event_type)
+        ]
+        if wildcard_rules:
+            matched.extend(wildcard_rules)
+            matched.sort(key=lambda rule: self._order[rule.rule_id])
+        return matched
 
 
 # ============================================================================
@@ -159,12 +395,18 @@ class RuleEngine:
     """
     规则引擎
     
-    管理多个规则，匹配事件并执行对应动作
+    管理多个规则，匹配事件并通过动作执行器并发执行对应动作
     """
     
-    def __init__(self):
-        """初始化规则引擎"""
-        self.rules: List[Rule] = []
+    def __init__(self, executor: Optional[ActionExecutor] = None):
+        """
+        初始化规则引擎
+        
+        Args:
+            executor: 动作执行器，默认创建（8线程、10秒超时、不重试）
+        """
+        self._index = RuleIndex()
+        self.executor = executor or ActionExecutor()
         self.logger = logging.getLogger(__name__)
         self.notification_service: Optional['NotificationService'] = None
         self.event_emitter: Optional[EventEmitter] = None
@@ -177,6 +419,11 @@ class RuleEngine:
             "started_at": datetime.now().isoformat()
         }
     
+    @property
+    def rules(self) -> List[Rule]:
+        """已注册规则（按注册顺序）"""
+        return list(self._index.by_id.values())
+    
     def set_notification_service(self, notification_service: 'NotificationService') -> None:
         """设置通知服务"""
         self.notification_service = notification_service
@@ -192,9 +439,11 @@ class RuleEngine:
         注册规则
         
         Args:
-            rule: 规则对象
+            rule: 规则对象（rule_id 已存在时替换旧规则）
         """
-        self.rules.append(rule)
+        if self._index.remove(rule.rule_id) is not None:
+            self.logger.warning(f"Rule {rule.rule_id} already registered, replacing")
+        self._index.add(rule)
         self.logger.info(f"Rule registered: {rule.rule_id} - {rule.name}")
     
     def unregister_rule(self, rule_id: str) -> bool:
@@ -207,19 +456,31 @@ class RuleEngine:
         Returns:
             是否成功
         """
-        for i, rule in enumerate(self.rules):
-            if rule.rule_id == rule_id:
-                self.rules.pop(i)
-                self.logger.info(f"Rule unregistered: {rule_id}")
-                return True
-        return False
+        if self._index.remove(rule_id) is None:
+            return False
+        self.logger.info(f"Rule unregistered: {rule_id}")
+        return True
     
     def get_rule(self, rule_id: str) -> Optional[Rule]:
         """获取规则"""
-        for rule in self.rules:
-            if rule.rule_id == rule_id:
-                return rule
-        return None
+        return self._index.by_id.get(rule_id)
+    
+    def match_rules(self, event: Dict[str, Any]) -> List[Rule]:
+        """
+        查找匹配事件的已启用规则（按注册顺序）
+        
+        先由索引按事件类型取候选，再检查启用状态和条件。
+        
+        Args:
+            event: 事件对象
+        
+        Returns:
+            匹配的规则列表
+        """
+        return [
+            rule for rule in self._index.candidates(event.get("event_type", ""))
+            if rule.is_enabled and rule.check_condition(event)
+        ]
     
     def enable_rule(self, rule_id: str) -> bool:
         """启用规则"""
@@ -239,49 +500,73 @@ class RuleEngine:
             return True
         return False
     
-    async def process_event(self, event: Dict[str, Any]) -> None:
+    async def process_event(self, event: Dict[str, Any], rule_ids: Optional[List[str]] = None) -> None:
         """
         处理事件，匹配规则并执行动作
         
         Args:
             event: 事件对象
+            rule_ids: 只执行其中的规则（重新投递时跳过已成功的规则），None表示全部匹配规则
+        
+        Raises:
+            RuleExecutionError: 有规则执行失败，由调用方决定重试或登记死信
         """
         try:
-            self.stats["total_events_processed"] += 1
+            if rule_ids is None:
+                self.stats["total_events_processed"] += 1
             event_type = event.get("event_type", "unknown")
             
             self.logger.debug(f"Processing event in RuleEngine: {event.get('id')} ({event_type})")
             
-            # 匹配所有规则
-            matched_rules = [rule for rule in self.rules if rule.matches(event)]
+            # 通过规则索引匹配
+            matched_rules = self.match_rules(event)
+            if rule_ids is not None:
+                matched_rules = [rule for rule in matched_rules if rule.rule_id in rule_ids]
             
             if matched_rules:
                 self.logger.info(f"Event {event.get('id')} matched {len(matched_rules)} rules")
                 
-                # 执行所有匹配的规则
-                for rule in matched_rules:
-                    success = rule.execute(event, self)
-                    if success:
-                        self.stats["total_rules_triggered"] += 1
+                # 并发执行所有匹配的规则（各自超时/重试，互不影响）
+                outcomes = await self.executor.run_all(matched_rules, event, self)
+                self.stats["total_rules_triggered"] += outcomes.count(ActionOutcome.SUCCEEDED)
+                
+                failed = [
+                    (rule, outcome) for rule, outcome in zip(matched_rules, outcomes)
+                    if outcome is not ActionOutcome.SUCCEEDED
+                ]
+                if failed:
+                    # 超时的非幂等动作可能已经生效，不交给调用方重新执行
+                    raise RuleExecutionError(
+                        event.get("id"),
+                        [rule.rule_id for rule, _ in failed],
+                        [
+                            rule.rule_id for rule, outcome in failed
+                            if outcome is ActionOutcome.FAILED or rule.idempotent
+                        ]
+                    )
             else:
                 self.logger.debug(f"No rules matched for event: {event.get('id')}")
             
         except Exception as e:
-            self.logger.error(f"Error in process_event: {e}", exc_info=True)
+            if not isinstance(e, RuleExecutionError):
+                self.logger.error(f"Error in process_event: {e}", exc_info=True)
             self.stats["total_errors"] += 1
+            raise
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         return {
             **self.stats,
-            "total_rules": len(self.rules),
-            "enabled_rules": len([r for r in self.rules if r.is_enabled]),
+            "total_rules": len(self._index.by_id),
+            "enabled_rules": len([r for r in self._index.by_id.values() if r.is_enabled]),
             "rules": [
                 {
                     "rule_id": rule.rule_id,
                     "name": rule.name,
                     "is_enabled": rule.is_enabled,
-                    "stats": rule.stats
+                    "stats": rule.stats,
+                    "in_flight": self.executor.in_flight(rule.rule_id),
+                    "latency": rule.latency.to_dict()
                 }
                 for rule in self.rules
             ]
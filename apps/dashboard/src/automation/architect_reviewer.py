@@ -17,6 +17,9 @@ from .models import Task, TaskStatus, Review
 from .state_manager import StateManager
 from .task_completion import TaskCompletion
 
+# state_manager 已把 core-domain 加入 sys.path
+from services.event_journal import get_feed
+
 
 class ArchitectReviewer:
     """架构师审查者
@@ -361,28 +364,12 @@ class ArchitectReviewer:
             content: 事件内容
         """
         try:
-            events_file = Path("automation-data/architect_events.json")
-            
-            if events_file.exists():
-                with open(events_file, 'r', encoding='utf-8') as f:
-                    events = json.load(f)
-            else:
-                events = []
-            
-            event = {
-                'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            # 写入架构师事件日志，保留策略由日志分段统一处理
+            get_feed("architect_events").append({
+                'type': 'architect_review',
                 'title': title,
                 'content': content
-            }
-            
-            events.append(event)
-            
-            # 只保留最近100条事件
-            if len(events) > 100:
-                events = events[-100:]
-            
-            with open(events_file, 'w', encoding='utf-8') as f:
-                json.dump(events, f, ensure_ascii=False, indent=2)
+            })
                 
         except Exception as e:
             print(f"[ArchitectReviewer] ✗ 记录事件失败: {str(e)}")
@@ -9,9 +9,11 @@ import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Tuple
 import sys
+import threading
+import time
+import weakref
 
 # 集成全局事件服务，用于在任务状态变更时写入 project_events
 core_domain_path = (
@@ -29,9 +31,20 @@ from services.event_service import (
     EventSeverity,
     EventSource,
 )
+from services.db_pool import ConnectionPool, get_connection_pool
 
 from .models import Task, TaskStatus, TaskPriority, Review, Worker, SystemStatus
 
+# 任务状态计数缓存（按连接池共享）：本进程的状态变更提交后立即失效，
+# 其他进程的写入最多延迟 STATUS_COUNTS_TTL 秒可见
+STATUS_COUNTS_TTL = 2.0
+_status_counts_cache: "weakref.WeakKeyDictionary[ConnectionPool, Tuple[float, Dict[str, int]]]" = (
+    weakref.WeakKeyDictionary()
+)
+# 失效代数：每次失效加1，读取期间代数变化的结果（可能是失效前的快照）不写回缓存
+_status_counts_generation: "weakref.WeakKeyDictionary[ConnectionPool, int]" = weakref.WeakKeyDictionary()
+_status_counts_lock = threading.Lock()
+
 
 class StateManager:
     """状态管理器
@@ -52,6 +65,7 @@ class StateManager:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = get_connection_pool(str(self.db_path))
 
         # 事件相关配置：project_events 写入使用主 tasks.db
         self.project_id = project_id
@@ -76,23 +90,13 @@ class StateManager:
         # 初始化数据库
         self._init_db()
     
-    @contextmanager
     def _get_connection(self):
         """获取数据库连接（上下文管理器）
         
         Yields:
-            sqlite3.Connection: 数据库连接
+            sqlite3.Connection: 连接池中的数据库连接
         """
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        return self._pool.connection()
     
     def _init_db(self) -> None:
         """初始化数据库表
@@ -160,6 +164,128 @@ class StateManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assigned ON tasks(assigned_to)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_reviews_task ON reviews(task_id)")
+            
+            self._init_revision_tables(cursor)
+            self._init_status_count_tables(cursor)
+    
+    def _init_revision_tables(self, cursor: sqlite3.Cursor) -> None:
+        """初始化看板修订号
+        
+        board_revision 保存单调递增的修订号；task_changes 记录每个任务最后一次
+        变更时的修订号（删除保留为墓碑）。二者由 tasks 上的触发器维护，
+        任何进程、任何写入路径都会递增。
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'board_revision'"
+        )
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS board_revision (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                revision INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_changes (
+                task_id TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_changes_revision ON task_changes(revision)")
+        
+        bump = """
+                UPDATE board_revision SET revision = revision + 1 WHERE id = 1;
+        """
+        record = """
+                INSERT INTO task_changes (task_id, revision, deleted)
+                SELECT {task_id}, revision, {deleted} FROM board_revision WHERE id = 1
+                ON CONFLICT(task_id) DO UPDATE SET revision = excluded.revision, deleted = excluded.deleted;
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_revision_insert AFTER INSERT ON tasks
+            BEGIN
+                {bump}
+                {record.format(task_id="NEW.id", deleted=0)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_revision_update AFTER UPDATE ON tasks
+            BEGIN
+                {bump}
+                {record.format(task_id="NEW.id", deleted=0)}
+                INSERT INTO task_changes (task_id, revision, deleted)
+                SELECT OLD.id, revision, 1 FROM board_revision WHERE id = 1 AND OLD.id <> NEW.id
+                ON CONFLICT(task_id) DO UPDATE SET revision = excluded.revision, deleted = 1;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_revision_delete AFTER DELETE ON tasks
+            BEGIN
+                {bump}
+                {record.format(task_id="OLD.id", deleted=1)}
+            END
+        """)
+        
+        if not exists:
+            # 已有任务记为修订号1，since=0 的增量请求可取得全部任务
+            cursor.execute("INSERT INTO board_revision (id, revision) VALUES (1, 1)")
+            cursor.execute("""
+                INSERT OR IGNORE INTO task_changes (task_id, revision, deleted)
+                SELECT id, 1, 0 FROM tasks
+            """)
+    
+    def _init_status_count_tables(self, cursor: sqlite3.Cursor) -> None:
+        """初始化任务状态计数
+        
+        task_status_counts 每个状态一行，由 tasks 上的触发器增减，
+        统计查询只读这几行，与任务总数无关。首次建表时从已有任务回填。
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_status_counts'"
+        )
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_status_counts (
+                status TEXT PRIMARY KEY,
+                task_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        increment = """
+                INSERT INTO task_status_counts (status, task_count) VALUES ({row}.status, 1)
+                ON CONFLICT(status) DO UPDATE SET task_count = task_count + 1;
+        """
+        decrement = """
+                UPDATE task_status_counts SET task_count = task_count - 1 WHERE status = {row}.status;
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_status_count_insert AFTER INSERT ON tasks
+            BEGIN
+                {increment.format(row="NEW")}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_status_count_update AFTER UPDATE OF status ON tasks
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                {decrement.format(row="OLD")}
+                {increment.format(row="NEW")}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tasks_status_count_delete AFTER DELETE ON tasks
+            BEGIN
+                {decrement.format(row="OLD")}
+            END
+        """)
+        
+        if not exists:
+            cursor.execute("""
+                INSERT INTO task_status_counts (status, task_count)
+                SELECT status, COUNT(*) FROM tasks GROUP BY status
+            """)
     
     def _task_dict_to_model(self, row: sqlite3.Row) -> Task:
         """将数据库行转换为 Task 模型
@@ -237,6 +363,7 @@ class StateManager:
                     task.revision_count,
                     task.max_revision_attempts,
                 ))
+                self._invalidate_status_counts()
                 return True
             except sqlite3.IntegrityError:
                 return False
@@ -292,6 +419,8 @@ class StateManager:
             ))
 
             updated = cursor.rowcount > 0
+            if updated and old_status != status_value:
+                self._invalidate_status_counts()
 
         # 在成功更新且状态确实发生变化时写入事件流
         if updated and old_status and old_status != status_value:
@@ -354,6 +483,100 @@ class StateManager:
             
             return [self._task_dict_to_model(row) for row in rows]
     
+    # ========== 看板修订号 ==========
+    
+    def get_board_revision(self) -> int:
+        """获取看板修订号
+        
+        Returns:
+            当前修订号（任务的任何写入都会使其递增）
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT revision FROM board_revision WHERE id = 1")
+            row = cursor.fetchone()
+            return row[0] if row else 0
+    
+    def list_tasks_changed_since(self, revision: int) -> Dict[str, Any]:
+        """列出指定修订号之后变更的任务
+        
+        Args:
+            revision: 客户端已同步到的修订号
+            
+        Returns:
+            {"revision": 当前修订号, "tasks": 新增/更新的任务, "deleted": 已删除的任务ID}
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT revision FROM board_revision WHERE id = 1")
+            row = cursor.fetchone()
+            current = row[0] if row else 0
+            
+            cursor.execute("""
+                SELECT t.* FROM task_changes c
+                JOIN tasks t ON t.id = c.task_id
+                WHERE c.revision > ? AND c.deleted = 0
+                ORDER BY t.created_at
+            """, (revision,))
+            tasks = [self._task_dict_to_model(row) for row in cursor.fetchall()]
+            
+            cursor.execute(
+                "SELECT task_id FROM task_changes WHERE revision > ? AND deleted = 1",
+                (revision,)
+            )
+            deleted = [row[0] for row in cursor.fetchall()]
+            
+            return {"revision": current, "tasks": tasks, "deleted": deleted}
+    
+    # ========== 任务统计 ==========
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """获取各状态任务数
+        
+        读取触发器维护的 task_status_counts（每个状态一行），结果按连接池缓存
+        STATUS_COUNTS_TTL 秒，本进程的状态变更提交后失效。
+        
+        Returns:
+            {status: 任务数}，不含计数为0的状态
+        """
+        now = time.monotonic()
+        with _status_counts_lock:
+            cached = _status_counts_cache.get(self._pool)
+            generation = _status_counts_generation.get(self._pool, 0)
+        if cached is not None and cached[0] > now:
+            return dict(cached[1])
+        
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT status, task_count FROM task_status_counts WHERE task_count > 0")
+            counts = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        with _status_counts_lock:
+            if _status_counts_generation.get(self._pool, 0) == generation:
+                _status_counts_cache[self._pool] = (now + STATUS_COUNTS_TTL, counts)
+        return dict(counts)
+    
+    def rebuild_status_counts(self) -> None:
+        """从 tasks 表重建状态计数（对账用）"""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM task_status_counts")
+            conn.execute("""
+                INSERT INTO task_status_counts (status, task_count)
+                SELECT status, COUNT(*) FROM tasks GROUP BY status
+            """)
+            self._invalidate_status_counts()
+    
+    def _invalidate_status_counts(self) -> None:
+        """事务提交后清除状态计数缓存（在写连接内调用）"""
+        pool = self._pool
+        
+        def invalidate() -> None:
+            with _status_counts_lock:
+                _status_counts_generation[pool] = _status_counts_generation.get(pool, 0) + 1
+                _status_counts_cache.pop(pool, None)
+        
+        pool.call_after_commit(invalidate)
+    
     # ========== 审查管理 ==========
     
     def create_review(self, review: Review) -> bool:
@@ -463,41 +686,23 @@ class StateManager:
         Returns:
             系统状态对象
         """
+        counts = self.get_status_counts()
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            
-            # 统计各状态的任务数
-            cursor.execute("SELECT COUNT(*) FROM tasks")
-            total = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.PENDING.value,))
-            pending = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.IN_PROGRESS.value,))
-            in_progress = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.REVIEW.value,))
-            review = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.COMPLETED.value,))
-            completed = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (TaskStatus.FAILED.value,))
-            failed = cursor.fetchone()[0]
-            
             cursor.execute("SELECT COUNT(*) FROM workers WHERE status = ?", ("idle",))
             # Count active workers (last heartbeat within 5 minutes)
             active_workers = cursor.fetchone()[0]
-            
-            return SystemStatus(
-                total_tasks=total,
-                pending_tasks=pending,
-                in_progress_tasks=in_progress,
-                review_tasks=review,
-                completed_tasks=completed,
-                failed_tasks=failed,
-                active_workers=active_workers,
-            )
+        
+        return SystemStatus(
+            total_tasks=sum(counts.values()),
+            pending_tasks=counts.get(TaskStatus.PENDING.value, 0),
+            in_progress_tasks=counts.get(TaskStatus.IN_PROGRESS.value, 0),
+            review_tasks=counts.get(TaskStatus.REVIEW.value, 0),
+            completed_tasks=counts.get(TaskStatus.COMPLETED.value, 0),
+            failed_tasks=counts.get(TaskStatus.FAILED.value, 0),
+            active_workers=active_workers,
+        )
 
     def _emit_task_status_changed_event(
         self,
@@ -272,17 +272,17 @@ class TaskScheduler:
         Returns:
             系统统计字典
         """
-        all_tasks = self.state_manager.list_all_tasks()
+        counts = self.state_manager.get_status_counts()
         
         stats = {
             'total_workers': len(self.workers),
             'healthy_workers': sum(1 for w in self.workers if self.is_worker_healthy(w)),
             'idle_workers': sum(1 for w in self.workers if not self.workers[w]['current_task']),
-            'total_tasks': len(all_tasks),
-            'pending_tasks': len([t for t in all_tasks if t.status == TaskStatus.PENDING]),
-            'in_progress_tasks': len([t for t in all_tasks if t.status == TaskStatus.IN_PROGRESS]),
-            'completed_tasks': len([t for t in all_tasks if t.status == TaskStatus.COMPLETED]),
-            'failed_tasks': len([t for t in all_tasks if t.status == TaskStatus.FAILED]),
+            'total_tasks': sum(counts.values()),
+            'pending_tasks': counts.get(TaskStatus.PENDING.value, 0),
+            'in_progress_tasks': counts.get(TaskStatus.IN_PROGRESS.value, 0),
+            'completed_tasks': counts.get(TaskStatus.COMPLETED.value, 0),
+            'failed_tasks': counts.get(TaskStatus.FAILED.value, 0),
             'worker_stats': {}
         }
         
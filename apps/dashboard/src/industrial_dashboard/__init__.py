@@ -25,12 +25,13 @@ __author__ = "AI Task Automation Team"
 __license__ = "MIT"
 
 from .dashboard import IndustrialDashboard
-from .data_provider import DataProvider, TaskData, StatsData
+from .data_provider import DataProvider, TaskData, StatsData, TaskDelta
 
 __all__ = [
     'IndustrialDashboard',
     'DataProvider',
     'TaskData',
     'StatsData',
+    'TaskDelta',
 ]
 
@@ -3,10 +3,10 @@
 
 提供开箱即用的适配器，支持快速集成
 """
-from typing import List
+from typing import List, Optional
 import json
 from pathlib import Path
-from .data_provider import DataProvider, TaskData, StatsData
+from .data_provider import DataProvider, TaskData, StatsData, TaskDelta
 
 
 class StateManagerAdapter(DataProvider):
@@ -46,67 +46,63 @@ class StateManagerAdapter(DataProvider):
             self.completions = {}
     
     def get_stats(self) -> StatsData:
-        """获取统计数据"""
-        all_tasks = self.sm.list_all_tasks()
+        """获取统计数据（读取 StateManager 的状态计数，与任务总数无关）"""
+        counts = self.sm.get_status_counts()
         
         return StatsData(
-            total_tasks=len(all_tasks),
-            pending_tasks=len([
-                t for t in all_tasks 
-                if str(t.status).lower() == 'pending'
-            ]),
-            in_progress_tasks=len([
-                t for t in all_tasks 
-                if str(t.status).lower() == 'in_progress'
-            ]),
-            completed_tasks=len([
-                t for t in all_tasks 
-                if str(t.status).lower() == 'completed'
-            ]),
-            review_tasks=len([
-                t for t in all_tasks 
-                if str(t.status).lower() == 'review'
-            ]),
-            failed_tasks=len([
-                t for t in all_tasks 
-                if str(t.status).lower() == 'failed'
-            ])
+            total_tasks=sum(counts.values()),
+            pending_tasks=counts.get('pending', 0),
+            in_progress_tasks=counts.get('in_progress', 0),
+            completed_tasks=counts.get('completed', 0),
+            review_tasks=counts.get('review', 0),
+            failed_tasks=counts.get('failed', 0)
         )
     
     def get_tasks(self) -> List[TaskData]:
         """获取任务列表"""
-        all_tasks = self.sm.list_all_tasks()
+        return [self._to_task_data(task) for task in self.sm.list_all_tasks()]
+    
+    def get_revision(self) -> Optional[int]:
+        """获取看板修订号（由 StateManager 的触发器维护）"""
+        return self.sm.get_board_revision()
+    
+    def get_task_changes(self, since: int) -> Optional[TaskDelta]:
+        """获取修订号 since 之后变更的任务"""
+        changes = self.sm.list_tasks_changed_since(since)
+        return TaskDelta(
+            revision=changes["revision"],
+            tasks=[self._to_task_data(task) for task in changes["tasks"]],
+            deleted=changes["deleted"]
+        )
+    
+    def _to_task_data(self, task) -> TaskData:
+        """Task 模型转换为 TaskData"""
+        # 提取状态
+        status = str(task.status).split('.')[-1].lower() if hasattr(task.status, 'name') else str(task.status).lower()
         
-        result = []
-        for task in all_tasks:
-            # 提取状态
-            status = str(task.status).split('.')[-1].lower() if hasattr(task.status, 'name') else str(task.status).lower()
-            
-            # 提取优先级
-            priority = str(task.priority).split('.')[-1] if hasattr(task.priority, 'name') else str(task.priority)
-            
-            # 获取完成详情
-            completion = self.completions.get(task.id, {})
-            
-            task_data = TaskData(
-                id=task.id,
-                title=task.title,
-                description=task.description or "",
-                status=status,
-                priority=priority,
-                complexity=task.complexity or "medium",
-                estimated_hours=task.estimated_hours or 0.0,
-                created_at=task.created_at.isoformat() if task.created_at else None,
-                assigned_to=task.assigned_to
-            )
-            
-            # 添加完成详情到描述中（JSON格式）
-            if completion:
-                task_data.description = json.dumps(completion, ensure_ascii=False)
-            
-            result.append(task_data)
+        # 提取优先级
+        priority = str(task.priority).split('.')[-1] if hasattr(task.priority, 'name') else str(task.priority)
         
-        return result
+        # 获取完成详情
+        completion = self.completions.get(task.id, {})
+        
+        task_data = TaskData(
+            id=task.id,
+            title=task.title,
+            description=task.description or "",
+            status=status,
+            priority=priority,
+            complexity=task.complexity or "medium",
+            estimated_hours=task.estimated_hours or 0.0,
+            created_at=task.created_at.isoformat() if task.created_at else None,
+            assigned_to=task.assigned_to
+        )
+        
+        # 添加完成详情到描述中（JSON格式）
+        if completion:
+            task_data.description = json.dumps(completion, ensure_ascii=False)
+        
+        return task_data
 
 
 class GenericDictAdapter(DataProvider):
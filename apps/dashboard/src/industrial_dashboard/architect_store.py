@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+架构师数据存储
+
+Dashboard 的架构师监控、设计确认、事件流与对话数据原先保存在 automation-data/*.json，
+每次请求整体读取、修改、写回。现在存放在 automation-data/documents.db 的文档集合中
+（services.document_store），每次写入只涉及一行且在事务内完成：
+
+- design_confirmations：ux / ui 两个文档
+- architect_monitor：monitor 文档（角色、状态、项目信息、Token总量）
+- token_sessions：Token使用记录，保留最近100条
+- 架构师事件流：同库的追加式事件日志（services.event_journal，architect_events），支持 ?after=<seq> 游标读取
+- conversations / conversation_messages：会话与消息分开存放，追加消息只写一条消息并更新会话计数
+
+首次打开时自动导入旧 JSON 文件（每个文件只导入一次），
+也可用 scripts/import_architect_documents.py 手动执行。
+"""
+
+import copy
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加core-domain路径
+project_root = Path(__file__).parent.parent.parent.parent.parent
+packages_path = project_root / "packages" / "core-domain" / "src"
+if str(packages_path) not in sys.path:
+    sys.path.insert(0, str(packages_path))
+
+from services.document_store import DocumentStore, create_document_store
+from services.event_journal import DEFAULT_PAGE_SIZE, EventJournal, get_feed
+
+# Dashboard 数据目录（apps/dashboard/automation-data）
+DEFAULT_DATA_DIR = Path(__file__).parent.parent.parent / "automation-data"
+
+TOKEN_SESSIONS_RETENTION = 100
+
+MONITOR_DOC = "monitor"
+
+DEFAULT_MONITOR = {
+    "token_usage": {"used": 0, "total": 1000000},
+    "status": {"text": "初始化", "reviewed_count": 0},
+    "prompt": ""
+}
+
+# 旧 JSON 文件 -> 导入函数名
+LEGACY_FILES = {
+    "design_confirmations.json": "_import_design_confirmations",
+    "architect_monitor.json": "_import_monitor",
+    "architect-conversations.json": "_import_conversations",
+}
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ArchitectStore:
+    """架构师数据（文档集合）"""
+
+    def __init__(self, store: DocumentStore, events: EventJournal, data_dir: Path = DEFAULT_DATA_DIR):
+        """
+        Args:
+            store: 文档存储
+            events: 架构师事件日志（与 store 同库）
+            data_dir: 旧 JSON 文件所在目录（导入用）
+        """
+        self.store = store
+        self.events = events
+        self.data_dir = Path(data_dir)
+        self.designs = store.collection("design_confirmations")
+        self.monitor = store.collection("architect_monitor")
+        self.token_sessions = store.collection(
+            "token_sessions", max_documents=TOKEN_SESSIONS_RETENTION
+        )
+        self.sessions = store.collection("conversations", id_template="session-{n:03d}")
+        self.messages = store.collection("conversation_messages")
+        self.messages.ensure_index("session_id")
+
+    # ========================================================================
+    # 设计确认
+    # ========================================================================
+
+    def get_design(self, design_type: str) -> Optional[Dict[str, Any]]:
+        """获取 UX/UI 设计确认数据（不存在返回 None）"""
+        return self.designs.get(design_type)
+
+    def confirm_design(self, design_type: str) -> Dict[str, Any]:
+        """确认设计"""
+        return self.designs.patch(design_type, {
+            "status": "approved",
+            "confirmed_at": datetime.now().isoformat()
+        })
+
+    def add_design_image(self, design_type: str, url: str, label: str) -> Dict[str, Any]:
+        """追加设计图片"""
+        def add(design: Dict[str, Any]) -> None:
+            design.setdefault("images", []).append({
+                "url": url,
+                "label": label,
+                "uploaded_at": datetime.now().isoformat()
+            })
+
+        return self.designs.update(
+            design_type, add, default={"images": [], "prompt": "", "status": "pending"}
+        )
+
+    # ========================================================================
+    # 架构师监控
+    # ========================================================================
+
+    def get_monitor(self, include_sessions: bool = True) -> Dict[str, Any]:
+        """
+        获取监控数据
+
+        Args:
+            include_sessions: 是否附带 token_usage.sessions（与旧 JSON 结构一致）
+        """
+        data = self.monitor.get(MONITOR_DOC)
+        if data is None:
+            data = copy.deepcopy(DEFAULT_MONITOR)
+        if include_sessions:
+            data.setdefault("token_usage", {})["sessions"] = self.get_token_sessions()
+        return data
+
+    def get_current_role(self) -> Dict[str, Any]:
+        return (self.monitor.get(MONITOR_DOC) or {}).get("current_role", {})
+
+    def assign_role(self, role: str, role_name: str, project: str, user: str) -> Dict[str, Any]:
+        """任命角色"""
+        def assign(data: Dict[str, Any]) -> None:
+            data["current_role"] = {
+                "role": role,
+                "role_name": role_name,
+                "project": project,
+                "assigned_at": datetime.now().isoformat(),
+                "assigned_by": user
+            }
+            data.setdefault("status", {})["text"] = f"{role_name}工作中"
+
+        return self.monitor.update(MONITOR_DOC, assign, default=DEFAULT_MONITOR)
+
+    def record_token_usage(self, tokens: int, event: str, conversation_id: str, sync_type: str) -> Dict[str, Any]:
+        """
+        记录Token使用
+
+        manual 为手动同步（tokens 是当前总量），其他为自动记录（tokens 是增量）。
+
+        Returns:
+            {"used": 更新后总量, "recorded": 本次记录的增量}
+        """
+        recorded = {}
+
+        def apply(data: Dict[str, Any]) -> None:
+            usage = data.setdefault("token_usage", {"used": 0, "total": 1000000})
+            used = usage.get("used", 0)
+            if sync_type == "manual":
+                # 手动同步：直接设置总量（而不是累加），记录增量
+                increment = tokens - used
+                recorded["tokens"] = tokens if increment < 0 else increment
+                usage["used"] = tokens
+            else:
+                usage["used"] = used + tokens
+                recorded["tokens"] = tokens
+
+        with self.store.transaction():
+            data = self.monitor.update(MONITOR_DOC, apply, default=DEFAULT_MONITOR)
+            self.token_sessions.append({
+                "timestamp": _now(),
+                "tokens": recorded["tokens"],
+                "event": event,
+                "conversation_id": conversation_id,
+                "sync_type": sync_type
+            }, id_field=None)
+        return {"used": data["token_usage"]["used"], "recorded": recorded["tokens"]}
+
+    def get_token_sessions(self) -> List[Dict[str, Any]]:
+        """Token使用记录（最新在前）"""
+        return self.token_sessions.list()
+
+    # ========================================================================
+    # 事件流
+    # ========================================================================
+
+    def add_event(self, event_type: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """追加架构师事件（ID event-{seq}）"""
+        return self.events.append({
+            "timestamp": _now(),
+            "type": event_type,
+            "content": content,
+            "metadata": metadata or {}
+        })
+
+    def list_events(self, limit: int = DEFAULT_PAGE_SIZE, event_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """最新的架构师事件（最新在前）"""
+        return self.events.latest(limit, event_type)
+
+    def page_events(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        event_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """事件流接口分页（见 EventJournal.page）"""
+        return self.events.page(after, limit, event_type)
+
+    # ========================================================================
+    # 对话
+    # ========================================================================
+
+    def get_conversations(self) -> Dict[str, Any]:
+        """全部会话（最新创建在前，附带消息）与汇总统计"""
+        sessions = self.sessions.list()
+        messages: Dict[str, List[Dict[str, Any]]] = {}
+        for message in self.messages.list(newest_first=False):
+            messages.setdefault(message.pop("session_id"), []).append(message)
+        for session in sessions:
+            session["messages"] = messages.get(session["session_id"], [])
+        return {
+            "sessions": sessions,
+            "stats": {
+                "total_conversations": len(sessions),
+                "active_conversations": sum(1 for s in sessions if s.get("status") == "active"),
+                "total_tokens": sum(s.get("total_tokens", 0) for s in sessions),
+                "total_messages": sum(s.get("messages_count", 0) for s in sessions),
+                "last_updated": datetime.now().isoformat()
+            }
+        }
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """单个会话（附带消息）"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        messages = self.messages.list(newest_first=False, where={"session_id": session_id})
+        for message in messages:
+            message.pop("session_id", None)
+        session["messages"] = messages
+        return session
+
+    def create_session(self, session: Dict[str, Any], id_template: Optional[str] = None) -> Dict[str, Any]:
+        """
+        创建会话（session_id 由计数器生成）
+
+        Args:
+            session: 会话字段（messages 不在会话文档中保存）
+            id_template: 会话ID模板，默认 session-{n:03d}
+        """
+        collection = self.sessions
+        if id_template:
+            collection = self.store.collection(self.sessions.name, id_template=id_template)
+        body = {key: value for key, value in session.items() if key != "messages"}
+        created = collection.append(body, id_field="session_id")
+        created["messages"] = []
+        return created
+
+    def add_message(self, session_id: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        向会话追加消息（会话不存在返回 None）
+
+        消息ID按会话内序号生成（msg-001...），会话的 messages_count / total_tokens 增量更新。
+        """
+        with self.store.transaction():
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            count = session.get("messages_count", 0) + 1
+            new_message = {"id": f"msg-{str(count).zfill(3)}", "timestamp": _now(), **message}
+            self.messages.put(f"{session_id}/{new_message['id']}", {**new_message, "session_id": session_id})
+            session["messages_count"] = count
+            session["total_tokens"] = session.get("total_tokens", 0) + (new_message.get("tokens") or 0)
+            session["updated_at"] = _now()
+            self.sessions.put(session_id, session)
+        return new_message
+
+    # ========================================================================
+    # 旧 JSON 文件导入
+    # ========================================================================
+
+    def import_legacy_files(self) -> Dict[str, Optional[int]]:
+        """
+        导入旧 JSON 文件（每个文件只导入一次；文件不存在时跳过且不登记）
+
+        Returns:
+            文件名 -> 导入文档数（已导入过为 None）
+        """
+        results = {}
+        for filename, loader in LEGACY_FILES.items():
+            path = self.data_dir / filename
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            results[filename] = self.store.import_once(filename, lambda: getattr(self, loader)(data))
+        return results
+
+    def _import_design_confirmations(self, data: Dict[str, Any]) -> int:
+        for design_type, design in data.items():
+            self.designs.put(design_type, design)
+        return len(data)
+
+    def _import_monitor(self, data: Dict[str, Any]) -> int:
+        data = dict(data)
+        usage = dict(data.get("token_usage", {}))
+        sessions = usage.pop("sessions", [])
+        data["token_usage"] = usage
+        # 事件流以架构师事件日志为准
+        data.pop("events", None)
+        self.monitor.put(MONITOR_DOC, data)
+        for session in reversed(sessions[:TOKEN_SESSIONS_RETENTION]):
+            self.token_sessions.append(session, id_field=None)
+        return 1 + min(len(sessions), TOKEN_SESSIONS_RETENTION)
+
+    def _import_conversations(self, data: Dict[str, Any]) -> int:
+        sessions = data.get("sessions", [])
+        self.sessions.reserve_ids(session["session_id"] for session in sessions if session.get("session_id"))
+        count = 0
+        for session in sorted(sessions, key=lambda s: s.get("created_at", "")):
+            messages = session.get("messages", [])
+            body = {key: value for key, value in session.items() if key != "messages"}
+            # 之后追加的消息按 messages_count 续编号
+            body["messages_count"] = max(body.get("messages_count", 0), len(messages))
+            session_id = body.get("session_id")
+            if not session_id or self.sessions.get(session_id) is not None:
+                session_id = self.sessions.append(body, id_field="session_id")["session_id"]
+            else:
+                self.sessions.put(session_id, body)
+            for index, message in enumerate(messages, start=1):
+                message_id = message.get("id") or f"msg-{str(index).zfill(3)}"
+                self.messages.put(f"{session_id}/{message_id}", {**message, "session_id": session_id})
+            count += 1 + len(messages)
+        return count
+
+
+def create_architect_store(data_dir: Path = DEFAULT_DATA_DIR, import_legacy: bool = True) -> ArchitectStore:
+    """
+    创建架构师数据存储（automation-data/documents.db）
+
+    Args:
+        data_dir: 数据目录
+        import_legacy: 是否导入尚未导入的旧 JSON 文件
+    """
+    data_dir = Path(data_dir)
+    store = ArchitectStore(
+        create_document_store(str(data_dir / "documents.db")),
+        get_feed("architect_events", data_dir),
+        data_dir
+    )
+    if import_legacy:
+        store.import_legacy_files()
+    return store
@@ -4,8 +4,9 @@ Industrial Dashboard 核心类 - 支持多版本
 工业美学风格的监控面板，支持动态版本管理
 """
 from fastapi import FastAPI, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 import uvicorn
 from typing import Optional
 from pathlib import Path
@@ -21,8 +22,11 @@ from .data_provider import DataProvider
 from .templates import get_dashboard_html
 from .templates_mission_control import get_mission_control_dashboard
 from .event_stream_provider import EventStreamProvider
+from .event_stream_hub import EventStreamHub, StreamFilter
 from .project_memory_provider import ProjectMemoryProvider
 from .knowledge_browser_provider import KnowledgeBrowserProvider
+from .page_cache import AssetStore, PageCache
+from .architect_store import create_architect_store
 
 
 class IndustrialDashboard:
@@ -54,20 +58,45 @@ class IndustrialDashboard:
         
         # 初始化事件流提供器
         self.event_stream_provider = EventStreamProvider()
+        self.event_stream_hub = EventStreamHub(
+            event_store=self.event_stream_provider.event_store,
+            project_id=self.event_stream_provider.project_id
+        )
         print(f"[事件流] Event Stream Provider 已初始化")
         
         # 初始化项目记忆提供器
         self.project_memory_provider = ProjectMemoryProvider()
-        print(f"[记忆空间] Project Memory Provider 已初始化")
+        print(f"[记忆空间] Project Memory Provider 已初始化（{self.project_memory_provider.mode} 模式）")
         
         # 初始化知识库浏览器提供器
         self.knowledge_browser_provider = KnowledgeBrowserProvider(project_root=project_root)
         print(f"[知识库] Knowledge Browser Provider 已初始化")
         
+        # 架构师/设计确认/对话数据（automation-data/documents.db，首次启动导入旧JSON文件）
+        self.architect_store = create_architect_store()
+        
+        # /api/tasks 全量响应缓存：(看板修订号, JSON响应体)
+        self._task_feed_cache = None
+        
+        # 页面渲染缓存（内联样式/脚本提取为 /static/assets 下的指纹资源）
+        self.page_cache = PageCache(AssetStore())
+        
         self.app = FastAPI(title=title)
         self._setup_routes()
         self._setup_static_files()
     
+    def _template_page(self, request: Request, filenames, fallback_html: str) -> Response:
+        """模块目录下的模板文件页面（取第一个存在的文件，经页面缓存返回）"""
+        template_dir = Path(__file__).parent
+        page = self.page_cache.get_file([template_dir / name for name in filenames], fallback_html)
+        return page.respond(request)
+    
+    def _serialize_tasks(self):
+        """全部任务转为字典（按创建时间倒序）"""
+        tasks_dict = [task.to_dict() for task in self.data_provider.get_tasks()]
+        tasks_dict.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        return tasks_dict
+    
     def _get_versions(self):
         """获取版本列表"""
         versions_file = Path("automation-data/versions.json")
@@ -96,27 +125,36 @@ class IndustrialDashboard:
         """设置路由"""
         
         @self.app.get("/", response_class=HTMLResponse)
-        async def dashboard(response: Response, style: str = "mission-control"):
-            # 设置强制不缓存的HTTP头
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate, max-age=0"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
+        async def dashboard(request: Request, style: str = "mission-control"):
+            # 页面按 (模板, 版本号, 标题) 只渲染一次；ETag 重新验证，版本号变化即生成新页面
+            cache_version = self.version_manager.get_version()
             
             # 根据style参数选择模板
             if style == "mission-control":
-                html = get_mission_control_dashboard(
-                    self.title,
-                    self.subtitle,
-                    cache_version=self.version_manager.get_version()
+                page = self.page_cache.get(
+                    ("mission-control", cache_version, self.title, self.subtitle),
+                    lambda: get_mission_control_dashboard(self.title, self.subtitle, cache_version=cache_version)
                 )
             else:
                 # 传递版本号到原模板
-                html = get_dashboard_html(
-                    self.title, 
-                    self.subtitle, 
-                    cache_version=self.version_manager.get_version()
+                page = self.page_cache.get(
+                    ("classic", cache_version, self.title, self.subtitle),
+                    lambda: get_dashboard_html(self.title, self.subtitle, cache_version=cache_version)
                 )
-            return html
+            return page.respond(request)
+        
+        @self.app.get("/static/assets/{name}")
+        async def page_asset(name: str, request: Request):
+            """页面内联样式/脚本提取出的指纹资源（需注册在 /static 挂载之前）"""
+            asset = self.page_cache.assets.get(name)
+            if asset is None:
+                return Response(status_code=404)
+            return asset.respond(request)
+        
+        @self.app.get("/api/page-cache")
+        async def get_page_cache_stats():
+            """页面渲染缓存统计"""
+            return JSONResponse(content=self.page_cache.get_stats())
         
         @self.app.get("/api/versions")
         async def get_versions():
@@ -136,12 +174,42 @@ class IndustrialDashboard:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
         @self.app.get("/api/tasks")
-        async def get_tasks():
+        async def get_tasks(request: Request, since: Optional[int] = None):
+            """
+            任务列表
+            
+            数据提供器支持看板修订号时：全量响应带 ETag（If-None-Match 命中返回304），
+            同一修订号的响应体只序列化一次；?since=<rev> 只返回其后变更的任务
+            """
             try:
-                tasks = self.data_provider.get_tasks()
-                tasks_dict = [task.to_dict() for task in tasks]
-                tasks_dict.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-                return JSONResponse(content=tasks_dict)
+                revision = await run_in_threadpool(self.data_provider.get_revision)
+                if since is not None:
+                    delta = None if revision is None else await run_in_threadpool(
+                        self.data_provider.get_task_changes, since
+                    )
+                    if delta is None:
+                        # 不支持增量：返回全量，客户端整体替换
+                        tasks = await run_in_threadpool(self._serialize_tasks)
+                        return JSONResponse(content={"revision": revision, "full": True, "tasks": tasks, "deleted": []})
+                    return JSONResponse(
+                        content={**delta.to_dict(), "full": False},
+                        headers={"Cache-Control": "no-cache"}
+                    )
+                
+                if revision is None:
+                    return JSONResponse(content=await run_in_threadpool(self._serialize_tasks))
+                
+                etag = f'"tasks-{revision}"'
+                headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Board-Revision": str(revision)}
+                if request.headers.get("if-none-match") == etag:
+                    return Response(status_code=304, headers=headers)
+                
+                cached = self._task_feed_cache
+                if cached is None or cached[0] != revision:
+                    tasks = await run_in_threadpool(self._serialize_tasks)
+                    cached = (revision, json.dumps(tasks, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                    self._task_feed_cache = cached
+                return Response(content=cached[1], media_type="application/json", headers=headers)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -151,79 +219,42 @@ class IndustrialDashboard:
             return {"status": "healthy", "timestamp": datetime.now().isoformat()}
         
         @self.app.get("/events", response_class=HTMLResponse)
-        async def event_stream_page(style: str = "mission-control"):
+        async def event_stream_page(request: Request, style: str = "mission-control"):
             """事件流可视化页面"""
             try:
+                # 指挥舱风格优先，其余依次回退 v3 → v2 → v1
+                candidates = ["event_stream_template_v3.html", "event_stream_template_v2.html", "event_stream_template.html"]
                 if style == "mission-control":
-                    # 使用新的指挥舱风格
-                    template_path = Path(__file__).parent / "event_stream_mission_control.html"
-                    if template_path.exists():
-                        with open(template_path, 'r', encoding='utf-8') as f:
-                            return f.read()
-                
-                # 优先使用v3版本
-                template_path = Path(__file__).parent / "event_stream_template_v3.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                
-                # 回退到v2
-                template_path_v2 = Path(__file__).parent / "event_stream_template_v2.html"
-                if template_path_v2.exists():
-                    with open(template_path_v2, 'r', encoding='utf-8') as f:
-                        return f.read()
-                
-                # 最后回退到v1
-                template_path_v1 = Path(__file__).parent / "event_stream_template.html"
-                if template_path_v1.exists():
-                    with open(template_path_v1, 'r', encoding='utf-8') as f:
-                        return f.read()
-                
-                return "<h1>事件流模板未找到</h1>"
+                    candidates.insert(0, "event_stream_mission_control.html")
+                return self._template_page(request, candidates, "<h1>事件流模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载事件流页面失败</h1><p>{str(e)}</p>"
         
         @self.app.get("/memories", response_class=HTMLResponse)
-        async def memory_space_page(style: str = "library"):
+        async def memory_space_page(request: Request, style: str = "library"):
             """项目记忆空间页面"""
             try:
+                # 数字图书馆风格优先，回退到原版本
+                candidates = ["memory_space_template.html"]
                 if style == "library":
-                    # 使用新的数字图书馆风格
-                    template_path = Path(__file__).parent / "memory_library.html"
-                    if template_path.exists():
-                        with open(template_path, 'r', encoding='utf-8') as f:
-                            return f.read()
-                
-                # 回退到原版本
-                template_path = Path(__file__).parent / "memory_space_template.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>记忆空间模板未找到</h1>"
+                    candidates.insert(0, "memory_library.html")
+                return self._template_page(request, candidates, "<h1>记忆空间模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载记忆空间页面失败</h1><p>{str(e)}</p>"
         
         @self.app.get("/knowledge", response_class=HTMLResponse)
-        async def knowledge_browser_page():
+        async def knowledge_browser_page(request: Request):
             """项目知识库浏览器页面"""
             try:
-                template_path = Path(__file__).parent / "knowledge_browser_template.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>知识库模板未找到</h1>"
+                return self._template_page(request, ["knowledge_browser_template.html"], "<h1>知识库模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载知识库页面失败</h1><p>{str(e)}</p>"
         
         @self.app.get("/conversations", response_class=HTMLResponse)
-        async def conversations_page():
+        async def conversations_page(request: Request):
             """对话历史档案馆页面"""
             try:
-                template_path = Path(__file__).parent / "conversations_archive.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>对话历史模板未找到</h1>"
+                return self._template_page(request, ["conversations_archive.html"], "<h1>对话历史模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载对话历史页面失败</h1><p>{str(e)}</p>"
         
@@ -259,38 +290,26 @@ class IndustrialDashboard:
                 """
         
         @self.app.get("/session-theatre", response_class=HTMLResponse)
-        async def session_theatre_page():
+        async def session_theatre_page(request: Request):
             """会话详情页（对话剧场）"""
             try:
-                template_path = Path(__file__).parent / "session_theatre.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>会话详情模板未找到</h1>"
+                return self._template_page(request, ["session_theatre.html"], "<h1>会话详情模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载会话详情页面失败</h1><p>{str(e)}</p>"
         
         @self.app.get("/adr-recorder", response_class=HTMLResponse)
-        async def adr_recorder_page():
+        async def adr_recorder_page(request: Request):
             """ADR记录器页面（侧边抽屉）"""
             try:
-                template_path = Path(__file__).parent / "adr_recorder.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>ADR记录器模板未找到</h1>"
+                return self._template_page(request, ["adr_recorder.html"], "<h1>ADR记录器模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载ADR记录器失败</h1><p>{str(e)}</p>"
         
         @self.app.get("/memory-constellation", response_class=HTMLResponse)
-        async def memory_constellation_page():
+        async def memory_constellation_page(request: Request):
             """记忆关系图谱页面（知识星图）"""
             try:
-                template_path = Path(__file__).parent / "memory_constellation.html"
-                if template_path.exists():
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        return f.read()
-                return "<h1>记忆图谱模板未找到</h1>"
+                return self._template_page(request, ["memory_constellation.html"], "<h1>记忆图谱模板未找到</h1>")
             except Exception as e:
                 return f"<h1>加载记忆图谱失败</h1><p>{str(e)}</p>"
         
@@ -310,16 +329,8 @@ class IndustrialDashboard:
                 }
             """
             try:
-                data_file = Path("automation-data/design_confirmations.json")
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        return JSONResponse(content=data.get("ux", {
-                            "images": [],
-                            "prompt": "暂无UX提示词",
-                            "status": "pending"
-                        }))
-                return JSONResponse(content={
+                data = await run_in_threadpool(self.architect_store.get_design, "ux")
+                return JSONResponse(content=data if data is not None else {
                     "images": [],
                     "prompt": "暂无UX提示词",
                     "status": "pending"
@@ -343,16 +354,8 @@ class IndustrialDashboard:
                 }
             """
             try:
-                data_file = Path("automation-data/design_confirmations.json")
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        return JSONResponse(content=data.get("ui", {
-                            "images": [],
-                            "prompt": "暂无UI提示词",
-                            "status": "pending"
-                        }))
-                return JSONResponse(content={
+                data = await run_in_threadpool(self.architect_store.get_design, "ui")
+                return JSONResponse(content=data if data is not None else {
                     "images": [],
                     "prompt": "暂无UI提示词",
                     "status": "pending"
@@ -364,27 +367,7 @@ class IndustrialDashboard:
         async def confirm_ux():
             """用户确认UX设计"""
             try:
-                from datetime import datetime
-                data_file = Path("automation-data/design_confirmations.json")
-                
-                # 读取现有数据
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                else:
-                    data = {"ux": {}, "ui": {}}
-                
-                # 更新UX确认状态
-                if "ux" not in data:
-                    data["ux"] = {}
-                data["ux"]["status"] = "approved"
-                data["ux"]["confirmed_at"] = datetime.now().isoformat()
-                
-                # 保存数据
-                data_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(data_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
+                await run_in_threadpool(self.architect_store.confirm_design, "ux")
                 return JSONResponse(content={"success": True, "message": "UX已确认"})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
@@ -393,27 +376,7 @@ class IndustrialDashboard:
         async def confirm_ui():
             """用户确认UI设计"""
             try:
-                from datetime import datetime
-                data_file = Path("automation-data/design_confirmations.json")
-                
-                # 读取现有数据
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                else:
-                    data = {"ux": {}, "ui": {}}
-                
-                # 更新UI确认状态
-                if "ui" not in data:
-                    data["ui"] = {}
-                data["ui"]["status"] = "approved"
-                data["ui"]["confirmed_at"] = datetime.now().isoformat()
-                
-                # 保存数据
-                data_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(data_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
+                await run_in_threadpool(self.architect_store.confirm_design, "ui")
                 return JSONResponse(content={"success": True, "message": "UI已确认"})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
@@ -480,52 +443,16 @@ class IndustrialDashboard:
                 if not image_url:
                     return JSONResponse(content={"success": False, "error": "缺少图片URL"}, status_code=400)
                 
-                # 读取现有确认数据
-                data_file = Path("automation-data/design_confirmations.json")
-                confirmation_data = {}
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        confirmation_data = json.load(f)
-                else:
-                    confirmation_data = {"ux": {}, "ui": {}}
-                
-                # 添加图片
-                if design_type not in confirmation_data:
-                    confirmation_data[design_type] = {'images': [], 'prompt': '', 'status': 'pending'}
-                
-                if 'images' not in confirmation_data[design_type]:
-                    confirmation_data[design_type]['images'] = []
+                def record():
+                    with self.architect_store.store.transaction():
+                        self.architect_store.add_design_image(design_type, image_url, label)
+                        self.architect_store.add_event(
+                            "design_upload",
+                            f"架构师上传{design_type.upper()}设计稿：{label}",
+                            {"design_type": design_type, "url": image_url}
+                        )
                 
-                confirmation_data[design_type]['images'].append({
-                    'url': image_url,
-                    'label': label,
-                    'uploaded_at': datetime.now().isoformat()
-                })
-                
-                # 保存
-                data_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(data_file, 'w', encoding='utf-8') as f:
-                    json.dump(confirmation_data, f, ensure_ascii=False, indent=2)
-                
-                #  添加事件到事件流
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                else:
-                    events_data = {"events": []}
-                
-                new_event = {
-                    "id": f"event-{len(events_data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": "design_upload",
-                    "content": f"架构师上传{design_type.upper()}设计稿：{label}",
-                    "metadata": {"design_type": design_type, "url": image_url}
-                }
-                events_data["events"].insert(0, new_event)
-                
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(events_data, f, ensure_ascii=False, indent=2)
+                await run_in_threadpool(record)
                 
                 return JSONResponse(content={"success": True, "message": f"{design_type.upper()}图片已上传"})
             except Exception as e:
@@ -579,82 +506,43 @@ class IndustrialDashboard:
                         print(f"⚠️ 项目扫描/初始化失败: {e}")
                         # 扫描失败不影响任命
                 
-                # 更新architect_monitor.json
-                monitor_file = Path("automation-data/architect_monitor.json")
-                monitor_data = {}
-                if monitor_file.exists():
-                    with open(monitor_file, 'r', encoding='utf-8') as f:
-                        monitor_data = json.load(f)
-                else:
-                    monitor_data = {
-                        "token_usage": {"used": 0, "total": 1000000},
-                        "status": {"text": "初始化", "reviewed_count": 0},
-                        "prompt": ""
-                    }
-                
-                # 更新角色和状态
-                monitor_data["current_role"] = {
-                    "role": role,
-                    "role_name": role_name,
-                    "project": project,
-                    "assigned_at": datetime.now().isoformat(),
-                    "assigned_by": user
-                }
-                monitor_data["status"]["text"] = f"{role_name}工作中"
-                
-                monitor_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(monitor_file, 'w', encoding='utf-8') as f:
-                    json.dump(monitor_data, f, ensure_ascii=False, indent=2)
-                
-                # 添加事件到事件流
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                else:
-                    events_data = {"events": []}
-                
-                new_event = {
-                    "id": f"event-{len(events_data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": "role_assignment",
-                    "content": f"任命AI为{role_name}（项目：{project}）",
-                    "metadata": {"role": role, "project": project, "user": user}
-                }
-                events_data["events"].insert(0, new_event)
-                
-                # 如果是架构师且扫描成功，添加额外事件
-                if role == "architect" and scan_result:
-                    # 添加扫描完成事件
-                    scan_event = {
-                        "id": f"event-{len(events_data['events']) + 1}",
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "type": "project_scan",
-                        "content": f"架构师扫描项目完成：{scan_result['files_count'].get('python', 0) + scan_result['files_count'].get('javascript', 0)}个代码文件，识别{len(scan_result.get('features', {}).get('implemented', []))}个功能",
-                        "metadata": {
-                            "files_total": scan_result['files_count'].get('total', 0),
-                            "features_count": len(scan_result.get('features', {}).get('implemented', [])),
-                            "conflicts_count": len(scan_result.get('features', {}).get('conflicts', []))
-                        }
-                    }
-                    events_data["events"].insert(0, scan_event)
-                    
-                    # 添加知识库初始化事件
-                    if kb_result and kb_result.get('status') == 'success':
-                        kb_event = {
-                            "id": f"event-{len(events_data['events']) + 1}",
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "type": "knowledge_base_init",
-                            "content": f"知识库初始化完成：创建{kb_result.get('created_dirs', 0)}个目录，{kb_result.get('created_files', 0)}个文件",
-                            "metadata": {
-                                "dirs_count": kb_result.get('created_dirs', 0),
-                                "files_count": kb_result.get('created_files', 0)
-                            }
-                        }
-                        events_data["events"].insert(0, kb_event)
-                
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(events_data, f, ensure_ascii=False, indent=2)
+                def record():
+                    with self.architect_store.store.transaction():
+                        # 更新角色和状态
+                        self.architect_store.assign_role(role, role_name, project, user)
+                        
+                        # 添加事件到事件流
+                        self.architect_store.add_event(
+                            "role_assignment",
+                            f"任命AI为{role_name}（项目：{project}）",
+                            {"role": role, "project": project, "user": user}
+                        )
+                        
+                        # 如果是架构师且扫描成功，添加额外事件
+                        if role == "architect" and scan_result:
+                            # 添加扫描完成事件
+                            self.architect_store.add_event(
+                                "project_scan",
+                                f"架构师扫描项目完成：{scan_result['files_count'].get('python', 0) + scan_result['files_count'].get('javascript', 0)}个代码文件，识别{len(scan_result.get('features', {}).get('implemented', []))}个功能",
+                                {
+                                    "files_total": scan_result['files_count'].get('total', 0),
+                                    "features_count": len(scan_result.get('features', {}).get('implemented', [])),
+                                    "conflicts_count": len(scan_result.get('features', {}).get('conflicts', []))
+                                }
+                            )
+                            
+                            # 添加知识库初始化事件
+                            if kb_result and kb_result.get('status') == 'success':
+                                self.architect_store.add_event(
+                                    "knowledge_base_init",
+                                    f"知识库初始化完成：创建{kb_result.get('created_dirs', 0)}个目录，{kb_result.get('created_files', 0)}个文件",
+                                    {
+                                        "dirs_count": kb_result.get('created_dirs', 0),
+                                        "files_count": kb_result.get('created_files', 0)
+                                    }
+                                )
+                
+                await run_in_threadpool(record)
                 
                 return JSONResponse(content={
                     "success": True,
@@ -671,12 +559,8 @@ class IndustrialDashboard:
         async def get_current_role():
             """获取当前角色"""
             try:
-                monitor_file = Path("automation-data/architect_monitor.json")
-                if monitor_file.exists():
-                    with open(monitor_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        return JSONResponse(content=data.get("current_role", {}))
-                return JSONResponse(content={})
+                role = await run_in_threadpool(self.architect_store.get_current_role)
+                return JSONResponse(content=role)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -690,85 +574,26 @@ class IndustrialDashboard:
                 conversation_id = data.get("conversation_id", "")
                 sync_type = data.get("sync_type", "auto")  # manual/auto/estimate
                 
-                # 读取监控数据
-                monitor_file = Path("automation-data/architect_monitor.json")
-                monitor_data = {}
-                if monitor_file.exists():
-                    with open(monitor_file, 'r', encoding='utf-8') as f:
-                        monitor_data = json.load(f)
-                else:
-                    monitor_data = {
-                        "token_usage": {"used": 0, "total": 1000000, "sessions": []},
-                        "status": {"text": "工作中", "reviewed_count": 0}
-                    }
-                
-                # 确保token_usage结构完整
-                if "token_usage" not in monitor_data:
-                    monitor_data["token_usage"] = {"used": 0, "total": 1000000, "sessions": []}
-                if "sessions" not in monitor_data["token_usage"]:
-                    monitor_data["token_usage"]["sessions"] = []
-                
-                # 处理不同的同步类型
-                if sync_type == "manual":
-                    # 手动同步：直接设置总量（而不是累加）
-                    increment = tokens - monitor_data["token_usage"]["used"]
-                    if increment < 0:
-                        increment = tokens
-                        monitor_data["token_usage"]["used"] = tokens
-                    else:
-                        monitor_data["token_usage"]["used"] = tokens
-                    
-                    tokens_to_record = increment  # 记录增量
-                else:
-                    # 自动记录：累加
-                    monitor_data["token_usage"]["used"] += tokens
-                    tokens_to_record = tokens
-                
-                # 记录会话
-                session_record = {
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "tokens": tokens_to_record,
-                    "event": event,
-                    "conversation_id": conversation_id,
-                    "sync_type": sync_type
-                }
-                monitor_data["token_usage"]["sessions"].insert(0, session_record)
-                
-                # 只保留最近100条记录
-                if len(monitor_data["token_usage"]["sessions"]) > 100:
-                    monitor_data["token_usage"]["sessions"] = monitor_data["token_usage"]["sessions"][:100]
-                
-                # 保存
-                monitor_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(monitor_file, 'w', encoding='utf-8') as f:
-                    json.dump(monitor_data, f, ensure_ascii=False, indent=2)
-                
-                # 添加事件到事件流
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                else:
-                    events_data = {"events": []}
-                
-                sync_label = "手动同步" if sync_type == "manual" else "自动记录"
-                new_event = {
-                    "id": f"event-{len(events_data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": "token_usage",
-                    "content": f"Token更新: {tokens_to_record:,} ({sync_label} - {event})",
-                    "metadata": {"tokens": tokens_to_record, "event": event, "sync_type": sync_type}
-                }
-                events_data["events"].insert(0, new_event)
+                def record():
+                    with self.architect_store.store.transaction():
+                        usage = self.architect_store.record_token_usage(tokens, event, conversation_id, sync_type)
+                        
+                        # 添加事件到事件流
+                        sync_label = "手动同步" if sync_type == "manual" else "自动记录"
+                        self.architect_store.add_event(
+                            "token_usage",
+                            f"Token更新: {usage['recorded']:,} ({sync_label} - {event})",
+                            {"tokens": usage["recorded"], "event": event, "sync_type": sync_type}
+                        )
+                    return usage
                 
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(events_data, f, ensure_ascii=False, indent=2)
+                usage = await run_in_threadpool(record)
                 
                 return JSONResponse(content={
                     "success": True,
                     "message": "Token使用已记录",
-                    "total_used": monitor_data["token_usage"]["used"],
-                    "increment": tokens_to_record if sync_type == "manual" else tokens
+                    "total_used": usage["used"],
+                    "increment": usage["recorded"] if sync_type == "manual" else tokens
                 })
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
@@ -777,14 +602,8 @@ class IndustrialDashboard:
         async def get_token_sessions():
             """获取Token使用会话记录"""
             try:
-                monitor_file = Path("automation-data/architect_monitor.json")
-                if monitor_file.exists():
-                    with open(monitor_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        return JSONResponse(content={
-                            "sessions": data.get("token_usage", {}).get("sessions", [])
-                        })
-                return JSONResponse(content={"sessions": []})
+                sessions = await run_in_threadpool(self.architect_store.get_token_sessions)
+                return JSONResponse(content={"sessions": sessions})
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -826,24 +645,12 @@ class IndustrialDashboard:
                     }, status_code=404)
                 
                 # 记录事件
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                else:
-                    events_data = {"events": []}
-                
-                new_event = {
-                    "id": f"event-{len(events_data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": "task_received",
-                    "content": f"{actor} 接收任务: {task_id}",
-                    "metadata": {"task_id": task_id, "actor": actor, "notes": notes}
-                }
-                events_data["events"].insert(0, new_event)
-                
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(events_data, f, ensure_ascii=False, indent=2)
+                await run_in_threadpool(
+                    self.architect_store.add_event,
+                    "task_received",
+                    f"{actor} 接收任务: {task_id}",
+                    {"task_id": task_id, "actor": actor, "notes": notes}
+                )
                 
                 return JSONResponse(content={
                     "success": True,
@@ -1122,16 +929,20 @@ class IndustrialDashboard:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
         @self.app.get("/api/architect_events")
-        async def get_architect_events():
-            """获取架构师事件流"""
+        async def get_architect_events(
+            after: Optional[int] = None,
+            limit: int = 100,
+            type: Optional[str] = None
+        ):
+            """
+            获取架构师事件流
+            
+            不带 after 时返回最新 limit 条（最新在前）；?after=<seq> 返回该序号之后的事件（升序），
+            以响应中的 next_after 继续读取。
+            """
             try:
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    return JSONResponse(content=data)
-                else:
-                    return JSONResponse(content={"events": []})
+                data = await run_in_threadpool(self.architect_store.page_events, after, limit, type)
+                return JSONResponse(content=data)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -1140,30 +951,12 @@ class IndustrialDashboard:
             """添加架构师事件"""
             try:
                 event_data = await request.json()
-                events_file = Path("automation-data/architect_events.json")
-                
-                # 读取现有事件
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                else:
-                    data = {"events": []}
-                
-                # 添加新事件
-                from datetime import datetime
-                new_event = {
-                    "id": f"event-{len(data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": event_data.get("type", "communication"),
-                    "content": event_data.get("content", ""),
-                    "metadata": event_data.get("metadata", {})
-                }
-                data["events"].insert(0, new_event)
-                
-                # 保存
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                
+                new_event = await run_in_threadpool(
+                    self.architect_store.add_event,
+                    event_data.get("type", "communication"),
+                    event_data.get("content", ""),
+                    event_data.get("metadata", {})
+                )
                 return JSONResponse(content={"success": True, "event": new_event})
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -1194,31 +987,12 @@ class IndustrialDashboard:
                 }
             """
             try:
-                # 使用绝对路径，确保找到数据文件
-                base_dir = Path(__file__).parent.parent.parent  # 回到apps/dashboard/
-                data_file = base_dir / "automation-data" / "architect_monitor.json"
-                events_file = base_dir / "automation-data" / "architect_events.json"
-                
-                # 读取基础监控数据
-                data = {}
-                if data_file.exists():
-                    with open(data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                else:
-                    data = {
-                        "token_usage": {"used": 0, "total": 1000000},
-                        "status": {"text": "初始化", "reviewed_count": 0},
-                        "prompt": "暂无提示词"
-                    }
-                
-                # 读取事件流数据
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                        data["events"] = events_data.get("events", [])
-                else:
-                    data["events"] = []
+                def load():
+                    data = self.architect_store.get_monitor()
+                    data["events"] = self.architect_store.list_events()
+                    return data
                 
+                data = await run_in_threadpool(load)
                 return JSONResponse(content=data)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -1437,24 +1211,12 @@ class IndustrialDashboard:
                 new_version = self.version_manager.bump_version()
                 
                 # 记录事件
-                events_file = Path("automation-data/architect_events.json")
-                if events_file.exists():
-                    with open(events_file, 'r', encoding='utf-8') as f:
-                        events_data = json.load(f)
-                else:
-                    events_data = {"events": []}
-                
-                new_event = {
-                    "id": f"event-{len(events_data['events']) + 1}",
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "type": "cache_clear",
-                    "content": f"手动更新缓存版本: {new_version}",
-                    "metadata": {"new_version": new_version}
-                }
-                events_data["events"].insert(0, new_event)
-                
-                with open(events_file, 'w', encoding='utf-8') as f:
-                    json.dump(events_data, f, ensure_ascii=False, indent=2)
+                await run_in_threadpool(
+                    self.architect_store.add_event,
+                    "cache_clear",
+                    f"手动更新缓存版本: {new_version}",
+                    {"new_version": new_version}
+                )
                 
                 return JSONResponse(content={
                     "success": True,
@@ -1468,13 +1230,8 @@ class IndustrialDashboard:
         async def get_conversations():
             """获取所有对话会话"""
             try:
-                conversations_file = Path("automation-data/architect-conversations.json")
-                if conversations_file.exists():
-                    with open(conversations_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    return JSONResponse(content=data)
-                else:
-                    return JSONResponse(content={"sessions": []})
+                data = await run_in_threadpool(self.architect_store.get_conversations)
+                return JSONResponse(content=data)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -1482,20 +1239,11 @@ class IndustrialDashboard:
         async def get_conversation(session_id: str):
             """获取单个对话会话详情"""
             try:
-                conversations_file = Path("automation-data/architect-conversations.json")
-                if conversations_file.exists():
-                    with open(conversations_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    sessions = data.get("sessions", [])
-                    session = next((s for s in sessions if s["session_id"] == session_id), None)
-                    
-                    if session:
-                        return JSONResponse(content=session)
-                    else:
-                        return JSONResponse(content={"error": "会话不存在"}, status_code=404)
+                session = await run_in_threadpool(self.architect_store.get_session, session_id)
+                if session:
+                    return JSONResponse(content=session)
                 else:
-                    return JSONResponse(content={"error": "数据文件不存在"}, status_code=404)
+                    return JSONResponse(content={"error": "会话不存在"}, status_code=404)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=500)
         
@@ -1504,22 +1252,9 @@ class IndustrialDashboard:
             """创建新的对话会话"""
             try:
                 req_data = await request.json()
-                conversations_file = Path("automation-data/architect-conversations.json")
                 
-                # 读取现有数据
-                if conversations_file.exists():
-                    with open(conversations_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                else:
-                    data = {"sessions": []}
-                
-                # 生成新会话ID
-                session_count = len(data.get("sessions", []))
-                new_session_id = f"session-{str(session_count + 1).zfill(3)}"
-                
-                # 创建新会话
-                new_session = {
-                    "session_id": new_session_id,
+                # 创建新会话（session_id 由存储按计数器生成）
+                new_session = await run_in_threadpool(self.architect_store.create_session, {
                     "title": req_data.get("title", "新会话"),
                     "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1528,17 +1263,8 @@ class IndustrialDashboard:
                     "messages_count": 0,
                     "participants": req_data.get("participants", ["用户", "架构师AI"]),
                     "tags": req_data.get("tags", []),
-                    "summary": req_data.get("summary", ""),
-                    "messages": []
-                }
-                
-                # 添加到列表
-                data["sessions"].insert(0, new_session)
-                
-                # 保存
-                conversations_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(conversations_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    "summary": req_data.get("summary", "")
+                })
                 
                 return JSONResponse(content={"success": True, "session": new_session})
             except Exception as e:
@@ -1549,45 +1275,16 @@ class IndustrialDashboard:
             """向会话添加消息"""
             try:
                 req_data = await request.json()
-                conversations_file = Path("automation-data/architect-conversations.json")
-                
-                if not conversations_file.exists():
-                    return JSONResponse(content={"error": "数据文件不存在"}, status_code=404)
-                
-                # 读取数据
-                with open(conversations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # 查找会话
-                sessions = data.get("sessions", [])
-                session = next((s for s in sessions if s["session_id"] == session_id), None)
-                
-                if not session:
-                    return JSONResponse(content={"error": "会话不存在"}, status_code=404)
                 
-                # 生成消息ID
-                msg_count = len(session.get("messages", []))
-                new_msg_id = f"msg-{str(msg_count + 1).zfill(3)}"
-                
-                # 创建新消息
-                new_message = {
-                    "id": new_msg_id,
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                new_message = await run_in_threadpool(self.architect_store.add_message, session_id, {
                     "from": req_data.get("from", "用户"),
                     "content": req_data.get("content", ""),
                     "type": req_data.get("type", "request"),
                     "tokens": req_data.get("tokens", 0)
-                }
-                
-                # 更新会话
-                session["messages"].append(new_message)
-                session["messages_count"] = len(session["messages"])
-                session["total_tokens"] = sum(m.get("tokens", 0) for m in session["messages"])
-                session["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                })
                 
-                # 保存
-                with open(conversations_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                if new_message is None:
+                    return JSONResponse(content={"error": "会话不存在"}, status_code=404)
                 
                 return JSONResponse(content={"success": True, "message": new_message})
             except Exception as e:
@@ -1618,7 +1315,8 @@ class IndustrialDashboard:
             actor: Optional[str] = None,
             severity: Optional[str] = None,
             hours: int = 24,
-            limit: int = 100
+            limit: int = 100,
+            after: Optional[str] = None
         ):
             """
             获取事件流
@@ -1630,6 +1328,7 @@ class IndustrialDashboard:
                 - severity: 严重性过滤 (info/warning/error/critical)
                 - hours: 最近N小时的事件
                 - limit: 返回数量限制
+                - after: 分页游标（上一页返回的next_cursor）
             """
             try:
                 events = self.event_stream_provider.get_events(
@@ -1638,9 +1337,17 @@ class IndustrialDashboard:
                     actor=actor,
                     severity=severity,
                     hours=hours,
-                    limit=limit
+                    limit=limit,
+                    after=after
                 )
-                return JSONResponse(content={"success": True, "events": events, "count": len(events)})
+                return JSONResponse(content={
+                    "success": True,
+                    "events": events,
+                    "count": len(events),
+                    "next_cursor": self.event_stream_provider.next_cursor(events, limit)
+                })
+            except ValueError as e:
+                return JSONResponse(content={"success": False, "error": str(e)}, status_code=400)
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
@@ -1698,7 +1405,81 @@ class IndustrialDashboard:
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
+        @self.app.get("/api/events/live")
+        async def stream_live_events(
+            request: Request,
+            category: Optional[str] = None,
+            severity: Optional[str] = None,
+            actor: Optional[str] = None,
+            last_event_id: Optional[int] = None
+        ):
+            """
+            实时事件流（Server-Sent Events）
+            
+            Query参数:
+                - category: 分类过滤，逗号分隔
+                - severity: 严重性过滤，逗号分隔
+                - actor: 操作者过滤，逗号分隔
+                - last_event_id: 续传位置（浏览器重连时自动通过 Last-Event-ID 头传递）
+            """
+            header_id = request.headers.get("last-event-id")
+            resume_from = int(header_id) if header_id and header_id.isdigit() else last_event_id
+            
+            hub = self.event_stream_hub
+            subscription = await hub.subscribe(
+                StreamFilter.from_params(category=category, severity=severity, actor=actor),
+                last_event_id=resume_from
+            )
+            
+            async def event_source():
+                try:
+                    # 告知客户端当前位置，便于首屏加载后续传
+                    yield f"event: ready\ndata: {json.dumps({'last_event_id': hub.last_rowid})}\n\n"
+                    while not subscription.lagged:
+                        if await request.is_disconnected():
+                            break
+                        event = await subscription.get(timeout=15.0)
+                        if event is None:
+                            yield ": keep-alive\n\n"
+                        elif event.get("reset"):
+                            yield "event: reset\ndata: {}\n\n"
+                        else:
+                            yield hub.format_sse(event)
+                finally:
+                    hub.unsubscribe(subscription)
+            
+            return StreamingResponse(
+                event_source(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        
+        @self.app.get("/api/events/live/stats")
+        async def get_live_stream_stats():
+            """获取实时事件流统计（订阅数、读库次数等）"""
+            return JSONResponse(content={"success": True, "stats": self.event_stream_hub.get_stats()})
+        
         # ========== 项目记忆空间 API ==========
+        # local 模式下提供器直接读 SQLite，放到线程池中执行，不阻塞事件循环
+        # /api/memories/{memory_id} 需注册在 stats/categories/importance/search 之后
+        
+        @self.app.get("/api/memory-overview")
+        async def get_memory_overview(
+            category: Optional[str] = None,
+            memory_type: Optional[str] = None,
+            limit: int = 50
+        ):
+            """获取记忆列表与统计（记忆页一次加载）"""
+            try:
+                overview = await run_in_threadpool(
+                    self.project_memory_provider.get_memory_overview,
+                    category=category,
+                    memory_type=memory_type,
+                    limit=limit
+                )
+                return JSONResponse(content={"success": True, **overview})
+            except Exception as e:
+                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
         @self.app.get("/api/memories/list")
         async def get_memories_list(
@@ -1710,7 +1491,8 @@ class IndustrialDashboard:
         ):
             """获取记忆列表"""
             try:
-                memories = self.project_memory_provider.get_memories(
+                memories = await run_in_threadpool(
+                    self.project_memory_provider.get_memories,
                     query=query,
                     category=category,
                     memory_type=memory_type,
@@ -1721,49 +1503,20 @@ class IndustrialDashboard:
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
-        @self.app.get("/api/memories/{memory_id}")
-        async def get_memory_detail(memory_id: str):
-            """获取记忆详情"""
-            try:
-                memory = self.project_memory_provider.get_memory_detail(memory_id)
-                if memory:
-                    return JSONResponse(content={"success": True, "memory": memory})
-                else:
-                    return JSONResponse(content={"success": False, "error": "Memory not found"}, status_code=404)
-            except Exception as e:
-                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
-        
         @self.app.get("/api/memories/stats")
         async def get_memory_stats():
             """获取记忆统计"""
             try:
-                stats = self.project_memory_provider.get_memory_stats()
+                stats = await run_in_threadpool(self.project_memory_provider.get_memory_stats)
                 return JSONResponse(content={"success": True, "stats": stats})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
-        @self.app.get("/api/memories/{memory_id}/related")
-        async def get_related_memories(
-            memory_id: str,
-            relation_types: Optional[str] = None,
-            min_strength: float = 0.5
-        ):
-            """获取相关记忆"""
-            try:
-                related = self.project_memory_provider.get_related_memories(
-                    memory_id=memory_id,
-                    relation_types=relation_types,
-                    min_strength=min_strength
-                )
-                return JSONResponse(content={"success": True, "related_memories": related, "count": len(related)})
-            except Exception as e:
-                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
-        
         @self.app.get("/api/memories/categories")
         async def get_categories_summary():
             """获取各分类记忆数量汇总"""
             try:
-                summary = self.project_memory_provider.get_categories_summary()
+                summary = await run_in_threadpool(self.project_memory_provider.get_categories_summary)
                 return JSONResponse(content={"success": True, "categories": summary})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
@@ -1772,7 +1525,7 @@ class IndustrialDashboard:
         async def get_importance_summary():
             """获取各重要性级别记忆数量汇总"""
             try:
-                summary = self.project_memory_provider.get_importance_summary()
+                summary = await run_in_threadpool(self.project_memory_provider.get_importance_summary)
                 return JSONResponse(content={"success": True, "importance": summary})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
@@ -1781,16 +1534,70 @@ class IndustrialDashboard:
         async def search_memories(q: str, limit: int = 30):
             """搜索记忆"""
             try:
-                memories = self.project_memory_provider.search_memories(keyword=q, limit=limit)
+                memories = await run_in_threadpool(
+                    self.project_memory_provider.search_memories, keyword=q, limit=limit
+                )
                 return JSONResponse(content={"success": True, "memories": memories, "count": len(memories)})
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
         
+        @self.app.get("/api/memories/{memory_id}")
+        async def get_memory_detail(memory_id: str):
+            """获取记忆详情"""
+            try:
+                memory = await run_in_threadpool(self.project_memory_provider.get_memory_detail, memory_id)
+                if memory:
+                    return JSONResponse(content={"success": True, "memory": memory})
+                else:
+                    return JSONResponse(content={"success": False, "error": "Memory not found"}, status_code=404)
+            except Exception as e:
+                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
+        
+        @self.app.get("/api/memories/{memory_id}/related")
+        async def get_related_memories(
+            memory_id: str,
+            relation_types: Optional[str] = None,
+            min_strength: float = 0.5
+        ):
+            """获取相关记忆"""
+            try:
+                related = await run_in_threadpool(
+                    self.project_memory_provider.get_related_memories,
+                    memory_id=memory_id,
+                    relation_types=relation_types,
+                    min_strength=min_strength
+                )
+                return JSONResponse(content={"success": True, "related_memories": related, "count": len(related)})
+            except Exception as e:
+                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
+        
+        @self.app.get("/api/memory-graph")
+        async def get_memory_graph(
+            relation_types: Optional[str] = None,
+            min_strength: float = 0.0,
+            center: Optional[str] = None,
+            depth: int = 2
+        ):
+            """获取记忆关系图（知识星图）"""
+            try:
+                graph = await run_in_threadpool(
+                    self.project_memory_provider.get_memory_graph,
+                    relation_types=relation_types,
+                    min_strength=min_strength,
+                    center=center,
+                    depth=depth
+                )
+                return JSONResponse(content=graph)
+            except Exception as e:
+                return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
+        
         @self.app.get("/api/knowledge/inherit")
         async def inherit_knowledge(context: Optional[str] = None, limit: int = 20):
             """跨会话知识继承"""
             try:
-                knowledge = self.project_memory_provider.inherit_knowledge(context=context, limit=limit)
+                knowledge = await run_in_threadpool(
+                    self.project_memory_provider.inherit_knowledge, context=context, limit=limit
+                )
                 return JSONResponse(content=knowledge)
             except Exception as e:
                 return JSONResponse(content={"success": False, "error": str(e)}, status_code=500)
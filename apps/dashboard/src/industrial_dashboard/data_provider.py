@@ -4,7 +4,7 @@
 定义了 Dashboard 需要的数据接口，项目只需实现这个接口即可集成
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
@@ -60,6 +60,22 @@ class StatsData:
         }
 
 
+@dataclass
+class TaskDelta:
+    """任务增量（since 修订号之后的变更）"""
+    revision: int
+    tasks: List[TaskData]
+    deleted: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "revision": self.revision,
+            "tasks": [task.to_dict() for task in self.tasks],
+            "deleted": self.deleted
+        }
+
+
 class DataProvider(ABC):
     """
     数据提供器抽象类
@@ -108,4 +124,27 @@ class DataProvider(ABC):
             List[TaskData]: 任务数据列表
         """
         pass
+    
+    def get_revision(self) -> Optional[int]:
+        """
+        获取看板修订号（任务任何变更后递增）
+        
+        支持时 /api/tasks 返回 ETag 并提供 ?since= 增量；默认不支持，每次返回全量
+        
+        Returns:
+            Optional[int]: 修订号，不支持时为None
+        """
+        return None
+    
+    def get_task_changes(self, since: int) -> Optional[TaskDelta]:
+        """
+        获取修订号 since 之后变更的任务
+        
+        Args:
+            since: 客户端已同步到的修订号
+        
+        Returns:
+            Optional[TaskDelta]: 任务增量，不支持时为None
+        """
+        return None
 
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+事件实时推送中心（Event Stream Hub）
+
+为Dashboard的 Server-Sent Events 端点提供事件扇出：
+1. 单个后台任务按 rowid 高水位线读取新事件，每个事件只读一次库
+2. 同进程写入由事件总线即时唤醒；其他进程（API服务）写入由短间隔追赶覆盖
+3. 每个客户端独立的过滤条件（分类/严重性/操作者），在内存中匹配
+4. 断线重连时按 Last-Event-ID（rowid）补发错过的事件
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+
+# 添加event_service路径
+packages_path = Path(__file__).parent.parent.parent.parent.parent / "packages" / "core-domain" / "src"
+sys.path.insert(0, str(packages_path))
+
+from services.event_service import EventStore
+from services.event_bus import EventBus, get_event_bus
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamFilter:
+    """客户端过滤条件（空集合表示不过滤）"""
+    categories: Set[str] = field(default_factory=set)
+    severities: Set[str] = field(default_factory=set)
+    actors: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def from_params(
+        cls,
+        category: Optional[str] = None,
+        severity: Optional[str] = None,
+        actor: Optional[str] = None
+    ) -> "StreamFilter":
+        """由逗号分隔的查询参数构建"""
+        def split(value: Optional[str]) -> Set[str]:
+            return {item.strip() for item in value.split(",") if item.strip()} if value else set()
+        return cls(categories=split(category), severities=split(severity), actors=split(actor))
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.categories and event.get("event_category") not in self.categories:
+            return False
+        if self.severities and event.get("severity") not in self.severities:
+            return False
+        if self.actors and event.get("actor") not in self.actors:
+            return False
+        return True
+
+
+class StreamSubscription:
+    """单个客户端的订阅"""
+
+    def __init__(self, stream_filter: StreamFilter, max_queue_size: int):
+        self.filter = stream_filter
+        self.queue: "asyncio.Queue" = asyncio.Queue(maxsize=max_queue_size)
+        self.backlog: List[Dict[str, Any]] = []
+        self.lagged = False  # 消费过慢被丢弃，客户端需凭 Last-Event-ID 重连
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """投递事件，返回是否入队"""
+        if self.lagged or not self.filter.matches(event):
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.lagged = True
+            return False
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """取下一个事件；超时返回None"""
+        if self.backlog:
+            return self.backlog.pop(0)
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventStreamHub:
+    """
+    事件扇出中心
+
+    N 个打开的Dashboard共享同一个读取任务：每个新事件读库一次，再分发给所有订阅者。
+    """
+
+    def __init__(
+        self,
+        event_store: EventStore,
+        project_id: str = "TASKFLOW",
+        catch_up_interval: float = 1.0,
+        batch_size: int = 500,
+        max_queue_size: int = 1000,
+        max_backlog: int = 1000,
+        event_bus: Optional[EventBus] = None
+    ):
+        """
+        初始化推送中心
+
+        Args:
+            event_store: 事件存储实例
+            project_id: 项目ID
+            catch_up_interval: 无总线通知时的追赶间隔（秒）
+            batch_size: 单次读取事件数
+            max_queue_size: 每个客户端的缓冲上限，超出后断开该客户端
+            max_backlog: 重连补发的最大事件数，超出时通知客户端全量刷新
+            event_bus: 事件总线，默认为进程级总线
+        """
+        self.event_store = event_store
+        self.project_id = project_id
+        self.catch_up_interval = catch_up_interval
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.max_backlog = max_backlog
+        self.event_bus = event_bus or get_event_bus()
+
+        self.last_rowid: Optional[int] = None
+        self._subscribers: Set[StreamSubscription] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._unsubscribe_bus = None
+
+        self.stats = {
+            "db_reads": 0,
+            "events_read": 0,
+            "events_delivered": 0,
+            "lagged_clients": 0
+        }
+
+    # ========================================================================
+    # 订阅
+    # ========================================================================
+
+    async def subscribe(
+        self,
+        stream_filter: StreamFilter,
+        last_event_id: Optional[int] = None
+    ) -> StreamSubscription:
+        """
+        注册客户端
+
+        Args:
+            stream_filter: 过滤条件
+            last_event_id: 客户端已收到的最后一个事件rowid（断线重连时）
+
+        Returns:
+            StreamSubscription；backlog 为需补发的事件，若为 [{"reset": True}] 表示应全量刷新
+        """
+        await self._ensure_running()
+        if not self._subscribers:
+            # 空闲期间未读取，从当前位置开始，避免把空闲期的事件推给新客户端
+            loop = asyncio.get_running_loop()
+            max_rowid = await loop.run_in_executor(None, self.event_store.get_max_rowid)
+            if not self._subscribers:
+                self.last_rowid = max_rowid
+        subscription = StreamSubscription(stream_filter, self.max_queue_size)
+        # 先注册再补发：注册后的新事件进入队列（rowid > 当前高水位），
+        # 补发只读到当前高水位，两段不重不漏
+        self._subscribers.add(subscription)
+
+        upper = self.last_rowid
+        if last_event_id is not None and last_event_id < upper:
+            subscription.backlog = await self._read_backlog(stream_filter, last_event_id, upper)
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription) -> None:
+        """注销客户端"""
+        self._subscribers.discard(subscription)
+
+    async def _read_backlog(
+        self,
+        stream_filter: StreamFilter,
+        after_rowid: int,
+        upper: int
+    ) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        backlog: List[Dict[str, Any]] = []
+        cursor = after_rowid
+        while cursor < upper:
+            events, cursor = await loop.run_in_executor(
+                None, self.event_store.read_since, cursor, self.project_id, self.batch_size
+            )
+            self.stats["db_reads"] += 1
+            for event in events:
+                if event["rowid"] > upper:
+                    return backlog
+                if stream_filter.matches(event):
+                    backlog.append(event)
+                    if len(backlog) > self.max_backlog:
+                        return [{"reset": True}]
+            if not events:
+                break
+        return backlog
+
+    # ========================================================================
+    # 读取与扇出
+    # ========================================================================
+
+    async def _ensure_running(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = asyncio.get_running_loop()
+        if self.last_rowid is None:
+            self.last_rowid = await loop.run_in_executor(None, self.event_store.get_max_rowid)
+        if self._task is not None and not self._task.done():
+            return  # 并发的订阅已启动读取任务
+        self._wakeup = asyncio.Event()
+
+        def on_events(events: List[Dict[str, Any]]) -> None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # 事件循环已关闭
+
+        if self._unsubscribe_bus is None:
+            self._unsubscribe_bus = self.event_bus.subscribe(on_events, project_id=self.project_id)
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.catch_up_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._subscribers:
+                continue
+
+            try:
+                while True:
+                    events, high_water = await loop.run_in_executor(
+                        None, self.event_store.read_since, self.last_rowid, self.project_id, self.batch_size
+                    )
+                    self.stats["db_reads"] += 1
+                    self.last_rowid = high_water
+                    if events:
+                        self._fan_out(events)
+                    if len(events) < self.batch_size:
+                        break
+            except Exception as e:
+                logger.error(f"Event stream read failed: {e}", exc_info=True)
+
+    def _fan_out(self, events: List[Dict[str, Any]]) -> None:
+        self.stats["events_read"] += len(events)
+        for subscription in list(self._subscribers):
+            for event in events:
+                if subscription.offer(event):
+                    self.stats["events_delivered"] += 1
+            if subscription.lagged:
+                self.stats["lagged_clients"] += 1
+                self._subscribers.discard(subscription)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取推送统计"""
+        return {
+            **self.stats,
+            "subscribers": len(self._subscribers),
+            "last_rowid": self.last_rowid,
+            "catch_up_interval": self.catch_up_interval
+        }
+
+    # ========================================================================
+    # SSE 编码
+    # ========================================================================
+
+    @staticmethod
+    def format_sse(event: Dict[str, Any]) -> str:
+        """编码为SSE消息；id 为 rowid，浏览器重连时作为 Last-Event-ID 回传"""
+        payload = json.dumps(event, ensure_ascii=False, default=str)
+        return f"id: {event['rowid']}\nevent: event\ndata: {payload}\n\n"
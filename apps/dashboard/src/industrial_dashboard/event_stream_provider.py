@@ -37,10 +37,11 @@ class EventStreamProvider:
         actor: Optional[str] = None,
         severity: Optional[str] = None,
         hours: int = 24,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        获取事件列表
+        获取事件列表（按时间倒序）
         
         Args:
             event_type: 事件类型过滤
@@ -49,28 +50,43 @@ class EventStreamProvider:
             severity: 严重性过滤 (info/warning/error/critical)
             hours: 最近N小时的事件
             limit: 返回数量限制
+            after: 分页游标（上一页的 next_cursor）
         
         Returns:
             事件列表
+        
+        Raises:
+            ValueError: 游标不合法
         """
         # 计算时间范围
         start_time = (datetime.now() - timedelta(hours=hours)).isoformat()
         
-        # 查询事件
-        events = self.event_store.query(
+        # 查询事件（EventStore 已按 occurred_at DESC, id DESC 排序）
+        return self.event_store.query(
             project_id=self.project_id,
             event_type=event_type,
             category=category,
             actor=actor,
             severity=severity,
             start_time=start_time,
-            limit=limit
+            limit=limit,
+            after=self.event_store.decode_cursor(after) if after else None
         )
+    
+    def next_cursor(self, events: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """
+        计算下一页游标
         
-        # 按时间倒序排序
-        events.sort(key=lambda e: e.get("occurred_at", ""), reverse=True)
+        Args:
+            events: 当前页事件
+            limit: 当前页数量限制
         
-        return events
+        Returns:
+            游标字符串；不足一页时返回None
+        """
+        if len(events) < limit:
+            return None
+        return self.event_store.encode_cursor(events[-1])
     
     def get_event_stats(self) -> Dict[str, Any]:
         """
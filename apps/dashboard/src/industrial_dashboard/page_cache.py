@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+页面渲染缓存（Page Cache）
+
+Dashboard 页面按 (页面, 参数...) 只渲染一次，之后每次请求只是一次内存查找：
+1. 内联 <style>/<script> 提取为按内容哈希命名的资源（/static/assets/<hash>.css|js），
+   响应带一年期 immutable 缓存头；内容变化即换名，无需手动失效
+2. 页面体预先压缩为 gzip（安装 brotli 时另有 br），按 Accept-Encoding 选择
+3. 强 ETag（内容哈希），If-None-Match 命中返回304；页面本身每次重新验证
+4. 模板文件按修改时间作为缓存键的一部分，编辑后自动重新加载
+"""
+
+import gzip
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # 可选依赖：未安装时只提供 gzip
+    brotli = None
+
+
+ASSET_PREFIX = "/static/assets"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PAGE_CACHE_CONTROL = "no-cache"
+
+# 小于该长度的响应体不压缩
+MIN_COMPRESS_SIZE = 1024
+
+# 依次匹配注释、内联脚本、内联样式；注释原样保留（其中被注释掉的脚本不能被激活）
+_INLINE_BLOCK = re.compile(
+    r"<!--.*?-->"
+    r"|<script(?P<script_attrs>(?:\s[^>]*)?)>(?P<script>.*?)</script\s*>"
+    r"|<style(?P<style_attrs>(?:\s[^>]*)?)>(?P<style>.*?)</style\s*>",
+    re.IGNORECASE | re.DOTALL
+)
+_SCRIPT_TYPE = re.compile(r"""\btype\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+_JS_TYPES = {"text/javascript", "application/javascript", "module"}
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _encode_variants(body: bytes) -> Dict[str, bytes]:
+    """预先计算压缩体（压缩后不更小时不保留）"""
+    variants = {"identity": body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants["gzip"] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    return variants
+
+
+def _accepted_encodings(request: Request) -> Dict[str, float]:
+    """解析 Accept-Encoding（编码 -> q 值）"""
+    accepted = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+@dataclass
+class CachedBody:
+    """预编码的响应体"""
+    media_type: str
+    variants: Dict[str, bytes]
+    etag: str
+    cache_control: str
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str, cache_control: str) -> "CachedBody":
+        return cls(
+            media_type=media_type,
+            variants=_encode_variants(body),
+            etag=_etag(body),
+            cache_control=cache_control
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.variants["identity"])
+
+    def respond(self, request: Request) -> Response:
+        """按 If-None-Match / Accept-Encoding 生成响应"""
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        accepted = _accepted_encodings(request)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                headers["Content-Encoding"] = encoding
+                return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+        return Response(content=self.variants["identity"], media_type=self.media_type, headers=headers)
+
+
+class AssetStore:
+    """按内容哈希命名的静态资源（内存中，进程内去重）"""
+
+    def __init__(self, prefix: str = ASSET_PREFIX):
+        self.prefix = prefix
+        self._assets: Dict[str, CachedBody] = {}
+        self._lock = threading.Lock()
+
+    def add(self, content: str, extension: str, media_type: str) -> str:
+        """登记资源，返回其URL"""
+        body = content.encode("utf-8")
+        name = f"{hashlib.blake2b(body, digest_size=10).hexdigest()}.{extension}"
+        with self._lock:
+            if name not in self._assets:
+                self._assets[name] = CachedBody.build(body, f"{media_type}; charset=utf-8", ASSET_CACHE_CONTROL)
+        return f"{self.prefix}/{name}"
+
+    def get(self, name: str) -> Optional[CachedBody]:
+        with self._lock:
+            return self._assets.get(name)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._assets)
+
+    def extract_inline(self, html: str) -> str:
+        """把内联 <style>/<script> 替换为外部资源引用（执行顺序不变）"""
+        def replace(match: "re.Match[str]") -> str:
+            if match.group("style") is not None:
+                css = match.group("style")
+                if not css.strip():
+                    return match.group(0)
+                # media 等属性保留到 <link> 上
+                attrs = match.group("style_attrs") or ""
+                return f'<link rel="stylesheet"{attrs} href="{self.add(css, "css", "text/css")}">'
+
+            if match.group("script") is not None:
+                js = match.group("script")
+                attrs = match.group("script_attrs") or ""
+                if not js.strip() or re.search(r"\bsrc\s*=", attrs, re.IGNORECASE):
+                    return match.group(0)
+                script_type = _SCRIPT_TYPE.search(attrs)
+                if script_type and script_type.group(1).lower() not in _JS_TYPES:
+                    # JSON 数据块、模板等非脚本内容保留在页面中
+                    return match.group(0)
+                return f'<script{attrs} src="{self.add(js, "js", "text/javascript")}"></script>'
+
+            return match.group(0)
+
+        return _INLINE_BLOCK.sub(replace, html)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    renders: Dict[str, int] = field(default_factory=dict)
+
+
+class PageCache:
+    """渲染后页面的LRU缓存"""
+
+    def __init__(self, assets: AssetStore, max_entries: int = 64, extract_assets: bool = True):
+        """
+        Args:
+            assets: 内联资源提取到的资源库
+            max_entries: 最多缓存的页面数
+            extract_assets: 是否提取内联 <style>/<script>
+        """
+        self.assets = assets
+        self.max_entries = max_entries
+        self.extract_assets = extract_assets
+        self._pages: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get(self, key: Tuple, render: Callable[[], str]) -> CachedBody:
+        """
+        获取页面，未缓存时渲染一次
+
+        Args:
+            key: 缓存键（页面名 + 影响输出的全部参数）
+            render: 渲染函数，返回完整HTML
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+                self._stats.hits += 1
+                return page
+            self._stats.misses += 1
+
+        html = render()
+        if self.extract_assets:
+            html = self.assets.extract_inline(html)
+        page = CachedBody.build(html.encode("utf-8"), "text/html; charset=utf-8", PAGE_CACHE_CONTROL)
+
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+            name = str(key[0])
+            self._stats.renders[name] = self._stats.renders.get(name, 0) + 1
+        return page
+
+    def get_file(self, candidates, fallback_html: str) -> CachedBody:
+        """
+        获取模板文件页面（取第一个存在的文件，按修改时间缓存）
+
+        Args:
+            candidates: 候选模板文件路径（按优先级）
+            fallback_html: 全部不存在时返回的HTML
+        """
+        for path in candidates:
+            path = Path(path)
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            return self.get(("file", str(path), mtime), lambda: path.read_text(encoding="utf-8"))
+        return self.get(("file", None, fallback_html), lambda: fallback_html)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "pages": len(self._pages),
+                "assets": len(self.assets),
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "renders": dict(self._stats.renders),
+                "bytes": sum(page.size for page in self._pages.values()),
+                "brotli": brotli is not None
+            }
@@ -2,34 +2,318 @@
 """
 项目记忆空间数据提供器
 
-为Dashboard提供项目记忆数据
+为Dashboard提供项目记忆数据。数据访问后端可插拔：
+- local（默认）：进程内直接调用 ProjectMemoryService，与 API 共用 tasks.db 连接池，
+  统计读取触发器维护的汇总行，无 HTTP 往返
+- http：经 API 服务访问，复用 keep-alive 连接池；记忆页的列表与统计合并为一次请求
+
+模式由构造参数 mode 或环境变量 MEMORY_PROVIDER_MODE 指定。
 """
 
+import os
 import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-import requests
+
+# 添加core-domain路径（local 模式使用 ProjectMemoryService）
+project_root = Path(__file__).parent.parent.parent.parent.parent
+packages_path = project_root / "packages" / "core-domain" / "src"
+sys.path.insert(0, str(packages_path))
 
 # API基础URL
 API_BASE_URL = "http://localhost:8800/api"
 
+# 进程内模式使用的数据库（与API服务同一个 tasks.db）
+DEFAULT_DB_PATH = project_root / "database" / "data" / "tasks.db"
+
+MODE_LOCAL = "local"
+MODE_HTTP = "http"
+
+
+def _split_csv(value: Optional[str]) -> Optional[List[str]]:
+    """逗号分隔字符串转列表（空值返回None）"""
+    if not value:
+        return None
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    return items or None
+
+
+# ============================================================================
+# 数据访问后端
+# ============================================================================
+
+class LocalMemoryBackend:
+    """进程内后端：直接调用 ProjectMemoryService（共享连接池）"""
+
+    mode = MODE_LOCAL
+
+    def __init__(self, project_code: str, db_path: Optional[str] = None):
+        from services.project_memory_service import create_project_memory_service
+
+        self.project_code = project_code
+        # 只读展示：不访问远程记忆服务，也不启用向量检索
+        self.service = create_project_memory_service(
+            db_path=str(db_path or DEFAULT_DB_PATH),
+            session_memory_enabled=False,
+            ultra_memory_enabled=False,
+            remote_search_enabled=False
+        )
+
+    def list_memories(
+        self,
+        query: Optional[str],
+        category: Optional[str],
+        memory_type: Optional[str],
+        tags: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        # 浏览不写检索历史，避免污染检索统计
+        return self.service.retrieve_memories(
+            project_id=self.project_code,
+            query=query,
+            category=category,
+            memory_type=memory_type,
+            tags=_split_csv(tags),
+            limit=limit,
+            record_retrieval=False
+        )
+
+    def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        memory = self.service.get_memory(self.project_code, memory_id)
+        if memory is None:
+            return None
+        # 空数组字段保持为列表，与API详情接口一致
+        memory = dict(memory)
+        for field in ("tags", "related_tasks", "related_issues"):
+            if isinstance(memory.get(field), str):
+                memory[field] = []
+        return memory
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.service.memory_stats.get(self.project_code)
+
+    def get_overview(
+        self,
+        category: Optional[str],
+        memory_type: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        return self.service.get_memory_overview(
+            project_id=self.project_code,
+            category=category,
+            memory_type=memory_type,
+            limit=limit
+        )
+
+    def get_related(
+        self,
+        memory_id: str,
+        relation_types: Optional[str],
+        min_strength: float
+    ) -> List[Dict[str, Any]]:
+        return self.service.get_related_memories(
+            memory_id=memory_id,
+            relation_types=_split_csv(relation_types),
+            min_strength=min_strength
+        )
+
+    def get_graph(
+        self,
+        relation_types: Optional[str],
+        min_strength: float,
+        center: Optional[str],
+        depth: int
+    ) -> Dict[str, Any]:
+        graph = self.service.get_memory_graph(
+            project_id=self.project_code,
+            relation_types=_split_csv(relation_types),
+            min_strength=min_strength,
+            center_id=center,
+            depth=depth
+        )
+        return {"success": True, **graph}
+
+    def inherit(self, context: Optional[str], limit: int) -> Dict[str, Any]:
+        package = self.service.inherit_knowledge(
+            project_id=self.project_code,
+            context=context,
+            limit=limit
+        )
+        return {"success": True, **package}
+
+
+class HttpMemoryBackend:
+    """HTTP后端：经API服务访问，复用连接池中的 keep-alive 连接"""
+
+    mode = MODE_HTTP
+
+    def __init__(self, project_code: str, api_base_url: str = API_BASE_URL, timeout: float = 5):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.project_code = project_code
+        self.api_base_url = api_base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET 项目记忆接口，非200时抛出 requests.HTTPError"""
+        url = f"{self.api_base_url}/projects/{self.project_code}{path}"
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def list_memories(
+        self,
+        query: Optional[str],
+        category: Optional[str],
+        memory_type: Optional[str],
+        tags: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        params = {'limit': limit, 'record': 'false'}
+        if query:
+            params['query'] = query
+        if category:
+            params['category'] = category
+        if memory_type:
+            params['memory_type'] = memory_type
+        if tags:
+            params['tags'] = tags
+        return self._get("/memories", params).get('memories', [])
+
+    def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
+        import requests
+
+        try:
+            return self._get(f"/memories/{memory_id}").get('memory')
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._get("/memories/stats").get('stats', {})
+
+    def get_overview(
+        self,
+        category: Optional[str],
+        memory_type: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        # 服务端合并列表与统计，一次往返
+        params = {'limit': limit}
+        if category:
+            params['category'] = category
+        if memory_type:
+            params['memory_type'] = memory_type
+        data = self._get("/memory-overview", params)
+        return {
+            "project_id": data.get('project_id', self.project_code),
+            "memories": data.get('memories', []),
+            "count": data.get('count', 0),
+            "stats": data.get('stats', {})
+        }
+
+    def get_related(
+        self,
+        memory_id: str,
+        relation_types: Optional[str],
+        min_strength: float
+    ) -> List[Dict[str, Any]]:
+        params = {'min_strength': min_strength}
+        if relation_types:
+            params['relation_types'] = relation_types
+        return self._get(f"/memories/{memory_id}/related", params).get('related_memories', [])
+
+    def get_graph(
+        self,
+        relation_types: Optional[str],
+        min_strength: float,
+        center: Optional[str],
+        depth: int
+    ) -> Dict[str, Any]:
+        params = {'min_strength': min_strength, 'depth': depth}
+        if relation_types:
+            params['relation_types'] = relation_types
+        if center:
+            params['center'] = center
+        return self._get("/memory-graph", params)
+
+    def inherit(self, context: Optional[str], limit: int) -> Dict[str, Any]:
+        params = {'limit': limit}
+        if context:
+            params['context'] = context
+        return self._get("/knowledge/inherit", params)
+
+
+def create_memory_backend(
+    project_code: str,
+    mode: Optional[str] = None,
+    api_base_url: str = API_BASE_URL,
+    db_path: Optional[str] = None
+):
+    """
+    创建记忆数据访问后端
+
+    Args:
+        project_code: 项目代码
+        mode: local / http，None 时读取环境变量 MEMORY_PROVIDER_MODE（默认 local）
+        api_base_url: http 模式的API基础URL
+        db_path: local 模式的数据库路径
+
+    Returns:
+        LocalMemoryBackend 或 HttpMemoryBackend
+    """
+    mode = (mode or os.environ.get("MEMORY_PROVIDER_MODE") or MODE_LOCAL).lower()
+    if mode == MODE_HTTP:
+        return HttpMemoryBackend(project_code, api_base_url=api_base_url)
+    if mode != MODE_LOCAL:
+        raise ValueError(f"Unknown memory provider mode: {mode}")
+    return LocalMemoryBackend(project_code, db_path=db_path)
+
+
+# ============================================================================
+# 数据提供器
+# ============================================================================
 
 class ProjectMemoryProvider:
     """项目记忆空间数据提供器"""
-    
-    def __init__(self, project_code: str = "TASKFLOW", api_base_url: str = API_BASE_URL):
+
+    def __init__(
+        self,
+        project_code: str = "TASKFLOW",
+        api_base_url: str = API_BASE_URL,
+        mode: Optional[str] = None,
+        db_path: Optional[str] = None
+    ):
         """
         初始化记忆空间提供器
-        
+
         Args:
             project_code: 项目代码
-            api_base_url: API基础URL
+            api_base_url: API基础URL（http 模式）
+            mode: 数据访问模式 local / http，None 时读取环境变量 MEMORY_PROVIDER_MODE
+            db_path: 数据库路径（local 模式，默认项目根目录 database/data/tasks.db）
         """
         self.project_code = project_code
         self.api_base_url = api_base_url
-        self.timeout = 5  # 请求超时时间（秒）
-    
+        self.backend = create_memory_backend(
+            project_code,
+            mode=mode,
+            api_base_url=api_base_url,
+            db_path=db_path
+        )
+
+    @property
+    def mode(self) -> str:
+        """当前数据访问模式"""
+        return self.backend.mode
+
     def get_memories(
         self,
         query: Optional[str] = None,
@@ -40,89 +324,85 @@ class ProjectMemoryProvider:
     ) -> List[Dict[str, Any]]:
         """
         获取记忆列表
-        
+
         Args:
             query: 查询文本（语义搜索）
             category: 分类过滤 (architecture/problem/solution/decision/knowledge)
             memory_type: 类型过滤 (session/ultra/decision/solution)
             tags: 标签过滤（逗号分隔）
             limit: 返回数量限制
-        
+
         Returns:
             记忆列表
         """
         try:
-            url = f"{self.api_base_url}/projects/{self.project_code}/memories"
-            params = {}
-            
-            if query:
-                params['query'] = query
-            if category:
-                params['category'] = category
-            if memory_type:
-                params['memory_type'] = memory_type
-            if tags:
-                params['tags'] = tags
-            params['limit'] = limit
-            
-            response = requests.get(url, params=params, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('memories', [])
-            else:
-                print(f"[记忆空间] API错误: {response.status_code}")
-                return []
-        except requests.exceptions.RequestException as e:
-            print(f"[记忆空间] 请求失败: {e}")
-            return []
+            return self.backend.list_memories(query, category, memory_type, tags, limit)
         except Exception as e:
-            print(f"[记忆空间] 未知错误: {e}")
+            print(f"[记忆空间] 获取记忆失败: {e}")
             return []
-    
+
     def get_memory_detail(self, memory_id: str) -> Optional[Dict[str, Any]]:
         """
         获取记忆详情
-        
+
         Args:
             memory_id: 记忆ID
-        
+
         Returns:
             记忆详情字典或None
         """
         try:
-            url = f"{self.api_base_url}/projects/{self.project_code}/memories/{memory_id}"
-            response = requests.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('memory')
-            else:
-                return None
+            return self.backend.get_memory(memory_id)
         except Exception as e:
             print(f"[记忆空间] 获取详情失败: {e}")
             return None
-    
+
     def get_memory_stats(self) -> Dict[str, Any]:
         """
         获取记忆统计
-        
+
         Returns:
             统计数据字典
         """
         try:
-            url = f"{self.api_base_url}/projects/{self.project_code}/memories/stats"
-            response = requests.get(url, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('stats', {})
-            else:
-                return self._get_default_stats()
+            return self.backend.get_stats() or self._get_default_stats()
         except Exception as e:
             print(f"[记忆空间] 获取统计失败: {e}")
             return self._get_default_stats()
-    
+
+    def get_memory_overview(
+        self,
+        category: Optional[str] = None,
+        memory_type: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        获取记忆列表与统计（记忆页一次加载）
+
+        local 模式为同一连接内的一次读取，http 模式为一次请求
+
+        Args:
+            category: 分类过滤
+            memory_type: 类型过滤
+            limit: 返回数量限制
+
+        Returns:
+            {"memories": [...], "count": N, "stats": {...}}
+        """
+        try:
+            overview = self.backend.get_overview(category, memory_type, limit)
+            if not overview.get("stats"):
+                overview["stats"] = self._get_default_stats()
+            return overview
+        except Exception as e:
+            print(f"[记忆空间] 获取记忆概览失败: {e}")
+            return {
+                "project_id": self.project_code,
+                "memories": [],
+                "count": 0,
+                "stats": self._get_default_stats()
+            }
+
     def _get_default_stats(self) -> Dict[str, Any]:
         """返回默认统计数据"""
         return {
@@ -146,7 +426,7 @@ class ProjectMemoryProvider:
             },
             "last_updated": datetime.now().isoformat()
         }
-    
+
     def get_related_memories(
         self,
         memory_id: str,
@@ -155,34 +435,46 @@ class ProjectMemoryProvider:
     ) -> List[Dict[str, Any]]:
         """
         获取相关记忆
-        
+
         Args:
             memory_id: 记忆ID
             relation_types: 关系类型过滤（逗号分隔）
             min_strength: 最小关系强度
-        
+
         Returns:
             相关记忆列表
         """
         try:
-            url = f"{self.api_base_url}/projects/{self.project_code}/memories/{memory_id}/related"
-            params = {
-                'min_strength': min_strength
-            }
-            if relation_types:
-                params['relation_types'] = relation_types
-            
-            response = requests.get(url, params=params, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('related_memories', [])
-            else:
-                return []
+            return self.backend.get_related(memory_id, relation_types, min_strength)
         except Exception as e:
             print(f"[记忆空间] 获取相关记忆失败: {e}")
             return []
-    
+
+    def get_memory_graph(
+        self,
+        relation_types: Optional[str] = None,
+        min_strength: float = 0.0,
+        center: Optional[str] = None,
+        depth: int = 2
+    ) -> Dict[str, Any]:
+        """
+        获取项目记忆关系图（知识星图）
+
+        Args:
+            relation_types: 关系类型过滤（逗号分隔）
+            min_strength: 最小关系强度
+            center: 中心记忆ID（只返回其邻域子图）
+            depth: 邻域跳数
+
+        Returns:
+            {"nodes": [...], "links": [...]}
+        """
+        try:
+            return self.backend.get_graph(relation_types, min_strength, center, depth)
+        except Exception as e:
+            print(f"[记忆空间] 获取关系图失败: {e}")
+            return {"success": False, "error": str(e), "nodes": [], "links": []}
+
     def inherit_knowledge(
         self,
         context: Optional[str] = None,
@@ -190,59 +482,47 @@ class ProjectMemoryProvider:
     ) -> Dict[str, Any]:
         """
         跨会话知识继承
-        
+
         Args:
             context: 当前上下文
             limit: 返回记忆数量
-        
+
         Returns:
             知识包字典
         """
         try:
-            url = f"{self.api_base_url}/projects/{self.project_code}/knowledge/inherit"
-            params = {'limit': limit}
-            if context:
-                params['context'] = context
-            
-            response = requests.get(url, params=params, timeout=self.timeout)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {
-                    "success": False,
-                    "architecture_decisions": [],
-                    "problem_solutions": [],
-                    "important_knowledge": [],
-                    "recent_memories": []
-                }
+            return self.backend.inherit(context, limit)
         except Exception as e:
             print(f"[记忆空间] 知识继承失败: {e}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "architecture_decisions": [],
+                "problem_solutions": [],
+                "important_knowledge": [],
+                "recent_memories": []
             }
-    
+
     def get_categories_summary(self) -> Dict[str, int]:
         """
         获取各分类记忆数量汇总
-        
+
         Returns:
             {category: count}字典
         """
         stats = self.get_memory_stats()
         return stats.get("by_category", {})
-    
+
     def get_importance_summary(self) -> Dict[str, int]:
         """
         获取各重要性级别记忆数量汇总
-        
+
         Returns:
             {importance_level: count}字典
         """
         stats = self.get_memory_stats()
         return stats.get("by_importance", {})
-    
+
     def search_memories(
         self,
         keyword: str,
@@ -250,11 +530,11 @@ class ProjectMemoryProvider:
     ) -> List[Dict[str, Any]]:
         """
         搜索记忆（语义搜索）
-        
+
         Args:
             keyword: 搜索关键词
             limit: 返回数量限制
-        
+
         Returns:
             匹配的记忆列表
         """
@@ -269,6 +549,7 @@ if __name__ == "__main__":
     print("===== ProjectMemoryProvider Test =====\n")
     
     provider = ProjectMemoryProvider()
+    print(f"Mode: {provider.mode}")
     
     # 测试获取记忆
     memories = provider.get_memories(limit=5)
@@ -3961,6 +3961,7 @@ AI代码管家等待您的提问...
         // 自动刷新控制变量
         let autoRefreshEnabled = true;
         let lastTasksData = null;
+        let taskFeedRevision = null;  // 已同步的看板修订号（服务端不支持时为null）
         let isUserInteracting = false;
         
         // 性能监控
@@ -3988,6 +3989,28 @@ AI代码管家等待您的提问...
             }});
         }}
         
+        // 拉取任务：首次全量（ETag 重新验证），之后按修订号只取变更的任务；无变化时返回null
+        async function fetchTaskFeed() {{
+            if (taskFeedRevision === null || !lastTasksData) {{
+                const res = await fetch('/api/tasks', {{ cache: 'no-cache' }});
+                const tasks = await res.json();
+                const revision = res.headers.get('X-Board-Revision');
+                taskFeedRevision = revision === null ? null : Number(revision);
+                return tasks;
+            }}
+            
+            const res = await fetch(`/api/tasks?since=${{taskFeedRevision}}`, {{ cache: 'no-store' }});
+            const delta = await res.json();
+            taskFeedRevision = delta.revision;
+            if (delta.full) return delta.tasks;
+            if (delta.tasks.length === 0 && delta.deleted.length === 0) return null;
+            
+            const byId = new Map(lastTasksData.map(t => [t.id, t]));
+            delta.deleted.forEach(id => byId.delete(id));
+            delta.tasks.forEach(t => byId.set(t.id, t));
+            return Array.from(byId.values()).sort((a, b) => (b.created_at || '').localeCompare(a.created_at || ''));
+        }}
+        
         async function loadData() {{
             const startTime = performance.now(); // 性能监控：开始时间
             
@@ -4002,12 +4025,11 @@ AI代码管家等待您的提问...
                 // 更新状态为加载中
                 updateRefreshStatus('刷新中...', 'loading');
                 
-                // 加载所有任务数据
-                const tasksRes = await fetch('/api/tasks?_t=' + Date.now()); // 添加时间戳避免缓存
-                const newTasksData = await tasksRes.json();
+                // 加载任务数据（增量同步）
+                const newTasksData = await fetchTaskFeed();
                 
                 // 检查数据是否有变化（避免不必要的DOM更新）
-                if (lastTasksData && JSON.stringify(lastTasksData) === JSON.stringify(newTasksData)) {{
+                if (newTasksData === null || (lastTasksData && JSON.stringify(lastTasksData) === JSON.stringify(newTasksData))) {{
                     console.log('[自动刷新] 数据无变化，跳过UI更新');
                     updateRefreshStatus('自动刷新 5秒', 'active');
                     
@@ -765,7 +765,7 @@ def get_mission_control_dashboard(title: str, subtitle: str, cache_version: str
                 <div class="section-title">
                     <span>⚡</span>
                     <span>实时脉动 (Live Pulse)</span>
-                    <span style="margin-left: auto; font-size: 11px; color: var(--gray-500);">每30秒自动刷新</span>
+                    <span style="margin-left: auto; font-size: 11px; color: var(--gray-500);">实时推送</span>
                 </div>
                 <div class="event-list" id="recentEventsList">
                     <div class="event-item">
@@ -967,8 +967,8 @@ def get_mission_control_dashboard(title: str, subtitle: str, cache_version: str
             // 加载任务列表
             loadTasks();
             
-            // 启动自动刷新（每30秒）
-            setInterval(loadRecentEvents, 30000);
+            // 订阅实时事件流（替代每30秒轮询）
+            subscribeLiveEvents();
             
             // 设置Tab切换
             setupTabNavigation();
@@ -1029,6 +1029,27 @@ def get_mission_control_dashboard(title: str, subtitle: str, cache_version: str
         }}
         
         // ===== 加载最近事件 =====
+        function createEventItem(event) {{
+            const severityClass = event.severity || 'info';
+            const eventItem = document.createElement('div');
+            eventItem.className = `event-item ${{severityClass}}`;
+            eventItem.dataset.eventId = event.id;
+            eventItem.innerHTML = `
+                <div class="event-dot ${{severityClass}}"></div>
+                <div class="event-content">
+                    <div class="event-header">
+                        <span class="event-time">${{formatTime(event.occurred_at || event.timestamp)}}</span>
+                        <span>|</span>
+                        <span class="event-type">${{event.event_type || event.type}}</span>
+                    </div>
+                    <div class="event-title">${{event.title}}</div>
+                    <div class="event-meta">👤 ${{event.actor || 'System'}} | 📋 ${{event.event_category || event.category}}</div>
+                </div>
+                <button class="action-button" onclick="viewEventDetail('${{event.id}}')">详情</button>
+            `;
+            return eventItem;
+        }}
+        
         async function loadRecentEvents() {{
             try {{
                 const response = await fetch('/api/events/recent?hours=24&limit=5');
@@ -1039,23 +1060,7 @@ def get_mission_control_dashboard(title: str, subtitle: str, cache_version: str
                     eventList.innerHTML = '';
                     
                     data.events.slice(0, 5).forEach(event => {{
-                        const severityClass = event.severity || 'info';
-                        const eventItem = document.createElement('div');
-                        eventItem.className = `event-item ${{severityClass}}`;
-                        eventItem.innerHTML = `
-                            <div class="event-dot ${{severityClass}}"></div>
-                            <div class="event-content">
-                                <div class="event-header">
-                                    <span class="event-time">${{formatTime(event.occurred_at || event.timestamp)}}</span>
-                                    <span>|</span>
-                                    <span class="event-type">${{event.event_type || event.type}}</span>
-                                </div>
-                                <div class="event-title">${{event.title}}</div>
-                                <div class="event-meta">👤 ${{event.actor || 'System'}} | 📋 ${{event.event_category || event.category}}</div>
-                            </div>
-                            <button class="action-button" onclick="viewEventDetail('${{event.id}}')">详情</button>
-                        `;
-                        eventList.appendChild(eventItem);
+                        eventList.appendChild(createEventItem(event));
                     }});
                     
                     // 更新事件统计
@@ -1070,6 +1075,23 @@ def get_mission_control_dashboard(title: str, subtitle: str, cache_version: str
             }}
         }}
         
+        // ===== 实时事件流（SSE） =====
+        function subscribeLiveEvents() {{
+            const source = new EventSource('/api/events/live');
+            source.addEventListener('event', (e) => {{
+                const event = JSON.parse(e.data);
+                const eventList = document.getElementById('recentEventsList');
+                if (eventList.querySelector(`[data-event-id="${{event.id}}"]`)) return;
+                eventList.prepend(createEventItem(event));
+                while (eventList.children.length > 5) {{
+                    eventList.removeChild(eventList.lastElementChild);
+                }}
+                const totalEl = document.getElementById('totalEvents');
+                totalEl.textContent = (parseInt(totalEl.textContent, 10) || 0) + 1;
+            }});
+            source.addEventListener('reset', loadRecentEvents);
+        }}
+        
         // ===== 加载任务列表 =====
         async function loadTasks() {{
             try {{
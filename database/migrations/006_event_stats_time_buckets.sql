@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Migration 006: event_stats 时间桶列
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: event_stats 改为单条 upsert 增量维护，events_today/events_this_week/
+--       events_this_month 按日/ISO周/月分桶计数，桶键变化时自动重置
+-- ============================================================================
+
+-- 1. 时间桶键（计数所属的日/周/月）
+ALTER TABLE event_stats ADD COLUMN stats_day TEXT;      -- YYYY-MM-DD
+ALTER TABLE event_stats ADD COLUMN stats_week TEXT;     -- YYYY-Www (ISO周)
+ALTER TABLE event_stats ADD COLUMN stats_month TEXT;    -- YYYY-MM
+
+-- 2. 迁移后执行一次对账，从 project_events 重建全部计数：
+--    python scripts/rebuild_event_stats.py
+
+-- Migration完成
@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Migration 007: 事件查询复合索引
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: EventStore.query 改为按 (occurred_at, id) 游标分页，
+--       为常用的 "项目 + 过滤条件 + 时间排序" 组合添加复合索引，
+--       使过滤与排序都能走索引（无需临时B树排序，游标翻页无需扫描跳过的行）
+-- ============================================================================
+
+-- 1. 项目时间线（默认查询路径）
+CREATE INDEX IF NOT EXISTS idx_events_project_occurred
+    ON project_events(project_id, occurred_at DESC, id DESC);
+
+-- 2. 项目 + 分类
+CREATE INDEX IF NOT EXISTS idx_events_project_category_occurred
+    ON project_events(project_id, event_category, occurred_at DESC, id DESC);
+
+-- 3. 项目 + 事件类型
+CREATE INDEX IF NOT EXISTS idx_events_project_type_occurred
+    ON project_events(project_id, event_type, occurred_at DESC, id DESC);
+
+-- 4. 项目 + 严重性
+CREATE INDEX IF NOT EXISTS idx_events_project_severity_occurred
+    ON project_events(project_id, severity, occurred_at DESC, id DESC);
+
+-- 5. 无项目过滤时的全局时间线（替换单列 idx_events_occurred）
+CREATE INDEX IF NOT EXISTS idx_events_occurred_id
+    ON project_events(occurred_at DESC, id DESC);
+
+-- 6. 单列索引已被以上复合索引的前缀覆盖
+DROP INDEX IF EXISTS idx_events_project;
+DROP INDEX IF EXISTS idx_events_occurred;
+
+-- 7. 更新查询规划器统计信息
+ANALYZE project_events;
+
+-- Migration完成
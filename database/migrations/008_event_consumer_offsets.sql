@@ -0,0 +1,15 @@
+-- ============================================================================
+-- Migration 008: 事件消费者游标
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: EventListener 由轮询改为事件总线推送 + rowid 高水位线追赶，
+--       高水位线持久化到此表，重启后从上次处理的位置继续，不漏事件
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS event_consumer_offsets (
+    consumer_id TEXT PRIMARY KEY,               -- 消费者ID（如 listener:TASKFLOW）
+    last_rowid INTEGER NOT NULL DEFAULT 0,      -- 已处理的最大 project_events.rowid
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Migration完成
@@ -0,0 +1,62 @@
+-- ============================================================================
+-- Migration 009: 持久化通知
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: NotificationService 由内存队列改为 SQLite 存储，重启不丢失并可被多个
+--       API 进程共享；总数/未读数/发送数由触发器增量维护，读取为O(1)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,      -- 插入顺序（最新优先查询与保留压缩）
+    id TEXT NOT NULL UNIQUE,                    -- 通知ID（NOTIF-xxxxxxxxxxxx）
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    type TEXT NOT NULL,                         -- info/success/warning/error
+    data TEXT,                                  -- 附加数据（JSON）
+    duration INTEGER NOT NULL DEFAULT 5000,
+    priority INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    read INTEGER NOT NULL DEFAULT 0
+);
+
+-- 未读列表（部分索引，只包含未读行）
+CREATE INDEX IF NOT EXISTS idx_notifications_unread ON notifications(seq) WHERE read = 0;
+
+-- 按类型列表 / 按类型未读列表
+CREATE INDEX IF NOT EXISTS idx_notifications_type ON notifications(type, seq);
+CREATE INDEX IF NOT EXISTS idx_notifications_type_unread ON notifications(type, seq) WHERE read = 0;
+
+-- 计数表：scope 为 '*'（全部）或 'type:<类型>'
+CREATE TABLE IF NOT EXISTS notification_counters (
+    scope TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,           -- 当前保留数量
+    unread INTEGER NOT NULL DEFAULT 0,          -- 当前未读数量
+    sent INTEGER NOT NULL DEFAULT 0             -- 累计发送数量（删除不减少）
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_insert AFTER INSERT ON notifications
+BEGIN
+    INSERT INTO notification_counters (scope, total, unread, sent)
+    VALUES ('*', 1, NEW.read = 0, 1), ('type:' || NEW.type, 1, NEW.read = 0, 1)
+    ON CONFLICT(scope) DO UPDATE SET
+        total = total + 1,
+        unread = unread + excluded.unread,
+        sent = sent + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_delete AFTER DELETE ON notifications
+BEGIN
+    UPDATE notification_counters
+    SET total = total - 1, unread = unread - (OLD.read = 0)
+    WHERE scope IN ('*', 'type:' || OLD.type);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_read AFTER UPDATE OF read ON notifications
+WHEN OLD.read <> NEW.read
+BEGIN
+    UPDATE notification_counters
+    SET unread = unread + (CASE WHEN NEW.read = 0 THEN 1 ELSE -1 END)
+    WHERE scope IN ('*', 'type:' || NEW.type);
+END;
+
+-- Migration完成
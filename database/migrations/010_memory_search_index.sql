@@ -0,0 +1,62 @@
+-- ============================================================================
+-- Migration 010: 项目记忆本地检索索引
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: ProjectMemoryService.retrieve_memories 的查询文本改由本地 FTS5 索引检索
+--       （BM25 排序），可选向量索引补充语义召回，不再依赖 Ultra Memory 网络调用。
+--       中日韩文本在写入索引前由 services/memory_search.py 切分为二元组，
+--       因此索引内容由服务写入；触发器只登记待索引/删除索引。
+--       已有记忆由服务首次检索时自动加入待索引表。
+-- ============================================================================
+
+-- 全文索引（rowid = memory_search_docs.doc_id）
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_search_fts USING fts5(
+    title, content, tags,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+-- 索引文档与记忆的映射
+CREATE TABLE IF NOT EXISTS memory_search_docs (
+    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    memory_id TEXT NOT NULL UNIQUE,
+    indexed_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- 待索引记忆（新增或标题/内容/标签被修改）
+CREATE TABLE IF NOT EXISTS memory_search_pending (
+    memory_id TEXT PRIMARY KEY
+);
+
+-- 向量索引（可选；vector 为 float32 单位向量）
+CREATE TABLE IF NOT EXISTS memory_embeddings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,      -- 增量加载游标
+    memory_id TEXT NOT NULL UNIQUE,
+    project_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_search_insert AFTER INSERT ON project_memories
+BEGIN
+    INSERT OR IGNORE INTO memory_search_pending (memory_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_search_update
+AFTER UPDATE OF title, content, tags ON project_memories
+BEGIN
+    INSERT OR IGNORE INTO memory_search_pending (memory_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_search_delete AFTER DELETE ON project_memories
+BEGIN
+    DELETE FROM memory_search_fts
+    WHERE rowid = (SELECT doc_id FROM memory_search_docs WHERE memory_id = OLD.id);
+    DELETE FROM memory_search_docs WHERE memory_id = OLD.id;
+    DELETE FROM memory_search_pending WHERE memory_id = OLD.id;
+    DELETE FROM memory_embeddings WHERE memory_id = OLD.id;
+END;
+
+-- 已有记忆加入待索引表
+INSERT OR IGNORE INTO memory_search_pending (memory_id) SELECT id FROM project_memories;
+
+-- Migration完成
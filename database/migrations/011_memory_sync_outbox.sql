@@ -0,0 +1,35 @@
+-- ============================================================================
+-- Migration 011: 外部记忆同步发件箱
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: create_memory 不再同步调用 Ultra Memory / Session Memory HTTP API，
+--       而是在写入记忆的同一事务中登记发件箱记录，由 API 进程内的
+--       MemorySyncWorker 异步批量推送（重试退避 + 熔断），成功后回写
+--       project_memories.external_memory_id
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_sync_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    memory_id TEXT NOT NULL,                    -- 本地记忆ID
+    project_id TEXT NOT NULL,
+    target TEXT NOT NULL,                       -- ultra/session
+    payload TEXT NOT NULL,                      -- 请求体（JSON）
+    status TEXT NOT NULL DEFAULT 'pending',     -- pending/in_flight/done/failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,    -- 下次尝试时间（unix秒，退避）
+    lease_until REAL,                           -- 领取租约到期时间（unix秒）
+    claim_token TEXT,                           -- 领取批次标识
+    external_memory_id TEXT,                    -- 同步成功后的外部记忆ID
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE(memory_id, target)
+);
+
+-- 领取到期记录
+CREATE INDEX IF NOT EXISTS idx_memory_sync_outbox_due ON memory_sync_outbox(status, next_attempt_at);
+
+-- 按领取批次读取
+CREATE INDEX IF NOT EXISTS idx_memory_sync_outbox_claim ON memory_sync_outbox(claim_token);
+
+-- Migration完成
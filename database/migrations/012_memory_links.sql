@@ -0,0 +1,105 @@
+-- ============================================================================
+-- Migration 012: 项目记忆标签与关联索引
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: project_memories 的 tags / related_tasks / related_issues 为 JSON 数组，
+--       过滤只能逐行 json_each 全表扫描。新增三张规范化副表并建立索引，
+--       由触发器在写入时同步，本迁移同时回填已有记忆。
+--       JSON 列仍为数据来源，副表仅用于索引过滤（标签 any/all、任务、问题）
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_tags (
+    memory_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (memory_id, tag)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_tags_project_tag ON memory_tags(project_id, tag, memory_id);
+
+CREATE TABLE IF NOT EXISTS memory_task_links (
+    memory_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    PRIMARY KEY (memory_id, task_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_task_links_task ON memory_task_links(task_id, memory_id);
+
+CREATE TABLE IF NOT EXISTS memory_issue_links (
+    memory_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    issue_id TEXT NOT NULL,
+    PRIMARY KEY (memory_id, issue_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_issue_links_issue ON memory_issue_links(issue_id, memory_id);
+
+-- ============================================================================
+-- 同步触发器（无效 JSON 按空数组处理）
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_links_insert AFTER INSERT ON project_memories
+BEGIN
+    INSERT OR IGNORE INTO memory_tags (memory_id, project_id, tag)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)
+    WHERE value IS NOT NULL;
+    INSERT OR IGNORE INTO memory_task_links (memory_id, project_id, task_id)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.related_tasks) THEN NEW.related_tasks ELSE '[]' END)
+    WHERE value IS NOT NULL;
+    INSERT OR IGNORE INTO memory_issue_links (memory_id, project_id, issue_id)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.related_issues) THEN NEW.related_issues ELSE '[]' END)
+    WHERE value IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_links_update
+AFTER UPDATE OF project_id, tags, related_tasks, related_issues ON project_memories
+BEGIN
+    DELETE FROM memory_tags WHERE memory_id = OLD.id;
+    DELETE FROM memory_task_links WHERE memory_id = OLD.id;
+    DELETE FROM memory_issue_links WHERE memory_id = OLD.id;
+    INSERT OR IGNORE INTO memory_tags (memory_id, project_id, tag)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)
+    WHERE value IS NOT NULL;
+    INSERT OR IGNORE INTO memory_task_links (memory_id, project_id, task_id)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.related_tasks) THEN NEW.related_tasks ELSE '[]' END)
+    WHERE value IS NOT NULL;
+    INSERT OR IGNORE INTO memory_issue_links (memory_id, project_id, issue_id)
+    SELECT NEW.id, NEW.project_id, CAST(value AS TEXT)
+    FROM json_each(CASE WHEN json_valid(NEW.related_issues) THEN NEW.related_issues ELSE '[]' END)
+    WHERE value IS NOT NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_links_delete AFTER DELETE ON project_memories
+BEGIN
+    DELETE FROM memory_tags WHERE memory_id = OLD.id;
+    DELETE FROM memory_task_links WHERE memory_id = OLD.id;
+    DELETE FROM memory_issue_links WHERE memory_id = OLD.id;
+END;
+
+-- ============================================================================
+-- 回填已有记忆
+-- ============================================================================
+
+INSERT OR IGNORE INTO memory_tags (memory_id, project_id, tag)
+SELECT pm.id, pm.project_id, CAST(j.value AS TEXT)
+FROM project_memories pm,
+     json_each(CASE WHEN json_valid(pm.tags) THEN pm.tags ELSE '[]' END) AS j
+WHERE j.value IS NOT NULL;
+
+INSERT OR IGNORE INTO memory_task_links (memory_id, project_id, task_id)
+SELECT pm.id, pm.project_id, CAST(j.value AS TEXT)
+FROM project_memories pm,
+     json_each(CASE WHEN json_valid(pm.related_tasks) THEN pm.related_tasks ELSE '[]' END) AS j
+WHERE j.value IS NOT NULL;
+
+INSERT OR IGNORE INTO memory_issue_links (memory_id, project_id, issue_id)
+SELECT pm.id, pm.project_id, CAST(j.value AS TEXT)
+FROM project_memories pm,
+     json_each(CASE WHEN json_valid(pm.related_issues) THEN pm.related_issues ELSE '[]' END) AS j
+WHERE j.value IS NOT NULL;
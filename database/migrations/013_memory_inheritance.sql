@@ -0,0 +1,47 @@
+-- ============================================================================
+-- Migration 013: 知识继承包缓存版本与分区查询索引
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: inherit_knowledge 改为单次查询（UNION ALL + 窗口函数）计算全部分区，
+--       结果按项目缓存。memory_project_versions 记录每个项目的记忆版本号，
+--       由触发器在记忆写入时递增，缓存据此判断是否失效（跨进程有效）。
+--       仅更新访问统计等列时不递增版本号。
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_project_versions (
+    project_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- 分区查询索引：按分类/全部取重要性排序、按时间取最近记忆
+CREATE INDEX IF NOT EXISTS idx_project_memories_project_category_rank
+ON project_memories(project_id, category, importance DESC, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_project_memories_project_importance
+ON project_memories(project_id, importance DESC, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_project_memories_project_created
+ON project_memories(project_id, created_at DESC);
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_versions_insert AFTER INSERT ON project_memories
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version) VALUES (NEW.project_id, 1)
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_versions_update
+AFTER UPDATE OF project_id, memory_type, category, title, content, context, tags,
+    related_tasks, related_issues, importance, external_memory_id, created_at
+ON project_memories
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version) VALUES (OLD.project_id, 1)
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+    INSERT INTO memory_project_versions (project_id, version) VALUES (NEW.project_id, 1)
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_versions_delete AFTER DELETE ON project_memories
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version) VALUES (OLD.project_id, 1)
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,34 @@
+-- ============================================================================
+-- Migration 014: 记忆关系图版本触发器
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: 记忆关系图按项目缓存为内存邻接表（MemoryGraphStore）。
+--       memory_relations 写入时递增源记忆所属项目的 memory_project_versions
+--       版本号（migration 013），使其他进程的写入也能让缓存图失效重载。
+-- 依赖: 013_memory_inheritance.sql
+-- ============================================================================
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_insert AFTER INSERT ON memory_relations
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version)
+    SELECT project_id, 1 FROM project_memories WHERE id = NEW.source_memory_id
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_update
+AFTER UPDATE OF source_memory_id, target_memory_id, relation_type, strength ON memory_relations
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version)
+    SELECT project_id, 1 FROM project_memories WHERE id = OLD.source_memory_id
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+    INSERT INTO memory_project_versions (project_id, version)
+    SELECT project_id, 1 FROM project_memories WHERE id = NEW.source_memory_id
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_delete AFTER DELETE ON memory_relations
+BEGIN
+    INSERT INTO memory_project_versions (project_id, version)
+    SELECT project_id, 1 FROM project_memories WHERE id = OLD.source_memory_id
+    ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+END;
@@ -0,0 +1,39 @@
+-- ============================================================================
+-- Migration 015: 记忆检索历史汇总
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: RetrievalAnalytics 按 rowid 游标增量汇总 memory_retrieval_history，
+--       得到每个记忆的命中次数与每个查询（含检索参数）的频次，
+--       API 进程据此预热热点缓存。
+-- 依赖: 005_add_project_memory_tables.sql, 013_memory_inheritance.sql
+-- ============================================================================
+
+-- 记忆命中次数
+CREATE TABLE IF NOT EXISTS memory_hit_stats (
+    memory_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_hit_at TEXT
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_hit_stats_project ON memory_hit_stats(project_id, hits DESC);
+
+-- 查询频次（query_norm 为 lower(trim(query_text))，filters 为检索参数JSON）
+CREATE TABLE IF NOT EXISTS memory_query_stats (
+    project_id TEXT NOT NULL,
+    query_norm TEXT NOT NULL,
+    filters TEXT NOT NULL DEFAULT '{}',
+    query_text TEXT NOT NULL,
+    query_count INTEGER NOT NULL DEFAULT 0,
+    total_results INTEGER NOT NULL DEFAULT 0,
+    last_seen_at TEXT,
+    PRIMARY KEY (project_id, query_norm, filters)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_query_stats_count ON memory_query_stats(project_id, query_count DESC);
+
+-- 汇总游标（已汇总到的 memory_retrieval_history rowid）
+CREATE TABLE IF NOT EXISTS memory_analytics_state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
@@ -0,0 +1,49 @@
+-- ============================================================================
+-- Migration 016: 记忆压实与归档
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: MemoryCompactor 以 MinHash 签名（LSH 分桶）查找近似重复记忆并合并，
+--       低重要性、从未被检索的旧记忆连同关系压缩（zstd/zlib）写入 memory_archive。
+--       签名在记忆标题/内容变更或删除时由触发器清除，下次压实时重新计算。
+--       合并与归档读取 project_memories.access_count/reference_count（v5 schema），
+--       按 003 建表的数据库由 ensure_compaction_tables 补列。
+-- 依赖: 005_add_project_memory_tables.sql, 015_memory_retrieval_analytics.sql
+-- ============================================================================
+
+-- 记忆 MinHash 签名（100 个 uint32，小端序打包）
+CREATE TABLE IF NOT EXISTS memory_fingerprints (
+    memory_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    signature BLOB NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_project ON memory_fingerprints(project_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_fingerprints_update
+AFTER UPDATE OF title, content ON project_memories
+BEGIN
+    DELETE FROM memory_fingerprints WHERE memory_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_fingerprints_delete AFTER DELETE ON project_memories
+BEGIN
+    DELETE FROM memory_fingerprints WHERE memory_id = OLD.id;
+END;
+
+-- 归档记忆（payload 为压缩后的 {"memory": 原记录, "relations": 原关系} JSON）
+CREATE TABLE IF NOT EXISTS memory_archive (
+    memory_id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    memory_type TEXT,
+    category TEXT,
+    title TEXT,
+    importance INTEGER,
+    reason TEXT NOT NULL,                  -- merged: 合并的重复记忆 / stale: 冷数据
+    merged_into TEXT,                      -- 合并到的保留记忆ID
+    created_at TEXT,
+    archived_at TEXT NOT NULL,
+    codec TEXT NOT NULL,                   -- zstd / zlib
+    payload BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_memory_archive_project ON memory_archive(project_id, archived_at DESC);
@@ -0,0 +1,231 @@
+-- ============================================================================
+-- Migration 017: 项目记忆统计物化
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: 每个项目一行 memory_stats_summary（按类型/分类计数与重要性直方图），
+--       由 project_memories 触发器在同一事务内增减，统计接口只读一行。
+--       取代 003 的 memory_stats（只在 create_memory 中更新且 knowledge 计数错误）。
+--       重建: python scripts/rebuild_memory_stats.py [PROJECT]
+-- 依赖: 005_add_project_memory_tables.sql, 013_memory_inheritance.sql
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_stats_summary (
+    project_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    type_session INTEGER NOT NULL DEFAULT 0,
+    type_ultra INTEGER NOT NULL DEFAULT 0,
+    type_decision INTEGER NOT NULL DEFAULT 0,
+    type_solution INTEGER NOT NULL DEFAULT 0,
+    type_knowledge INTEGER NOT NULL DEFAULT 0,
+    type_other INTEGER NOT NULL DEFAULT 0,
+    category_architecture INTEGER NOT NULL DEFAULT 0,
+    category_problem INTEGER NOT NULL DEFAULT 0,
+    category_solution INTEGER NOT NULL DEFAULT 0,
+    category_decision INTEGER NOT NULL DEFAULT 0,
+    category_knowledge INTEGER NOT NULL DEFAULT 0,
+    category_experience INTEGER NOT NULL DEFAULT 0,
+    category_other INTEGER NOT NULL DEFAULT 0,
+    importance_1 INTEGER NOT NULL DEFAULT 0,
+    importance_2 INTEGER NOT NULL DEFAULT 0,
+    importance_3 INTEGER NOT NULL DEFAULT 0,
+    importance_4 INTEGER NOT NULL DEFAULT 0,
+    importance_5 INTEGER NOT NULL DEFAULT 0,
+    importance_6 INTEGER NOT NULL DEFAULT 0,
+    importance_7 INTEGER NOT NULL DEFAULT 0,
+    importance_8 INTEGER NOT NULL DEFAULT 0,
+    importance_9 INTEGER NOT NULL DEFAULT 0,
+    importance_10 INTEGER NOT NULL DEFAULT 0,
+    importance_sum INTEGER NOT NULL DEFAULT 0,
+    last_memory_created_at TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_stats_insert AFTER INSERT ON project_memories
+BEGIN
+    INSERT INTO memory_stats_summary (project_id) VALUES (NEW.project_id)
+    ON CONFLICT(project_id) DO NOTHING;
+    UPDATE memory_stats_summary SET
+        total = total + 1,
+        type_session = type_session + (NEW.memory_type = 'session'),
+        type_ultra = type_ultra + (NEW.memory_type = 'ultra'),
+        type_decision = type_decision + (NEW.memory_type = 'decision'),
+        type_solution = type_solution + (NEW.memory_type = 'solution'),
+        type_knowledge = type_knowledge + (NEW.memory_type = 'knowledge'),
+        type_other = type_other + (COALESCE(NEW.memory_type, '') NOT IN ('session', 'ultra', 'decision', 'solution', 'knowledge')),
+        category_architecture = category_architecture + (NEW.category = 'architecture'),
+        category_problem = category_problem + (NEW.category = 'problem'),
+        category_solution = category_solution + (NEW.category = 'solution'),
+        category_decision = category_decision + (NEW.category = 'decision'),
+        category_knowledge = category_knowledge + (NEW.category = 'knowledge'),
+        category_experience = category_experience + (NEW.category = 'experience'),
+        category_other = category_other + (COALESCE(NEW.category, '') NOT IN ('architecture', 'problem', 'solution', 'decision', 'knowledge', 'experience')),
+        importance_1 = importance_1 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 1),
+        importance_2 = importance_2 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 2),
+        importance_3 = importance_3 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 3),
+        importance_4 = importance_4 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 4),
+        importance_5 = importance_5 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 5),
+        importance_6 = importance_6 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 6),
+        importance_7 = importance_7 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 7),
+        importance_8 = importance_8 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 8),
+        importance_9 = importance_9 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 9),
+        importance_10 = importance_10 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 10),
+        importance_sum = importance_sum + MIN(MAX(COALESCE(NEW.importance, 5), 1), 10),
+        updated_at = datetime('now')
+    WHERE project_id = NEW.project_id;
+    UPDATE memory_stats_summary
+    SET last_memory_created_at = MAX(COALESCE(last_memory_created_at, ''), NEW.created_at)
+    WHERE project_id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_stats_update
+AFTER UPDATE OF project_id, memory_type, category, importance, created_at ON project_memories
+BEGIN
+    INSERT INTO memory_stats_summary (project_id) VALUES (OLD.project_id)
+    ON CONFLICT(project_id) DO NOTHING;
+    UPDATE memory_stats_summary SET
+        total = total - 1,
+        type_session = type_session - (OLD.memory_type = 'session'),
+        type_ultra = type_ultra - (OLD.memory_type = 'ultra'),
+        type_decision = type_decision - (OLD.memory_type = 'decision'),
+        type_solution = type_solution - (OLD.memory_type = 'solution'),
+        type_knowledge = type_knowledge - (OLD.memory_type = 'knowledge'),
+        type_other = type_other - (COALESCE(OLD.memory_type, '') NOT IN ('session', 'ultra', 'decision', 'solution', 'knowledge')),
+        category_architecture = category_architecture - (OLD.category = 'architecture'),
+        category_problem = category_problem - (OLD.category = 'problem'),
+        category_solution = category_solution - (OLD.category = 'solution'),
+        category_decision = category_decision - (OLD.category = 'decision'),
+        category_knowledge = category_knowledge - (OLD.category = 'knowledge'),
+        category_experience = category_experience - (OLD.category = 'experience'),
+        category_other = category_other - (COALESCE(OLD.category, '') NOT IN ('architecture', 'problem', 'solution', 'decision', 'knowledge', 'experience')),
+        importance_1 = importance_1 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 1),
+        importance_2 = importance_2 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 2),
+        importance_3 = importance_3 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 3),
+        importance_4 = importance_4 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 4),
+        importance_5 = importance_5 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 5),
+        importance_6 = importance_6 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 6),
+        importance_7 = importance_7 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 7),
+        importance_8 = importance_8 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 8),
+        importance_9 = importance_9 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 9),
+        importance_10 = importance_10 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 10),
+        importance_sum = importance_sum - MIN(MAX(COALESCE(OLD.importance, 5), 1), 10),
+        updated_at = datetime('now')
+    WHERE project_id = OLD.project_id;
+    INSERT INTO memory_stats_summary (project_id) VALUES (NEW.project_id)
+    ON CONFLICT(project_id) DO NOTHING;
+    UPDATE memory_stats_summary SET
+        total = total + 1,
+        type_session = type_session + (NEW.memory_type = 'session'),
+        type_ultra = type_ultra + (NEW.memory_type = 'ultra'),
+        type_decision = type_decision + (NEW.memory_type = 'decision'),
+        type_solution = type_solution + (NEW.memory_type = 'solution'),
+        type_knowledge = type_knowledge + (NEW.memory_type = 'knowledge'),
+        type_other = type_other + (COALESCE(NEW.memory_type, '') NOT IN ('session', 'ultra', 'decision', 'solution', 'knowledge')),
+        category_architecture = category_architecture + (NEW.category = 'architecture'),
+        category_problem = category_problem + (NEW.category = 'problem'),
+        category_solution = category_solution + (NEW.category = 'solution'),
+        category_decision = category_decision + (NEW.category = 'decision'),
+        category_knowledge = category_knowledge + (NEW.category = 'knowledge'),
+        category_experience = category_experience + (NEW.category = 'experience'),
+        category_other = category_other + (COALESCE(NEW.category, '') NOT IN ('architecture', 'problem', 'solution', 'decision', 'knowledge', 'experience')),
+        importance_1 = importance_1 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 1),
+        importance_2 = importance_2 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 2),
+        importance_3 = importance_3 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 3),
+        importance_4 = importance_4 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 4),
+        importance_5 = importance_5 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 5),
+        importance_6 = importance_6 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 6),
+        importance_7 = importance_7 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 7),
+        importance_8 = importance_8 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 8),
+        importance_9 = importance_9 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 9),
+        importance_10 = importance_10 + (MIN(MAX(COALESCE(NEW.importance, 5), 1), 10) = 10),
+        importance_sum = importance_sum + MIN(MAX(COALESCE(NEW.importance, 5), 1), 10),
+        updated_at = datetime('now')
+    WHERE project_id = NEW.project_id;
+    UPDATE memory_stats_summary SET last_memory_created_at = (
+        SELECT MAX(created_at) FROM project_memories WHERE project_id = OLD.project_id
+    )
+    WHERE project_id = OLD.project_id;
+    UPDATE memory_stats_summary SET last_memory_created_at = (
+        SELECT MAX(created_at) FROM project_memories WHERE project_id = NEW.project_id
+    )
+    WHERE project_id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_stats_delete AFTER DELETE ON project_memories
+BEGIN
+    INSERT INTO memory_stats_summary (project_id) VALUES (OLD.project_id)
+    ON CONFLICT(project_id) DO NOTHING;
+    UPDATE memory_stats_summary SET
+        total = total - 1,
+        type_session = type_session - (OLD.memory_type = 'session'),
+        type_ultra = type_ultra - (OLD.memory_type = 'ultra'),
+        type_decision = type_decision - (OLD.memory_type = 'decision'),
+        type_solution = type_solution - (OLD.memory_type = 'solution'),
+        type_knowledge = type_knowledge - (OLD.memory_type = 'knowledge'),
+        type_other = type_other - (COALESCE(OLD.memory_type, '') NOT IN ('session', 'ultra', 'decision', 'solution', 'knowledge')),
+        category_architecture = category_architecture - (OLD.category = 'architecture'),
+        category_problem = category_problem - (OLD.category = 'problem'),
+        category_solution = category_solution - (OLD.category = 'solution'),
+        category_decision = category_decision - (OLD.category = 'decision'),
+        category_knowledge = category_knowledge - (OLD.category = 'knowledge'),
+        category_experience = category_experience - (OLD.category = 'experience'),
+        category_other = category_other - (COALESCE(OLD.category, '') NOT IN ('architecture', 'problem', 'solution', 'decision', 'knowledge', 'experience')),
+        importance_1 = importance_1 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 1),
+        importance_2 = importance_2 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 2),
+        importance_3 = importance_3 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 3),
+        importance_4 = importance_4 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 4),
+        importance_5 = importance_5 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 5),
+        importance_6 = importance_6 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 6),
+        importance_7 = importance_7 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 7),
+        importance_8 = importance_8 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 8),
+        importance_9 = importance_9 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 9),
+        importance_10 = importance_10 - (MIN(MAX(COALESCE(OLD.importance, 5), 1), 10) = 10),
+        importance_sum = importance_sum - MIN(MAX(COALESCE(OLD.importance, 5), 1), 10),
+        updated_at = datetime('now')
+    WHERE project_id = OLD.project_id;
+    UPDATE memory_stats_summary SET last_memory_created_at = (
+        SELECT MAX(created_at) FROM project_memories WHERE project_id = OLD.project_id
+    )
+    WHERE project_id = OLD.project_id;
+END;
+
+-- 回填已有记忆（已存在的项目行按原始数据覆盖）
+INSERT OR REPLACE INTO memory_stats_summary (
+    project_id, total, type_session, type_ultra, type_decision,
+    type_solution, type_knowledge, type_other, category_architecture,
+    category_problem, category_solution, category_decision,
+    category_knowledge, category_experience, category_other, importance_1,
+    importance_2, importance_3, importance_4, importance_5, importance_6,
+    importance_7, importance_8, importance_9, importance_10, importance_sum,
+    last_memory_created_at, updated_at
+)
+SELECT
+    pm.project_id,
+    COUNT(*),
+    SUM((pm.memory_type = 'session')),
+    SUM((pm.memory_type = 'ultra')),
+    SUM((pm.memory_type = 'decision')),
+    SUM((pm.memory_type = 'solution')),
+    SUM((pm.memory_type = 'knowledge')),
+    SUM((COALESCE(pm.memory_type, '') NOT IN ('session', 'ultra', 'decision', 'solution', 'knowledge'))),
+    SUM((pm.category = 'architecture')),
+    SUM((pm.category = 'problem')),
+    SUM((pm.category = 'solution')),
+    SUM((pm.category = 'decision')),
+    SUM((pm.category = 'knowledge')),
+    SUM((pm.category = 'experience')),
+    SUM((COALESCE(pm.category, '') NOT IN ('architecture', 'problem', 'solution', 'decision', 'knowledge', 'experience'))),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 1)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 2)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 3)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 4)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 5)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 6)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 7)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 8)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 9)),
+    SUM((MIN(MAX(COALESCE(pm.importance, 5), 1), 10) = 10)),
+    SUM(MIN(MAX(COALESCE(pm.importance, 5), 1), 10)),
+    MAX(pm.created_at),
+    datetime('now')
+FROM project_memories pm
+GROUP BY pm.project_id;
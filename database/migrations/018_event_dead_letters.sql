@@ -0,0 +1,24 @@
+-- ============================================================================
+-- Migration 018: 事件死信表
+-- ============================================================================
+-- 创建时间: 2026-10-18
+-- 说明: EventListener 处理事件失败且重试用尽后，先把事件登记到死信表，
+--       再推进 event_consumer_offsets 高水位线；失败事件不会被静默跳过
+-- 依赖: 004_add_events_tables.sql, 008_event_consumer_offsets.sql
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS event_dead_letters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    consumer_id TEXT NOT NULL,                  -- 消费者ID（如 listener:TASKFLOW）
+    event_rowid INTEGER NOT NULL,               -- project_events.rowid
+    event_id TEXT NOT NULL,                     -- project_events.id
+    error TEXT,                                 -- 最后一次失败原因
+    attempts INTEGER NOT NULL DEFAULT 1,        -- 处理次数
+    failed_at TEXT NOT NULL DEFAULT (datetime('now')),
+    UNIQUE (consumer_id, event_rowid)
+);
+
+CREATE INDEX IF NOT EXISTS idx_event_dead_letters_consumer
+    ON event_dead_letters(consumer_id, id);
+
+-- Migration完成
@@ -62,6 +62,9 @@ CREATE TABLE IF NOT EXISTS event_stats (
     events_today INTEGER DEFAULT 0,
     events_this_week INTEGER DEFAULT 0,
     events_this_month INTEGER DEFAULT 0,
+    stats_day TEXT,                            -- events_today 所属日期 YYYY-MM-DD
+    stats_week TEXT,                           -- events_this_week 所属ISO周 YYYY-Www
+    stats_month TEXT,                          -- events_this_month 所属月份 YYYY-MM
     
     -- 按类型统计
     task_events INTEGER DEFAULT 0,
@@ -85,10 +88,14 @@ CREATE TABLE IF NOT EXISTS event_stats (
 -- ============================================================================
 -- 索引优化
 -- ============================================================================
-CREATE INDEX IF NOT EXISTS idx_events_project ON project_events(project_id);
 CREATE INDEX IF NOT EXISTS idx_events_type ON project_events(event_type);
 CREATE INDEX IF NOT EXISTS idx_events_category ON project_events(event_category);
-CREATE INDEX IF NOT EXISTS idx_events_occurred ON project_events(occurred_at DESC);
+CREATE INDEX IF NOT EXISTS idx_events_occurred_id ON project_events(occurred_at DESC, id DESC);
+-- 复合索引：项目 + 过滤条件 + 时间排序（游标分页）
+CREATE INDEX IF NOT EXISTS idx_events_project_occurred ON project_events(project_id, occurred_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_project_category_occurred ON project_events(project_id, event_category, occurred_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_project_type_occurred ON project_events(project_id, event_type, occurred_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_project_severity_occurred ON project_events(project_id, severity, occurred_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_events_severity ON project_events(severity);
 CREATE INDEX IF NOT EXISTS idx_events_entity ON project_events(related_entity_type, related_entity_id);
 CREATE INDEX IF NOT EXISTS idx_events_actor ON project_events(actor);
@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+对话关键词分类器（Conversation Classifier）
+
+对话自动记录需要判断每轮对话是否包含决策/方案/知识，并提炼关键行。
+所有关键词集合（决策/解决方案/知识/强制记录/精炼/重要性）构建时编译为
+一个多模式匹配器，每轮对话只扫描一遍即得到：
+
+- 各类别得分与命中位置（spans）
+- 记忆类型、分类、重要性与关键词（与原逐词子串匹配的判定规则一致）
+- 精炼内容（AI回复中包含关键信息的行）
+
+批量接口 classify_turns() 在轮次较多时使用进程池并行。
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterator
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_right
+import atexit
+import os
+import re
+import threading
+
+
+# ============================================================================
+# 关键词集合
+# ============================================================================
+
+LABEL_DECISION = "decision"
+LABEL_SOLUTION = "solution"
+LABEL_KNOWLEDGE = "knowledge"
+LABEL_FORCE = "force"
+LABEL_REFINE = "refine"      # 精炼时保留包含这些词的行
+LABEL_BOOST = "boost"        # 关键词中包含这些词时提升重要性
+
+KEYWORD_SETS: Dict[str, Tuple[str, ...]] = {
+    LABEL_DECISION: (
+        "决定", "采用", "选择", "使用", "adr", "架构决策",
+        "决策", "方案确定", "最终方案", "技术选型"
+    ),
+    LABEL_SOLUTION: (
+        "解决", "修复", "bug", "问题", "方案", "解决方法",
+        "fix", "解决了", "搞定", "已修复"
+    ),
+    LABEL_KNOWLEDGE: (
+        "学习", "笔记", "总结", "经验", "最佳实践",
+        "记住", "重要", "注意", "技巧", "规范"
+    ),
+    LABEL_FORCE: ("请记住", "需要记录", "写入记忆", "保存到记忆空间"),
+    LABEL_REFINE: ("决定", "采用", "解决", "方案", "重要", "注意"),
+    LABEL_BOOST: ("重要", "关键", "核心", "critical"),
+}
+
+# 类别 -> (基础重要性, 分类)
+_BASE_IMPORTANCE = {LABEL_DECISION: 8, LABEL_SOLUTION: 7, LABEL_KNOWLEDGE: 5}
+_CATEGORY = {LABEL_DECISION: "decision", LABEL_SOLUTION: "solution", LABEL_KNOWLEDGE: "knowledge"}
+
+MAX_KEYWORDS = 5         # 返回的关键词数量上限
+MAX_REFINED_LINES = 10   # 精炼内容最多保留的行数
+REFINE_FALLBACK_CHARS = 300
+
+_NEWLINE_RE = re.compile("\n")
+
+
+# ============================================================================
+# 多模式匹配
+# ============================================================================
+
+class KeywordAutomaton:
+    """
+    多模式关键词匹配器（一次扫描返回全部重叠命中，结果与 Aho-Corasick 一致）
+
+    纯 Python 逐字符驱动的 Aho-Corasick 比 C 实现的子串查找慢数倍，
+    因此扫描交给编译后的正则（全部关键词按长度降序组成的单个交替式，
+    由 re 引擎一次遍历文本）；正则只返回不重叠的最左最长命中，
+    被跳过的重叠命中由构建时预计算的两张表补齐：
+    - contained: 关键词内部出现的其他关键词（如 "架构决策" 中的 "决策"）
+    - straddle:  从关键词内部开始、延伸到其后的关键词（后缀与前缀重叠）
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Sequence[str]]):
+        """
+        Args:
+            keyword_sets: {标签: 关键词列表}；关键词匹配前统一转小写
+        """
+        self.keyword_sets = {label: tuple(words) for label, words in keyword_sets.items()}
+
+        labels: Dict[str, set] = {}
+        for label, words in self.keyword_sets.items():
+            for word in words:
+                if word:
+                    labels.setdefault(word.lower(), set()).add(label)
+        self.labels: Dict[str, frozenset] = {word: frozenset(owners) for word, owners in labels.items()}
+
+        words = sorted(self.labels, key=lambda word: (-len(word), word))
+        self._pattern = re.compile("|".join(re.escape(word) for word in words)) if words else None
+
+        self._contained: Dict[str, Tuple[Tuple[int, str], ...]] = {}
+        self._straddle: Dict[str, Tuple[Tuple[int, str], ...]] = {}
+        for word in words:
+            self._contained[word] = tuple(
+                (offset, other)
+                for other in words
+                for offset in self._occurrences(word, other)
+            )
+            self._straddle[word] = tuple(
+                (offset, other)
+                for other in words
+                for offset in range(1, len(word))
+                if len(other) > len(word) - offset and other.startswith(word[offset:])
+            )
+
+    @staticmethod
+    def _occurrences(text: str, word: str) -> List[int]:
+        offsets = []
+        start = text.find(word)
+        while start != -1:
+            offsets.append(start)
+            start = text.find(word, start + 1)
+        return offsets
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        扫描文本（调用方负责转小写）
+
+        Yields:
+            (start, end, keyword)，重叠命中全部返回，每个 (位置, 关键词) 只返回一次
+        """
+        if self._pattern is None:
+            return
+        seen = set()
+        for match in self._pattern.finditer(text):
+            stack = [(match.start(), match.group())]
+            while stack:
+                start, word = stack.pop()
+                for offset, other in self._contained[word]:
+                    key = (start + offset, other)
+                    if key not in seen:
+                        seen.add(key)
+                        yield start + offset, start + offset + len(other), other
+                for offset, other in self._straddle[word]:
+                    position = start + offset
+                    if (position, other) not in seen and text.startswith(other, position):
+                        stack.append((position, other))
+
+
+# ============================================================================
+# 分类结果
+# ============================================================================
+
+@dataclass
+class ConversationClassification:
+    """单轮对话分类结果"""
+    should_record: bool
+    memory_type: str
+    category: str
+    importance: int
+    keywords: List[str]
+    scores: Dict[str, int]
+    refined_content: str
+    spans: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "should_record": self.should_record,
+            "memory_type": self.memory_type,
+            "category": self.category,
+            "importance": self.importance,
+            "keywords": self.keywords,
+            "scores": self.scores,
+            "refined_content": self.refined_content,
+            "spans": self.spans
+        }
+
+
+class ConversationClassifier:
+    """对话分类器：一次扫描得到类别得分、命中位置与精炼内容"""
+
+    def __init__(self, keyword_sets: Optional[Dict[str, Sequence[str]]] = None):
+        self.automaton = KeywordAutomaton(keyword_sets or KEYWORD_SETS)
+
+    def classify(
+        self,
+        user_input: str,
+        ai_response: str,
+        include_spans: bool = False
+    ) -> ConversationClassification:
+        """
+        分类单轮对话
+
+        Args:
+            user_input: 用户输入
+            ai_response: AI回复
+            include_spans: 是否返回命中位置（source 为 user/ai，偏移基于小写文本）
+        """
+        automaton = self.automaton
+        found: Dict[str, set] = {}
+        scores = {label: 0 for label in automaton.keyword_sets}
+        spans: List[Dict[str, Any]] = []
+        refine_lines = set()
+
+        response_lower = ai_response.lower()
+        newlines = [match.start() for match in _NEWLINE_RE.finditer(response_lower)]
+
+        for source, text in (("user", user_input.lower()), ("ai", response_lower)):
+            for start, end, word in automaton.iter_matches(text):
+                labels = automaton.labels[word]
+                for label in labels:
+                    found.setdefault(label, set()).add(word)
+                    scores[label] += 1
+                if source == "ai" and LABEL_REFINE in labels:
+                    refine_lines.add(bisect_right(newlines, start))
+                if include_spans:
+                    spans.append({
+                        "source": source, "start": start, "end": end,
+                        "keyword": word, "labels": sorted(labels)
+                    })
+
+        should_record, memory_type, keywords = self._decide(found)
+        category = self._category(memory_type, keywords)
+        importance = self._importance(memory_type, keywords)
+        refined = self._refine(ai_response, refine_lines)
+
+        return ConversationClassification(
+            should_record=should_record,
+            memory_type=memory_type,
+            category=category,
+            importance=importance,
+            keywords=keywords,
+            scores=scores,
+            refined_content=refined,
+            spans=spans
+        )
+
+    def refine(self, text: str) -> str:
+        """单独精炼一段文本（保留包含关键信息的行）"""
+        lowered = text.lower()
+        newlines = [match.start() for match in _NEWLINE_RE.finditer(lowered)]
+        lines = {
+            bisect_right(newlines, start)
+            for start, _, word in self.automaton.iter_matches(lowered)
+            if LABEL_REFINE in self.automaton.labels[word]
+        }
+        return self._refine(text, lines)
+
+    # ------------------------------------------------------------------
+    # 判定规则
+    # ------------------------------------------------------------------
+
+    def _ordered(self, found: Dict[str, set], label: str) -> List[str]:
+        """命中的关键词按关键词表顺序排列"""
+        hits = found.get(label)
+        if not hits:
+            return []
+        return [word for word in self.automaton.keyword_sets.get(label, ()) if word.lower() in hits]
+
+    def _decide(self, found: Dict[str, set]) -> Tuple[bool, str, List[str]]:
+        if found.get(LABEL_FORCE):
+            return True, LABEL_KNOWLEDGE, ["强制记录"]
+
+        decision = self._ordered(found, LABEL_DECISION)
+        solution = self._ordered(found, LABEL_SOLUTION)
+        knowledge = self._ordered(found, LABEL_KNOWLEDGE)
+        keywords = decision + solution + knowledge
+
+        if decision:
+            memory_type = LABEL_DECISION
+        elif solution:
+            memory_type = LABEL_SOLUTION
+        else:
+            memory_type = LABEL_KNOWLEDGE
+
+        # 至少2个关键词，或命中任一决策/解决方案关键词
+        should_record = len(keywords) >= 2 or bool(decision) or bool(solution)
+        return should_record, memory_type, keywords[:MAX_KEYWORDS]
+
+    @staticmethod
+    def _category(memory_type: str, keywords: List[str]) -> str:
+        if memory_type == LABEL_DECISION or "决策" in keywords or "adr" in keywords:
+            return _CATEGORY[LABEL_DECISION]
+        if memory_type == LABEL_SOLUTION or "解决" in keywords or "fix" in keywords:
+            return _CATEGORY[LABEL_SOLUTION]
+        return _CATEGORY[LABEL_KNOWLEDGE]
+
+    def _importance(self, memory_type: str, keywords: List[str]) -> int:
+        base = _BASE_IMPORTANCE.get(memory_type, 5)
+        boost_words = self.automaton.keyword_sets.get(LABEL_BOOST, ())
+        boost = 2 if any(word in keywords for word in boost_words) else 0
+        return min(base + boost, 10)
+
+    @staticmethod
+    def _refine(text: str, line_indexes) -> str:
+        """保留包含精炼关键词的行（最多 MAX_REFINED_LINES 行），没有时取开头"""
+        if not line_indexes:
+            return text[:REFINE_FALLBACK_CHARS]
+        lines = text.split("\n")
+        kept = [lines[index].strip() for index in sorted(line_indexes)[:MAX_REFINED_LINES]]
+        return "\n".join(kept)
+
+
+# ============================================================================
+# 默认实例与批量接口
+# ============================================================================
+
+_default_classifier: Optional[ConversationClassifier] = None
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+PARALLEL_THRESHOLD = 1000  # 少于该轮次时在当前进程内分类（进程间传输开销更大）
+
+
+def get_default_classifier() -> ConversationClassifier:
+    """默认关键词集合的分类器（每进程构建一次）"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = ConversationClassifier()
+    return _default_classifier
+
+
+def _classify_chunk(turns: List[Tuple[str, str]], include_spans: bool) -> List[ConversationClassification]:
+    classifier = get_default_classifier()
+    return [classifier.classify(user_input, ai_response, include_spans) for user_input, ai_response in turns]
+
+
+def _get_process_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+            atexit.register(shutdown_process_pool)
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """关闭批量分类进程池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def classify_turns(
+    turns: Sequence[Tuple[str, str]],
+    include_spans: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: int = 512,
+    parallel_threshold: int = PARALLEL_THRESHOLD
+) -> List[ConversationClassification]:
+    """
+    批量分类多轮对话
+
+    Args:
+        turns: [(user_input, ai_response), ...]
+        include_spans: 是否返回命中位置
+        workers: 进程数（默认CPU核数，仅首次创建进程池时生效）
+        chunk_size: 每个任务包含的轮次数
+        parallel_threshold: 轮次数达到该值时使用进程池
+
+    Returns:
+        与输入顺序一致的分类结果
+    """
+    turns = list(turns)
+    if len(turns) < parallel_threshold or (workers or os.cpu_count() or 1) <= 1:
+        return _classify_chunk(turns, include_spans)
+
+    pool = _get_process_pool(workers)
+    chunks = [turns[i:i + chunk_size] for i in range(0, len(turns), chunk_size)]
+    results: List[ConversationClassification] = []
+    for chunk_result in pool.map(_classify_chunk, chunks, [include_spans] * len(chunks)):
+        results.extend(chunk_result)
+    return results
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite连接池（Connection Pool）
+
+功能：
+1. 按数据库文件共享连接池，所有服务复用同一组连接
+2. WAL日志模式 + 可调 synchronous 级别
+3. 预编译语句缓存（sqlite3 cached_statements）
+4. busy_timeout 处理写锁竞争
+5. 同线程嵌套使用时复用同一连接（内层使用SAVEPOINT）
+6. 提交后回调（call_after_commit）
+"""
+
+from typing import Dict, Any, Optional, List, Callable
+from pathlib import Path
+from contextlib import contextmanager
+import logging
+import os
+import sqlite3
+import threading
+
+
+# 默认连接参数
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_JOURNAL_MODE = "WAL"
+DEFAULT_SYNCHRONOUS = "NORMAL"
+DEFAULT_CACHED_STATEMENTS = 256
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """在超时时间内无法获取连接"""
+
+
+class ConnectionPool:
+    """
+    SQLite有界连接池
+
+    - 连接在最外层 `connection()` 退出时归还（提交或回滚）
+    - 同一线程嵌套调用 `connection()` 复用同一连接，内层以SAVEPOINT隔离
+    - 超过 max_connections 时等待空闲连接，超时抛出 PoolTimeoutError
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        journal_mode: str = DEFAULT_JOURNAL_MODE,
+        synchronous: str = DEFAULT_SYNCHRONOUS,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+        acquire_timeout: Optional[float] = 30.0
+    ):
+        """
+        初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            max_connections: 最大连接数
+            busy_timeout_ms: 写锁等待时间（毫秒）
+            journal_mode: 日志模式（WAL/DELETE/...）
+            synchronous: 同步级别（OFF/NORMAL/FULL）
+            cached_statements: 每个连接缓存的预编译语句数量
+            acquire_timeout: 获取连接的最长等待时间（秒），None表示无限等待
+        """
+        self.db_path = Path(db_path)
+        self.max_connections = max_connections
+        self.busy_timeout_ms = busy_timeout_ms
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        self.acquire_timeout = acquire_timeout
+
+        self._is_memory = str(db_path) == ":memory:"
+        if not self._is_memory:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._closed = False
+
+        # 统计信息
+        self._created = 0
+        self._acquired = 0
+        self._waited = 0
+
+    # ========================================================================
+    # 连接管理
+    # ========================================================================
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """创建并配置新连接"""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if not self._is_memory and self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute("PRAGMA foreign_keys = OFF")
+        self._created += 1
+        return conn
+
+    def _reset_after_fork(self) -> None:
+        """fork后的子进程不能复用父进程的连接"""
+        if os.getpid() == self._pid:
+            return
+        with self._lock:
+            if os.getpid() == self._pid:
+                return
+            self._idle = []
+            self._all = []
+            self._local = threading.local()
+            self._pid = os.getpid()
+
+    def _acquire(self) -> sqlite3.Connection:
+        """从池中取出一个连接"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"连接池已关闭: {self.db_path}")
+
+            waited = False
+            while not self._idle and len(self._all) >= self.max_connections:
+                waited = True
+                if not self._lock.wait(timeout=self.acquire_timeout):
+                    raise PoolTimeoutError(
+                        f"获取数据库连接超时({self.acquire_timeout}s): {self.db_path}"
+                    )
+
+            if waited:
+                self._waited += 1
+            self._acquired += 1
+
+            if self._idle:
+                return self._idle.pop()
+
+            conn = self._create_connection()
+            self._all.append(conn)
+            return conn
+
+    def _release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """归还连接到池中"""
+        with self._lock:
+            if discard or self._closed:
+                if conn in self._all:
+                    self._all.remove(conn)
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append(conn)
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """获取连接（上下文管理器）
+
+        最外层退出时提交事务并归还连接；异常时回滚。
+        同线程内的嵌套调用复用外层连接，并以SAVEPOINT隔离内层失败。
+
+        Yields:
+            sqlite3.Connection: 数据库连接
+        """
+        self._reset_after_fork()
+        local = self._local
+        conn = getattr(local, "conn", None)
+
+        if conn is not None:
+            # 嵌套调用：复用当前线程连接
+            local.depth += 1
+            savepoint = f"sp_{local.depth}"
+            pending = len(local.after_commit)
+            if not conn.in_transaction:
+                # 外层尚未写入时先显式开启事务，否则最外层SAVEPOINT的RELEASE会直接提交
+                conn.execute("BEGIN")
+            conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                yield conn
+                conn.execute(f"RELEASE {savepoint}")
+            except Exception:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                # 回滚的SAVEPOINT内登记的提交后回调一并丢弃
+                del local.after_commit[pending:]
+                raise
+            finally:
+                local.depth -= 1
+            return
+
+        conn = self._acquire()
+        local.conn = conn
+        local.depth = 0
+        local.after_commit = []
+        discard = False
+        committed = False
+        try:
+            yield conn
+            conn.commit()
+            committed = True
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+            raise
+        finally:
+            callbacks = local.after_commit
+            local.conn = None
+            local.after_commit = []
+            self._release(conn, discard=discard)
+            if committed:
+                self._run_callbacks(callbacks)
+
+    def call_after_commit(self, callback: Callable[[], None]) -> None:
+        """登记提交后回调
+
+        当前线程处于 `connection()` 事务中时，回调在最外层提交成功后执行
+        （回滚则丢弃）；否则立即执行。
+
+        Args:
+            callback: 无参回调
+        """
+        if getattr(self._local, "conn", None) is not None:
+            self._local.after_commit.append(callback)
+        else:
+            self._run_callbacks([callback])
+
+    @staticmethod
+    def _run_callbacks(callbacks: List[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"After-commit callback failed: {e}", exc_info=True)
+
+    def close(self) -> None:
+        """关闭池中所有空闲连接，并拒绝后续获取"""
+        with self._lock:
+            self._closed = True
+            for conn in self._idle:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                if conn in self._all:
+                    self._all.remove(conn)
+            self._idle = []
+            self._lock.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        with self._lock:
+            return {
+                "db_path": str(self.db_path),
+                "max_connections": self.max_connections,
+                "open_connections": len(self._all),
+                "idle_connections": len(self._idle),
+                "in_use_connections": len(self._all) - len(self._idle),
+                "created_total": self._created,
+                "acquired_total": self._acquired,
+                "waited_total": self._waited,
+                "journal_mode": self.journal_mode,
+                "synchronous": self.synchronous
+            }
+
+
+# ============================================================================
+# 全局连接池注册表
+# ============================================================================
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_path: str) -> str:
+    """同一数据库文件的不同写法映射到同一个键"""
+    if str(db_path) == ":memory:":
+        return ":memory:"
+    return str(Path(db_path).resolve())
+
+
+def get_connection_pool(db_path: str, **options: Any) -> ConnectionPool:
+    """
+    获取数据库文件对应的共享连接池（首次调用时创建）
+
+    Args:
+        db_path: 数据库文件路径
+        **options: 首次创建时传给 ConnectionPool 的参数
+
+    Returns:
+        ConnectionPool实例
+    """
+    key = _pool_key(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(db_path, **options)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    """关闭所有共享连接池（进程退出或测试清理时使用）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+JSON文档存储（Document Store）
+
+取代“整体读取 JSON 文件 → 修改 → 整体写回”的数据文件：
+1. 文档按 (集合, 文档ID) 存放在 SQLite 的 documents 表中，一次写入只涉及一行
+2. update() 在 BEGIN IMMEDIATE 事务内读改写，跨线程/跨进程不丢更新
+3. append() 按集合计数器生成ID（如 event-{n}），按插入序号排序，保留策略在同一事务内裁剪
+4. ensure_index() 为 JSON 字段建立表达式索引，find()/list(where=...) 走索引
+5. import_once() 一次性导入旧 JSON 文件（按来源登记，重复调用不会重复导入）
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+import copy
+import json
+import re
+import time
+
+from .db_pool import ConnectionPool, get_connection_pool
+
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+_NUMERIC_SUFFIX = re.compile(r"(\d+)$")
+
+
+# ============================================================================
+# 存储结构
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        collection TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        body TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        UNIQUE (collection, doc_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_documents_collection_seq ON documents(collection, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_documents_collection_created ON documents(collection, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS document_collections (
+        name TEXT PRIMARY KEY,
+        id_counter INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS document_imports (
+        source TEXT PRIMARY KEY,
+        documents INTEGER NOT NULL DEFAULT 0,
+        imported_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """
+)
+
+
+def _dumps(body: Any) -> str:
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_path(field: str) -> str:
+    """字段名（支持 a.b 嵌套）转 JSON 路径；只允许标识符，路径直接拼入SQL"""
+    if not _FIELD_PATTERN.match(field):
+        raise ValueError(f"非法的文档字段名: {field}")
+    return f"$.{field}"
+
+
+class Collection:
+    """文档集合"""
+
+    def __init__(
+        self,
+        store: "DocumentStore",
+        name: str,
+        id_template: str = "{n}",
+        max_documents: Optional[int] = None,
+        max_age_days: Optional[float] = None
+    ):
+        """
+        Args:
+            store: 所属文档存储
+            name: 集合名
+            id_template: append() 生成文档ID的模板（n 为集合计数器，如 "event-{n}"、"session-{n:03d}"）
+            max_documents: 保留的最多文档数（超出时删除最早插入的）
+            max_age_days: 保留天数（按创建时间）
+        """
+        self.store = store
+        self.name = name
+        self.id_template = id_template
+        self.max_documents = max_documents
+        self.max_age_days = max_age_days
+
+    # ========================================================================
+    # 读取
+    # ========================================================================
+
+    def get(self, doc_id: str, default: Any = None) -> Any:
+        """获取文档，不存在时返回 default"""
+        with self.store._read() as conn:
+            row = conn.execute(
+                "SELECT body FROM documents WHERE collection = ? AND doc_id = ?",
+                (self.name, doc_id)
+            ).fetchone()
+        return json.loads(row["body"]) if row else default
+
+    def list(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        newest_first: bool = True,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Any]:
+        """
+        按插入顺序列出文档
+
+        Args:
+            limit: 最多返回条数（None 表示全部）
+            offset: 跳过条数
+            newest_first: 是否最新在前
+            where: 字段等值条件（字段需 ensure_index() 才走索引）
+        """
+        clause, params = self._where(where)
+        order = "DESC" if newest_first else "ASC"
+        sql = (
+            f"SELECT body FROM documents WHERE collection = ?{clause} "
+            f"ORDER BY seq {order} LIMIT ? OFFSET ?"
+        )
+        with self.store._read() as conn:
+            rows = conn.execute(
+                sql, (self.name, *params, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [json.loads(row["body"]) for row in rows]
+
+    def find(self, **equals: Any) -> List[Any]:
+        """按字段等值查找（最新在前）"""
+        return self.list(where=equals)
+
+    def count(self, where: Optional[Dict[str, Any]] = None) -> int:
+        """文档数"""
+        clause, params = self._where(where)
+        with self.store._read() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*) AS n FROM documents WHERE collection = ?{clause}",
+                (self.name, *params)
+            ).fetchone()
+        return row["n"]
+
+    def _where(self, where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        clause = ""
+        params: List[Any] = []
+        for field, value in (where or {}).items():
+            # 与 ensure_index() 的表达式逐字一致，才能命中表达式索引
+            clause += f" AND json_extract(body, '{_json_path(field)}') = ?"
+            params.append(value)
+        return clause, params
+
+    # ========================================================================
+    # 写入
+    # ========================================================================
+
+    def put(self, doc_id: str, body: Any) -> Any:
+        """写入（覆盖）整个文档；已存在的文档保持原插入顺序"""
+        now = time.time()
+        with self.store._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO documents (collection, doc_id, body, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(collection, doc_id) DO UPDATE SET
+                    body = excluded.body,
+                    updated_at = excluded.updated_at
+                """,
+                (self.name, doc_id, _dumps(body), now, now)
+            )
+            self._raise_counter(conn, doc_id)
+        return body
+
+    def update(self, doc_id: str, mutate: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        原子读改写单个文档
+
+        Args:
+            doc_id: 文档ID
+            mutate: 接收当前文档（不存在时为 default 的副本），返回新文档；
+                    返回 None 表示已就地修改
+            default: 文档不存在时的初始值
+
+        Returns:
+            写入后的文档
+        """
+        with self.store._write() as conn:
+            row = conn.execute(
+                "SELECT body FROM documents WHERE collection = ? AND doc_id = ?",
+                (self.name, doc_id)
+            ).fetchone()
+            current = json.loads(row["body"]) if row else copy.deepcopy(default)
+            result = mutate(current)
+            body = current if result is None else result
+            self.put(doc_id, body)
+        return body
+
+    def patch(self, doc_id: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        合并更新文档（RFC 7396 JSON Merge Patch：嵌套对象逐层合并，值为 None 的键被删除）
+
+        合并在SQL内完成（调用方无需先读取文档），文档不存在时以 changes 创建。返回合并后的文档。
+        """
+        now = time.time()
+        patch = _dumps(changes)
+        with self.store._write() as conn:
+            conn.execute(
+                """
+                INSERT INTO documents (collection, doc_id, body, created_at, updated_at)
+                VALUES (?, ?, json_patch('{}', ?), ?, ?)
+                ON CONFLICT(collection, doc_id) DO UPDATE SET
+                    body = json_patch(body, ?),
+                    updated_at = excluded.updated_at
+                """,
+                (self.name, doc_id, patch, now, now, patch)
+            )
+            row = conn.execute(
+                "SELECT body FROM documents WHERE collection = ? AND doc_id = ?",
+                (self.name, doc_id)
+            ).fetchone()
+        return json.loads(row["body"])
+
+    def append(self, body: Dict[str, Any], id_field: Optional[str] = "id", doc_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        追加文档（ID由集合计数器生成，写入 body[id_field]），并执行保留策略
+
+        Args:
+            body: 文档内容
+            id_field: 写入生成ID的字段名（None 表示不写入文档）
+            doc_id: 指定ID（导入旧数据时使用；计数器随之推进，之后生成的ID不会与其冲突）
+
+        Returns:
+            写入的文档
+        """
+        now = time.time()
+        with self.store._write() as conn:
+            if doc_id is None:
+                doc_id = self.id_template.format(n=self._next_counter(conn))
+            else:
+                self._raise_counter(conn, doc_id)
+            body = {id_field: doc_id, **body, id_field: doc_id} if id_field else dict(body)
+            conn.execute(
+                """
+                INSERT INTO documents (collection, doc_id, body, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (self.name, doc_id, _dumps(body), now, now)
+            )
+            self._apply_retention(conn, now)
+        return body
+
+    def delete(self, doc_id: str) -> bool:
+        """删除文档"""
+        with self.store._write() as conn:
+            cursor = conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND doc_id = ?",
+                (self.name, doc_id)
+            )
+        return cursor.rowcount > 0
+
+    def clear(self) -> int:
+        """删除集合内全部文档（计数器保留，之后生成的ID继续递增）"""
+        with self.store._write() as conn:
+            cursor = conn.execute("DELETE FROM documents WHERE collection = ?", (self.name,))
+        return cursor.rowcount
+
+    def reserve_ids(self, doc_ids) -> None:
+        """推进计数器，使之后 append() 生成的ID不与这些（以数字结尾的）ID冲突"""
+        with self.store._write() as conn:
+            for doc_id in doc_ids:
+                self._raise_counter(conn, doc_id)
+
+    def ensure_index(self, field: str) -> None:
+        """为字段建立表达式索引（list(where=...)/find() 使用）"""
+        path = _json_path(field)
+        index_name = "idx_documents_" + re.sub(r"\W", "_", f"{self.name}_{field}")
+        with self.store._write() as conn:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} "
+                f"ON documents(collection, json_extract(body, '{path}'))"
+            )
+
+    def trim(self) -> int:
+        """立即执行保留策略，返回删除的文档数"""
+        with self.store._write() as conn:
+            return self._apply_retention(conn, time.time())
+
+    # ========================================================================
+    # 内部
+    # ========================================================================
+
+    def _next_counter(self, conn) -> int:
+        conn.execute(
+            """
+            INSERT INTO document_collections (name, id_counter) VALUES (?, 1)
+            ON CONFLICT(name) DO UPDATE SET id_counter = id_counter + 1
+            """,
+            (self.name,)
+        )
+        return conn.execute(
+            "SELECT id_counter FROM document_collections WHERE name = ?", (self.name,)
+        ).fetchone()["id_counter"]
+
+    def _raise_counter(self, conn, doc_id: str) -> None:
+        """指定ID以数字结尾时，计数器至少推进到该数字"""
+        match = _NUMERIC_SUFFIX.search(str(doc_id))
+        if not match:
+            return
+        conn.execute(
+            """
+            INSERT INTO document_collections (name, id_counter) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET id_counter = MAX(id_counter, excluded.id_counter)
+            """,
+            (self.name, int(match.group(1)))
+        )
+
+    def _apply_retention(self, conn, now: float) -> int:
+        removed = 0
+        if self.max_documents is not None:
+            # 第 max_documents 新的文档之前的全部删除（走 (collection, seq) 索引）
+            cursor = conn.execute(
+                """
+                DELETE FROM documents WHERE collection = ? AND seq < (
+                    SELECT seq FROM documents WHERE collection = ?
+                    ORDER BY seq DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (self.name, self.name, max(self.max_documents - 1, 0))
+            )
+            removed += cursor.rowcount
+        if self.max_age_days is not None:
+            cursor = conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND created_at < ?",
+                (self.name, now - self.max_age_days * 86400)
+            )
+            removed += cursor.rowcount
+        return removed
+
+
+class DocumentStore:
+    """JSON文档存储（共享连接池）"""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        with self._pool.connection() as conn:
+            for statement in _SCHEMA_STATEMENTS:
+                conn.execute(statement)
+
+    @contextmanager
+    def _read(self):
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _write(self):
+        """写事务：最外层以 BEGIN IMMEDIATE 先取写锁，读改写期间其他写入者等待"""
+        with self._pool.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    @contextmanager
+    def transaction(self):
+        """把多次写入合并为一个事务（期间的集合操作复用同一连接）"""
+        with self._write() as conn:
+            yield conn
+
+    def collection(self, name: str, **options: Any) -> Collection:
+        """
+        获取集合句柄
+
+        Args:
+            name: 集合名
+            **options: id_template / max_documents / max_age_days，见 Collection
+        """
+        return Collection(self, name, **options)
+
+    def import_once(self, source: str, load: Callable[[], int]) -> Optional[int]:
+        """
+        一次性导入
+
+        Args:
+            source: 导入来源标识（如旧 JSON 文件名），已导入过的来源直接跳过
+            load: 执行写入并返回导入文档数的函数；与登记在同一事务内执行，失败时整体回滚
+
+        Returns:
+            导入的文档数；已导入过返回 None
+        """
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM document_imports WHERE source = ?", (source,)).fetchone():
+                return None
+            count = load()
+            conn.execute(
+                "INSERT INTO document_imports (source, documents) VALUES (?, ?)", (source, count)
+            )
+        return count
+
+    def get_imports(self) -> List[Dict[str, Any]]:
+        """已导入的来源"""
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT source, documents, imported_at FROM document_imports ORDER BY imported_at"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def create_document_store(db_path: str) -> DocumentStore:
+    """创建文档存储（同一数据库文件共享连接池）"""
+    return DocumentStore(get_connection_pool(str(db_path)))
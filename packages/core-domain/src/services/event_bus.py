@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+进程内事件总线（Event Bus）
+
+功能：
+1. EventEmitter 在事件提交后直接发布，订阅方毫秒级得到通知
+2. 按项目过滤订阅
+3. 线程安全：发布可发生在任意线程（请求线程、写后队列写线程）
+
+总线只负责"唤醒"，不保证投递：订阅方应以 EventStore.read_since 的
+rowid 游标为准读取事件，总线消息丢失时由兜底追赶补齐。
+"""
+
+from typing import List, Dict, Any, Optional, Callable
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+EventCallback = Callable[[List[Dict[str, Any]]], None]
+
+
+class EventBus:
+    """
+    进程内发布/订阅总线
+
+    回调在发布方线程中同步执行，应尽快返回（如 loop.call_soon_threadsafe）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, tuple] = {}
+        self._next_id = 0
+
+    def subscribe(self, callback: EventCallback, project_id: Optional[str] = None) -> Callable[[], None]:
+        """
+        订阅事件
+
+        Args:
+            callback: 回调，参数为本次发布中匹配的事件列表
+            project_id: 只接收该项目的事件，None表示全部
+
+        Returns:
+            取消订阅函数
+        """
+        with self._lock:
+            subscription_id = self._next_id
+            self._next_id += 1
+            self._subscribers[subscription_id] = (callback, project_id)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers.pop(subscription_id, None)
+
+        return unsubscribe
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        """
+        发布已提交的事件
+
+        Args:
+            events: 事件列表
+        """
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+
+        for callback, project_id in subscribers:
+            matched = events if project_id is None else [
+                event for event in events if event.get("project_id") == project_id
+            ]
+            if not matched:
+                continue
+            try:
+                callback(matched)
+            except Exception as e:
+                logger.error(f"Event bus subscriber failed: {e}", exc_info=True)
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅数"""
+        with self._lock:
+            return len(self._subscribers)
+
+
+# ============================================================================
+# 进程级默认总线
+# ============================================================================
+
+_default_bus = EventBus()
+
+
+def get_event_bus() -> EventBus:
+    """获取进程级默认事件总线"""
+    return _default_bus
@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+"""
+追加式事件日志（Event Journal）
+
+取代“新事件 insert(0, ...) 到 JSON 列表、ID 取 len(events)、读取方加载整个文件”的事件流文件：
+1. 每条事件分配单调递增的序号 seq（删除、保留裁剪后也不回退），ID 由序号生成
+2. 按 (日志, seq) 主键存放，另有类型索引与时间索引
+3. 游标读取：read_after(after, limit) 只读 seq > after 的新事件；latest(limit) 只读最新几条
+4. 分段：每 segment_size 条为一段，写满后轮换新段；保留策略按整段删除（max_segments / max_age_days），
+   不在每次追加时裁剪
+5. count_fields 指定的字段（如 role、category）计数在追加与删段时增减，统计只读计数表
+
+Dashboard 的架构师 / 实时脉动 / 工程师事件流见文件末尾 get_feed()。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import json
+import re
+import threading
+
+from .db_pool import ConnectionPool, get_connection_pool
+
+
+DEFAULT_SEGMENT_SIZE = 1000
+DEFAULT_MAX_SEGMENTS = 10
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+# ============================================================================
+# 存储结构
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS journals (
+        name TEXT PRIMARY KEY,
+        last_seq INTEGER NOT NULL DEFAULT 0,
+        current_segment INTEGER NOT NULL DEFAULT 1,
+        entries INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS journal_segments (
+        journal TEXT NOT NULL,
+        segment INTEGER NOT NULL,
+        first_seq INTEGER NOT NULL,
+        last_seq INTEGER NOT NULL,
+        first_ts TEXT,
+        last_ts TEXT,
+        entries INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (journal, segment)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS journal_entries (
+        journal TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        segment INTEGER NOT NULL,
+        ts TEXT NOT NULL,
+        type TEXT,
+        body TEXT NOT NULL,
+        PRIMARY KEY (journal, seq)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_journal_entries_type ON journal_entries(journal, type, seq)",
+    "CREATE INDEX IF NOT EXISTS idx_journal_entries_ts ON journal_entries(journal, ts)",
+    """
+    CREATE TABLE IF NOT EXISTS journal_counts (
+        journal TEXT NOT NULL,
+        field TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (journal, field, value)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS journal_imports (
+        journal TEXT NOT NULL,
+        source TEXT NOT NULL,
+        entries INTEGER NOT NULL DEFAULT 0,
+        imported_at TEXT NOT NULL DEFAULT (datetime('now')),
+        PRIMARY KEY (journal, source)
+    )
+    """
+)
+
+
+def _now() -> str:
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def _id_pattern(id_template: str) -> "re.Pattern[str]":
+    """ID模板（如 event-{seq}、pulse-{seq:03d}）对应的正则，用于导入时识别已占用的序号"""
+    prefix, _, rest = id_template.partition("{")
+    suffix = rest.partition("}")[2]
+    return re.compile(f"^{re.escape(prefix)}(\\d+){re.escape(suffix)}$")
+
+
+class EventJournal:
+    """追加式事件日志"""
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        name: str,
+        id_template: str = "event-{seq}",
+        id_field: str = "id",
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        max_segments: Optional[int] = DEFAULT_MAX_SEGMENTS,
+        max_age_days: Optional[float] = None,
+        count_fields: Iterable[str] = ()
+    ):
+        """
+        Args:
+            pool: 数据库连接池
+            name: 日志名
+            id_template: 事件没有ID时按序号生成（seq 为序号）
+            id_field: 事件ID字段名
+            segment_size: 每段事件数
+            max_segments: 保留的段数（含当前段，None 表示不限）
+            max_age_days: 最后一条事件早于该天数的段在轮换时删除
+            count_fields: 维护计数的事件字段
+        """
+        self._pool = pool
+        self.name = name
+        self.id_template = id_template
+        self.id_field = id_field
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.max_age_days = max_age_days
+        self.count_fields = tuple(count_fields)
+        for field in self.count_fields:
+            if not _FIELD_PATTERN.match(field):
+                raise ValueError(f"非法的计数字段名: {field}")
+        with self._pool.connection() as conn:
+            for statement in _SCHEMA_STATEMENTS:
+                conn.execute(statement)
+
+    @contextmanager
+    def _write(self):
+        """写事务：最外层以 BEGIN IMMEDIATE 先取写锁，序号分配不冲突"""
+        with self._pool.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    # ========================================================================
+    # 追加
+    # ========================================================================
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        追加事件
+
+        事件缺少ID时按 id_template 生成，缺少 timestamp 时取当前时间。
+
+        Returns:
+            写入的事件（附带 seq）
+        """
+        with self._write() as conn:
+            return self._append(conn, event)
+
+    def _append(self, conn, event: Dict[str, Any]) -> Dict[str, Any]:
+        state = self._state(conn)
+        seq = state["last_seq"] + 1
+        segment = state["current_segment"]
+        current = conn.execute(
+            "SELECT entries FROM journal_segments WHERE journal = ? AND segment = ?",
+            (self.name, segment)
+        ).fetchone()
+        if current is not None and current["entries"] >= self.segment_size:
+            segment += 1
+            self._apply_retention(conn, segment)
+
+        body = dict(event)
+        if not body.get(self.id_field):
+            body = {self.id_field: self.id_template.format(seq=seq), **body}
+        timestamp = body.setdefault("timestamp", _now())
+        ts = str(timestamp)
+
+        conn.execute(
+            """
+            INSERT INTO journal_entries (journal, seq, segment, ts, type, body)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (self.name, seq, segment, ts, body.get("type"),
+             json.dumps(body, ensure_ascii=False, separators=(",", ":")))
+        )
+        conn.execute(
+            """
+            INSERT INTO journal_segments (journal, segment, first_seq, last_seq, first_ts, last_ts, entries)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT(journal, segment) DO UPDATE SET
+                last_seq = excluded.last_seq,
+                last_ts = MAX(COALESCE(last_ts, ''), excluded.last_ts),
+                entries = entries + 1
+            """,
+            (self.name, segment, seq, seq, ts, ts)
+        )
+        conn.execute(
+            """
+            UPDATE journals SET last_seq = ?, current_segment = ?, entries = entries + 1
+            WHERE name = ?
+            """,
+            (seq, segment, self.name)
+        )
+        for field in self.count_fields:
+            value = body.get(field)
+            if value is None:
+                continue
+            conn.execute(
+                """
+                INSERT INTO journal_counts (journal, field, value, count) VALUES (?, ?, ?, 1)
+                ON CONFLICT(journal, field, value) DO UPDATE SET count = count + 1
+                """,
+                (self.name, field, str(value))
+            )
+        return {**body, "seq": seq}
+
+    def _state(self, conn) -> Dict[str, int]:
+        conn.execute(
+            "INSERT INTO journals (name) VALUES (?) ON CONFLICT(name) DO NOTHING", (self.name,)
+        )
+        return dict(conn.execute(
+            "SELECT last_seq, current_segment, entries FROM journals WHERE name = ?", (self.name,)
+        ).fetchone())
+
+    def _apply_retention(self, conn, new_segment: int) -> None:
+        """轮换到新段时按整段删除过期数据"""
+        conditions = []
+        params: List[Any] = [self.name]
+        if self.max_segments is not None:
+            conditions.append("segment <= ?")
+            params.append(new_segment - self.max_segments)
+        if self.max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).strftime(TIMESTAMP_FORMAT)
+            conditions.append("last_ts < ?")
+            params.append(cutoff)
+        if not conditions:
+            return
+        expired = conn.execute(
+            f"""
+            SELECT segment, first_seq, last_seq, entries FROM journal_segments
+            WHERE journal = ? AND ({" OR ".join(conditions)})
+            """,
+            params
+        ).fetchall()
+        for segment in expired:
+            self._drop_segment(conn, segment)
+
+    def _drop_segment(self, conn, segment) -> None:
+        seq_range = (self.name, segment["first_seq"], segment["last_seq"])
+        for field in self.count_fields:
+            rows = conn.execute(
+                f"""
+                SELECT json_extract(body, '$.{field}') AS value, COUNT(*) AS n
+                FROM journal_entries
+                WHERE journal = ? AND seq BETWEEN ? AND ? AND json_extract(body, '$.{field}') IS NOT NULL
+                GROUP BY value
+                """,
+                seq_range
+            ).fetchall()
+            for row in rows:
+                conn.execute(
+                    "UPDATE journal_counts SET count = count - ? WHERE journal = ? AND field = ? AND value = ?",
+                    (row["n"], self.name, field, str(row["value"]))
+                )
+            conn.execute(
+                "DELETE FROM journal_counts WHERE journal = ? AND field = ? AND count <= 0",
+                (self.name, field)
+            )
+        cursor = conn.execute(
+            "DELETE FROM journal_entries WHERE journal = ? AND seq BETWEEN ? AND ?", seq_range
+        )
+        conn.execute(
+            "DELETE FROM journal_segments WHERE journal = ? AND segment = ?",
+            (self.name, segment["segment"])
+        )
+        conn.execute(
+            "UPDATE journals SET entries = entries - ? WHERE name = ?",
+            (cursor.rowcount, self.name)
+        )
+
+    # ========================================================================
+    # 读取
+    # ========================================================================
+
+    @staticmethod
+    def _decode(row) -> Dict[str, Any]:
+        return {**json.loads(row["body"]), "seq": row["seq"]}
+
+    def read_after(self, after: int = 0, limit: int = DEFAULT_PAGE_SIZE, event_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """seq > after 的事件（按 seq 升序）"""
+        sql = "SELECT seq, body FROM journal_entries WHERE journal = ? AND seq > ?"
+        params: List[Any] = [self.name, after]
+        if event_type:
+            sql += " AND type = ?"
+            params.append(event_type)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+        with self._pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def latest(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        最新事件（按 seq 降序）
+
+        Args:
+            limit: 条数
+            event_type: 只取该类型（类型索引）
+            since: 只取 timestamp >= since 的事件（时间索引）
+        """
+        sql = "SELECT seq, body FROM journal_entries WHERE journal = ?"
+        params: List[Any] = [self.name]
+        if event_type:
+            sql += " AND type = ?"
+            params.append(event_type)
+        if since:
+            sql += " AND ts >= ?"
+            params.append(since)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def count(self, event_type: Optional[str] = None, since: Optional[str] = None) -> int:
+        """保留中的事件数（无条件时读 journals 行）"""
+        with self._pool.connection() as conn:
+            if not event_type and not since:
+                row = conn.execute(
+                    "SELECT entries FROM journals WHERE name = ?", (self.name,)
+                ).fetchone()
+                return row["entries"] if row else 0
+            sql = "SELECT COUNT(*) AS n FROM journal_entries WHERE journal = ?"
+            params: List[Any] = [self.name]
+            if event_type:
+                sql += " AND type = ?"
+                params.append(event_type)
+            if since:
+                sql += " AND ts >= ?"
+                params.append(since)
+            return conn.execute(sql, params).fetchone()["n"]
+
+    def get_counts(self) -> Dict[str, Dict[str, int]]:
+        """count_fields 的计数（字段 -> 取值 -> 事件数）"""
+        counts: Dict[str, Dict[str, int]] = {field: {} for field in self.count_fields}
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT field, value, count FROM journal_counts WHERE journal = ?", (self.name,)
+            ).fetchall()
+        for row in rows:
+            counts.setdefault(row["field"], {})[row["value"]] = row["count"]
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """序号、保留条数与分段信息"""
+        with self._pool.connection() as conn:
+            state = conn.execute(
+                "SELECT last_seq, current_segment, entries FROM journals WHERE name = ?", (self.name,)
+            ).fetchone()
+            segments = conn.execute(
+                """
+                SELECT segment, first_seq, last_seq, first_ts, last_ts, entries
+                FROM journal_segments WHERE journal = ? ORDER BY segment
+                """,
+                (self.name,)
+            ).fetchall()
+        return {
+            "journal": self.name,
+            "latest_seq": state["last_seq"] if state else 0,
+            "entries": state["entries"] if state else 0,
+            "oldest_seq": segments[0]["first_seq"] if segments else None,
+            "segment_size": self.segment_size,
+            "max_segments": self.max_segments,
+            "segments": [dict(segment) for segment in segments]
+        }
+
+    def page(
+        self,
+        after: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        event_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        接口分页（?after=<seq>&limit=）
+
+        不带 after 时返回最新 limit 条（最新在前）；带 after 时返回其后的事件（按序号升序），
+        客户端以 next_after 继续读取。after 早于保留范围时 truncated 为 True。
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        stats = self.get_stats()
+        if after is None:
+            return {
+                "events": self.latest(limit, event_type),
+                "total": stats["entries"],
+                "latest_seq": stats["latest_seq"]
+            }
+        events = self.read_after(after, limit + 1, event_type)
+        has_more = len(events) > limit
+        events = events[:limit]
+        oldest = stats["oldest_seq"]
+        return {
+            "events": events,
+            "total": stats["entries"],
+            "latest_seq": stats["latest_seq"],
+            "next_after": events[-1]["seq"] if events else max(after, 0),
+            "has_more": has_more,
+            "truncated": oldest is not None and after < oldest - 1
+        }
+
+    # ========================================================================
+    # 导入
+    # ========================================================================
+
+    def import_once(self, source: str, load: Callable[[], Iterable[Dict[str, Any]]]) -> Optional[int]:
+        """
+        一次性导入旧事件
+
+        导入事件保留原ID；符合 id_template 的ID所占用的序号会被跳过，之后生成的ID不会重复。
+
+        Args:
+            source: 导入来源标识，已导入过的来源直接跳过（不调用 load）
+            load: 返回旧事件（按旧到新）的函数，与登记在同一事务内执行
+
+        Returns:
+            导入条数；该来源已导入过返回 None
+        """
+        with self._write() as conn:
+            if conn.execute(
+                "SELECT 1 FROM journal_imports WHERE journal = ? AND source = ?", (self.name, source)
+            ).fetchone():
+                return None
+            pattern = _id_pattern(self.id_template)
+            reserved = 0
+            count = 0
+            for event in load():
+                self._append(conn, event)
+                match = pattern.match(str(event.get(self.id_field, "")))
+                if match:
+                    reserved = max(reserved, int(match.group(1)))
+                count += 1
+            self._state(conn)
+            conn.execute(
+                "UPDATE journals SET last_seq = MAX(last_seq, ?) WHERE name = ?", (reserved, self.name)
+            )
+            conn.execute(
+                "INSERT INTO journal_imports (journal, source, entries) VALUES (?, ?, ?)",
+                (self.name, source, count)
+            )
+        return count
+
+
+# ============================================================================
+# Dashboard 事件流（apps/dashboard/automation-data）
+# ============================================================================
+
+DASHBOARD_DATA_DIR = Path(__file__).resolve().parents[4] / "apps" / "dashboard" / "automation-data"
+
+# 与架构师文档存储同库，便于同一事务内写入
+FEED_DB_NAME = "documents.db"
+
+# 日志名 -> (旧 JSON 文件, ID模板, 计数字段)
+FEEDS: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "architect_events": ("architect_events.json", "event-{seq}", ()),
+    "realtime_pulse": ("realtime_pulse_events.json", "pulse-{seq:03d}", ("role", "category")),
+    "engineer_events": ("engineer_events.json", "eng-{seq:03d}", ()),
+}
+
+_feeds: Dict[Tuple[str, str], EventJournal] = {}
+_feeds_lock = threading.Lock()
+
+
+def _legacy_events(legacy_path: Path) -> List[Dict[str, Any]]:
+    """旧 JSON 文件中的事件（按时间从旧到新）"""
+    if not legacy_path.exists():
+        return []
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        events = json.load(f).get("events", [])
+    # 旧文件有的最新在前（insert(0, ...)）、有的追加在后，统一按时间排序（同一时间保持文件中的先后）
+    if len(events) > 1 and str(events[0].get("timestamp", "")) > str(events[-1].get("timestamp", "")):
+        events = list(reversed(events))
+    return sorted(events, key=lambda event: str(event.get("timestamp", "")))
+
+
+def get_feed(name: str, data_dir: Optional[Path] = None) -> EventJournal:
+    """
+    获取 Dashboard 事件流日志（首次打开时导入旧 JSON 文件）
+
+    Args:
+        name: architect_events / realtime_pulse / engineer_events
+        data_dir: 数据目录，默认 apps/dashboard/automation-data
+    """
+    legacy_file, id_template, count_fields = FEEDS[name]
+    data_dir = Path(data_dir or DASHBOARD_DATA_DIR)
+    key = (name, str(data_dir.resolve()))
+    with _feeds_lock:
+        journal = _feeds.get(key)
+        if journal is not None:
+            return journal
+        pool = get_connection_pool(str(data_dir / FEED_DB_NAME))
+        journal = EventJournal(pool, name, id_template=id_template, count_fields=count_fields)
+        journal.import_once(legacy_file, lambda: _legacy_events(data_dir / legacy_file))
+        _feeds[key] = journal
+        return journal
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+异步写后事件队列（Write-Behind Event Queue）
+
+功能：
+1. WriteBehindEventEmitter: emit() 只入队，后台写线程负责落库
+2. 组提交：每 batch_size 个事件或 flush_interval_ms 毫秒提交一次
+3. 背压：队列满时阻塞等待，超时后退化为调用方线程同步写入
+4. 持久性模式：fire-and-forget / await-commit
+5. 关闭时刷盘（flush + atexit）
+"""
+
+from typing import List, Dict, Any, Optional
+from concurrent.futures import Future
+from enum import Enum
+import asyncio
+import atexit
+import logging
+import queue
+import threading
+import time
+import weakref
+
+from .event_service import (
+    EventCategory,
+    EventEmitter,
+    EventSeverity,
+    EventSource,
+    EventStore,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class DurabilityMode(str, Enum):
+    """持久性模式"""
+    FIRE_AND_FORGET = "fire_and_forget"  # 入队即返回
+    AWAIT_COMMIT = "await_commit"        # 等待所在批次提交后返回
+
+
+class _FlushMarker:
+    """刷盘标记：写线程处理到此处时提交当前批次并通知等待方"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+# ============================================================================
+# WriteBehindEventEmitter - 写后事件发射器
+# ============================================================================
+
+class WriteBehindEventEmitter(EventEmitter):
+    """
+    写后事件发射器
+
+    与 EventEmitter 接口一致；emit() 构建事件后放入有界队列，
+    由后台写线程通过 EventStore.save_batch 组提交，提交后发布到事件总线。
+    """
+
+    def __init__(
+        self,
+        event_store: EventStore,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_ms: int = 50,
+        durability: str = DurabilityMode.FIRE_AND_FORGET,
+        enqueue_timeout: Optional[float] = 1.0
+    ):
+        """
+        初始化写后事件发射器
+
+        Args:
+            event_store: 事件存储实例
+            max_queue_size: 队列容量（背压阈值）
+            batch_size: 单次组提交的最大事件数
+            flush_interval_ms: 组提交的最长等待时间（毫秒）
+            durability: 持久性模式（fire_and_forget / await_commit）
+            enqueue_timeout: 队列满时的最长等待时间（秒），超时后同步写入
+        """
+        super().__init__(event_store)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.durability = DurabilityMode(durability)
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "enqueued": 0,
+            "committed": 0,
+            "batches": 0,
+            "failed": 0,
+            "sync_fallbacks": 0
+        }
+
+        self._writer = threading.Thread(
+            target=self._run_writer,
+            name="event-write-behind",
+            daemon=True
+        )
+        self._writer.start()
+        _register(self)
+
+    # ========================================================================
+    # 发射
+    # ========================================================================
+
+    def emit(
+        self,
+        project_id: str,
+        event_type: str,
+        title: str,
+        description: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        category: str = EventCategory.GENERAL,
+        source: str = EventSource.SYSTEM,
+        actor: Optional[str] = None,
+        severity: str = EventSeverity.INFO,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        occurred_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        发射单个事件（参数同 EventEmitter.emit）
+
+        fire_and_forget 模式下入队即返回；await_commit 模式下等待提交完成。
+        """
+        event = self._build_event(
+            project_id=project_id,
+            event_type=event_type,
+            title=title,
+            description=description,
+            data=data,
+            category=category,
+            source=source,
+            actor=actor,
+            severity=severity,
+            related_entity_type=related_entity_type,
+            related_entity_id=related_entity_id,
+            tags=tags,
+            occurred_at=occurred_at
+        )
+        future = self._submit(event, block=True)
+        if self.durability == DurabilityMode.AWAIT_COMMIT:
+            future.result()
+        return event
+
+    async def emit_async(
+        self,
+        project_id: str,
+        event_type: str,
+        title: str,
+        description: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        category: str = EventCategory.GENERAL,
+        source: str = EventSource.SYSTEM,
+        actor: Optional[str] = None,
+        severity: str = EventSeverity.INFO,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        occurred_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        在事件循环中发射事件（不阻塞事件循环）
+
+        队列满时在线程池中等待入队；await_commit 模式下异步等待提交完成。
+        """
+        event = self._build_event(
+            project_id=project_id,
+            event_type=event_type,
+            title=title,
+            description=description,
+            data=data,
+            category=category,
+            source=source,
+            actor=actor,
+            severity=severity,
+            related_entity_type=related_entity_type,
+            related_entity_id=related_entity_id,
+            tags=tags,
+            occurred_at=occurred_at
+        )
+        try:
+            future = self._submit(event, block=False)
+        except queue.Full:
+            loop = asyncio.get_running_loop()
+            future = await loop.run_in_executor(None, self._submit, event, True)
+        if self.durability == DurabilityMode.AWAIT_COMMIT:
+            await asyncio.wrap_future(future)
+        return event
+
+    def _submit(self, event: Dict[str, Any], block: bool = True) -> Future:
+        """事件入队，返回提交完成时结束的Future
+
+        block=False 且队列已满时抛出 queue.Full；
+        block=True 时等待 enqueue_timeout，超时后在调用方线程同步写入。
+        """
+        future: Future = Future()
+
+        if self._closed:
+            self._write_sync(event, future)
+            return future
+
+        try:
+            if block:
+                self._queue.put((event, future), timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait((event, future))
+        except queue.Full:
+            if not block:
+                raise
+            # 背压超时：退化为同步写入，保证事件不丢失
+            self._write_sync(event, future)
+            return future
+
+        self._bump("enqueued")
+        return future
+
+    def _write_sync(self, event: Dict[str, Any], future: Future) -> None:
+        """在调用方线程直接写入单个事件"""
+        self._bump("sync_fallbacks")
+        try:
+            self._persist(event)
+            self._bump("committed")
+            future.set_result(event)
+        except Exception as e:
+            self._bump("failed")
+            future.set_exception(e)
+            if self.durability == DurabilityMode.FIRE_AND_FORGET:
+                logger.error(f"Event write failed: {e}")
+
+    # ========================================================================
+    # 后台写线程
+    # ========================================================================
+
+    def _run_writer(self) -> None:
+        """写线程主循环：收集批次并组提交"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[tuple] = []
+            markers: List[_FlushMarker] = []
+
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, _FlushMarker):
+                    markers.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit(batch)
+            for marker in markers:
+                marker.done.set()
+
+        # 停止前清空剩余事件
+        remaining_items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushMarker):
+                item.done.set()
+            elif item is not _STOP:
+                remaining_items.append(item)
+        if remaining_items:
+            self._commit(remaining_items)
+
+    def _commit(self, batch: List[tuple]) -> None:
+        """组提交一个批次；批量失败时逐条重试，隔离坏事件"""
+        events = [event for event, _ in batch]
+        try:
+            self._persist_batch(events)
+        except Exception as e:
+            logger.warning(f"Group commit of {len(events)} events failed, retrying one by one: {e}")
+            for event, future in batch:
+                try:
+                    self._persist(event)
+                    self._bump("committed")
+                    future.set_result(event)
+                except Exception as exc:
+                    self._bump("failed")
+                    future.set_exception(exc)
+                    logger.error(f"Event {event.get('id')} write failed: {exc}")
+            self._bump("batches")
+            return
+
+        for event, future in batch:
+            future.set_result(event)
+        self._bump("committed", len(batch))
+        self._bump("batches")
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    # ========================================================================
+    # 刷盘与关闭
+    # ========================================================================
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待当前已入队的事件全部提交
+
+        Args:
+            timeout: 最长等待时间（秒），None表示无限等待
+
+        Returns:
+            是否在超时前完成
+        """
+        if self._closed or not self._writer.is_alive():
+            return True
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """刷盘并停止写线程；关闭后的 emit 退化为同步写入"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取队列统计信息"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update({
+            "queue_size": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "durability": self.durability.value,
+            "closed": self._closed
+        })
+        return stats
+
+
+# ============================================================================
+# 关闭钩子
+# ============================================================================
+
+_emitters: "weakref.WeakSet[WriteBehindEventEmitter]" = weakref.WeakSet()
+_emitters_lock = threading.Lock()
+
+
+def _register(emitter: WriteBehindEventEmitter) -> None:
+    with _emitters_lock:
+        _emitters.add(emitter)
+
+
+def shutdown_write_behind_emitters(timeout: Optional[float] = 10.0) -> None:
+    """刷盘并关闭所有写后发射器（应用关闭时调用）"""
+    with _emitters_lock:
+        emitters = list(_emitters)
+    for emitter in emitters:
+        try:
+            emitter.close(timeout=timeout)
+        except Exception as e:
+            logger.error(f"Failed to close write-behind emitter: {e}")
+
+
+atexit.register(shutdown_write_behind_emitters)
+
+
+# ============================================================================
+# 工厂函数
+# ============================================================================
+
+def create_write_behind_emitter(
+    db_path: str = "database/data/tasks.db",
+    **options: Any
+) -> WriteBehindEventEmitter:
+    """
+    创建写后事件发射器实例
+
+    Args:
+        db_path: 数据库文件路径
+        **options: WriteBehindEventEmitter 参数
+
+    Returns:
+        WriteBehindEventEmitter实例
+    """
+    return WriteBehindEventEmitter(event_store=EventStore(db_path=db_path), **options)
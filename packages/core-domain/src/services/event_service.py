@@ -9,15 +9,17 @@
 4. 事件统计
 """
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta
+import base64
 import json
 import uuid
-import sqlite3
 from pathlib import Path
-from contextlib import contextmanager
 from enum import Enum
 
+from .db_pool import get_connection_pool
+from .event_bus import EventBus, get_event_bus
+
 
 class EventSeverity(str, Enum):
     """事件严重性枚举"""
@@ -60,17 +62,19 @@ class EventEmitter:
     """
     事件发射器
     
-    负责创建和发射事件到EventStore
+    负责创建和发射事件到EventStore，提交后发布到进程内事件总线
     """
     
-    def __init__(self, event_store: 'EventStore'):
+    def __init__(self, event_store: 'EventStore', event_bus: Optional[EventBus] = None):
         """
         初始化事件发射器
         
         Args:
             event_store: 事件存储实例
+            event_bus: 事件总线，默认为进程级总线
         """
         self.event_store = event_store
+        self.event_bus = event_bus or get_event_bus()
     
     def emit(
         self,
@@ -109,32 +113,23 @@ class EventEmitter:
         Returns:
             创建的事件对象
         """
-        event_id = f"EVT-{uuid.uuid4().hex[:8]}"
-        
-        event = {
-            "id": event_id,
-            "project_id": project_id,
-            "event_type": event_type,
-            "event_category": category,
-            "source": source,
-            "actor": actor,
-            "title": title,
-            "description": description,
-            "data": json.dumps(data) if data else None,
-            "related_entity_type": related_entity_type,
-            "related_entity_id": related_entity_id,
-            "severity": severity,
-            "status": EventStatus.PROCESSED,
-            "tags": json.dumps(tags) if tags else None,
-            "occurred_at": occurred_at or datetime.now().isoformat(),
-            "created_at": datetime.now().isoformat()
-        }
-        
-        # 保存事件
-        self.event_store.save(event)
+        event = self._build_event(
+            project_id=project_id,
+            event_type=event_type,
+            title=title,
+            description=description,
+            data=data,
+            category=category,
+            source=source,
+            actor=actor,
+            severity=severity,
+            related_entity_type=related_entity_type,
+            related_entity_id=related_entity_id,
+            tags=tags,
+            occurred_at=occurred_at
+        )
         
-        # 更新统计
-        self.event_store.update_stats(project_id, category, severity)
+        self._persist(event)
         
         return event
     
@@ -146,6 +141,9 @@ class EventEmitter:
         """
         批量发射事件
         
+        所有事件在一个事务内通过 executemany 写入，统计增量在内存中
+        聚合后对 event_stats 只做一次 upsert。
+        
         Args:
             project_id: 项目ID
             events: 事件列表，每个事件包含emit()方法的参数
@@ -158,13 +156,73 @@ class EventEmitter:
         for event_data in events:
             # 确保project_id
             event_data["project_id"] = project_id
-            
-            # 发射事件
-            event = self.emit(**event_data)
-            created_events.append(event)
+            created_events.append(self._build_event(**event_data))
+        
+        self._persist_batch(created_events)
         
         return created_events
     
+    def _persist(self, event: Dict[str, Any]) -> None:
+        """保存事件并更新统计（同一连接、同一事务），提交后发布"""
+        with self.event_store.transaction():
+            self.event_store.save(event)
+            self.event_store.update_stats(
+                event["project_id"],
+                event["event_category"],
+                event["severity"],
+                event["occurred_at"]
+            )
+            self._publish([event])
+    
+    def _persist_batch(self, events: List[Dict[str, Any]]) -> None:
+        """批量保存事件，提交后发布"""
+        with self.event_store.transaction():
+            self.event_store.save_batch(events)
+            self._publish(events)
+    
+    def _publish(self, events: List[Dict[str, Any]]) -> None:
+        """在外层事务提交后发布到事件总线（回滚则不发布）"""
+        self.event_store.after_commit(lambda: self.event_bus.publish(events))
+    
+    def _build_event(
+        self,
+        project_id: str,
+        event_type: str,
+        title: str,
+        description: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        category: str = EventCategory.GENERAL,
+        source: str = EventSource.SYSTEM,
+        actor: Optional[str] = None,
+        severity: str = EventSeverity.INFO,
+        related_entity_type: Optional[str] = None,
+        related_entity_id: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        occurred_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """构建待写入的事件对象（参数同emit）"""
+        event_id = f"EVT-{uuid.uuid4().hex[:8]}"
+        now = datetime.now().isoformat()
+        
+        return {
+            "id": event_id,
+            "project_id": project_id,
+            "event_type": event_type,
+            "event_category": category,
+            "source": source,
+            "actor": actor,
+            "title": title,
+            "description": description,
+            "data": json.dumps(data) if data else None,
+            "related_entity_type": related_entity_type,
+            "related_entity_id": related_entity_id,
+            "severity": severity,
+            "status": EventStatus.PROCESSED,
+            "tags": json.dumps(tags) if tags else None,
+            "occurred_at": occurred_at or now,
+            "created_at": now
+        }
+    
     # ========================================================================
     # 便捷方法 - 常用事件类型
     # ========================================================================
@@ -279,29 +337,69 @@ class EventStore:
         
         # 确保数据库目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 共享连接池（WAL + 预编译语句缓存）
+        self._pool = get_connection_pool(str(self.db_path))
     
-    @contextmanager
     def _get_connection(self):
         """获取数据库连接（上下文管理器）
         
+        Yields:
+            sqlite3.Connection: 连接池中的数据库连接
+        """
+        return self._pool.connection()
+    
+    def transaction(self):
+        """开启一个事务（上下文管理器）
+        
+        事务内的 save/update_stats 等调用复用同一连接，退出时统一提交。
+        
         Yields:
             sqlite3.Connection: 数据库连接
         """
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        return self._pool.connection()
+    
+    def after_commit(self, callback) -> None:
+        """登记提交后回调；不在事务中时立即执行"""
+        self._pool.call_after_commit(callback)
     
     # ========================================================================
     # 核心方法
     # ========================================================================
     
+    # 允许排序的字段（均有 (…, 字段, id) 复合索引支撑，见 migration 007）
+    ORDERABLE_COLUMNS = ("occurred_at",)
+    
+    _INSERT_EVENT_SQL = """
+        INSERT INTO project_events (
+            id, project_id, event_type, event_category, source, actor,
+            title, description, data, related_entity_type, related_entity_id,
+            severity, status, tags, occurred_at, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    @staticmethod
+    def _event_row(event: Dict[str, Any]) -> tuple:
+        """事件对象 → INSERT参数元组"""
+        return (
+            event["id"],
+            event["project_id"],
+            event["event_type"],
+            event["event_category"],
+            event["source"],
+            event.get("actor"),
+            event["title"],
+            event.get("description"),
+            event.get("data"),
+            event.get("related_entity_type"),
+            event.get("related_entity_id"),
+            event["severity"],
+            event["status"],
+            event.get("tags"),
+            event["occurred_at"],
+            event["created_at"]
+        )
+    
     def save(self, event: Dict[str, Any]) -> None:
         """
         保存事件到数据库
@@ -310,31 +408,46 @@ class EventStore:
             event: 事件对象
         """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO project_events (
-                    id, project_id, event_type, event_category, source, actor,
-                    title, description, data, related_entity_type, related_entity_id,
-                    severity, status, tags, occurred_at, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                event["id"],
+            conn.execute(self._INSERT_EVENT_SQL, self._event_row(event))
+    
+    def save_batch(self, events: List[Dict[str, Any]]) -> int:
+        """
+        批量保存事件并更新统计（单事务）
+        
+        事件通过 executemany 一次写入；各项目的分类/严重性计数在内存中
+        聚合，每个项目只对 event_stats 做一次 upsert。
+        
+        Args:
+            events: 事件对象列表
+            
+        Returns:
+            写入的事件数量
+        """
+        if not events:
+            return 0
+        
+        # 按项目聚合统计增量
+        buckets = self._current_buckets()
+        deltas: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            self._accumulate_delta(
+                deltas,
                 event["project_id"],
-                event["event_type"],
                 event["event_category"],
-                event["source"],
-                event.get("actor"),
-                event["title"],
-                event.get("description"),
-                event.get("data"),
-                event.get("related_entity_type"),
-                event.get("related_entity_id"),
                 event["severity"],
-                event["status"],
-                event.get("tags"),
                 event["occurred_at"],
-                event["created_at"]
-            ))
+                buckets
+            )
+        
+        with self._get_connection() as conn:
+            conn.executemany(
+                self._INSERT_EVENT_SQL,
+                [self._event_row(event) for event in events]
+            )
+            for project_id, delta in deltas.items():
+                self._upsert_stats(conn, project_id, delta, buckets)
+        
+        return len(events)
     
     def query(
         self,
@@ -350,11 +463,15 @@ class EventStore:
         limit: int = 100,
         offset: int = 0,
         order_by: str = "occurred_at",
-        order_direction: str = "DESC"
+        order_direction: str = "DESC",
+        after: Optional[Tuple[str, str]] = None
     ) -> List[Dict[str, Any]]:
         """
         查询事件
         
+        推荐使用游标分页：将上一页最后一个事件的 (occurred_at, id) 作为 after 传入，
+        翻页代价与页深无关；offset 仅为兼容保留。
+        
         Args:
             project_id: 项目ID过滤
             event_type: 事件类型过滤
@@ -366,13 +483,25 @@ class EventStore:
             start_time: 开始时间过滤（ISO格式）
             end_time: 结束时间过滤（ISO格式）
             limit: 返回数量限制
-            offset: 偏移量
-            order_by: 排序字段
+            offset: 偏移量（与 after 同时使用时忽略）
+            order_by: 排序字段（仅限 ORDERABLE_COLUMNS）
             order_direction: 排序方向（ASC/DESC）
+            after: 游标 (occurred_at, id)，返回排在该事件之后的事件
             
         Returns:
             事件列表
+        
+        Raises:
+            ValueError: order_by 或 order_direction 不合法
         """
+        if order_by not in self.ORDERABLE_COLUMNS:
+            raise ValueError(
+                f"Invalid order_by: {order_by!r}, expected one of {self.ORDERABLE_COLUMNS}"
+            )
+        direction = str(order_direction).upper()
+        if direction not in ("ASC", "DESC"):
+            raise ValueError(f"Invalid order_direction: {order_direction!r}")
+        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
@@ -416,14 +545,21 @@ class EventStore:
                 conditions.append("occurred_at <= ?")
                 params.append(end_time)
             
+            # 游标条件：行值比较可直接在 (…, occurred_at, id) 复合索引上定位
+            if after:
+                comparator = "<" if direction == "DESC" else ">"
+                conditions.append(f"({order_by}, id) {comparator} (?, ?)")
+                params.extend(after)
+                offset = 0
+            
             # 构建WHERE子句
             where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
             
-            # 构建完整查询
+            # 构建完整查询（id 作为次级排序键，保证游标翻页稳定）
             query = f"""
                 SELECT * FROM project_events
                 {where_clause}
-                ORDER BY {order_by} {order_direction}
+                ORDER BY {order_by} {direction}, id {direction}
                 LIMIT ? OFFSET ?
             """
             params.extend([limit, offset])
@@ -432,23 +568,7 @@ class EventStore:
             rows = cursor.fetchall()
             
             # 转换为字典列表
-            events = []
-            for row in rows:
-                event = dict(row)
-                # 解析JSON字段
-                if event.get('data'):
-                    try:
-                        event['data'] = json.loads(event['data'])
-                    except:
-                        pass
-                if event.get('tags'):
-                    try:
-                        event['tags'] = json.loads(event['tags'])
-                    except:
-                        event['tags'] = []
-                events.append(event)
-            
-            return events
+            return [self._row_to_event(row) for row in rows]
     
     def get_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -460,8 +580,6 @@ class EventStore:
         Returns:
             事件对象或None
         """
-        events = self.query(limit=1, offset=0)
-        
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM project_events WHERE id = ?", (event_id,))
@@ -470,81 +588,292 @@ class EventStore:
             if not row:
                 return None
             
-            event = dict(row)
-            # 解析JSON字段
-            if event.get('data'):
-                try:
-                    event['data'] = json.loads(event['data'])
-                except:
-                    pass
-            if event.get('tags'):
-                try:
-                    event['tags'] = json.loads(event['tags'])
-                except:
-                    event['tags'] = []
-            
-            return event
+            return self._row_to_event(row)
+    
+    @staticmethod
+    def _row_to_event(row) -> Dict[str, Any]:
+        """数据库行转换为事件字典（解析JSON字段）"""
+        event = dict(row)
+        if event.get('data'):
+            try:
+                event['data'] = json.loads(event['data'])
+            except:
+                pass
+        if event.get('tags'):
+            try:
+                event['tags'] = json.loads(event['tags'])
+            except:
+                event['tags'] = []
+        return event
+    
+    @staticmethod
+    def encode_cursor(event: Dict[str, Any]) -> str:
+        """
+        将事件编码为分页游标（不透明字符串）
+        
+        Args:
+            event: 当前页最后一个事件
+            
+        Returns:
+            游标字符串
+        """
+        raw = json.dumps([event["occurred_at"], event["id"]], ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """
+        解码分页游标
+        
+        Args:
+            cursor: encode_cursor 生成的游标
+            
+        Returns:
+            (occurred_at, id)
+        
+        Raises:
+            ValueError: 游标格式不合法
+        """
+        try:
+            occurred_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor!r}") from e
+        return str(occurred_at), str(event_id)
     
     # ========================================================================
-    # 统计方法
+    # 增量读取（消费者游标）
     # ========================================================================
     
-    def get_stats(self, project_id: str) -> Dict[str, Any]:
+    def get_max_rowid(self) -> int:
         """
-        获取项目事件统计
+        获取当前最大事件rowid
+        
+        SQLite单写者串行提交，rowid随提交顺序递增，可作为高水位线。
+        
+        Returns:
+            最大rowid，无事件时为0
+        """
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM project_events").fetchone()
+            return row[0]
+    
+    def read_since(
+        self,
+        after_rowid: int,
+        project_id: Optional[str] = None,
+        limit: int = 500
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        按rowid顺序读取高水位线之后的事件
         
         Args:
-            project_id: 项目ID
+            after_rowid: 高水位线（不含）
+            project_id: 项目ID过滤
+            limit: 单次读取数量
             
         Returns:
-            统计信息
+            (事件列表, 新高水位线)；事件附带 rowid 字段。
+            返回事件数等于 limit 时可能还有剩余，应继续读取。
         """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            # 先确定上界：上界之前的行均已提交，过滤掉的其他项目事件也可安全跳过
+            upper = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM project_events").fetchone()[0]
             
-            # 尝试从统计表获取
-            cursor.execute("""
-                SELECT * FROM event_stats WHERE project_id = ?
-            """, (project_id,))
-            row = cursor.fetchone()
+            conditions = ["rowid > ?", "rowid <= ?"]
+            params: List[Any] = [after_rowid, upper]
+            if project_id:
+                conditions.append("project_id = ?")
+                params.append(project_id)
+            params.append(limit)
             
-            if row:
-                return dict(row)
-            
-            # 如果不存在，实时计算
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total_events,
-                    SUM(CASE WHEN event_category = 'task' THEN 1 ELSE 0 END) as task_events,
-                    SUM(CASE WHEN event_category = 'issue' THEN 1 ELSE 0 END) as issue_events,
-                    SUM(CASE WHEN event_category = 'decision' THEN 1 ELSE 0 END) as decision_events,
-                    SUM(CASE WHEN event_category = 'deployment' THEN 1 ELSE 0 END) as deployment_events,
-                    SUM(CASE WHEN event_category = 'system' THEN 1 ELSE 0 END) as system_events,
-                    SUM(CASE WHEN severity = 'info' THEN 1 ELSE 0 END) as info_events,
-                    SUM(CASE WHEN severity = 'warning' THEN 1 ELSE 0 END) as warning_events,
-                    SUM(CASE WHEN severity = 'error' THEN 1 ELSE 0 END) as error_events,
-                    SUM(CASE WHEN severity = 'critical' THEN 1 ELSE 0 END) as critical_events,
-                    MAX(occurred_at) as last_event_at
-                FROM project_events
-                WHERE project_id = ?
-            """, (project_id,))
+            rows = conn.execute(f"""
+                SELECT rowid AS rowid, * FROM project_events
+                WHERE {" AND ".join(conditions)}
+                ORDER BY rowid
+                LIMIT ?
+            """, params).fetchall()
+        
+        events = [self._row_to_event(row) for row in rows]
+        if len(events) == limit:
+            return events, events[-1]["rowid"]
+        return events, max(upper, after_rowid)
+    
+    def _ensure_offsets_table(self, conn) -> None:
+        """确保消费者游标表存在（兼容未执行 migration 008 的数据库）"""
+        if getattr(self, "_offsets_checked", False):
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS event_consumer_offsets (
+                consumer_id TEXT PRIMARY KEY,
+                last_rowid INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+        """)
+        self.after_commit(lambda: setattr(self, "_offsets_checked", True))
+    
+    def get_consumer_offset(self, consumer_id: str) -> Optional[int]:
+        """
+        获取消费者持久化的高水位线
+        
+        Args:
+            consumer_id: 消费者ID
             
-            row = cursor.fetchone()
-            return dict(row) if row else {}
+        Returns:
+            rowid，从未保存过时返回None
+        """
+        with self._get_connection() as conn:
+            self._ensure_offsets_table(conn)
+            row = conn.execute(
+                "SELECT last_rowid FROM event_consumer_offsets WHERE consumer_id = ?",
+                (consumer_id,)
+            ).fetchone()
+            return row[0] if row else None
     
-    def update_stats(
+    def save_consumer_offset(self, consumer_id: str, last_rowid: int) -> None:
+        """
+        保存消费者高水位线
+        
+        Args:
+            consumer_id: 消费者ID
+            last_rowid: 已处理的最大rowid
+        """
+        with self._get_connection() as conn:
+            self._ensure_offsets_table(conn)
+            conn.execute("""
+                INSERT INTO event_consumer_offsets (consumer_id, last_rowid, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(consumer_id) DO UPDATE SET
+                    last_rowid = excluded.last_rowid,
+                    updated_at = excluded.updated_at
+            """, (consumer_id, last_rowid, datetime.now().isoformat()))
+    
+    def _ensure_dead_letters_table(self, conn) -> None:
+        """确保死信表存在（兼容未执行 migration 018 的数据库）"""
+        if getattr(self, "_dead_letters_checked", False):
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS event_dead_letters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                consumer_id TEXT NOT NULL,
+                event_rowid INTEGER NOT NULL,
+                event_id TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                failed_at TEXT NOT NULL DEFAULT (datetime('now')),
+                UNIQUE (consumer_id, event_rowid)
+            )
+        """)
+        self.after_commit(lambda: setattr(self, "_dead_letters_checked", True))
+    
+    def save_dead_letter(
         self,
-        project_id: str,
-        category: str,
-        severity: str
+        consumer_id: str,
+        event: Dict[str, Any],
+        error: str,
+        attempts: int
     ) -> None:
         """
-        更新事件统计
+        登记处理失败的事件（重复登记时更新失败原因和次数）
+        
+        Args:
+            consumer_id: 消费者ID
+            event: read_since 返回的事件（含 rowid）
+            error: 最后一次失败原因
+            attempts: 处理次数
+        """
+        with self._get_connection() as conn:
+            self._ensure_dead_letters_table(conn)
+            conn.execute("""
+                INSERT INTO event_dead_letters (consumer_id, event_rowid, event_id, error, attempts, failed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(consumer_id, event_rowid) DO UPDATE SET
+                    error = excluded.error,
+                    attempts = event_dead_letters.attempts + excluded.attempts,
+                    failed_at = excluded.failed_at
+            """, (consumer_id, event["rowid"], event["id"], error, attempts, datetime.now().isoformat()))
+    
+    def list_dead_letters(self, consumer_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        查询消费者的死信事件（最新在前）
+        
+        Args:
+            consumer_id: 消费者ID
+            limit: 返回数量
+            
+        Returns:
+            死信记录列表
+        """
+        with self._get_connection() as conn:
+            self._ensure_dead_letters_table(conn)
+            rows = conn.execute("""
+                SELECT * FROM event_dead_letters
+                WHERE consumer_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (consumer_id, limit)).fetchall()
+            return [dict(row) for row in rows]
+    
+    # ========================================================================
+    # 统计方法
+    # ========================================================================
+    
+    def get_stats(self, project_id: str) -> Dict[str, Any]:
+        """
+        获取项目事件统计
+        
+        统计由写入路径增量维护；项目尚无统计行时从原始事件重建一次并持久化。
         
         Args:
             project_id: 项目ID
-            category: 事件分类
-            severity: 事件严重性
+            
+        Returns:
+            统计信息
+        """
+        with self._get_connection() as conn:
+            self._ensure_stats_columns(conn)
+            row = conn.execute(
+                "SELECT * FROM event_stats WHERE project_id = ?", (project_id,)
+            ).fetchone()
+            
+            if not row:
+                if not self.rebuild_stats(project_id):
+                    return {}
+                row = conn.execute(
+                    "SELECT * FROM event_stats WHERE project_id = ?", (project_id,)
+                ).fetchone()
+                if not row:
+                    return {}
+            
+            stats = dict(row)
+        
+        # 时间桶过期（例如跨天后尚无新事件）时计数归零
+        day, week, month = self._current_buckets()
+        if stats.get("stats_day") != day:
+            stats["events_today"] = 0
+        if stats.get("stats_week") != week:
+            stats["events_this_week"] = 0
+        if stats.get("stats_month") != month:
+            stats["events_this_month"] = 0
+        
+        return stats
+    
+    # 有效的分类/严重性列（对应event_stats列名）
+    STATS_CATEGORIES = ("task", "issue", "decision", "deployment", "system")
+    STATS_SEVERITIES = ("info", "warning", "error", "critical")
+    
+    # 时间桶列：stats_day/stats_week/stats_month 记录计数所属的日/ISO周/月
+    _BUCKET_COLUMNS = (
+        ("stats_day", "events_today"),
+        ("stats_week", "events_this_week"),
+        ("stats_month", "events_this_month")
+    )
+    
+    @classmethod
+    def _normalize_stats_keys(cls, category: str, severity: str) -> tuple:
+        """将分类/严重性规整为event_stats中存在的列名
+        
+        Returns:
+            (category, severity)
         """
         # 转换枚举为字符串值
         if hasattr(category, 'value'):
@@ -556,55 +885,230 @@ class EventStore:
         category = str(category)
         severity = str(severity)
         
-        # 有效的分类列（对应数据库列名）
-        valid_categories = ["task", "issue", "decision", "deployment", "system"]
-        valid_severities = ["info", "warning", "error", "critical"]
-        
         # 如果分类或严重性不在有效列表中，使用默认值
-        if category not in valid_categories:
+        if category not in cls.STATS_CATEGORIES:
             category = "system"  # general类别归到system
-        if severity not in valid_severities:
+        if severity not in cls.STATS_SEVERITIES:
             severity = "info"
         
+        return category, severity
+    
+    @staticmethod
+    def _bucket_keys(day: date) -> tuple:
+        """日期 → (日, ISO周, 月) 时间桶键"""
+        iso_year, iso_week, _ = day.isocalendar()
+        return (
+            day.isoformat(),
+            f"{iso_year}-W{iso_week:02d}",
+            day.isoformat()[:7]
+        )
+    
+    def _current_buckets(self) -> tuple:
+        """当前时间所在的 (日, ISO周, 月) 时间桶"""
+        return self._bucket_keys(date.today())
+    
+    def _event_buckets(self, occurred_at: Optional[str]) -> tuple:
+        """事件发生时间所在的时间桶（无法解析时视为当前时间）"""
+        if occurred_at:
+            try:
+                return self._bucket_keys(date.fromisoformat(str(occurred_at)[:10]))
+            except ValueError:
+                pass
+        return self._current_buckets()
+    
+    def _accumulate_delta(
+        self,
+        deltas: Dict[str, Dict[str, Any]],
+        project_id: str,
+        category: str,
+        severity: str,
+        occurred_at: Optional[str],
+        buckets: tuple
+    ) -> None:
+        """把单个事件累加到项目的统计增量中"""
+        category, severity = self._normalize_stats_keys(category, severity)
+        delta = deltas.setdefault(project_id, {
+            "total": 0,
+            "categories": {},
+            "severities": {},
+            "buckets": [0, 0, 0],
+            "last_event_at": None
+        })
+        delta["total"] += 1
+        delta["categories"][category] = delta["categories"].get(category, 0) + 1
+        delta["severities"][severity] = delta["severities"].get(severity, 0) + 1
+        
+        # 只有落在当前日/周/月内的事件才计入对应时间桶
+        event_buckets = self._event_buckets(occurred_at)
+        for i in range(3):
+            if event_buckets[i] == buckets[i]:
+                delta["buckets"][i] += 1
+        
+        if occurred_at and (delta["last_event_at"] is None or occurred_at > delta["last_event_at"]):
+            delta["last_event_at"] = occurred_at
+    
+    def _ensure_stats_columns(self, conn) -> None:
+        """确保event_stats包含时间桶列（兼容未执行迁移006的数据库）"""
+        if getattr(self, "_stats_columns_checked", False):
+            return
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(event_stats)")}
+        for bucket_column, _ in self._BUCKET_COLUMNS:
+            if bucket_column not in existing:
+                conn.execute(f"ALTER TABLE event_stats ADD COLUMN {bucket_column} TEXT")
+        # DDL随外层事务回滚时需重新检查，因此提交后才标记
+        self.after_commit(lambda: setattr(self, "_stats_columns_checked", True))
+    
+    def _upsert_stats(
+        self,
+        conn,
+        project_id: str,
+        delta: Dict[str, Any],
+        buckets: tuple
+    ) -> None:
+        """对单个项目的event_stats应用计数增量（单条 INSERT ... ON CONFLICT DO UPDATE）
+        
+        计数列做加法；时间桶列在桶键变化（跨日/周/月）时重置为本次增量。
+        """
+        self._ensure_stats_columns(conn)
+        
+        columns = [f"{c}_events" for c in self.STATS_CATEGORIES] + \
+                  [f"{s}_events" for s in self.STATS_SEVERITIES]
+        values = [delta["categories"].get(c, 0) for c in self.STATS_CATEGORIES] + \
+                 [delta["severities"].get(s, 0) for s in self.STATS_SEVERITIES]
+        now = datetime.now().isoformat()
+        
+        counter_updates = [f"{col} = {col} + excluded.{col}" for col in columns]
+        bucket_updates = []
+        for bucket_column, count_column in self._BUCKET_COLUMNS:
+            bucket_updates.append(
+                f"{count_column} = CASE WHEN {bucket_column} = excluded.{bucket_column} "
+                f"THEN {count_column} + excluded.{count_column} "
+                f"ELSE excluded.{count_column} END"
+            )
+            bucket_updates.append(f"{bucket_column} = excluded.{bucket_column}")
+        updates = ",\n                ".join(counter_updates + bucket_updates)
+        
+        conn.execute(f"""
+            INSERT INTO event_stats (
+                project_id, total_events, {", ".join(columns)},
+                events_today, events_this_week, events_this_month,
+                stats_day, stats_week, stats_month,
+                last_event_at, last_updated
+            ) VALUES (?, ?, {", ".join("?" * len(columns))}, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(project_id) DO UPDATE SET
+                total_events = total_events + excluded.total_events,
+                {updates},
+                last_event_at = MAX(COALESCE(last_event_at, ''), excluded.last_event_at),
+                last_updated = excluded.last_updated
+        """, [
+            project_id, delta["total"], *values,
+            *delta["buckets"], *buckets,
+            delta["last_event_at"] or now, now
+        ])
+    
+    def update_stats(
+        self,
+        project_id: str,
+        category: str,
+        severity: str,
+        occurred_at: Optional[str] = None
+    ) -> None:
+        """
+        更新事件统计（单条upsert，并发写入安全）
+        
+        Args:
+            project_id: 项目ID
+            category: 事件分类
+            severity: 事件严重性
+            occurred_at: 事件发生时间（ISO格式），默认为当前时间
+        """
+        buckets = self._current_buckets()
+        deltas: Dict[str, Dict[str, Any]] = {}
+        self._accumulate_delta(
+            deltas,
+            project_id,
+            category,
+            severity,
+            occurred_at or datetime.now().isoformat(),
+            buckets
+        )
+        
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            self._upsert_stats(conn, project_id, deltas[project_id], buckets)
+    
+    def rebuild_stats(self, project_id: Optional[str] = None) -> int:
+        """
+        从 project_events 原始数据重建 event_stats 计数（对账）
+        
+        Args:
+            project_id: 只重建指定项目，None表示重建全部项目
             
-            # 检查统计记录是否存在
-            cursor.execute("""
-                SELECT project_id FROM event_stats WHERE project_id = ?
-            """, (project_id,))
-            exists = cursor.fetchone() is not None
-            
-            now = datetime.now().isoformat()
-            
-            if exists:
-                # 更新现有统计
-                cursor.execute(f"""
-                    UPDATE event_stats
-                    SET total_events = total_events + 1,
-                        {category}_events = {category}_events + 1,
-                        {severity}_events = {severity}_events + 1,
-                        last_event_at = ?,
-                        last_updated = ?
-                    WHERE project_id = ?
-                """, (now, now, project_id))
+        Returns:
+            重建的项目数量
+        """
+        day, week, month = self._current_buckets()
+        today = date.today()
+        week_start = (today - timedelta(days=today.weekday())).isoformat()
+        week_end = (today + timedelta(days=6 - today.weekday())).isoformat()
+        now = datetime.now().isoformat()
+        
+        category_sums = [
+            f"SUM(CASE WHEN event_category = '{c}' THEN 1 ELSE 0 END)"
+            for c in self.STATS_CATEGORIES if c != "system"
+        ]
+        known_categories = ", ".join(
+            f"'{c}'" for c in self.STATS_CATEGORIES if c != "system"
+        )
+        category_sums.append(
+            f"SUM(CASE WHEN event_category NOT IN ({known_categories}) THEN 1 ELSE 0 END)"
+        )
+        severity_sums = [
+            f"SUM(CASE WHEN COALESCE(severity, 'info') = '{sv}' THEN 1 ELSE 0 END)"
+            for sv in self.STATS_SEVERITIES if sv != "info"
+        ]
+        known_severities = ", ".join(
+            f"'{sv}'" for sv in self.STATS_SEVERITIES if sv != "info"
+        )
+        severity_sums.insert(
+            0,
+            f"SUM(CASE WHEN COALESCE(severity, 'info') NOT IN ({known_severities}) THEN 1 ELSE 0 END)"
+        )
+        columns = [f"{c}_events" for c in self.STATS_CATEGORIES] + \
+                  [f"{sv}_events" for sv in self.STATS_SEVERITIES]
+        
+        where_clause = "WHERE project_id = ?" if project_id else ""
+        params: List[Any] = [day, week_start, week_end, month, day, week, month, now]
+        if project_id:
+            params.append(project_id)
+        
+        with self._get_connection() as conn:
+            self._ensure_stats_columns(conn)
+            if project_id:
+                conn.execute("DELETE FROM event_stats WHERE project_id = ?", (project_id,))
             else:
-                # 创建新统计记录
-                cursor.execute("""
-                    INSERT INTO event_stats (
-                        project_id, total_events, task_events, issue_events,
-                        decision_events, deployment_events, system_events,
-                        info_events, warning_events, error_events, critical_events,
-                        last_event_at, last_updated
-                    ) VALUES (?, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, ?, ?)
-                """, (project_id, now, now))
-                
-                # 更新对应的分类和严重性计数
-                cursor.execute(f"""
-                    UPDATE event_stats
-                    SET {category}_events = 1, {severity}_events = 1
-                    WHERE project_id = ?
-                """, (project_id,))
+                conn.execute("DELETE FROM event_stats")
+            cursor = conn.execute(f"""
+                INSERT INTO event_stats (
+                    project_id, total_events, {", ".join(columns)},
+                    events_today, events_this_week, events_this_month,
+                    stats_day, stats_week, stats_month,
+                    last_event_at, last_updated
+                )
+                SELECT
+                    project_id,
+                    COUNT(*),
+                    {", ".join(category_sums + severity_sums)},
+                    SUM(CASE WHEN substr(occurred_at, 1, 10) = ? THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN substr(occurred_at, 1, 10) BETWEEN ? AND ? THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN substr(occurred_at, 1, 7) = ? THEN 1 ELSE 0 END),
+                    ?, ?, ?,
+                    MAX(occurred_at),
+                    ?
+                FROM project_events
+                {where_clause}
+                GROUP BY project_id
+            """, params)
+            return cursor.rowcount
     
     # ========================================================================
     # 事件类型管理
@@ -656,17 +1160,27 @@ class EventStore:
 # 工厂函数
 # ============================================================================
 
-def create_event_emitter(db_path: str = "database/data/tasks.db") -> EventEmitter:
+def create_event_emitter(
+    db_path: str = "database/data/tasks.db",
+    write_behind: bool = False,
+    **write_behind_options: Any
+) -> EventEmitter:
     """
     创建事件发射器实例
     
     Args:
         db_path: 数据库文件路径
+        write_behind: 是否使用异步写后（write-behind）发射器
+        **write_behind_options: 传给 WriteBehindEventEmitter 的参数
+            （max_queue_size/batch_size/flush_interval_ms/durability/enqueue_timeout）
         
     Returns:
         EventEmitter实例
     """
     event_store = EventStore(db_path=db_path)
+    if write_behind:
+        from .event_queue import WriteBehindEventEmitter
+        return WriteBehindEventEmitter(event_store=event_store, **write_behind_options)
     return EventEmitter(event_store=event_store)
 
 
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+记忆检索分析与热点缓存（Retrieval Analytics）
+
+retrieve_memories 每次检索都会写入 memory_retrieval_history，本模块把这些记录
+定期汇总并用于缓存预热：
+
+- RetrievalAnalytics: 按 rowid 游标增量汇总检索历史（纯SQL，json_each 展开结果ID），
+  得到每个记忆的命中次数（memory_hit_stats）和每个查询的频次（memory_query_stats）
+- HotMemoryCache: 按项目划分的有界 LRU 缓存（检索结果 + 记忆详情），
+  以 memory_project_versions 版本号校验，项目记忆有写入即整体失效
+- RetrievalAnalyticsWorker: API 进程内定期汇总，并用最热的查询/记忆预热缓存，
+  AI 会话反复加载上下文时直接从内存返回
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Tuple, Set
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import json
+import logging
+import threading
+import weakref
+
+from .db_pool import ConnectionPool
+from .memory_inheritance import ensure_memory_version_tables
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """查询文本归一化（去首尾空白、转小写，与汇总SQL的 lower(trim()) 一致），用于统计与缓存键"""
+    return (query or "").strip().lower()
+
+
+def encode_filters(filters: Dict[str, Any]) -> str:
+    """检索参数编码为稳定的JSON（去掉空值、键排序），用于统计与缓存键"""
+    return json.dumps(
+        {key: value for key, value in filters.items() if value not in (None, [], "")},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/015_memory_retrieval_analytics.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS memory_hit_stats (
+        memory_id TEXT PRIMARY KEY,
+        project_id TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        last_hit_at TEXT
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_hit_stats_project ON memory_hit_stats(project_id, hits DESC)",
+    """
+    CREATE TABLE IF NOT EXISTS memory_query_stats (
+        project_id TEXT NOT NULL,
+        query_norm TEXT NOT NULL,
+        filters TEXT NOT NULL DEFAULT '{}',
+        query_text TEXT NOT NULL,
+        query_count INTEGER NOT NULL DEFAULT 0,
+        total_results INTEGER NOT NULL DEFAULT 0,
+        last_seen_at TEXT,
+        PRIMARY KEY (project_id, query_norm, filters)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_query_stats_count ON memory_query_stats(project_id, query_count DESC)",
+    """
+    CREATE TABLE IF NOT EXISTS memory_analytics_state (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """
+)
+
+_CURSOR_NAME = "retrieval_rollup_rowid"
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_analytics_tables(pool: ConnectionPool, conn) -> None:
+    """确保分析表存在（兼容未执行 migration 015 的数据库）"""
+    ensure_memory_version_tables(pool, conn)
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+def get_project_version(pool: ConnectionPool, conn, project_id: str) -> int:
+    """项目记忆版本号（记忆写入时由触发器递增）"""
+    ensure_memory_version_tables(pool, conn)
+    row = conn.execute(
+        "SELECT version FROM memory_project_versions WHERE project_id = ?",
+        (project_id,)
+    ).fetchone()
+    return row["version"] if row else 0
+
+
+# ============================================================================
+# 检索历史汇总
+# ============================================================================
+
+class RetrievalAnalytics:
+    """检索历史增量汇总（游标记录已汇总到的 rowid，重复执行不会重复计数）"""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def _get_connection(self):
+        return self._pool.connection()
+
+    def rollup(self, batch_size: int = 50000) -> Dict[str, Any]:
+        """
+        汇总一批新的检索历史
+
+        Args:
+            batch_size: 单次最多汇总的记录数
+
+        Returns:
+            {"rows": 汇总记录数, "projects": [涉及的项目]}
+        """
+        with self._get_connection() as conn:
+            ensure_analytics_tables(self._pool, conn)
+            row = conn.execute(
+                "SELECT value FROM memory_analytics_state WHERE name = ?", (_CURSOR_NAME,)
+            ).fetchone()
+            cursor = row["value"] if row else 0
+            bounds = conn.execute("""
+                SELECT MAX(rowid) AS upper, COUNT(*) AS rows FROM (
+                    SELECT rowid FROM memory_retrieval_history
+                    WHERE rowid > ? ORDER BY rowid LIMIT ?
+                )
+            """, (cursor, batch_size)).fetchone()
+            if not bounds["rows"]:
+                return {"rows": 0, "projects": []}
+            upper = bounds["upper"]
+            window = (cursor, upper)
+
+            conn.execute("""
+                INSERT INTO memory_hit_stats (memory_id, project_id, hits, last_hit_at)
+                SELECT CAST(j.value AS TEXT), h.project_id, COUNT(*), MAX(h.retrieved_at)
+                FROM memory_retrieval_history h,
+                     json_each(CASE WHEN json_valid(h.memory_ids) THEN h.memory_ids ELSE '[]' END) AS j
+                WHERE h.rowid > ? AND h.rowid <= ? AND j.value IS NOT NULL
+                GROUP BY CAST(j.value AS TEXT), h.project_id
+                ON CONFLICT(memory_id) DO UPDATE SET
+                    hits = hits + excluded.hits,
+                    last_hit_at = MAX(COALESCE(last_hit_at, ''), excluded.last_hit_at)
+            """, window)
+
+            conn.execute("""
+                INSERT INTO memory_query_stats (
+                    project_id, query_norm, filters, query_text,
+                    query_count, total_results, last_seen_at
+                )
+                SELECT project_id, lower(trim(query_text)), COALESCE(filters, '{}'), MAX(query_text),
+                       COUNT(*), SUM(COALESCE(result_count, 0)), MAX(retrieved_at)
+                FROM memory_retrieval_history
+                WHERE rowid > ? AND rowid <= ? AND query_text IS NOT NULL AND trim(query_text) != ''
+                GROUP BY project_id, lower(trim(query_text)), COALESCE(filters, '{}')
+                ON CONFLICT(project_id, query_norm, filters) DO UPDATE SET
+                    query_count = query_count + excluded.query_count,
+                    total_results = total_results + excluded.total_results,
+                    last_seen_at = MAX(COALESCE(last_seen_at, ''), excluded.last_seen_at)
+            """, window)
+
+            projects = [
+                r["project_id"] for r in conn.execute(
+                    "SELECT DISTINCT project_id FROM memory_retrieval_history WHERE rowid > ? AND rowid <= ?",
+                    window
+                )
+            ]
+            conn.execute("""
+                INSERT INTO memory_analytics_state (name, value) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = excluded.value
+            """, (_CURSOR_NAME, upper))
+
+        return {"rows": bounds["rows"], "projects": projects}
+
+    def get_hot_memories(self, project_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """命中次数最多的记忆（已删除的记忆不返回）"""
+        with self._get_connection() as conn:
+            ensure_analytics_tables(self._pool, conn)
+            rows = conn.execute("""
+                SELECT s.memory_id, s.hits, s.last_hit_at, pm.title, pm.category, pm.importance
+                FROM memory_hit_stats s
+                JOIN project_memories pm ON pm.id = s.memory_id
+                WHERE s.project_id = ?
+                ORDER BY s.hits DESC
+                LIMIT ?
+            """, (project_id, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_top_queries(self, project_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """最常见的查询（含检索参数与平均结果数）"""
+        with self._get_connection() as conn:
+            ensure_analytics_tables(self._pool, conn)
+            rows = conn.execute("""
+                SELECT query_text, filters, query_count, total_results, last_seen_at
+                FROM memory_query_stats
+                WHERE project_id = ?
+                ORDER BY query_count DESC
+                LIMIT ?
+            """, (project_id, limit)).fetchall()
+        result = []
+        for row in rows:
+            try:
+                filters = json.loads(row["filters"])
+            except ValueError:
+                filters = {}
+            result.append({
+                "query": row["query_text"],
+                "filters": filters,
+                "count": row["query_count"],
+                "avg_results": round(row["total_results"] / row["query_count"], 2) if row["query_count"] else 0.0,
+                "last_seen_at": row["last_seen_at"]
+            })
+        return result
+
+
+# ============================================================================
+# 热点缓存
+# ============================================================================
+
+class _ProjectCache:
+    def __init__(self, version: int):
+        self.version = version
+        self.queries: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self.memories: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+class HotMemoryCache:
+    """
+    按项目划分的有界 LRU 缓存
+
+    每个项目的缓存区记录写入时的版本号，读取时版本号不一致则整体清空。
+    返回浅拷贝，调用方修改结果不影响缓存。
+    """
+
+    def __init__(self, max_queries: int = 200, max_memories: int = 500, max_projects: int = 64):
+        self.max_queries = max_queries
+        self.max_memories = max_memories
+        self.max_projects = max_projects
+        self._projects: "OrderedDict[str, _ProjectCache]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"query_hits": 0, "query_misses": 0, "memory_hits": 0, "memory_misses": 0, "warmed": 0}
+
+    def _region(self, project_id: str, version: int, create: bool) -> Optional[_ProjectCache]:
+        region = self._projects.get(project_id)
+        if region is not None and region.version != version:
+            region = None
+            del self._projects[project_id]
+        if region is None and create:
+            region = _ProjectCache(version)
+            self._projects[project_id] = region
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+        if region is not None:
+            self._projects.move_to_end(project_id)
+        return region
+
+    def get_query(self, project_id: str, version: int, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            region = self._region(project_id, version, create=False)
+            results = region.queries.get(key) if region is not None else None
+            if results is None:
+                self.stats["query_misses"] += 1
+                return None
+            region.queries.move_to_end(key)
+            self.stats["query_hits"] += 1
+            return [dict(memory) for memory in results]
+
+    def put_query(self, project_id: str, version: int, key: Tuple, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            region = self._region(project_id, version, create=True)
+            region.queries[key] = [dict(memory) for memory in results]
+            region.queries.move_to_end(key)
+            while len(region.queries) > self.max_queries:
+                region.queries.popitem(last=False)
+
+    def get_memory(self, project_id: str, version: int, memory_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            region = self._region(project_id, version, create=False)
+            memory = region.memories.get(memory_id) if region is not None else None
+            if memory is None:
+                self.stats["memory_misses"] += 1
+                return None
+            region.memories.move_to_end(memory_id)
+            self.stats["memory_hits"] += 1
+            return dict(memory)
+
+    def put_memory(self, project_id: str, version: int, memory: Dict[str, Any]) -> None:
+        with self._lock:
+            region = self._region(project_id, version, create=True)
+            region.memories[memory["id"]] = dict(memory)
+            region.memories.move_to_end(memory["id"])
+            while len(region.memories) > self.max_memories:
+                region.memories.popitem(last=False)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        with self._lock:
+            if project_id is None:
+                self._projects.clear()
+            else:
+                self._projects.pop(project_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "projects": len(self._projects),
+                "queries": sum(len(region.queries) for region in self._projects.values()),
+                "memories": sum(len(region.memories) for region in self._projects.values())
+            }
+
+
+# ============================================================================
+# 定期汇总与预热
+# ============================================================================
+
+class RetrievalAnalyticsWorker:
+    """
+    API 进程内的定期任务：汇总检索历史，并为有新检索的项目预热热点缓存
+
+    warm 回调（通常为 ProjectMemoryService.warm_hot_cache）在线程池中执行。
+    """
+
+    def __init__(
+        self,
+        analytics: RetrievalAnalytics,
+        warm: Optional[Callable[[str], Dict[str, Any]]] = None,
+        interval: float = 60.0
+    ):
+        self.analytics = analytics
+        self.warm = warm
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self.stats = {"runs": 0, "rows": 0, "warmed_projects": 0, "last_run_at": None}
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Retrieval analytics worker started")
+
+    async def stop(self) -> None:
+        self.is_running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Retrieval analytics worker stopped")
+
+    async def _run(self) -> None:
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retrieval analytics rollup failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """汇总一次并预热涉及的项目"""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, self.analytics.rollup)
+        projects: Set[str] = set(result["projects"])
+        if self.warm is not None:
+            for project_id in projects:
+                await loop.run_in_executor(None, self.warm, project_id)
+        self.stats["runs"] += 1
+        self.stats["rows"] += result["rows"]
+        self.stats["warmed_projects"] += len(projects) if self.warm is not None else 0
+        self.stats["last_run_at"] = datetime.now().isoformat()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "is_running": self.is_running, "interval": self.interval}
@@ -0,0 +1,742 @@
+# -*- coding: utf-8 -*-
+"""
+记忆压实与归档（Memory Compaction）
+
+对话自动记录会为每个符合条件的轮次写入一条完整记录，project_memories 持续增长且存在大量近似重复。
+本模块提供后台压实任务：
+
+- 近似去重：在字符 3-gram 上计算 MinHash 签名，按 LSH 分段分桶找候选（段数/行数按 Jaccard 0.85 调整），
+  再以 3-gram Jaccard 相似度确认；同项目、同类型/分类的重复记忆合并到保留记忆
+  （标签/关联合并，关系改指向保留记忆）
+- 冷数据归档：重要性低、从未被检索/访问且超过 N 天的记忆连同其关系压缩
+  （zstd，未安装 zstandard 时用 zlib）写入 memory_archive，可恢复
+- 删除较多时 VACUUM 回收空间
+
+MinHash 签名缓存在 memory_fingerprints，由触发器在记忆内容变更/删除时清除，每次只为新记忆计算签名。
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterable, Callable
+from collections import defaultdict
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import struct
+import threading
+import weakref
+import zlib
+
+from .db_pool import ConnectionPool
+from .memory_analytics import ensure_analytics_tables
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+# MinHash / LSH 参数：Jaccard 为 s 的一对记忆成为候选的概率为 1 - (1 - s^rows)^bands，
+# 20段×5行时 s=0.85 约 0.99999，s=0.5 约 0.47，s=0.3 约 0.05（候选再以精确 Jaccard 确认）
+MINHASH_PERMUTATIONS = 100
+LSH_BANDS = 20
+LSH_ROWS = 5
+_SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# 固定种子：签名缓存在数据库中，跨进程必须使用同一组哈希函数
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+del _rng
+_SIGNATURE_FORMAT = f"<{MINHASH_PERMUTATIONS}I"
+
+
+# ============================================================================
+# 指纹
+# ============================================================================
+
+def shingles(text: Optional[str]) -> Set[str]:
+    """文本归一化（转小写、合并空白）后的字符 3-gram 集合"""
+    normalized = " ".join((text or "").split()).lower()
+    if len(normalized) <= _SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + _SHINGLE_SIZE] for i in range(len(normalized) - _SHINGLE_SIZE + 1)}
+
+
+def minhash(features: Iterable[str]) -> Tuple[int, ...]:
+    """
+    MinHash 签名（MINHASH_PERMUTATIONS 个 32 位最小哈希）
+
+    每个特征取 blake2b 4 字节摘要，再经 (a*x + b) mod p 的一组哈希函数置换后取最小值；
+    两个集合签名中相同位置相等的比例是其 Jaccard 相似度的无偏估计。
+    """
+    values = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "little") for f in features]
+    if not values:
+        return (_MAX_HASH,) * MINHASH_PERMUTATIONS
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in values) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def lsh_candidate_probability(similarity: float, bands: int = LSH_BANDS, rows: int = LSH_ROWS) -> float:
+    """Jaccard 为 similarity 的两条记忆在至少一段中签名完全相同（成为候选）的概率"""
+    return 1.0 - (1.0 - similarity ** rows) ** bands
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _pack_signature(signature: Tuple[int, ...]) -> bytes:
+    return struct.pack(_SIGNATURE_FORMAT, *signature)
+
+
+def _unpack_signature(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(_SIGNATURE_FORMAT, blob)
+
+
+def compress_payload(data: Dict[str, Any]) -> Tuple[str, bytes]:
+    """归档内容序列化并压缩，返回（编码, 数据）"""
+    raw = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=10).compress(raw)
+    return CODEC_ZLIB, zlib.compress(raw, 9)
+
+
+def decompress_payload(codec: str, blob: bytes) -> Dict[str, Any]:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard not installed, cannot read zstd archive")
+        raw = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        raw = zlib.decompress(blob)
+    return json.loads(raw.decode("utf-8"))
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/016_memory_compaction.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS memory_fingerprints (
+        memory_id TEXT PRIMARY KEY,
+        project_id TEXT NOT NULL,
+        signature BLOB NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_fingerprints_project ON memory_fingerprints(project_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memory_fingerprints_update
+    AFTER UPDATE OF title, content ON project_memories
+    BEGIN
+        DELETE FROM memory_fingerprints WHERE memory_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memory_fingerprints_delete AFTER DELETE ON project_memories
+    BEGIN
+        DELETE FROM memory_fingerprints WHERE memory_id = OLD.id;
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memory_archive (
+        memory_id TEXT PRIMARY KEY,
+        project_id TEXT NOT NULL,
+        memory_type TEXT,
+        category TEXT,
+        title TEXT,
+        importance INTEGER,
+        reason TEXT NOT NULL,
+        merged_into TEXT,
+        created_at TEXT,
+        archived_at TEXT NOT NULL,
+        codec TEXT NOT NULL,
+        payload BLOB NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_archive_project ON memory_archive(project_id, archived_at DESC)"
+)
+
+# 合并/归档用到的使用统计列（v5 schema 有，migration 003 建的表没有）
+_USAGE_COLUMNS = ("access_count", "reference_count")
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_compaction_tables(pool: ConnectionPool, conn) -> None:
+    """确保指纹表、归档表、触发器与使用统计列存在（兼容未执行 migration 016 的数据库）"""
+    ensure_analytics_tables(pool, conn)
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(project_memories)")}
+    for column in _USAGE_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE project_memories ADD COLUMN {column} INTEGER DEFAULT 0")
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+ARCHIVE_REASON_MERGED = "merged"
+ARCHIVE_REASON_STALE = "stale"
+
+_LIST_FIELDS = ("tags", "related_tasks", "related_issues")
+
+
+def _load_list(raw: Optional[str]) -> List[Any]:
+    if not raw:
+        return []
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a: str, b: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+# ============================================================================
+# 压实
+# ============================================================================
+
+class MemoryCompactor:
+    """项目记忆近似去重、冷数据归档与空间回收"""
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        min_similarity: float = 0.85,
+        bands: int = LSH_BANDS,
+        rows: int = LSH_ROWS
+    ):
+        """
+        Args:
+            pool: 共享连接池
+            min_similarity: 确认重复所需的 3-gram Jaccard 相似度
+            bands: LSH 段数
+            rows: 每段的最小哈希个数（bands * rows 不超过 MINHASH_PERMUTATIONS）；
+                  调整阈值时应保证 lsh_candidate_probability(min_similarity) 接近 1
+        """
+        if bands * rows > MINHASH_PERMUTATIONS:
+            raise ValueError(f"bands * rows must not exceed {MINHASH_PERMUTATIONS}")
+        self._pool = pool
+        self.min_similarity = min_similarity
+        self.bands = bands
+        self.rows = rows
+
+    def _get_connection(self):
+        return self._pool.connection()
+
+    @staticmethod
+    def _features(title: Optional[str], content: Optional[str]) -> Set[str]:
+        return shingles(f"{title or ''}\n{content or ''}")
+
+    def refresh_fingerprints(self, project_id: str, batch_size: int = 500) -> int:
+        """为尚无签名的记忆计算 MinHash，返回新计算的数量"""
+        computed = 0
+        while True:
+            with self._get_connection() as conn:
+                ensure_compaction_tables(self._pool, conn)
+                rows = conn.execute("""
+                    SELECT pm.id, pm.title, pm.content
+                    FROM project_memories pm
+                    LEFT JOIN memory_fingerprints f ON f.memory_id = pm.id
+                    WHERE pm.project_id = ? AND f.memory_id IS NULL
+                    LIMIT ?
+                """, (project_id, batch_size)).fetchall()
+                if not rows:
+                    return computed
+                conn.executemany(
+                    "INSERT OR REPLACE INTO memory_fingerprints (memory_id, project_id, signature) VALUES (?, ?, ?)",
+                    [
+                        (row["id"], project_id, _pack_signature(minhash(self._features(row["title"], row["content"]))))
+                        for row in rows
+                    ]
+                )
+            computed += len(rows)
+
+    def find_duplicates(self, project_id: str) -> List[List[str]]:
+        """
+        查找近似重复的记忆簇（同项目、同类型、同分类）
+
+        Returns:
+            记忆ID簇列表（每簇至少2条）
+        """
+        self.refresh_fingerprints(project_id)
+        with self._get_connection() as conn:
+            rows = conn.execute("""
+                SELECT f.memory_id, f.signature, pm.memory_type, pm.category
+                FROM memory_fingerprints f
+                JOIN project_memories pm ON pm.id = f.memory_id
+                WHERE f.project_id = ?
+            """, (project_id,)).fetchall()
+
+        # LSH：签名按 rows 个一段切分，任意一段完全相同即成为候选
+        buckets: Dict[Tuple, List[str]] = defaultdict(list)
+        for row in rows:
+            signature = _unpack_signature(row["signature"])
+            for band in range(self.bands):
+                key = (row["memory_type"], row["category"], band,
+                       signature[band * self.rows:(band + 1) * self.rows])
+                buckets[key].append(row["memory_id"])
+        groups_to_check = [members for members in buckets.values() if len(members) > 1]
+        if not groups_to_check:
+            return []
+
+        # 候选对以 3-gram Jaccard 确认；已在同一簇中的候选对不再重复计算
+        features = self._load_features({memory_id for members in groups_to_check for memory_id in members})
+        clusters = _DisjointSet()
+        checked: Set[Tuple[str, str]] = set()
+        for members in groups_to_check:
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    left, right = sorted((members[i], members[j]))
+                    if (left, right) in checked or clusters.find(left) == clusters.find(right):
+                        continue
+                    checked.add((left, right))
+                    if jaccard(features[left], features[right]) >= self.min_similarity:
+                        clusters.union(left, right)
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for memory_id in clusters.parent:
+            groups[clusters.find(memory_id)].append(memory_id)
+        return [sorted(group) for group in groups.values() if len(group) > 1]
+
+    def _load_features(self, memory_ids: Set[str]) -> Dict[str, Set[str]]:
+        features: Dict[str, Set[str]] = {}
+        ids = list(memory_ids)
+        with self._get_connection() as conn:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row in conn.execute(
+                    f"SELECT id, title, content FROM project_memories WHERE id IN ({placeholders})", batch
+                ):
+                    features[row["id"]] = self._features(row["title"], row["content"])
+        return features
+
+    def merge_cluster(self, conn, memory_ids: List[str]) -> Optional[str]:
+        """
+        合并一簇重复记忆（需在事务中调用）
+
+        保留重要性最高、命中最多、最新的一条；其余记忆的标签/关联任务/关联问题并入保留记忆，
+        访问与引用计数累加，关系改指向保留记忆，原记录归档后删除。
+
+        Returns:
+            保留记忆ID；簇内记忆已不存在时返回None
+        """
+        ensure_compaction_tables(self._pool, conn)
+        placeholders = ",".join("?" * len(memory_ids))
+        rows = conn.execute(f"""
+            SELECT pm.*, COALESCE(s.hits, 0) AS _hits
+            FROM project_memories pm
+            LEFT JOIN memory_hit_stats s ON s.memory_id = pm.id
+            WHERE pm.id IN ({placeholders})
+        """, memory_ids).fetchall()
+        if len(rows) < 2:
+            return None
+        ordered = sorted(
+            rows,
+            key=lambda row: (
+                row["importance"] or 0,
+                row["_hits"] + (row["access_count"] or 0),
+                row["created_at"] or ""
+            ),
+            reverse=True
+        )
+        survivor, duplicates = ordered[0], ordered[1:]
+        survivor_id = survivor["id"]
+
+        merged_lists = {field: _load_list(survivor[field]) for field in _LIST_FIELDS}
+        for row in duplicates:
+            for field in _LIST_FIELDS:
+                for value in _load_list(row[field]):
+                    if value not in merged_lists[field]:
+                        merged_lists[field].append(value)
+
+        conn.execute("""
+            UPDATE project_memories SET
+                importance = ?, tags = ?, related_tasks = ?, related_issues = ?,
+                access_count = ?, reference_count = ?, updated_at = ?
+            WHERE id = ?
+        """, (
+            max(row["importance"] or 0 for row in rows),
+            json.dumps(merged_lists["tags"], ensure_ascii=False),
+            json.dumps(merged_lists["related_tasks"], ensure_ascii=False),
+            json.dumps(merged_lists["related_issues"], ensure_ascii=False),
+            sum(row["access_count"] or 0 for row in rows),
+            sum(row["reference_count"] or 0 for row in rows),
+            datetime.now().isoformat(),
+            survivor_id
+        ))
+
+        for row in duplicates:
+            self._archive_row(conn, row, ARCHIVE_REASON_MERGED, merged_into=survivor_id)
+            # 关系改指向保留记忆；与已有关系冲突时保留较大强度
+            conn.execute("""
+                UPDATE memory_relations SET strength = MAX(strength, (
+                    SELECT MAX(d.strength) FROM memory_relations d
+                    WHERE d.source_memory_id = ? AND d.target_memory_id = memory_relations.target_memory_id
+                      AND d.relation_type = memory_relations.relation_type
+                ))
+                WHERE source_memory_id = ? AND EXISTS (
+                    SELECT 1 FROM memory_relations d
+                    WHERE d.source_memory_id = ? AND d.target_memory_id = memory_relations.target_memory_id
+                      AND d.relation_type = memory_relations.relation_type
+                )
+            """, (row["id"], survivor_id, row["id"]))
+            conn.execute("""
+                UPDATE memory_relations SET strength = MAX(strength, (
+                    SELECT MAX(d.strength) FROM memory_relations d
+                    WHERE d.target_memory_id = ? AND d.source_memory_id = memory_relations.source_memory_id
+                      AND d.relation_type = memory_relations.relation_type
+                ))
+                WHERE target_memory_id = ? AND EXISTS (
+                    SELECT 1 FROM memory_relations d
+                    WHERE d.target_memory_id = ? AND d.source_memory_id = memory_relations.source_memory_id
+                      AND d.relation_type = memory_relations.relation_type
+                )
+            """, (row["id"], survivor_id, row["id"]))
+            # memory_relations 没有 (源, 目标, 类型) 唯一约束，冲突的关系显式删除后再改指向
+            conn.execute("""
+                DELETE FROM memory_relations
+                WHERE source_memory_id = ? AND EXISTS (
+                    SELECT 1 FROM memory_relations s
+                    WHERE s.source_memory_id = ? AND s.target_memory_id = memory_relations.target_memory_id
+                      AND s.relation_type = memory_relations.relation_type
+                )
+            """, (row["id"], survivor_id))
+            conn.execute("""
+                DELETE FROM memory_relations
+                WHERE target_memory_id = ? AND EXISTS (
+                    SELECT 1 FROM memory_relations s
+                    WHERE s.target_memory_id = ? AND s.source_memory_id = memory_relations.source_memory_id
+                      AND s.relation_type = memory_relations.relation_type
+                )
+            """, (row["id"], survivor_id))
+            conn.execute(
+                "UPDATE memory_relations SET source_memory_id = ? WHERE source_memory_id = ?",
+                (survivor_id, row["id"])
+            )
+            conn.execute(
+                "UPDATE memory_relations SET target_memory_id = ? WHERE target_memory_id = ?",
+                (survivor_id, row["id"])
+            )
+            # 命中统计并入保留记忆
+            if row["_hits"]:
+                conn.execute("""
+                    INSERT INTO memory_hit_stats (memory_id, project_id, hits, last_hit_at)
+                    SELECT ?, project_id, hits, last_hit_at FROM memory_hit_stats WHERE memory_id = ?
+                    ON CONFLICT(memory_id) DO UPDATE SET
+                        hits = hits + excluded.hits,
+                        last_hit_at = MAX(COALESCE(last_hit_at, ''), excluded.last_hit_at)
+                """, (survivor_id, row["id"]))
+            conn.execute("DELETE FROM memory_hit_stats WHERE memory_id = ?", (row["id"],))
+            conn.execute("DELETE FROM project_memories WHERE id = ?", (row["id"],))
+
+        # 互为重复的记忆之间的关系合并后成为自环
+        conn.execute(
+            "DELETE FROM memory_relations WHERE source_memory_id = ? AND target_memory_id = ?",
+            (survivor_id, survivor_id)
+        )
+        return survivor_id
+
+    def _archive_row(self, conn, row, reason: str, merged_into: Optional[str] = None) -> None:
+        """记忆及其关系压缩写入归档表"""
+        memory = {key: row[key] for key in row.keys() if not key.startswith("_")}
+        relations = [
+            dict(relation) for relation in conn.execute(
+                "SELECT * FROM memory_relations WHERE source_memory_id = ? OR target_memory_id = ?",
+                (row["id"], row["id"])
+            )
+        ]
+        codec, payload = compress_payload({"memory": memory, "relations": relations})
+        conn.execute("""
+            INSERT OR REPLACE INTO memory_archive (
+                memory_id, project_id, memory_type, category, title, importance,
+                reason, merged_into, created_at, archived_at, codec, payload
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            row["id"], row["project_id"], row["memory_type"], row["category"], row["title"],
+            row["importance"], reason, merged_into, row["created_at"],
+            datetime.now().isoformat(), codec, payload
+        ))
+
+    def find_stale(
+        self,
+        project_id: str,
+        older_than_days: int = 90,
+        max_importance: int = 3,
+        limit: int = 1000
+    ) -> List[str]:
+        """重要性低、从未被检索或访问、未被引用且早于 N 天的记忆"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        with self._get_connection() as conn:
+            ensure_compaction_tables(self._pool, conn)
+            rows = conn.execute("""
+                SELECT pm.id FROM project_memories pm
+                WHERE pm.project_id = ?
+                  AND COALESCE(pm.importance, 5) <= ?
+                  AND pm.created_at < ?
+                  AND COALESCE(pm.access_count, 0) = 0
+                  AND COALESCE(pm.reference_count, 0) = 0
+                  AND NOT EXISTS (SELECT 1 FROM memory_hit_stats s WHERE s.memory_id = pm.id)
+                ORDER BY pm.created_at
+                LIMIT ?
+            """, (project_id, max_importance, cutoff, limit)).fetchall()
+        return [row["id"] for row in rows]
+
+    def archive(self, conn, memory_ids: List[str]) -> int:
+        """归档并删除记忆及其关系（需在事务中调用），返回归档数量"""
+        ensure_compaction_tables(self._pool, conn)
+        archived = 0
+        for start in range(0, len(memory_ids), 500):
+            batch = memory_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(f"SELECT * FROM project_memories WHERE id IN ({placeholders})", batch).fetchall()
+            for row in rows:
+                self._archive_row(conn, row, ARCHIVE_REASON_STALE)
+            conn.execute(
+                f"DELETE FROM memory_relations WHERE source_memory_id IN ({placeholders}) "
+                f"OR target_memory_id IN ({placeholders})",
+                batch + batch
+            )
+            conn.execute(f"DELETE FROM project_memories WHERE id IN ({placeholders})", batch)
+            archived += len(rows)
+        return archived
+
+    def compact(
+        self,
+        project_id: str,
+        older_than_days: int = 90,
+        max_importance: int = 3,
+        archive_limit: int = 1000,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        压实项目记忆：合并近似重复，归档冷数据
+
+        Args:
+            project_id: 项目ID
+            older_than_days: 归档的最小记忆年龄（天）
+            max_importance: 归档的最大重要性
+            archive_limit: 单次最多归档数量
+            dry_run: 只返回将要合并/归档的记忆，不做修改
+
+        Returns:
+            压实报告
+        """
+        clusters = self.find_duplicates(project_id)
+        stale = self.find_stale(project_id, older_than_days, max_importance, archive_limit)
+        report: Dict[str, Any] = {
+            "project_id": project_id,
+            "dry_run": dry_run,
+            "duplicate_clusters": clusters if dry_run else len(clusters),
+            "merged": sum(len(cluster) - 1 for cluster in clusters),
+            "stale": stale if dry_run else len(stale),
+            "archived": len(stale)
+        }
+        if dry_run:
+            return report
+
+        merged = 0
+        survivors: Set[str] = set()
+        with self._get_connection() as conn:
+            for cluster in clusters:
+                survivor_id = self.merge_cluster(conn, cluster)
+                if survivor_id is not None:
+                    survivors.add(survivor_id)
+                    merged += len(cluster) - 1
+            report["merged"] = merged
+            # 刚合并的保留记忆不参与本次归档
+            report["archived"] = self.archive(conn, [memory_id for memory_id in stale if memory_id not in survivors])
+        return report
+
+    def vacuum_if_needed(self, min_free_ratio: float = 0.2) -> bool:
+        """空闲页占比超过阈值时执行 VACUUM，返回是否执行"""
+        with self._get_connection() as conn:
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not page_count or free_count / page_count < min_free_ratio:
+                return False
+            if conn.in_transaction:
+                # 嵌套在外层事务中时不能 VACUUM
+                return False
+            conn.execute("VACUUM")
+        logger.info(f"Vacuumed memory database: {free_count}/{page_count} free pages reclaimed")
+        return True
+
+    def list_projects(self) -> List[str]:
+        with self._get_connection() as conn:
+            return [row["project_id"] for row in conn.execute("SELECT DISTINCT project_id FROM project_memories")]
+
+    def list_archive(self, project_id: str, limit: int = 100, reason: Optional[str] = None) -> List[Dict[str, Any]]:
+        """归档记录列表（不含压缩内容）"""
+        sql = """
+            SELECT memory_id, project_id, memory_type, category, title, importance,
+                   reason, merged_into, created_at, archived_at, codec, length(payload) AS payload_bytes
+            FROM memory_archive WHERE project_id = ?
+        """
+        params: List[Any] = [project_id]
+        if reason:
+            sql += " AND reason = ?"
+            params.append(reason)
+        sql += " ORDER BY archived_at DESC LIMIT ?"
+        params.append(limit)
+        with self._get_connection() as conn:
+            ensure_compaction_tables(self._pool, conn)
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def restore(self, project_id: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        从归档恢复记忆及其关系（另一端记忆已不存在的关系跳过）
+
+        Returns:
+            恢复的记忆行；归档不存在时返回None
+        """
+        with self._get_connection() as conn:
+            ensure_compaction_tables(self._pool, conn)
+            row = conn.execute(
+                "SELECT codec, payload FROM memory_archive WHERE memory_id = ? AND project_id = ?",
+                (memory_id, project_id)
+            ).fetchone()
+            if row is None:
+                return None
+            data = decompress_payload(row["codec"], row["payload"])
+            memory = data["memory"]
+            columns = list(memory)
+            # 不用 OR REPLACE：替换删除不触发删除触发器，且会改写触发器内的冲突处理
+            conn.execute(
+                f"INSERT INTO project_memories ({', '.join(columns)}) "
+                f"SELECT {', '.join('?' * len(columns))} "
+                f"WHERE NOT EXISTS (SELECT 1 FROM project_memories WHERE id = ?)",
+                [memory[column] for column in columns] + [memory_id]
+            )
+            for relation in data.get("relations", []):
+                other = (
+                    relation["target_memory_id"]
+                    if relation["source_memory_id"] == memory_id else relation["source_memory_id"]
+                )
+                if not conn.execute("SELECT 1 FROM project_memories WHERE id = ?", (other,)).fetchone():
+                    continue
+                relation_columns = list(relation)
+                conn.execute(
+                    f"INSERT OR IGNORE INTO memory_relations ({', '.join(relation_columns)}) "
+                    f"VALUES ({', '.join('?' * len(relation_columns))})",
+                    [relation[column] for column in relation_columns]
+                )
+            conn.execute("DELETE FROM memory_archive WHERE memory_id = ?", (memory_id,))
+        return memory
+
+
+# ============================================================================
+# 定期压实
+# ============================================================================
+
+class MemoryCompactionWorker:
+    """
+    API 进程内的定期压实任务（逐项目合并/归档，结束后按需 VACUUM）
+
+    rollup 回调（通常为 RetrievalAnalytics.rollup）在压实前执行，保证“从未被检索”基于最新统计。
+    """
+
+    def __init__(
+        self,
+        compactor: MemoryCompactor,
+        rollup: Optional[Callable[[], Any]] = None,
+        interval: float = 6 * 3600.0,
+        older_than_days: int = 90,
+        max_importance: int = 3
+    ):
+        self.compactor = compactor
+        self.rollup = rollup
+        self.interval = interval
+        self.older_than_days = older_than_days
+        self.max_importance = max_importance
+        self._task: Optional[asyncio.Task] = None
+        self.is_running = False
+        self.stats = {"runs": 0, "merged": 0, "archived": 0, "vacuums": 0, "last_run_at": None}
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Memory compaction worker started")
+
+    async def stop(self) -> None:
+        self.is_running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Memory compaction worker stopped")
+
+    async def _run(self) -> None:
+        while self.is_running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Memory compaction failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        reports = []
+        if self.rollup is not None:
+            await loop.run_in_executor(None, self.rollup)
+        for project_id in await loop.run_in_executor(None, self.compactor.list_projects):
+            report = await loop.run_in_executor(
+                None,
+                lambda: self.compactor.compact(project_id, self.older_than_days, self.max_importance)
+            )
+            self.stats["merged"] += report["merged"]
+            self.stats["archived"] += report["archived"]
+            reports.append(report)
+        if any(report["merged"] or report["archived"] for report in reports):
+            if await loop.run_in_executor(None, self.compactor.vacuum_if_needed):
+                self.stats["vacuums"] += 1
+        self.stats["runs"] += 1
+        self.stats["last_run_at"] = datetime.now().isoformat()
+        return reports
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "is_running": self.is_running, "interval": self.interval}
@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+项目记忆关系图谱（Memory Relation Graph）
+
+把 memory_relations 按项目加载为内存邻接表，支持多跳遍历：
+- 直接关联 / k跳邻域（BFS）
+- 最强关联路径（Dijkstra，边代价 -ln(strength)，即路径强度乘积最大）
+- 连通分量、整图导出（知识星图一次请求渲染）
+
+图按需加载，并以 memory_project_versions 版本号判断是否过期：
+- 本进程写入（create_memory / create_memory_relation）增量更新图：
+  在副本上应用变更后整体替换（写时复制），已发布的图不再修改，读取方遍历无需加锁
+- 其他进程写入使版本号变化，下次访问时重新加载
+关系按无向图遍历（与原一跳查询一致），relation_type 保留原方向。
+"""
+
+from typing import List, Dict, Any, Optional, Iterable, Callable, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from collections import deque
+import heapq
+import math
+import threading
+import weakref
+
+from .db_pool import ConnectionPool
+from .memory_inheritance import ensure_memory_version_tables
+
+
+@dataclass
+class RelationEdge:
+    """记忆关系（边）"""
+    id: str
+    source_memory_id: str
+    target_memory_id: str
+    relation_type: str
+    strength: float
+
+    def other(self, memory_id: str) -> str:
+        return self.target_memory_id if memory_id == self.source_memory_id else self.source_memory_id
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/014_memory_graph.sql 保持一致）
+# ============================================================================
+
+def _bump_relation_version(row: str) -> str:
+    return f"""
+        INSERT INTO memory_project_versions (project_id, version)
+        SELECT project_id, 1 FROM project_memories WHERE id = {row}.source_memory_id
+        ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+    """
+
+
+_SCHEMA_STATEMENTS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_insert AFTER INSERT ON memory_relations
+    BEGIN
+        {_bump_relation_version("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_update
+    AFTER UPDATE OF source_memory_id, target_memory_id, relation_type, strength ON memory_relations
+    BEGIN
+        {_bump_relation_version("OLD")}
+        {_bump_relation_version("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_relation_versions_delete AFTER DELETE ON memory_relations
+    BEGIN
+        {_bump_relation_version("OLD")}
+    END
+    """
+)
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_memory_graph_tables(pool: ConnectionPool, conn) -> None:
+    """确保版本表及关系触发器存在（兼容未执行 migration 013/014 的数据库）"""
+    ensure_memory_version_tables(pool, conn)
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+def _get_version(conn, project_id: str) -> int:
+    row = conn.execute(
+        "SELECT version FROM memory_project_versions WHERE project_id = ?",
+        (project_id,)
+    ).fetchone()
+    return row["version"] if row else 0
+
+
+# ============================================================================
+# 图结构
+# ============================================================================
+
+class MemoryGraph:
+    """
+    单个项目的记忆关系图（邻接表）
+
+    由 MemoryGraphStore 发布后视为只读（连通分量缓存除外），变更在 copy() 的副本上进行。
+    """
+
+    def __init__(self, project_id: str, version: int = 0):
+        self.project_id = project_id
+        self.version = version
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[str, RelationEdge] = {}
+        self.adjacency: Dict[str, List[RelationEdge]] = {}
+        # 连通分量缓存（图变更时清空）
+        self._components: Dict[Tuple, List[List[str]]] = {}
+
+    # ------------------------------------------------------------------
+    # 变更
+    # ------------------------------------------------------------------
+
+    def copy(self) -> "MemoryGraph":
+        """复制图结构（节点属性与边对象共享，邻接列表各自复制）"""
+        graph = MemoryGraph(self.project_id, self.version)
+        graph.nodes = dict(self.nodes)
+        graph.edges = dict(self.edges)
+        graph.adjacency = {memory_id: list(edges) for memory_id, edges in self.adjacency.items()}
+        return graph
+
+    def add_node(self, memory_id: str, title: str, category: str, importance: int) -> None:
+        self._components.clear()
+        self.nodes[memory_id] = {
+            "id": memory_id,
+            "title": title,
+            "type": category,
+            "importance": importance
+        }
+        self.adjacency.setdefault(memory_id, [])
+
+    def add_edge(self, edge: RelationEdge) -> None:
+        """添加关系；两端都必须是本项目记忆，同ID关系覆盖"""
+        if edge.source_memory_id not in self.nodes or edge.target_memory_id not in self.nodes:
+            return
+        self._components.clear()
+        if edge.id in self.edges:
+            self.remove_edge(edge.id)
+        self.edges[edge.id] = edge
+        self.adjacency[edge.source_memory_id].append(edge)
+        if edge.target_memory_id != edge.source_memory_id:
+            self.adjacency[edge.target_memory_id].append(edge)
+
+    def remove_edge(self, relation_id: str) -> None:
+        edge = self.edges.pop(relation_id, None)
+        if edge is None:
+            return
+        self._components.clear()
+        for memory_id in {edge.source_memory_id, edge.target_memory_id}:
+            self.adjacency[memory_id] = [e for e in self.adjacency[memory_id] if e.id != relation_id]
+
+    # ------------------------------------------------------------------
+    # 遍历
+    # ------------------------------------------------------------------
+
+    def iter_edges(
+        self,
+        memory_id: str,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0
+    ) -> Iterable[RelationEdge]:
+        """节点的关联边（按类型与强度过滤）"""
+        types = set(relation_types) if relation_types else None
+        for edge in self.adjacency.get(memory_id, ()):
+            if edge.strength < min_strength:
+                continue
+            if types is not None and edge.relation_type not in types:
+                continue
+            yield edge
+
+    def neighbors(
+        self,
+        memory_id: str,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0
+    ) -> List[Tuple[RelationEdge, str]]:
+        """直接关联（每条关系一项），按强度、重要性降序"""
+        result = [
+            (edge, edge.other(memory_id))
+            for edge in self.iter_edges(memory_id, relation_types, min_strength)
+        ]
+        result.sort(key=lambda item: (
+            -item[0].strength,
+            -(self.nodes[item[1]]["importance"] or 0)
+        ))
+        return result
+
+    def k_hop(
+        self,
+        memory_id: str,
+        depth: int,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0
+    ) -> Dict[str, int]:
+        """k跳邻域（BFS），返回 {记忆ID: 跳数}，不含起点"""
+        if memory_id not in self.nodes:
+            return {}
+        hops = {memory_id: 0}
+        queue = deque([memory_id])
+        while queue:
+            current = queue.popleft()
+            if hops[current] >= depth:
+                continue
+            for edge in self.iter_edges(current, relation_types, min_strength):
+                neighbor = edge.other(current)
+                if neighbor not in hops:
+                    hops[neighbor] = hops[current] + 1
+                    queue.append(neighbor)
+        del hops[memory_id]
+        return hops
+
+    def strongest_paths(
+        self,
+        memory_id: str,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0,
+        max_depth: Optional[int] = None,
+        target_id: Optional[str] = None
+    ) -> Dict[str, Tuple[float, List[str]]]:
+        """
+        最强关联路径
+
+        边代价为 -ln(strength)，代价最小即路径强度（各边强度乘积）最大。
+        不限跳数时用 Dijkstra；限制跳数时逐层松弛（每层只从当前最优的节点继续扩展）。
+
+        Returns:
+            {记忆ID: (路径强度, 路径节点列表)}，不含起点；指定 target_id 时找到即停止
+        """
+        if memory_id not in self.nodes:
+            return {}
+        if max_depth is None:
+            best = self._dijkstra(memory_id, relation_types, min_strength, target_id)
+        else:
+            best = self._layered(memory_id, relation_types, min_strength, max_depth)
+        return {node: (math.exp(-cost), path) for node, (cost, path) in best.items()}
+
+    def _weighted_edges(self, memory_id, relation_types, min_strength):
+        for edge in self.iter_edges(memory_id, relation_types, min_strength):
+            if edge.strength > 0:
+                yield edge.other(memory_id), -math.log(min(edge.strength, 1.0))
+
+    def _dijkstra(self, start, relation_types, min_strength, target_id):
+        costs = {start: 0.0}
+        previous: Dict[str, str] = {}
+        done: Dict[str, float] = {}
+        heap = [(0.0, start)]
+        while heap:
+            cost, current = heapq.heappop(heap)
+            if current in done:
+                continue
+            done[current] = cost
+            if current == target_id:
+                break
+            for neighbor, weight in self._weighted_edges(current, relation_types, min_strength):
+                new_cost = cost + weight
+                if neighbor not in costs or new_cost < costs[neighbor]:
+                    costs[neighbor] = new_cost
+                    previous[neighbor] = current
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        best = {}
+        for node, cost in done.items():
+            if node == start:
+                continue
+            path = [node]
+            while path[-1] != start:
+                path.append(previous[path[-1]])
+            path.reverse()
+            best[node] = (cost, path)
+        return best
+
+    def _layered(self, start, relation_types, min_strength, max_depth):
+        best: Dict[str, Tuple[float, List[str]]] = {}
+        frontier = {start: (0.0, [start])}
+        for _ in range(max_depth):
+            reached: Dict[str, Tuple[float, List[str]]] = {}
+            for node, (cost, path) in frontier.items():
+                for neighbor, weight in self._weighted_edges(node, relation_types, min_strength):
+                    if neighbor == start:
+                        continue
+                    new_cost = cost + weight
+                    if neighbor not in reached or new_cost < reached[neighbor][0]:
+                        reached[neighbor] = (new_cost, path + [neighbor])
+            # 代价不优于更浅层已知路径的节点无需继续扩展
+            frontier = {}
+            for node, entry in reached.items():
+                if node not in best or entry[0] < best[node][0]:
+                    best[node] = entry
+                    frontier[node] = entry
+            if not frontier:
+                break
+        return best
+
+    def components(
+        self,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0
+    ) -> List[List[str]]:
+        """连通分量（按规模降序）"""
+        key = (tuple(sorted(relation_types)) if relation_types else None, min_strength)
+        cached = self._components.get(key)
+        if cached is not None:
+            return cached
+        seen = set()
+        result = []
+        for start in self.nodes:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = [start]
+            queue = deque([start])
+            while queue:
+                current = queue.popleft()
+                for edge in self.iter_edges(current, relation_types, min_strength):
+                    neighbor = edge.other(current)
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        component.append(neighbor)
+                        queue.append(neighbor)
+            result.append(component)
+        result.sort(key=len, reverse=True)
+        self._components[key] = result
+        return result
+
+    def to_dict(
+        self,
+        relation_types: Optional[Iterable[str]] = None,
+        min_strength: float = 0.0,
+        include_isolated: bool = True,
+        center_id: Optional[str] = None,
+        depth: int = 1
+    ) -> Dict[str, Any]:
+        """
+        导出图（nodes/links，与知识星图的数据格式一致）
+
+        指定 center_id 时只导出其 depth 跳邻域子图。
+        """
+        types = set(relation_types) if relation_types else None
+        if center_id is not None:
+            scope = set(self.k_hop(center_id, depth, relation_types, min_strength))
+            if center_id in self.nodes:
+                scope.add(center_id)
+        else:
+            scope = None
+
+        links = [
+            {
+                "id": edge.id,
+                "source": edge.source_memory_id,
+                "target": edge.target_memory_id,
+                "type": edge.relation_type,
+                "strength": edge.strength
+            }
+            for edge in self.edges.values()
+            if edge.strength >= min_strength
+            and (types is None or edge.relation_type in types)
+            and (scope is None or (edge.source_memory_id in scope and edge.target_memory_id in scope))
+        ]
+        components = self.components(relation_types, min_strength)
+        component_of = {
+            memory_id: index for index, members in enumerate(components) for memory_id in members
+        }
+        node_ids = [memory_id for memory_id in self.nodes if scope is None or memory_id in scope]
+        if not include_isolated:
+            linked = {link["source"] for link in links} | {link["target"] for link in links}
+            node_ids = [memory_id for memory_id in node_ids if memory_id in linked]
+        return {
+            "project_id": self.project_id,
+            "nodes": [
+                {**self.nodes[memory_id], "component": component_of[memory_id]}
+                for memory_id in node_ids
+            ],
+            "links": links,
+            "node_count": len(node_ids),
+            "link_count": len(links),
+            "component_count": sum(1 for members in components if len(members) > 1),
+            "version": self.version
+        }
+
+
+# ============================================================================
+# 图缓存
+# ============================================================================
+
+class MemoryGraphStore:
+    """
+    按项目缓存记忆关系图
+
+    get() 比较缓存图与数据库的版本号（一次主键查询），过期时重新加载；
+    track() 包裹本进程的写入，提交后在缓存图的副本上增量更新并替换缓存图。
+    get() 返回的图不会再被修改，可在锁外遍历。
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        self._graphs: Dict[str, MemoryGraph] = {}
+        self._lock = threading.Lock()
+
+    def _get_connection(self):
+        return self._pool.connection()
+
+    def get(self, project_id: str) -> MemoryGraph:
+        """获取项目关系图（必要时加载）"""
+        with self._get_connection() as conn:
+            ensure_memory_graph_tables(self._pool, conn)
+            version = _get_version(conn, project_id)
+            with self._lock:
+                graph = self._graphs.get(project_id)
+                if graph is not None and graph.version == version:
+                    return graph
+            graph = self._load(conn, project_id, version)
+        with self._lock:
+            current = self._graphs.get(project_id)
+            if current is None or current.version <= version:
+                self._graphs[project_id] = graph
+        return graph
+
+    def get_project_id(self, memory_id: str) -> Optional[str]:
+        """记忆所属项目"""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT project_id FROM project_memories WHERE id = ?", (memory_id,)
+            ).fetchone()
+        return row["project_id"] if row else None
+
+    @contextmanager
+    def track(self, conn, project_id: str, apply: Callable[[MemoryGraph], None]):
+        """
+        包裹一次写入：提交后若缓存图恰好落后于本次写入，则增量应用 apply，
+        否则（期间有其他写入）丢弃缓存图，下次访问重新加载。
+        """
+        ensure_memory_graph_tables(self._pool, conn)
+        before = _get_version(conn, project_id)
+        yield
+        after = _get_version(conn, project_id)
+        if after == before:
+            return
+
+        def apply_after_commit() -> None:
+            with self._lock:
+                graph = self._graphs.get(project_id)
+                if graph is None:
+                    return
+                if graph.version == before:
+                    # 写时复制：其他线程可能正在遍历当前图
+                    updated = graph.copy()
+                    apply(updated)
+                    updated.version = after
+                    self._graphs[project_id] = updated
+                else:
+                    del self._graphs[project_id]
+
+        self._pool.call_after_commit(apply_after_commit)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        with self._lock:
+            if project_id is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(project_id, None)
+
+    @staticmethod
+    def _load(conn, project_id: str, version: int) -> MemoryGraph:
+        graph = MemoryGraph(project_id, version)
+        for row in conn.execute(
+            "SELECT id, title, category, importance FROM project_memories WHERE project_id = ?",
+            (project_id,)
+        ):
+            graph.add_node(row["id"], row["title"], row["category"], row["importance"])
+        for row in conn.execute("""
+            SELECT mr.id, mr.source_memory_id, mr.target_memory_id, mr.relation_type, mr.strength
+            FROM project_memories pm
+            CROSS JOIN memory_relations mr ON mr.source_memory_id = pm.id
+            WHERE pm.project_id = ?
+        """, (project_id,)):
+            graph.add_edge(RelationEdge(
+                id=row["id"],
+                source_memory_id=row["source_memory_id"],
+                target_memory_id=row["target_memory_id"],
+                relation_type=row["relation_type"],
+                strength=row["strength"] if row["strength"] is not None else 1.0
+            ))
+        return graph
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+跨会话知识继承包（Knowledge Inheritance Bundle）
+
+新会话启动时需要一次性获取项目的决策、方案、重要知识与最近记忆。
+本模块用一条 SQL（UNION ALL + 窗口函数）计算全部分区，跨分区去重，
+并按项目缓存结果：
+
+- 缓存有效性由 memory_project_versions 的版本号判定，版本号由
+  project_memories 上的触发器在写入时递增（任何进程、任何写入路径都生效）
+- 可选 token 预算：按分区优先级在服务端裁剪，客户端无需再截断
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import re
+import threading
+import time
+import weakref
+
+from .db_pool import ConnectionPool
+
+
+# 分区（按优先级排序；记忆只出现在最先命中的分区）
+SECTION_DECISIONS = "decisions"
+SECTION_SOLUTIONS = "solutions"
+SECTION_IMPORTANT = "important_knowledge"
+SECTION_RECENT = "recent_memories"
+SECTION_RELATED = "related_memories"
+
+SECTIONS = (SECTION_DECISIONS, SECTION_SOLUTIONS, SECTION_IMPORTANT, SECTION_RECENT, SECTION_RELATED)
+
+# 中日韩字符按1 token估算，其余按4字符1 token估算
+_CJK_CHAR_RE = re.compile("[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """粗略估算文本 token 数（无需分词器）"""
+    if not text:
+        return 0
+    cjk = len(_CJK_CHAR_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/013_memory_inheritance.sql 保持一致）
+# ============================================================================
+
+# 影响继承包内容的列；仅更新访问统计等列时不使缓存失效
+_VERSIONED_COLUMNS = (
+    "project_id, memory_type, category, title, content, context, tags, "
+    "related_tasks, related_issues, importance, external_memory_id, created_at"
+)
+
+
+def _bump_version(row: str) -> str:
+    return f"""
+        INSERT INTO memory_project_versions (project_id, version) VALUES ({row}.project_id, 1)
+        ON CONFLICT(project_id) DO UPDATE SET version = version + 1;
+    """
+
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS memory_project_versions (
+        project_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_project_memories_project_category_rank
+    ON project_memories(project_id, category, importance DESC, created_at DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_project_memories_project_importance
+    ON project_memories(project_id, importance DESC, created_at DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_project_memories_project_created
+    ON project_memories(project_id, created_at DESC)
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_versions_insert AFTER INSERT ON project_memories
+    BEGIN
+        {_bump_version("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_versions_update
+    AFTER UPDATE OF {_VERSIONED_COLUMNS} ON project_memories
+    BEGIN
+        {_bump_version("OLD")}
+        {_bump_version("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_versions_delete AFTER DELETE ON project_memories
+    BEGIN
+        {_bump_version("OLD")}
+    END
+    """
+)
+
+
+# 单次查询计算全部分区：每个分区按索引顺序取 (分区容量 + 前序分区容量之和) 条
+# （子查询 LIMIT 使扫描提前终止），保证跨分区去重后每个分区仍能填满
+def _section_query(order: int, condition: str, order_by: str) -> str:
+    return f"""
+        SELECT id, {order} AS section_order, ROW_NUMBER() OVER (ORDER BY {order_by}) AS rn
+        FROM (
+            SELECT id, importance, created_at FROM project_memories
+            WHERE project_id = :project_id AND {condition}
+            ORDER BY {order_by}
+            LIMIT :cap{order}
+        )
+    """
+
+
+_RANK_ORDER = "importance DESC, created_at DESC"
+
+_BUNDLE_SQL = f"""
+    WITH ranked AS (
+        {_section_query(0, "category = 'decision'", _RANK_ORDER)}
+        UNION ALL
+        {_section_query(1, "category = 'solution'", _RANK_ORDER)}
+        UNION ALL
+        {_section_query(2, "importance >= :min_importance", _RANK_ORDER)}
+        UNION ALL
+        {_section_query(3, "created_at >= :recent_cutoff", "created_at DESC")}
+    )
+    SELECT ranked.section_order, pm.*
+    FROM ranked CROSS JOIN project_memories pm ON pm.id = ranked.id
+    ORDER BY ranked.section_order, ranked.rn
+"""
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_memory_version_tables(pool: ConnectionPool, conn) -> None:
+    """确保版本表、触发器与分区查询索引存在（兼容未执行 migration 013 的数据库）"""
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+# ============================================================================
+# 继承包构建
+# ============================================================================
+
+class KnowledgeBundleBuilder:
+    """
+    知识继承包构建器
+
+    - build(): 单次查询计算决策/方案/重要知识/最近记忆，跨分区去重
+    - 结果按 (项目, 上下文, 数量, 预算) 缓存；项目记忆版本号变化或超过 TTL 时重新计算
+      （"最近记忆"依赖当前时间，TTL 限制其滞后）
+    """
+
+    SECTION_LIMITS = {
+        SECTION_DECISIONS: 5,
+        SECTION_SOLUTIONS: 10,
+        SECTION_IMPORTANT: 5,
+        SECTION_RECENT: 10
+    }
+    MAX_RELATED = 10
+    MIN_IMPORTANCE = 7
+    RECENT_DAYS = 7
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        search_index=None,
+        parse_row=dict,
+        cache_ttl: float = 300.0,
+        cache_size: int = 256
+    ):
+        """
+        Args:
+            pool: 数据库连接池
+            search_index: MemorySearchIndex，提供上下文相关记忆（可选）
+            parse_row: 记忆行 -> 字典（解析JSON字段）
+            cache_ttl: 缓存有效期（秒），0 表示不缓存
+            cache_size: 缓存条目上限（LRU）
+        """
+        self._pool = pool
+        self.search_index = search_index
+        self._parse_row = parse_row
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Tuple[int, float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    def build(
+        self,
+        project_id: str,
+        context: Optional[str] = None,
+        limit: int = 20,
+        token_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        构建知识继承包
+
+        Args:
+            project_id: 项目ID
+            context: 当前上下文（提供时附加本地检索的相关记忆）
+            limit: 相关记忆数量上限（最多 MAX_RELATED）
+            token_budget: token 预算；提供时按分区优先级裁剪
+
+        Returns:
+            继承包（含各分区、total_inherited、token_estimate、cached 等）
+        """
+        key = (project_id, context or "", limit, token_budget)
+
+        with self._get_connection() as conn:
+            ensure_memory_version_tables(self._pool, conn)
+            version = self._get_version(conn, project_id)
+
+            cached = self._cache_get(key, version)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+            sections = self._query_sections(conn, project_id)
+
+        if context and self.search_index is not None:
+            seen = {m["id"] for items in sections.values() for m in items}
+            related = self.search_index.search(
+                project_id=project_id,
+                query=context,
+                limit=min(limit, self.MAX_RELATED) + len(seen)
+            )
+            sections[SECTION_RELATED] = [
+                self._parse_row(row) for row in related if row["id"] not in seen
+            ][:min(limit, self.MAX_RELATED)]
+        else:
+            sections[SECTION_RELATED] = []
+
+        bundle = self._assemble(project_id, sections, token_budget)
+        self._cache_put(key, version, bundle)
+        return {**bundle, "cached": False}
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """清除缓存（project_id 为空时清除全部）"""
+        with self._lock:
+            if project_id is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == project_id]:
+                del self._cache[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._cache),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0
+            }
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _get_connection(self):
+        return self._pool.connection()
+
+    @staticmethod
+    def _get_version(conn, project_id: str) -> int:
+        row = conn.execute(
+            "SELECT version FROM memory_project_versions WHERE project_id = ?",
+            (project_id,)
+        ).fetchone()
+        return row["version"] if row else 0
+
+    def _query_sections(self, conn, project_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """单次查询取出四个分区，按优先级去重"""
+        ordered = SECTIONS[:4]
+        caps: Dict[str, int] = {}
+        preceding = 0
+        for index, section in enumerate(ordered):
+            caps[f"cap{index}"] = self.SECTION_LIMITS[section] + preceding
+            preceding += self.SECTION_LIMITS[section]
+
+        rows = conn.execute(_BUNDLE_SQL, {
+            "project_id": project_id,
+            "min_importance": self.MIN_IMPORTANCE,
+            "recent_cutoff": (datetime.now() - timedelta(days=self.RECENT_DAYS)).isoformat(),
+            **caps
+        }).fetchall()
+
+        sections: Dict[str, List[Dict[str, Any]]] = {section: [] for section in ordered}
+        seen = set()
+        for row in rows:
+            section = ordered[row["section_order"]]
+            if row["id"] in seen or len(sections[section]) >= self.SECTION_LIMITS[section]:
+                continue
+            seen.add(row["id"])
+            memory = self._parse_row(row)
+            memory.pop("section_order", None)
+            sections[section].append(memory)
+        return sections
+
+    # ------------------------------------------------------------------
+    # 组装与裁剪
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _memory_tokens(memory: Dict[str, Any]) -> int:
+        return estimate_tokens(memory.get("title")) + estimate_tokens(memory.get("content"))
+
+    def _assemble(
+        self,
+        project_id: str,
+        sections: Dict[str, List[Dict[str, Any]]],
+        token_budget: Optional[int]
+    ) -> Dict[str, Any]:
+        """按分区优先级装入预算；放不下的记忆跳过（后续较短的记忆仍可装入）"""
+        used = 0
+        trimmed = 0
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        for section in SECTIONS:
+            kept = []
+            for memory in sections.get(section, []):
+                tokens = self._memory_tokens(memory)
+                if token_budget is not None and used + tokens > token_budget:
+                    trimmed += 1
+                    continue
+                used += tokens
+                kept.append(memory)
+            result[section] = kept
+
+        return {
+            "project_id": project_id,
+            **result,
+            "total_inherited": sum(len(items) for items in result.values()),
+            "token_estimate": used,
+            "token_budget": token_budget,
+            "trimmed": trimmed,
+            "inherited_at": datetime.now().isoformat()
+        }
+
+    # ------------------------------------------------------------------
+    # 缓存
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: Tuple, version: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if (entry is not None and entry[0] == version
+                    and time.monotonic() - entry[1] < self.cache_ttl):
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return entry[2]
+            self._misses += 1
+            return None
+
+    def _cache_put(self, key: Tuple, version: int, bundle: Dict[str, Any]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (version, time.monotonic(), bundle)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+项目记忆标签与关联索引（Memory Links）
+
+project_memories 的 tags / related_tasks / related_issues 以 JSON 数组存储，
+无法走索引过滤。本模块维护三张规范化副表：
+
+- memory_tags:         (memory_id, tag)
+- memory_task_links:   (memory_id, task_id)
+- memory_issue_links:  (memory_id, issue_id)
+
+副表由 project_memories 上的触发器在写入时同步（任何写入路径都生效），
+JSON 列仍是数据来源；"标签X且关联TASK-Y的记忆"等过滤变为索引连接。
+"""
+
+from typing import List, Any, Optional, Tuple
+import threading
+import weakref
+
+from .db_pool import ConnectionPool
+
+
+TAG_MODE_ANY = "any"    # 命中任意一个标签
+TAG_MODE_ALL = "all"    # 同时包含全部标签
+TAG_MODES = (TAG_MODE_ANY, TAG_MODE_ALL)
+
+
+def _json_array(column: str) -> str:
+    """无效JSON按空数组处理，避免 json_each 报错导致写入失败"""
+    return f"json_each(CASE WHEN json_valid({column}) THEN {column} ELSE '[]' END)"
+
+
+def _insert_links(row: str) -> str:
+    return f"""
+        INSERT OR IGNORE INTO memory_tags (memory_id, project_id, tag)
+        SELECT {row}.id, {row}.project_id, CAST(value AS TEXT) FROM {_json_array(f'{row}.tags')}
+        WHERE value IS NOT NULL;
+        INSERT OR IGNORE INTO memory_task_links (memory_id, project_id, task_id)
+        SELECT {row}.id, {row}.project_id, CAST(value AS TEXT) FROM {_json_array(f'{row}.related_tasks')}
+        WHERE value IS NOT NULL;
+        INSERT OR IGNORE INTO memory_issue_links (memory_id, project_id, issue_id)
+        SELECT {row}.id, {row}.project_id, CAST(value AS TEXT) FROM {_json_array(f'{row}.related_issues')}
+        WHERE value IS NOT NULL;
+    """
+
+
+_DELETE_LINKS = """
+        DELETE FROM memory_tags WHERE memory_id = OLD.id;
+        DELETE FROM memory_task_links WHERE memory_id = OLD.id;
+        DELETE FROM memory_issue_links WHERE memory_id = OLD.id;
+"""
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/012_memory_links.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS memory_tags (
+        memory_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        PRIMARY KEY (memory_id, tag)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_tags_project_tag ON memory_tags(project_id, tag, memory_id)",
+    """
+    CREATE TABLE IF NOT EXISTS memory_task_links (
+        memory_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        PRIMARY KEY (memory_id, task_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_task_links_task ON memory_task_links(task_id, memory_id)",
+    """
+    CREATE TABLE IF NOT EXISTS memory_issue_links (
+        memory_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        issue_id TEXT NOT NULL,
+        PRIMARY KEY (memory_id, issue_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_issue_links_issue ON memory_issue_links(issue_id, memory_id)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_links_insert AFTER INSERT ON project_memories
+    BEGIN
+        {_insert_links("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_links_update
+    AFTER UPDATE OF project_id, tags, related_tasks, related_issues ON project_memories
+    BEGIN
+        {_DELETE_LINKS}
+        {_insert_links("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_links_delete AFTER DELETE ON project_memories
+    BEGIN
+        {_DELETE_LINKS}
+    END
+    """
+)
+
+# 副表建立前已有记忆的回填
+_BACKFILL_STATEMENTS = tuple(
+    f"""
+    INSERT OR IGNORE INTO {table} (memory_id, project_id, {column})
+    SELECT pm.id, pm.project_id, CAST(j.value AS TEXT)
+    FROM project_memories pm, {_json_array(f'pm.{source}')} AS j
+    WHERE j.value IS NOT NULL
+    """
+    for table, column, source in (
+        ("memory_tags", "tag", "tags"),
+        ("memory_task_links", "task_id", "related_tasks"),
+        ("memory_issue_links", "issue_id", "related_issues")
+    )
+)
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_memory_link_tables(pool: ConnectionPool, conn) -> None:
+    """
+    确保副表与触发器存在（兼容未执行 migration 012 的数据库）
+
+    首次建表时回填已有记忆。每个连接池只检查一次。
+    """
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_tags'"
+    ).fetchone() is not None
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+    if not exists:
+        for statement in _BACKFILL_STATEMENTS:
+            conn.execute(statement)
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+def build_link_filters(
+    project_id: str,
+    tags: Optional[List[str]] = None,
+    tag_mode: str = TAG_MODE_ANY,
+    task_id: Optional[str] = None,
+    issue_id: Optional[str] = None,
+    alias: str = "pm"
+) -> Tuple[List[str], List[Any]]:
+    """
+    构建标签/任务/问题过滤条件（基于副表索引）
+
+    Args:
+        project_id: 项目ID
+        tags: 标签列表
+        tag_mode: any（命中任意一个）或 all（全部包含）
+        task_id: 关联任务ID
+        issue_id: 关联问题ID
+        alias: project_memories 表别名
+
+    Returns:
+        (条件列表, 参数列表)
+
+    Raises:
+        ValueError: tag_mode 无效
+    """
+    if tag_mode not in TAG_MODES:
+        raise ValueError(f"Invalid tag_mode: {tag_mode} (expected one of {', '.join(TAG_MODES)})")
+
+    conditions: List[str] = []
+    params: List[Any] = []
+
+    unique_tags = list(dict.fromkeys(tag for tag in (tags or []) if tag))
+    if unique_tags:
+        placeholders = ",".join("?" * len(unique_tags))
+        subquery = (
+            f"SELECT memory_id FROM memory_tags "
+            f"WHERE project_id = ? AND tag IN ({placeholders})"
+        )
+        params.extend([project_id, *unique_tags])
+        if tag_mode == TAG_MODE_ALL and len(unique_tags) > 1:
+            subquery += " GROUP BY memory_id HAVING COUNT(*) = ?"
+            params.append(len(unique_tags))
+        conditions.append(f"{alias}.id IN ({subquery})")
+
+    if task_id:
+        conditions.append(f"{alias}.id IN (SELECT memory_id FROM memory_task_links WHERE task_id = ?)")
+        params.append(task_id)
+
+    if issue_id:
+        conditions.append(f"{alias}.id IN (SELECT memory_id FROM memory_issue_links WHERE issue_id = ?)")
+        params.append(issue_id)
+
+    return conditions, params
@@ -0,0 +1,661 @@
+# -*- coding: utf-8 -*-
+"""
+项目记忆本地检索（Memory Search）
+
+功能：
+1. SQLite FTS5 全文索引 + BM25 排序，检索不再依赖网络，离线可用
+2. 中日韩文本按字二元组（bigram）切分后入索引，英文/数字按词切分
+3. 可选的本地向量索引（CPU embedding），补充语义召回
+4. 融合排序：BM25 相关度 + 语义相似度 + 重要性 + 时间衰减
+
+索引同步：
+- project_memories 上的触发器把新增/修改的记忆ID写入待索引表，删除时同步删除索引
+- 检索前先处理待索引表（通常为空，开销为一次主键查询），
+  因此任何进程、任何代码路径写入的记忆都会被索引
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from array import array
+import json
+import logging
+import math
+import re
+import threading
+
+from .db_pool import ConnectionPool
+from .memory_links import TAG_MODE_ANY, build_link_filters, ensure_memory_link_tables
+
+
+logger = logging.getLogger(__name__)
+
+# 文本 -> 向量（批量）；向量无需归一化
+Embedder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# 中日韩字符（汉字、假名、谚文）
+_CJK_RANGES = "぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]+|[^\W_{_CJK_RANGES}]+")
+_CJK_RE = re.compile(rf"[{_CJK_RANGES}]")
+
+
+# ============================================================================
+# 分词
+# ============================================================================
+
+def segment_text(text: Optional[str]) -> List[str]:
+    """
+    切分文本为索引词
+
+    中日韩连续字符切分为重叠二元组（"架构决策" -> 架构/构决/决策），
+    单字成词时保留单字；其他文字按词切分并转小写。
+    """
+    tokens: List[str] = []
+    if not text:
+        return tokens
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    构建 FTS5 MATCH 表达式
+
+    各词以 OR 连接，由 BM25 决定排序；单个中日韩字符使用前缀匹配
+    （只能命中以该字开头的二元组）。
+
+    Returns:
+        MATCH 表达式；查询无可用词时返回None
+    """
+    terms = []
+    seen = set()
+    for token in segment_text(query):
+        if token in seen:
+            continue
+        seen.add(token)
+        quoted = '"' + token.replace('"', '""') + '"'
+        terms.append(quoted + "*" if len(token) == 1 and _CJK_RE.match(token) else quoted)
+    return " OR ".join(terms) if terms else None
+
+
+def build_memory_filters(
+    project_id: str,
+    category: Optional[str] = None,
+    memory_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    tag_mode: str = TAG_MODE_ANY,
+    task_id: Optional[str] = None,
+    issue_id: Optional[str] = None,
+    alias: str = "pm"
+) -> Tuple[str, List[Any]]:
+    """
+    构建记忆过滤条件
+
+    Args:
+        project_id: 项目ID
+        category: 记忆分类
+        memory_type: 记忆类型
+        tags: 标签
+        tag_mode: any（命中任意一个标签）或 all（全部包含）
+        task_id: 关联任务ID
+        issue_id: 关联问题ID
+        alias: project_memories 表别名
+
+    Returns:
+        (WHERE 子句内容, 参数列表)
+
+    Raises:
+        ValueError: tag_mode 无效
+    """
+    conditions = [f"{alias}.project_id = ?"]
+    params: List[Any] = [project_id]
+
+    if category:
+        conditions.append(f"{alias}.category = ?")
+        params.append(category)
+
+    if memory_type:
+        conditions.append(f"{alias}.memory_type = ?")
+        params.append(memory_type)
+
+    # 标签与关联过滤走 memory_tags / memory_*_links 副表索引
+    link_conditions, link_params = build_link_filters(
+        project_id, tags=tags, tag_mode=tag_mode, task_id=task_id, issue_id=issue_id, alias=alias
+    )
+    conditions.extend(link_conditions)
+    params.extend(link_params)
+
+    return " AND ".join(conditions), params
+
+
+# ============================================================================
+# 存储结构
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS memory_search_fts USING fts5(
+        title, content, tags,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memory_search_docs (
+        doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        memory_id TEXT NOT NULL UNIQUE,
+        indexed_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memory_search_pending (
+        memory_id TEXT PRIMARY KEY
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memory_embeddings (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        memory_id TEXT NOT NULL UNIQUE,
+        project_id TEXT NOT NULL,
+        model TEXT NOT NULL,
+        vector BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memory_search_insert AFTER INSERT ON project_memories
+    BEGIN
+        INSERT OR IGNORE INTO memory_search_pending (memory_id) VALUES (NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memory_search_update
+    AFTER UPDATE OF title, content, tags ON project_memories
+    BEGIN
+        INSERT OR IGNORE INTO memory_search_pending (memory_id) VALUES (NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memory_search_delete AFTER DELETE ON project_memories
+    BEGIN
+        DELETE FROM memory_search_fts
+        WHERE rowid = (SELECT doc_id FROM memory_search_docs WHERE memory_id = OLD.id);
+        DELETE FROM memory_search_docs WHERE memory_id = OLD.id;
+        DELETE FROM memory_search_pending WHERE memory_id = OLD.id;
+        DELETE FROM memory_embeddings WHERE memory_id = OLD.id;
+    END
+    """
+)
+
+
+# 融合排序所需的列（候选阶段不读取正文）
+_RANK_COLUMNS = "pm.id, pm.importance, pm.created_at"
+
+
+# ============================================================================
+# 排序权重
+# ============================================================================
+
+@dataclass
+class RankWeights:
+    """融合排序权重（各分量已归一化到 0~1）"""
+    text: float = 0.6                    # BM25（按本次结果最大值归一化）
+    semantic: float = 0.4                # 向量余弦相似度
+    importance: float = 0.25             # importance / 10
+    recency: float = 0.15                # 按半衰期指数衰减
+    recency_half_life_days: float = 30.0
+
+
+# ============================================================================
+# 检索索引
+# ============================================================================
+
+class MemorySearchIndex:
+    """
+    项目记忆检索索引
+
+    全文索引始终启用；提供 embedder 时额外维护向量索引。
+    """
+
+    CANDIDATE_MULTIPLIER = 5   # 每路召回 limit * 倍数 个候选再融合排序
+    MIN_CANDIDATES = 50
+    FILTER_OVERSAMPLE = 4      # 全文召回先在FTS内取 候选数 * 倍数，再回表过滤
+    SYNC_BATCH_SIZE = 500
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        embedder: Optional[Embedder] = None,
+        embedding_model: str = "default",
+        weights: Optional[RankWeights] = None
+    ):
+        """
+        初始化检索索引
+
+        Args:
+            pool: 数据库连接池（与 ProjectMemoryService 共用）
+            embedder: 文本向量化函数，None 表示只使用全文检索
+            embedding_model: 向量模型名（更换模型后旧向量不再使用）
+            weights: 排序权重
+        """
+        self._pool = pool
+        self.embedder = embedder
+        self.embedding_model = embedding_model
+        self.weights = weights or RankWeights()
+        self._schema_checked = False
+
+        # 向量缓存：memory_id -> (project_id, 单位向量)，按 seq 增量加载
+        self._vectors: Dict[str, Tuple[str, array]] = {}
+        self._vectors_seq = 0
+        self._vectors_lock = threading.Lock()
+
+        self.stats = {
+            "searches": 0,
+            "indexed": 0,
+            "embedded": 0
+        }
+
+    # ========================================================================
+    # 表结构与同步
+    # ========================================================================
+
+    def ensure_schema(self, conn) -> None:
+        """确保索引表与触发器存在，并把尚未索引的记忆加入待索引表"""
+        if self._schema_checked:
+            return
+        for statement in _SCHEMA_STATEMENTS:
+            conn.execute(statement)
+        # 启用索引前已有的记忆（或触发器创建前由其他进程写入的记忆）
+        conn.execute("""
+            INSERT OR IGNORE INTO memory_search_pending (memory_id)
+            SELECT pm.id FROM project_memories pm
+            WHERE NOT EXISTS (SELECT 1 FROM memory_search_docs d WHERE d.memory_id = pm.id)
+        """)
+        self._pool.call_after_commit(lambda: setattr(self, "_schema_checked", True))
+
+    def sync(self) -> int:
+        """
+        索引待索引表中的记忆
+
+        Returns:
+            本次索引数量
+        """
+        total = 0
+        while True:
+            with self._pool.connection() as conn:
+                self.ensure_schema(conn)
+                pending = [
+                    row[0] for row in conn.execute(
+                        "SELECT memory_id FROM memory_search_pending LIMIT ?",
+                        (self.SYNC_BATCH_SIZE,)
+                    ).fetchall()
+                ]
+                if not pending:
+                    return total
+                self._index_batch(conn, pending)
+            total += len(pending)
+
+    def _index_batch(self, conn, memory_ids: List[str]) -> None:
+        placeholders = ",".join("?" * len(memory_ids))
+        rows = conn.execute(f"""
+            SELECT id, project_id, title, content, tags
+            FROM project_memories WHERE id IN ({placeholders})
+        """, memory_ids).fetchall()
+
+        for row in rows:
+            existing = conn.execute(
+                "SELECT doc_id FROM memory_search_docs WHERE memory_id = ?", (row["id"],)
+            ).fetchone()
+            if existing is not None:
+                conn.execute("DELETE FROM memory_search_fts WHERE rowid = ?", (existing[0],))
+                conn.execute("DELETE FROM memory_search_docs WHERE doc_id = ?", (existing[0],))
+            doc_id = conn.execute(
+                "INSERT INTO memory_search_docs (memory_id) VALUES (?)", (row["id"],)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO memory_search_fts (rowid, title, content, tags) VALUES (?, ?, ?, ?)",
+                (
+                    doc_id,
+                    " ".join(segment_text(row["title"])),
+                    " ".join(segment_text(row["content"])),
+                    " ".join(segment_text(" ".join(_parse_tags(row["tags"]))))
+                )
+            )
+
+        if self.embedder is not None and rows:
+            self._embed_rows(conn, rows)
+
+        conn.executemany(
+            "DELETE FROM memory_search_pending WHERE memory_id = ?",
+            [(memory_id,) for memory_id in memory_ids]
+        )
+        self.stats["indexed"] += len(rows)
+
+    def _embed_rows(self, conn, rows) -> None:
+        try:
+            vectors = self.embedder([f"{row['title']}\n{row['content']}" for row in rows])
+        except Exception as e:
+            # 向量化失败不影响全文索引，下次 rebuild 时重试
+            logger.error(f"Memory embedding failed: {e}", exc_info=True)
+            return
+        conn.executemany("""
+            INSERT OR REPLACE INTO memory_embeddings (memory_id, project_id, model, vector)
+            VALUES (?, ?, ?, ?)
+        """, [
+            (row["id"], row["project_id"], self.embedding_model, _normalize(vector).tobytes())
+            for row, vector in zip(rows, vectors)
+        ])
+        self.stats["embedded"] += len(rows)
+
+    def rebuild(self) -> int:
+        """
+        重建全部索引（全文 + 向量）
+
+        Returns:
+            索引数量
+        """
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            conn.execute("DELETE FROM memory_search_fts")
+            conn.execute("DELETE FROM memory_search_docs")
+            conn.execute("DELETE FROM memory_embeddings")
+            conn.execute("""
+                INSERT OR IGNORE INTO memory_search_pending (memory_id)
+                SELECT id FROM project_memories
+            """)
+        with self._vectors_lock:
+            self._vectors = {}
+            self._vectors_seq = 0
+        return self.sync()
+
+    # ========================================================================
+    # 检索
+    # ========================================================================
+
+    def search(
+        self,
+        project_id: str,
+        query: str,
+        category: Optional[str] = None,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        limit: int = 10,
+        tag_mode: str = TAG_MODE_ANY,
+        task_id: Optional[str] = None,
+        issue_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        检索记忆
+
+        Args:
+            project_id: 项目ID
+            query: 查询文本
+            category: 记忆分类过滤
+            memory_type: 记忆类型过滤
+            tags: 标签过滤
+            limit: 返回数量限制
+            tag_mode: 多标签匹配方式（any/all）
+            task_id: 关联任务过滤
+            issue_id: 关联问题过滤
+
+        Returns:
+            记忆行（dict，JSON字段未解析），附加 relevance 与 scores 字段，按融合得分降序
+        """
+        self.sync()
+        self.stats["searches"] += 1
+        candidate_limit = max(limit * self.CANDIDATE_MULTIPLIER, self.MIN_CANDIDATES)
+        where, params = build_memory_filters(
+            project_id, category, memory_type, tags, tag_mode=tag_mode, task_id=task_id, issue_id=issue_id
+        )
+
+        candidates: Dict[str, Dict[str, Any]] = {}
+        with self._pool.connection() as conn:
+            ensure_memory_link_tables(self._pool, conn)
+            match = build_match_query(query)
+            if match:
+                for memory in self._text_candidates(conn, match, where, params, candidate_limit):
+                    candidates[memory["id"]] = memory
+
+            if self.embedder is not None:
+                semantic = self._semantic_candidates(conn, project_id, query, candidate_limit)
+                missing = [memory_id for memory_id in semantic if memory_id not in candidates]
+                if missing:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = conn.execute(f"""
+                        SELECT {_RANK_COLUMNS} FROM project_memories pm
+                        WHERE pm.id IN ({placeholders}) AND {where}
+                    """, [*missing, *params]).fetchall()
+                    for row in rows:
+                        candidates[row["id"]] = dict(row)
+                for memory_id, similarity in semantic.items():
+                    if memory_id in candidates:
+                        candidates[memory_id]["_semantic"] = similarity
+
+            # 排序只用轻量列，最终结果再回表取完整记忆
+            ranked = self._rank(list(candidates.values()))[:limit]
+            if not ranked:
+                return []
+            placeholders = ",".join("?" * len(ranked))
+            rows = {
+                row["id"]: row for row in conn.execute(
+                    f"SELECT * FROM project_memories WHERE id IN ({placeholders})",
+                    [memory["id"] for memory in ranked]
+                ).fetchall()
+            }
+
+        results = []
+        for memory in ranked:
+            row = rows.get(memory["id"])
+            if row is not None:
+                results.append({**dict(row), "relevance": memory["relevance"], "scores": memory["scores"]})
+        return results
+
+    def _text_candidates(
+        self,
+        conn,
+        match: str,
+        where: str,
+        params: List[Any],
+        candidate_limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        全文召回
+
+        先只在 FTS 表内按 BM25 取前 N 个文档（过采样），再回表过滤项目/分类等条件；
+        过滤后不足且过采样被截断时，退回到带过滤条件的完整排序。
+        CROSS JOIN 固定连接顺序，避免规划器改为按 project_id 索引扫描全部记忆。
+        """
+        oversample = candidate_limit * self.FILTER_OVERSAMPLE
+        ranked = conn.execute("""
+            SELECT rowid, bm25(memory_search_fts, 3.0, 1.0, 2.0)
+            FROM memory_search_fts
+            WHERE memory_search_fts MATCH ?
+            ORDER BY 2
+            LIMIT ?
+        """, (match, oversample)).fetchall()
+        if not ranked:
+            return []
+
+        scores = {row[0]: row[1] for row in ranked}
+        placeholders = ",".join("?" * len(scores))
+        rows = conn.execute(f"""
+            SELECT {_RANK_COLUMNS}, d.doc_id AS _doc_id
+            FROM memory_search_docs d
+            CROSS JOIN project_memories pm ON pm.id = d.memory_id
+            WHERE d.doc_id IN ({placeholders}) AND {where}
+        """, [*scores, *params]).fetchall()
+        memories = []
+        for row in rows:
+            memory = dict(row)
+            # FTS5 的 bm25() 越小越相关，取反后为正向得分
+            memory["_text"] = -scores[memory.pop("_doc_id")]
+            memories.append(memory)
+        memories.sort(key=lambda m: m["_text"], reverse=True)
+        if len(memories) >= candidate_limit or len(ranked) < oversample:
+            return memories[:candidate_limit]
+
+        rows = conn.execute(f"""
+            SELECT {_RANK_COLUMNS}, bm25(memory_search_fts, 3.0, 1.0, 2.0) AS _bm25
+            FROM memory_search_fts
+            CROSS JOIN memory_search_docs d ON d.doc_id = memory_search_fts.rowid
+            CROSS JOIN project_memories pm ON pm.id = d.memory_id
+            WHERE memory_search_fts MATCH ? AND {where}
+            ORDER BY _bm25
+            LIMIT ?
+        """, [match, *params, candidate_limit]).fetchall()
+        memories = []
+        for row in rows:
+            memory = dict(row)
+            memory["_text"] = -memory.pop("_bm25")
+            memories.append(memory)
+        return memories
+
+    def _semantic_candidates(
+        self,
+        conn,
+        project_id: str,
+        query: str,
+        candidate_limit: int
+    ) -> Dict[str, float]:
+        try:
+            query_vector = _normalize(self.embedder([query])[0])
+        except Exception as e:
+            logger.error(f"Query embedding failed: {e}", exc_info=True)
+            return {}
+
+        self._load_vectors(conn)
+        with self._vectors_lock:
+            vectors = [
+                (memory_id, vector) for memory_id, (vector_project, vector) in self._vectors.items()
+                if vector_project == project_id and len(vector) == len(query_vector)
+            ]
+        scored = [(memory_id, _dot(query_vector, vector)) for memory_id, vector in vectors]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return {memory_id: max(similarity, 0.0) for memory_id, similarity in scored[:candidate_limit]}
+
+    def _load_vectors(self, conn) -> None:
+        """增量加载新写入的向量（含其他进程写入的）"""
+        with self._vectors_lock:
+            rows = conn.execute("""
+                SELECT seq, memory_id, project_id, vector FROM memory_embeddings
+                WHERE seq > ? AND model = ?
+                ORDER BY seq
+            """, (self._vectors_seq, self.embedding_model)).fetchall()
+            for row in rows:
+                vector = array("f")
+                vector.frombytes(row["vector"])
+                self._vectors[row["memory_id"]] = (row["project_id"], vector)
+                self._vectors_seq = row["seq"]
+
+    def _rank(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """融合排序"""
+        weights = self.weights
+        max_text = max((c.get("_text", 0.0) for c in candidates), default=0.0)
+        now = datetime.now()
+
+        for memory in candidates:
+            text_score = memory.pop("_text", 0.0) / max_text if max_text > 0 else 0.0
+            semantic_score = memory.pop("_semantic", 0.0)
+            importance_score = min(max((memory.get("importance") or 0) / 10.0, 0.0), 1.0)
+            recency_score = _recency(memory.get("created_at"), now, weights.recency_half_life_days)
+            memory["relevance"] = round(
+                weights.text * text_score
+                + weights.semantic * semantic_score
+                + weights.importance * importance_score
+                + weights.recency * recency_score,
+                6
+            )
+            memory["scores"] = {
+                "text": round(text_score, 6),
+                "semantic": round(semantic_score, 6),
+                "importance": round(importance_score, 6),
+                "recency": round(recency_score, 6)
+            }
+
+        candidates.sort(key=lambda m: m["relevance"], reverse=True)
+        return candidates
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取索引统计"""
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            indexed = conn.execute("SELECT COUNT(*) FROM memory_search_docs").fetchone()[0]
+            pending = conn.execute("SELECT COUNT(*) FROM memory_search_pending").fetchone()[0]
+            embedded = conn.execute("SELECT COUNT(*) FROM memory_embeddings").fetchone()[0]
+        return {
+            **self.stats,
+            "indexed_memories": indexed,
+            "pending_memories": pending,
+            "embedded_memories": embedded,
+            "semantic_enabled": self.embedder is not None,
+            "embedding_model": self.embedding_model if self.embedder is not None else None
+        }
+
+
+# ============================================================================
+# 辅助函数
+# ============================================================================
+
+def _parse_tags(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return []
+    try:
+        tags = json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+    return [str(tag) for tag in tags] if isinstance(tags, list) else []
+
+
+def _normalize(vector: Sequence[float]) -> array:
+    values = array("f", (float(v) for v in vector))
+    norm = math.sqrt(sum(v * v for v in values))
+    if norm > 0:
+        for i in range(len(values)):
+            values[i] /= norm
+    return values
+
+
+def _dot(a: array, b: array) -> float:
+    return math.fsum(x * y for x, y in zip(a, b))
+
+
+def _recency(created_at: Optional[str], now: datetime, half_life_days: float) -> float:
+    if not created_at or half_life_days <= 0:
+        return 0.0
+    try:
+        created = datetime.fromisoformat(created_at.replace(" ", "T"))
+    except ValueError:
+        return 0.0
+    age_days = max((now - created).total_seconds() / 86400.0, 0.0)
+    return 0.5 ** (age_days / half_life_days)
+
+
+def create_sentence_transformer_embedder(
+    model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"
+) -> Optional[Embedder]:
+    """
+    创建基于 sentence-transformers 的本地向量化函数（CPU）
+
+    Args:
+        model_name: 模型名（默认为支持中文的多语言小模型）
+
+    Returns:
+        向量化函数；未安装 sentence-transformers 或模型不可用时返回None
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name, device="cpu")
+    except Exception as e:
+        logger.info(f"Semantic memory search disabled: {e}")
+        return None
+
+    def embed(texts: List[str]) -> Sequence[Sequence[float]]:
+        return model.encode(texts, show_progress_bar=False).tolist()
+
+    return embed
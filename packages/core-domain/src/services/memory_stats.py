@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+项目记忆统计物化（Memory Stats）
+
+每个项目一行 memory_stats_summary，包含按类型、按分类计数与重要性直方图（1-10），
+由 project_memories 上的触发器在同一事务内增减（任何进程、任何写入路径都生效，
+包括压实合并/归档的删除与恢复）。统计查询只读一行。
+
+例外：INSERT OR REPLACE 因冲突删除旧行时，未开启 recursive_triggers 的连接不触发删除触发器，
+旧行计数不会扣除（本仓库的写入路径不使用 REPLACE）。
+计数偏差时用 rebuild() 或 scripts/rebuild_memory_stats.py 从原始数据重建。
+"""
+
+from typing import Dict, Any, Optional
+import threading
+import weakref
+
+from .db_pool import ConnectionPool
+from .memory_inheritance import ensure_memory_version_tables
+
+
+MEMORY_TYPES = ("session", "ultra", "decision", "solution", "knowledge")
+MEMORY_CATEGORIES = ("architecture", "problem", "solution", "decision", "knowledge", "experience")
+IMPORTANCE_LEVELS = tuple(range(1, 11))
+
+# Dashboard 使用的重要性分档（闭区间）
+IMPORTANCE_BANDS = (
+    ("critical (9-10)", 9, 10),
+    ("high (7-8)", 7, 8),
+    ("medium (5-6)", 5, 6),
+    ("low (1-4)", 1, 4),
+)
+
+
+def _importance(row: str) -> str:
+    """重要性取值（空值按默认5，越界截断到1-10）"""
+    return f"MIN(MAX(COALESCE({row}.importance, 5), 1), 10)"
+
+
+def _counter_expressions(row: str):
+    """（列名, 该行对此列的增量表达式）"""
+    yield "total", "1"
+    for memory_type in MEMORY_TYPES:
+        yield f"type_{memory_type}", f"({row}.memory_type = '{memory_type}')"
+    types = ", ".join(f"'{t}'" for t in MEMORY_TYPES)
+    yield "type_other", f"(COALESCE({row}.memory_type, '') NOT IN ({types}))"
+    for category in MEMORY_CATEGORIES:
+        yield f"category_{category}", f"({row}.category = '{category}')"
+    categories = ", ".join(f"'{c}'" for c in MEMORY_CATEGORIES)
+    yield "category_other", f"(COALESCE({row}.category, '') NOT IN ({categories}))"
+    for level in IMPORTANCE_LEVELS:
+        yield f"importance_{level}", f"({_importance(row)} = {level})"
+    yield "importance_sum", _importance(row)
+
+
+_COUNTER_COLUMNS = [column for column, _ in _counter_expressions("NEW")]
+
+
+def _apply(row: str, sign: str) -> str:
+    # 用 UPSERT 而非 INSERT OR IGNORE：外层语句的 OR REPLACE 会覆盖触发器内的 OR IGNORE，清空整行计数
+    assignments = ",\n            ".join(
+        f"{column} = {column} {sign} {expression}" for column, expression in _counter_expressions(row)
+    )
+    return f"""
+        INSERT INTO memory_stats_summary (project_id) VALUES ({row}.project_id)
+        ON CONFLICT(project_id) DO NOTHING;
+        UPDATE memory_stats_summary SET
+            {assignments},
+            updated_at = datetime('now')
+        WHERE project_id = {row}.project_id;
+    """
+
+
+def _refresh_last_created(row: str) -> str:
+    return f"""
+        UPDATE memory_stats_summary SET last_memory_created_at = (
+            SELECT MAX(created_at) FROM project_memories WHERE project_id = {row}.project_id
+        )
+        WHERE project_id = {row}.project_id;
+    """
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/017_memory_stats_summary.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    f"""
+    CREATE TABLE IF NOT EXISTS memory_stats_summary (
+        project_id TEXT PRIMARY KEY,
+        {", ".join(f"{column} INTEGER NOT NULL DEFAULT 0" for column in _COUNTER_COLUMNS)},
+        last_memory_created_at TEXT,
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_stats_insert AFTER INSERT ON project_memories
+    BEGIN
+        {_apply("NEW", "+")}
+        UPDATE memory_stats_summary
+        SET last_memory_created_at = MAX(COALESCE(last_memory_created_at, ''), NEW.created_at)
+        WHERE project_id = NEW.project_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_stats_update
+    AFTER UPDATE OF project_id, memory_type, category, importance, created_at ON project_memories
+    BEGIN
+        {_apply("OLD", "-")}
+        {_apply("NEW", "+")}
+        {_refresh_last_created("OLD")}
+        {_refresh_last_created("NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_memory_stats_delete AFTER DELETE ON project_memories
+    BEGIN
+        {_apply("OLD", "-")}
+        {_refresh_last_created("OLD")}
+    END
+    """
+)
+
+
+def _rebuild_sql(where: str) -> str:
+    counters = ",\n            ".join(
+        "COUNT(*)" if column == "total" else f"SUM({expression})"
+        for column, expression in _counter_expressions("pm")
+    )
+    return f"""
+        INSERT OR REPLACE INTO memory_stats_summary (
+            project_id, {", ".join(_COUNTER_COLUMNS)}, last_memory_created_at, updated_at
+        )
+        SELECT
+            pm.project_id,
+            {counters},
+            MAX(pm.created_at),
+            datetime('now')
+        FROM project_memories pm
+        {where}
+        GROUP BY pm.project_id
+    """
+
+
+_checked_pools: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_checked_lock = threading.Lock()
+
+
+def ensure_memory_stats_tables(pool: ConnectionPool, conn) -> None:
+    """
+    确保统计表与触发器存在（兼容未执行 migration 017 的数据库）
+
+    首次建表时从已有记忆回填。每个连接池只检查一次。
+    """
+    # 删除时按 (project_id, created_at) 索引重算最后创建时间
+    ensure_memory_version_tables(pool, conn)
+    with _checked_lock:
+        if pool in _checked_pools:
+            return
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_stats_summary'"
+    ).fetchone() is not None
+    for statement in _SCHEMA_STATEMENTS:
+        conn.execute(statement)
+    if not exists:
+        conn.execute(_rebuild_sql(""))
+
+    def mark_checked() -> None:
+        with _checked_lock:
+            _checked_pools.add(pool)
+
+    pool.call_after_commit(mark_checked)
+
+
+# ============================================================================
+# 统计读取与重建
+# ============================================================================
+
+class MemoryStatsStore:
+    """项目记忆统计（单行读取）"""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def _get_connection(self):
+        return self._pool.connection()
+
+    def get(self, project_id: str) -> Dict[str, Any]:
+        """
+        获取项目记忆统计
+
+        Returns:
+            总数、按类型计数（兼容原 *_memories 字段）、by_type / by_category /
+            by_importance / importance_histogram、平均重要性与最后创建时间
+        """
+        with self._get_connection() as conn:
+            ensure_memory_stats_tables(self._pool, conn)
+            row = conn.execute(
+                "SELECT * FROM memory_stats_summary WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return self.format(project_id, dict(row) if row else {})
+
+    @staticmethod
+    def format(project_id: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """统计行转换为接口格式"""
+        total = row.get("total", 0)
+        by_type = {memory_type: row.get(f"type_{memory_type}", 0) for memory_type in MEMORY_TYPES}
+        by_category = {category: row.get(f"category_{category}", 0) for category in MEMORY_CATEGORIES}
+        if row.get("type_other"):
+            by_type["other"] = row["type_other"]
+        if row.get("category_other"):
+            by_category["other"] = row["category_other"]
+        histogram = {str(level): row.get(f"importance_{level}", 0) for level in IMPORTANCE_LEVELS}
+        by_importance = {
+            label: sum(histogram[str(level)] for level in range(low, high + 1))
+            for label, low, high in IMPORTANCE_BANDS
+        }
+        return {
+            "project_id": project_id,
+            "total_memories": total,
+            **{f"{memory_type}_memories": count for memory_type, count in by_type.items() if memory_type != "other"},
+            "by_type": by_type,
+            "by_category": by_category,
+            "by_importance": by_importance,
+            "importance_histogram": histogram,
+            "avg_importance": round(row.get("importance_sum", 0) / total, 2) if total else 0.0,
+            "last_memory_created_at": row.get("last_memory_created_at"),
+            "last_updated": row.get("updated_at")
+        }
+
+    def rebuild(self, project_id: Optional[str] = None) -> int:
+        """
+        从 project_memories 重建统计
+
+        Args:
+            project_id: 只重建指定项目，None 为全部项目
+
+        Returns:
+            重建的项目数
+        """
+        with self._get_connection() as conn:
+            ensure_memory_stats_tables(self._pool, conn)
+            if project_id is None:
+                conn.execute("DELETE FROM memory_stats_summary")
+                conn.execute(_rebuild_sql(""))
+            else:
+                conn.execute("DELETE FROM memory_stats_summary WHERE project_id = ?", (project_id,))
+                conn.execute(_rebuild_sql("WHERE pm.project_id = :project_id"), {"project_id": project_id})
+            return conn.execute("SELECT changes()").fetchone()[0]
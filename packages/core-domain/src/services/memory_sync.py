@@ -0,0 +1,704 @@
+# -*- coding: utf-8 -*-
+"""
+外部记忆系统同步（Memory Sync Outbox）
+
+功能：
+1. 发件箱（outbox）：记忆写入本地数据库时，同一事务内登记待同步记录，本地写入立即返回
+2. 异步同步任务：共享连接池的 httpx.AsyncClient 批量并发推送到 Ultra Memory / Session Memory
+3. 失败按指数退避重试，超过最大次数标记为 failed
+4. 按目标系统熔断：连续失败后暂停请求，冷却后半开探测
+5. 同步成功后回写 project_memories.external_memory_id
+
+远程地址可通过环境变量 ULTRA_MEMORY_URL / SESSION_MEMORY_URL 覆盖，
+测试时可指向 scripts/memory_sync_stub_server.py 启动的本地替身服务。
+"""
+
+from typing import List, Dict, Any, Optional, Callable
+from datetime import datetime
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from .db_pool import ConnectionPool
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ULTRA_MEMORY_URL = os.getenv("ULTRA_MEMORY_URL", "http://13.158.83.99:7000")
+DEFAULT_SESSION_MEMORY_URL = os.getenv("SESSION_MEMORY_URL", "http://13.158.83.99:4000")
+DEFAULT_ULTRA_NAMESPACE = os.getenv("ULTRA_MEMORY_NAMESPACE", "wanxin_ultra")
+
+
+class SyncTarget:
+    """同步目标系统"""
+    ULTRA = "ultra"                  # Ultra Memory Cloud
+    SESSION = "session"              # Session Memory
+
+
+class SyncStatus:
+    """发件箱记录状态"""
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class PermanentSyncError(Exception):
+    """不可重试的同步错误（如 4xx 请求错误）"""
+
+
+# ============================================================================
+# 请求体构建
+# ============================================================================
+
+def build_ultra_payload(
+    memory_id: str,
+    project_id: str,
+    content: str,
+    metadata: Dict[str, Any],
+    namespace: str = DEFAULT_ULTRA_NAMESPACE
+) -> Dict[str, Any]:
+    """构建 Ultra Memory /store 请求体（远程ID由本地记忆ID派生，重试幂等）"""
+    return {
+        "namespace": namespace,
+        "id": f"taskflow_{project_id}_{memory_id}",
+        "content": content,
+        "metadata": {
+            **metadata,
+            "project_id": project_id,
+            "memory_id": memory_id,
+            "stored_at": datetime.now().isoformat(),
+            "source": "project_memory_service"
+        }
+    }
+
+
+def build_session_payload(
+    project_id: str,
+    title: str,
+    content: str
+) -> Dict[str, Any]:
+    """构建 Session Memory /api/tasks/match 请求体"""
+    return {
+        "user_id": "taskflow",
+        "platform": "taskflow-system",
+        "workspace_path": f"/projects/{project_id}",
+        "message": f"{title}: {content}"
+    }
+
+
+# ============================================================================
+# 存储结构（与 database/migrations/011_memory_sync_outbox.sql 保持一致）
+# ============================================================================
+
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS memory_sync_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        memory_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        target TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        lease_until REAL,
+        claim_token TEXT,
+        external_memory_id TEXT,
+        last_error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        UNIQUE(memory_id, target)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_memory_sync_outbox_due ON memory_sync_outbox(status, next_attempt_at)",
+    "CREATE INDEX IF NOT EXISTS idx_memory_sync_outbox_claim ON memory_sync_outbox(claim_token)"
+)
+
+
+# ============================================================================
+# 发件箱
+# ============================================================================
+
+class MemorySyncOutbox:
+    """
+    记忆同步发件箱
+
+    enqueue() 复用调用方当前线程的事务（连接池嵌套），记忆与发件箱记录同时提交或回滚。
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        """
+        初始化发件箱
+
+        Args:
+            pool: 数据库连接池（与 ProjectMemoryService 共用）
+        """
+        self._pool = pool
+        self._schema_checked = False
+        self._listeners: List[Callable[[], None]] = []
+        self._listeners_lock = threading.Lock()
+
+    def ensure_schema(self, conn) -> None:
+        """确保发件箱表存在（兼容未执行 migration 011 的数据库）"""
+        if self._schema_checked:
+            return
+        for statement in _SCHEMA_STATEMENTS:
+            conn.execute(statement)
+        self._pool.call_after_commit(lambda: setattr(self, "_schema_checked", True))
+
+    def add_listener(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        登记新记录提交后的通知回调（同步任务借此即时唤醒）
+
+        Returns:
+            取消登记函数
+        """
+        with self._listeners_lock:
+            self._listeners.append(callback)
+
+        def remove() -> None:
+            with self._listeners_lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+
+        return remove
+
+    def _notify(self) -> None:
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Outbox listener failed: {e}", exc_info=True)
+
+    def enqueue(
+        self,
+        memory_id: str,
+        project_id: str,
+        target: str,
+        payload: Dict[str, Any]
+    ) -> None:
+        """
+        登记待同步记录（同一记忆同一目标只保留一条，重复登记会重新排队）
+
+        Args:
+            memory_id: 本地记忆ID
+            project_id: 项目ID
+            target: 同步目标（SyncTarget）
+            payload: 请求体
+        """
+        now = datetime.now().isoformat()
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            conn.execute("""
+                INSERT INTO memory_sync_outbox (
+                    memory_id, project_id, target, payload, status,
+                    attempts, next_attempt_at, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, 'pending', 0, 0, ?, ?)
+                ON CONFLICT(memory_id, target) DO UPDATE SET
+                    payload = excluded.payload,
+                    status = 'pending',
+                    attempts = 0,
+                    next_attempt_at = 0,
+                    last_error = NULL,
+                    updated_at = excluded.updated_at
+            """, (
+                memory_id,
+                project_id,
+                target,
+                json.dumps(payload, ensure_ascii=False, default=str),
+                now,
+                now
+            ))
+            self._pool.call_after_commit(self._notify)
+
+    def claim(self, limit: int, lease_seconds: float = 60.0) -> List[Dict[str, Any]]:
+        """
+        领取到期的待同步记录
+
+        单条 UPDATE 完成领取，多个进程的同步任务不会领取到同一记录；
+        租约过期（同步任务崩溃）的 in_flight 记录会被重新领取。
+
+        Args:
+            limit: 最大领取数量
+            lease_seconds: 租约时长（秒）
+
+        Returns:
+            记录列表（payload 已解析）
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            conn.execute("""
+                UPDATE memory_sync_outbox
+                SET status = 'in_flight', claim_token = ?, lease_until = ?, updated_at = ?
+                WHERE id IN (
+                    SELECT id FROM memory_sync_outbox
+                    WHERE (status = 'pending' AND next_attempt_at <= ?)
+                       OR (status = 'in_flight' AND lease_until < ?)
+                    ORDER BY next_attempt_at, id
+                    LIMIT ?
+                )
+            """, (token, now + lease_seconds, datetime.now().isoformat(), now, now, limit))
+            rows = conn.execute("""
+                SELECT id, memory_id, project_id, target, payload, attempts
+                FROM memory_sync_outbox WHERE claim_token = ?
+                ORDER BY id
+            """, (token,)).fetchall()
+
+        items = []
+        for row in rows:
+            item = dict(row)
+            item["payload"] = json.loads(item["payload"])
+            items.append(item)
+        return items
+
+    def complete(self, item: Dict[str, Any], external_memory_id: Optional[str]) -> None:
+        """标记同步成功，并回写记忆的 external_memory_id"""
+        now = datetime.now().isoformat()
+        with self._pool.connection() as conn:
+            conn.execute("""
+                UPDATE memory_sync_outbox
+                SET status = 'done', attempts = attempts + 1, external_memory_id = ?,
+                    last_error = NULL, lease_until = NULL, updated_at = ?
+                WHERE id = ?
+            """, (external_memory_id, now, item["id"]))
+            if external_memory_id:
+                conn.execute("""
+                    UPDATE project_memories
+                    SET external_memory_id = ?, updated_at = ?
+                    WHERE id = ?
+                """, (external_memory_id, now, item["memory_id"]))
+
+    def retry_later(
+        self,
+        item: Dict[str, Any],
+        delay_seconds: float,
+        error: Optional[str] = None,
+        count_attempt: bool = True
+    ) -> None:
+        """
+        重新排队
+
+        Args:
+            item: 记录
+            delay_seconds: 延迟（秒）
+            error: 错误信息
+            count_attempt: 是否计入尝试次数（熔断跳过时不计入）
+        """
+        with self._pool.connection() as conn:
+            conn.execute("""
+                UPDATE memory_sync_outbox
+                SET status = 'pending', attempts = attempts + ?, next_attempt_at = ?,
+                    last_error = COALESCE(?, last_error), lease_until = NULL, updated_at = ?
+                WHERE id = ?
+            """, (
+                1 if count_attempt else 0,
+                time.time() + delay_seconds,
+                error,
+                datetime.now().isoformat(),
+                item["id"]
+            ))
+
+    def fail(self, item: Dict[str, Any], error: str) -> None:
+        """标记为最终失败（不再重试，可通过 requeue_failed 重新排队）"""
+        with self._pool.connection() as conn:
+            conn.execute("""
+                UPDATE memory_sync_outbox
+                SET status = 'failed', attempts = attempts + 1, last_error = ?,
+                    lease_until = NULL, updated_at = ?
+                WHERE id = ?
+            """, (error, datetime.now().isoformat(), item["id"]))
+
+    def requeue_failed(self, project_id: Optional[str] = None) -> int:
+        """
+        失败记录重新排队
+
+        Returns:
+            重新排队数量
+        """
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            sql = """
+                UPDATE memory_sync_outbox
+                SET status = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ?
+                WHERE status = 'failed'
+            """
+            params: List[Any] = [datetime.now().isoformat()]
+            if project_id:
+                sql += " AND project_id = ?"
+                params.append(project_id)
+            count = conn.execute(sql, params).rowcount
+            if count:
+                self._pool.call_after_commit(self._notify)
+        return count
+
+    def get_stats(self, project_id: Optional[str] = None) -> Dict[str, Any]:
+        """按目标与状态统计发件箱记录"""
+        with self._pool.connection() as conn:
+            self.ensure_schema(conn)
+            sql = "SELECT target, status, COUNT(*) FROM memory_sync_outbox"
+            params: List[Any] = []
+            if project_id:
+                sql += " WHERE project_id = ?"
+                params.append(project_id)
+            rows = conn.execute(sql + " GROUP BY target, status", params).fetchall()
+
+        stats: Dict[str, Dict[str, int]] = {}
+        for target, status, count in rows:
+            stats.setdefault(target, {})[status] = count
+        return stats
+
+
+# ============================================================================
+# 熔断器
+# ============================================================================
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    closed：正常请求；连续失败 failure_threshold 次后 open；
+    open：拒绝请求，reset_timeout 秒后 half_open；
+    half_open：放行一个探测请求，成功则 closed，失败则重新 open。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.open_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """是否允许发出请求"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def retry_after(self) -> float:
+        """距离允许下一次探测的秒数"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.open_count += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "open_count": self.open_count,
+            "retry_after": round(self.retry_after(), 3)
+        }
+
+
+# ============================================================================
+# 同步任务
+# ============================================================================
+
+class MemorySyncWorker:
+    """
+    异步同步任务
+
+    在API事件循环中运行：领取一批到期记录，经共享连接池的 httpx.AsyncClient
+    并发推送，不阻塞请求处理。
+    """
+
+    def __init__(
+        self,
+        outbox: MemorySyncOutbox,
+        ultra_url: str = DEFAULT_ULTRA_MEMORY_URL,
+        session_url: str = DEFAULT_SESSION_MEMORY_URL,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        poll_interval: float = 5.0,
+        request_timeout: float = 10.0,
+        max_attempts: int = 8,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        lease_seconds: float = 60.0,
+        breaker_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        client=None
+    ):
+        """
+        初始化同步任务
+
+        Args:
+            outbox: 发件箱
+            ultra_url: Ultra Memory HTTP API 地址
+            session_url: Session Memory HTTP API 地址
+            batch_size: 每批领取记录数
+            concurrency: 并发请求数（也是连接池大小）
+            poll_interval: 无新记录通知时的轮询间隔（秒）
+            request_timeout: 单次请求超时（秒）
+            max_attempts: 最大尝试次数，超过后标记为 failed
+            backoff_base: 退避底数（第n次失败后等待 base^n 秒，含抖动）
+            backoff_max: 最大退避（秒）
+            lease_seconds: 领取租约（秒）
+            breaker_threshold: 熔断阈值（连续失败次数）
+            breaker_reset_timeout: 熔断冷却时间（秒）
+            client: 预先创建的 httpx.AsyncClient（测试时注入），None 时启动时创建
+        """
+        self.outbox = outbox
+        self.endpoints = {
+            SyncTarget.ULTRA: f"{ultra_url.rstrip('/')}/store",
+            SyncTarget.SESSION: f"{session_url.rstrip('/')}/api/tasks/match"
+        }
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.request_timeout = request_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.breakers = {
+            target: CircuitBreaker(breaker_threshold, breaker_reset_timeout)
+            for target in self.endpoints
+        }
+
+        self._client = client
+        self._owns_client = client is None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._remove_listener: Optional[Callable[[], None]] = None
+        self.is_running = False
+
+        self.stats = {
+            "batches": 0,
+            "synced": 0,
+            "retried": 0,
+            "failed": 0,
+            "skipped_open_circuit": 0,
+            "last_sync_at": None
+        }
+
+    # ========================================================================
+    # 生命周期
+    # ========================================================================
+
+    async def start(self) -> bool:
+        """
+        启动同步任务
+
+        Returns:
+            是否启动（未安装 httpx 时不启动，记录保留在发件箱中）
+        """
+        if self.is_running:
+            return True
+        if self._client is None:
+            try:
+                import httpx
+            except ImportError:
+                logger.warning("httpx not installed, memory sync worker disabled")
+                return False
+            self._client = httpx.AsyncClient(
+                timeout=self.request_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency
+                )
+            )
+
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        def on_enqueue() -> None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # 事件循环已关闭
+
+        self._remove_listener = self.outbox.add_listener(on_enqueue)
+        self.is_running = True
+        self._task = loop.create_task(self._run())
+        logger.info("Memory sync worker started")
+        return True
+
+    async def stop(self) -> None:
+        """停止同步任务（未完成的记录租约过期后会被重新领取）"""
+        self.is_running = False
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        logger.info("Memory sync worker stopped")
+
+    def notify(self) -> None:
+        """唤醒同步任务（同一事件循环内调用）"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while self.is_running:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Memory sync batch failed: {e}", exc_info=True)
+                processed = 0
+            if processed >= self.batch_size:
+                continue  # 可能还有积压，立即处理下一批
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ========================================================================
+    # 同步
+    # ========================================================================
+
+    async def run_once(self) -> int:
+        """
+        处理一批到期记录
+
+        Returns:
+            本批领取数量
+        """
+        loop = asyncio.get_running_loop()
+        items = await loop.run_in_executor(None, self.outbox.claim, self.batch_size, self.lease_seconds)
+        if not items:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def process(item: Dict[str, Any]) -> None:
+            async with semaphore:
+                await self._process(item)
+
+        await asyncio.gather(*(process(item) for item in items))
+        self.stats["batches"] += 1
+        self.stats["last_sync_at"] = datetime.now().isoformat()
+        return len(items)
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        target = item["target"]
+        breaker = self.breakers.get(target)
+        if breaker is None:
+            await loop.run_in_executor(None, self.outbox.fail, item, f"Unknown sync target: {target}")
+            return
+
+        if not breaker.allow():
+            # 熔断中：不发请求、不计尝试次数，冷却结束后再领取
+            self.stats["skipped_open_circuit"] += 1
+            await loop.run_in_executor(
+                None,
+                lambda: self.outbox.retry_later(item, max(breaker.retry_after(), 1.0), count_attempt=False)
+            )
+            return
+
+        try:
+            external_memory_id = await self._send(target, item["payload"])
+        except PermanentSyncError as e:
+            breaker.record_success()  # 远端可用，只是请求本身有误
+            self.stats["failed"] += 1
+            await loop.run_in_executor(None, self.outbox.fail, item, str(e))
+            return
+        except Exception as e:
+            breaker.record_failure()
+            error = f"{type(e).__name__}: {e}"
+            attempts = item["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self.stats["failed"] += 1
+                await loop.run_in_executor(None, self.outbox.fail, item, error)
+            else:
+                self.stats["retried"] += 1
+                delay = self._backoff(attempts)
+                await loop.run_in_executor(
+                    None, lambda: self.outbox.retry_later(item, delay, error)
+                )
+            logger.warning(f"Memory sync to {target} failed (attempt {attempts}): {error}")
+            return
+
+        breaker.record_success()
+        self.stats["synced"] += 1
+        await loop.run_in_executor(None, self.outbox.complete, item, external_memory_id)
+
+    def _backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待时间（全抖动指数退避）"""
+        ceiling = min(self.backoff_max, self.backoff_base ** attempts)
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def _send(self, target: str, payload: Dict[str, Any]) -> Optional[str]:
+        """发送请求，返回外部记忆ID"""
+        response = await self._client.post(self.endpoints[target], json=payload)
+        if response.status_code >= 500 or response.status_code == 429:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise PermanentSyncError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+        result = response.json()
+        if not result.get("success"):
+            raise RuntimeError(f"Remote rejected: {str(result)[:200]}")
+
+        if target == SyncTarget.ULTRA:
+            # Ultra Memory HTTP API返回格式: {success: true, data: {id: "xxx"}}
+            return (result.get("data") or {}).get("id") or payload.get("id")
+        # Session Memory Tasks API返回格式: {success: true, data: {task: {task_id: "xxx"}}}
+        return result["data"]["task"]["task_id"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取同步统计"""
+        return {
+            **self.stats,
+            "is_running": self.is_running,
+            "breakers": {target: breaker.to_dict() for target, breaker in self.breakers.items()}
+        }
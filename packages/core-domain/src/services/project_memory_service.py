@@ -8,15 +8,42 @@
 3. 自动记录问题解决方案
 4. 跨会话知识继承
 5. 集成 Session Memory 和 Ultra Memory Cloud
+6. 本地全文/语义检索（FTS5 + 可选向量索引，离线可用）
+7. 检索历史汇总与热点记忆缓存
+8. 近似重复合并与冷数据归档
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import uuid
-import sqlite3
 from pathlib import Path
-from contextlib import contextmanager
+
+from .db_pool import get_connection_pool
+from .memory_search import MemorySearchIndex, Embedder, build_memory_filters
+from .memory_links import TAG_MODE_ANY, ensure_memory_link_tables
+from .memory_inheritance import KnowledgeBundleBuilder
+from .memory_graph import MemoryGraphStore, RelationEdge
+from .conversation_classifier import ConversationClassification, get_default_classifier
+from .memory_analytics import (
+    RetrievalAnalytics,
+    HotMemoryCache,
+    normalize_query,
+    encode_filters,
+    get_project_version
+)
+from .memory_compaction import MemoryCompactor
+from .memory_stats import MemoryStatsStore, ensure_memory_stats_tables
+from .memory_sync import (
+    MemorySyncOutbox,
+    CircuitBreaker,
+    SyncTarget,
+    SyncStatus,
+    DEFAULT_ULTRA_MEMORY_URL,
+    DEFAULT_ULTRA_NAMESPACE,
+    build_ultra_payload,
+    build_session_payload
+)
 
 
 class MemoryType:
@@ -55,49 +82,81 @@ class ProjectMemoryService:
     - 本地数据库（SQLite）
     - Session Memory MCP（会话记忆）
     - Ultra Memory Cloud MCP（长期记忆）
+
+    外部系统的写入经发件箱（memory_sync_outbox）异步同步，create_memory 不发起网络请求。
     """
 
+    REMOTE_SEARCH_TIMEOUT = 3.0  # 远程检索超时（秒）
+
     def __init__(
         self,
         state_manager=None,
         db_path: str = "database/data/tasks.db",
         session_memory_enabled: bool = True,
-        ultra_memory_enabled: bool = True
+        ultra_memory_enabled: bool = True,
+        remote_search_enabled: bool = False,
+        search_embedder: Optional[Embedder] = None,
+        persist: bool = True
     ):
         """
         初始化项目记忆服务
 
         Args:
-            state_manager: 状态管理器（访问数据库）- 弃用，保留兼容性
+            state_manager: 状态管理器 - 弃用，仅保留参数兼容性，不再影响行为
             db_path: 数据库文件路径
             session_memory_enabled: 是否启用Session Memory
             ultra_memory_enabled: 是否启用Ultra Memory Cloud
+            remote_search_enabled: 检索时是否额外查询Ultra Memory（网络往返，默认只用本地索引）
+            search_embedder: 本地向量化函数，提供时启用语义召回
+            persist: 是否将记忆与关系写入本地数据库（False 时 create_* 只构造返回数据）
         """
         self.state_manager = state_manager  # 保留兼容性
+        self.persist = persist
         self.db_path = Path(db_path)
         self.session_memory_enabled = session_memory_enabled
         self.ultra_memory_enabled = ultra_memory_enabled
+        self.remote_search_enabled = remote_search_enabled
 
         # 确保数据库目录存在
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    @contextmanager
+        # 共享连接池（与EventStore等服务共用tasks.db连接）
+        self._pool = get_connection_pool(str(self.db_path))
+
+        # 本地检索索引
+        self.search_index = MemorySearchIndex(self._pool, embedder=search_embedder)
+
+        # 知识继承包（单次查询 + 按项目缓存）
+        self.knowledge_bundles = KnowledgeBundleBuilder(
+            self._pool,
+            search_index=self.search_index,
+            parse_row=self._parse_memory_row
+        )
+
+        # 记忆关系图（按项目缓存的邻接表）
+        self.relation_graph = MemoryGraphStore(self._pool)
+
+        # 检索历史汇总；热点检索结果/记忆详情缓存（按项目版本号失效）
+        self.retrieval_analytics = RetrievalAnalytics(self._pool)
+        self.hot_cache = HotMemoryCache()
+
+        # 近似去重与冷数据归档
+        self.compactor = MemoryCompactor(self._pool)
+
+        # 记忆统计（触发器维护的单行汇总）
+        self.memory_stats = MemoryStatsStore(self._pool)
+
+        # 外部记忆同步发件箱；远程检索熔断器
+        self.sync_outbox = MemorySyncOutbox(self._pool)
+        self.remote_search_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+
     def _get_connection(self):
         """获取数据库连接（上下文管理器）
 
         Yields:
-            sqlite3.Connection: 数据库连接
+            sqlite3.Connection: 连接池中的数据库连接
         """
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        return self._pool.connection()
 
     # ========================================================================
     # 核心功能：记忆存储
@@ -157,12 +216,15 @@ class ProjectMemoryService:
             "updated_at": datetime.now().isoformat()
         }
 
-        # 2. 根据记忆类型，同步到外部记忆系统
-        external_memory_id = None
+        # 2. 根据记忆类型，登记到外部记忆系统的发件箱（由 MemorySyncWorker 异步同步）
+        sync_target = None
+        sync_payload = None
 
         if memory_type == MemoryType.ULTRA and self.ultra_memory_enabled:
             # 存储到 Ultra Memory Cloud（长期记忆）
-            external_memory_id = self._store_to_ultra_memory(
+            sync_target = SyncTarget.ULTRA
+            sync_payload = build_ultra_payload(
+                memory_id=memory_id,
                 project_id=project_id,
                 content=content,
                 metadata={
@@ -172,24 +234,35 @@ class ProjectMemoryService:
                     "importance": importance
                 }
             )
-            memory_data["external_memory_id"] = external_memory_id
 
         elif memory_type == MemoryType.SESSION and self.session_memory_enabled:
             # 存储到 Session Memory（会话记忆）
-            external_memory_id = self._store_to_session_memory(
+            sync_target = SyncTarget.SESSION
+            sync_payload = build_session_payload(
                 project_id=project_id,
                 title=title,
-                content=content,
-                context=context
+                content=content
             )
-            memory_data["external_memory_id"] = external_memory_id
-
-        # 3. 保存到本地数据库
-        if self.state_manager:
-            self._save_memory_to_db(memory_data)
 
-        # 4. 更新统计
-        self._update_memory_stats(project_id, memory_type)
+        # 3. 保存到本地数据库（与发件箱记录同一事务提交）
+        #    未保存到本地时不登记发件箱，避免同步并回写一条不存在的记忆
+        stored = False
+        with self._get_connection() as conn:
+            if self.persist:
+                with self.relation_graph.track(
+                    conn, project_id,
+                    lambda graph: graph.add_node(memory_id, title, category, importance)
+                ):
+                    self._save_memory_to_db(memory_data)
+                    if sync_target:
+                        self.sync_outbox.enqueue(
+                            memory_id=memory_id,
+                            project_id=project_id,
+                            target=sync_target,
+                            payload=sync_payload
+                        )
+                stored = True
+        memory_data["sync_status"] = SyncStatus.PENDING if stored and sync_target else None
 
         return memory_data
 
@@ -200,7 +273,11 @@ class ProjectMemoryService:
         category: Optional[str] = None,
         memory_type: Optional[str] = None,
         tags: Optional[List[str]] = None,
-        limit: int = 10
+        limit: int = 10,
+        tag_mode: str = TAG_MODE_ANY,
+        task_id: Optional[str] = None,
+        issue_id: Optional[str] = None,
+        record_retrieval: bool = True
     ) -> List[Dict[str, Any]]:
         """
         检索项目记忆
@@ -212,21 +289,32 @@ class ProjectMemoryService:
             memory_type: 记忆类型过滤
             tags: 标签过滤
             limit: 返回数量限制
+            tag_mode: 多标签匹配方式，any（任意一个）/ all（全部包含）
+            task_id: 关联任务过滤
+            issue_id: 关联问题过滤
+            record_retrieval: 是否写入检索历史（只读浏览传 False，避免污染检索统计）
 
         Returns:
             记忆列表
+
+        Raises:
+            ValueError: tag_mode 无效
         """
-        # 1. 从本地数据库查询
-        memories = self._query_memories_from_db(
-            project_id=project_id,
-            category=category,
-            memory_type=memory_type,
-            tags=tags,
-            limit=limit
-        )
+        filters = {
+            "category": category,
+            "memory_type": memory_type,
+            "tags": tags,
+            "limit": limit,
+            "tag_mode": tag_mode,
+            "task_id": task_id,
+            "issue_id": issue_id
+        }
+
+        # 1. 本地检索（热点查询直接命中缓存）
+        memories = self._retrieve_local(project_id, query, filters)
 
-        # 2. 如果有查询文本，使用Ultra Memory进行语义搜索
-        if query and self.ultra_memory_enabled:
+        # 2. 显式启用时再合并Ultra Memory远程检索结果
+        if query and self.remote_search_enabled and self.ultra_memory_enabled:
             ultra_results = self._query_from_ultra_memory(
                 project_id=project_id,
                 query=query,
@@ -236,14 +324,131 @@ class ProjectMemoryService:
             memories = self._merge_memory_results(memories, ultra_results)
 
         # 3. 记录检索历史（用于优化推荐）
-        self._record_retrieval(
-            project_id=project_id,
-            query=query,
-            memory_ids=[m["id"] for m in memories]
-        )
+        if record_retrieval:
+            self._record_retrieval(
+                project_id=project_id,
+                query=query,
+                memory_ids=[m["id"] for m in memories],
+                filters=filters
+            )
+
+        return memories
+
+    def _retrieve_local(
+        self,
+        project_id: str,
+        query: Optional[str],
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """本地检索，结果按（查询文本, 检索参数）缓存，项目记忆有写入时失效"""
+        with self._get_connection() as conn:
+            version = get_project_version(self._pool, conn, project_id)
+        key = (normalize_query(query), encode_filters(filters))
+        cached = self.hot_cache.get_query(project_id, version, key)
+        if cached is not None:
+            return cached
+
+        # 有查询文本时走本地检索索引，否则按过滤条件查询
+        if query:
+            memories = [
+                self._parse_memory_row(row)
+                for row in self.search_index.search(project_id=project_id, query=query, **filters)
+            ]
+        else:
+            memories = self._query_memories_from_db(project_id=project_id, **filters)
 
+        self.hot_cache.put_query(project_id, version, key, memories)
         return memories
 
+    def get_memory(self, project_id: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单个记忆（优先从热点缓存读取）
+
+        Args:
+            project_id: 项目ID
+            memory_id: 记忆ID
+
+        Returns:
+            记忆字典，不存在时返回None
+        """
+        with self._get_connection() as conn:
+            version = get_project_version(self._pool, conn, project_id)
+            memory = self.hot_cache.get_memory(project_id, version, memory_id)
+            if memory is not None:
+                return memory
+            row = conn.execute(
+                "SELECT * FROM project_memories WHERE id = ? AND project_id = ?",
+                (memory_id, project_id)
+            ).fetchone()
+        if row is None:
+            return None
+        memory = self._parse_memory_row(row)
+        self.hot_cache.put_memory(project_id, version, memory)
+        return memory
+
+    def warm_hot_cache(
+        self,
+        project_id: str,
+        query_limit: int = 20,
+        memory_limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        按检索统计预热热点缓存（重放最常见的查询，预读命中最多的记忆）
+
+        预热不写入检索历史，避免影响统计。
+
+        Args:
+            project_id: 项目ID
+            query_limit: 预热的查询数量
+            memory_limit: 预热的记忆数量
+
+        Returns:
+            {"queries": 预热查询数, "memories": 预热记忆数}
+        """
+        warmed_queries = 0
+        for item in self.retrieval_analytics.get_top_queries(project_id, query_limit):
+            filters = {
+                name: item["filters"].get(name)
+                for name in ("category", "memory_type", "tags", "task_id", "issue_id")
+            }
+            filters["limit"] = item["filters"].get("limit", 10)
+            filters["tag_mode"] = item["filters"].get("tag_mode", TAG_MODE_ANY)
+            try:
+                self._retrieve_local(project_id, item["query"], filters)
+            except ValueError:
+                continue
+            warmed_queries += 1
+
+        hot_ids = [
+            item["memory_id"]
+            for item in self.retrieval_analytics.get_hot_memories(project_id, memory_limit)
+        ]
+        with self._get_connection() as conn:
+            version = get_project_version(self._pool, conn, project_id)
+        memories = self._fetch_memories(hot_ids)
+        for memory in memories.values():
+            self.hot_cache.put_memory(project_id, version, memory)
+
+        self.hot_cache.stats["warmed"] += warmed_queries + len(memories)
+        return {"queries": warmed_queries, "memories": len(memories)}
+
+    def get_retrieval_analytics(self, project_id: str, limit: int = 20) -> Dict[str, Any]:
+        """
+        获取检索统计（热点记忆、常见查询）及缓存状态
+
+        Args:
+            project_id: 项目ID
+            limit: 每类返回数量
+
+        Returns:
+            {"hot_memories": [...], "top_queries": [...], "cache": {...}}
+        """
+        return {
+            "hot_memories": self.retrieval_analytics.get_hot_memories(project_id, limit),
+            "top_queries": self.retrieval_analytics.get_top_queries(project_id, limit),
+            "cache": self.hot_cache.get_stats()
+        }
+
     # ========================================================================
     # 自动记录功能
     # ========================================================================
@@ -415,7 +620,8 @@ class ProjectMemoryService:
         ai_response: str,
         conversation_id: Optional[str] = None,
         actor: str = "user",
-        ai_role: str = "assistant"
+        ai_role: str = "assistant",
+        classification: Optional[ConversationClassification] = None
     ) -> Dict[str, Any]:
         """
         自动记录对话到记忆空间
@@ -433,6 +639,7 @@ class ProjectMemoryService:
             conversation_id: 会话ID
             actor: 用户标识
             ai_role: AI角色（architect/fullstack/devops）
+            classification: 预先计算的分类结果（批量记录时由 classify_turns 并行得到）
 
         Returns:
             {
@@ -441,26 +648,28 @@ class ProjectMemoryService:
                 "event_emitted": bool
             }
         """
-        # 1. 判断是否需要记录
-        should_record, memory_type, keywords = self._analyze_conversation(
-            user_input, ai_response
-        )
+        # 1. 一次扫描得到是否需要记录、记忆类型、分类、重要性与精炼内容
+        if classification is None:
+            classification = get_default_classifier().classify(user_input, ai_response)
+        memory_type = classification.memory_type
+        keywords = classification.keywords
 
-        if not should_record:
+        if not classification.should_record:
             return {
                 "should_record": False,
                 "reason": "对话未包含需要记录的内容",
-                "keywords_found": keywords
+                "keywords_found": keywords,
+                "scores": classification.scores
             }
 
         # 2. 生成对话摘要
         summary = self._generate_conversation_summary(
-            user_input, ai_response, memory_type
+            user_input, ai_response, classification
         )
 
         # 3. 确定记忆类型和分类
-        category = self._determine_memory_category(memory_type, keywords)
-        importance = self._calculate_importance(memory_type, keywords)
+        category = classification.category
+        importance = classification.importance
 
         # 4. 创建记忆（同时写入session和ultra）
         memories_created = []
@@ -512,79 +721,15 @@ class ProjectMemoryService:
             "importance": importance,
             "memories_created": memories_created,
             "keywords": keywords,
+            "scores": classification.scores,
             "recorded_at": datetime.now().isoformat()
         }
 
-    def _analyze_conversation(
-        self,
-        user_input: str,
-        ai_response: str
-    ) -> tuple[bool, str, List[str]]:
-        """
-        分析对话是否需要记录
-
-        Returns:
-            (should_record, memory_type, keywords)
-        """
-        combined_text = f"{user_input} {ai_response}".lower()
-
-        # 决策关键词
-        decision_keywords = [
-            "决定", "采用", "选择", "使用", "adr", "架构决策",
-            "决策", "方案确定", "最终方案", "技术选型"
-        ]
-
-        # 解决方案关键词
-        solution_keywords = [
-            "解决", "修复", "bug", "问题", "方案", "解决方法",
-            "fix", "解决了", "搞定", "已修复"
-        ]
-
-        # 知识关键词
-        knowledge_keywords = [
-            "学习", "笔记", "总结", "经验", "最佳实践",
-            "记住", "重要", "注意", "技巧", "规范"
-        ]
-
-        # 强制记录关键词
-        force_keywords = ["请记住", "需要记录", "写入记忆", "保存到记忆空间"]
-
-        found_keywords = []
-        memory_type = "knowledge"
-
-        # 检查强制记录
-        if any(kw in combined_text for kw in force_keywords):
-            found_keywords.append("强制记录")
-            return True, "knowledge", found_keywords
-
-        # 检查决策关键词
-        decision_found = [kw for kw in decision_keywords if kw in combined_text]
-        if decision_found:
-            found_keywords.extend(decision_found)
-            memory_type = "decision"
-
-        # 检查解决方案关键词
-        solution_found = [kw for kw in solution_keywords if kw in combined_text]
-        if solution_found:
-            found_keywords.extend(solution_found)
-            if memory_type != "decision":
-                memory_type = "solution"
-
-        # 检查知识关键词
-        knowledge_found = [kw for kw in knowledge_keywords if kw in combined_text]
-        if knowledge_found:
-            found_keywords.extend(knowledge_found)
-
-        # 判断是否需要记录（至少找到2个关键词）
-        should_record = len(found_keywords) >= 2 or len(decision_found) >= 1 or len(solution_found) >= 1
-
-        return should_record, memory_type, found_keywords[:5]  # 最多返回5个关键词
-
     def _generate_conversation_summary(
         self,
         user_input: str,
         ai_response: str,
-        memory_type: str
+        classification: ConversationClassification
     ) -> Dict[str, Any]:
         """
         生成对话摘要
@@ -603,59 +748,13 @@ class ProjectMemoryService:
         # 组合完整内容
         content = f"【用户】: {user_input}\n\n【AI回复】: {ai_response}"
 
-        # 精炼内容（提取关键点）
-        refined_content = self._refine_content(ai_response, memory_type)
-
         return {
             "title": f"[自动记录] {title}",
             "content": content,
-            "refined_content": refined_content,
-            "importance_reason": f"包含{memory_type}相关内容"
+            "refined_content": classification.refined_content,  # 分类时已提取关键行
+            "importance_reason": f"包含{classification.memory_type}相关内容"
         }
 
-    def _refine_content(self, text: str, memory_type: str) -> str:
-        """精炼内容，提取关键信息"""
-        # 简单提取（可以后续接入NLP优化）
-        lines = text.split('\n')
-        important_lines = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            # 保留包含关键信息的行
-            if any(kw in line.lower() for kw in ["决定", "采用", "解决", "方案", "重要", "注意"]):
-                important_lines.append(line)
-
-        if important_lines:
-            return '\n'.join(important_lines[:10])  # 最多10行
-        else:
-            return text[:300]  # 默认取前300字符
-
-    def _determine_memory_category(self, memory_type: str, keywords: List[str]) -> str:
-        """确定记忆分类"""
-        if memory_type == "decision" or "决策" in keywords or "adr" in keywords:
-            return MemoryCategory.DECISION
-        elif memory_type == "solution" or "解决" in keywords or "fix" in keywords:
-            return MemoryCategory.SOLUTION
-        else:
-            return MemoryCategory.KNOWLEDGE
-
-    def _calculate_importance(self, memory_type: str, keywords: List[str]) -> int:
-        """计算重要性（1-10）"""
-        base_importance = {
-            "decision": 8,
-            "solution": 7,
-            "knowledge": 5
-        }.get(memory_type, 5)
-
-        # 如果包含"重要"、"关键"等词，提升重要性
-        boost = 0
-        if any(kw in keywords for kw in ["重要", "关键", "核心", "critical"]):
-            boost = 2
-
-        return min(base_importance + boost, 10)
-
     # ========================================================================
     # 跨会话知识继承
     # ========================================================================
@@ -664,80 +763,39 @@ class ProjectMemoryService:
         self,
         project_id: str,
         context: Optional[str] = None,
-        limit: int = 20
+        limit: int = 20,
+        token_budget: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         跨会话知识继承
 
-        获取项目的历史记忆，帮助新会话快速获取上下文
+        获取项目的历史记忆，帮助新会话快速获取上下文。
+        各分区由一次查询算出并跨分区去重，结果按项目缓存，记忆写入后自动失效。
 
         Args:
             project_id: 项目ID
-            context: 当前上下文（用于相关性过滤）
-            limit: 返回记忆数量
+            context: 当前上下文（用于本地检索相关记忆）
+            limit: 相关记忆数量上限
+            token_budget: token 预算（可选），超出时按分区优先级裁剪
 
         Returns:
             知识继承包：{
                 "decisions": [...],  # 架构决策
                 "solutions": [...],  # 解决方案
                 "important_knowledge": [...],  # 重要知识
-                "recent_memories": [...]  # 最近记忆
+                "recent_memories": [...],  # 最近记忆
+                "related_memories": [...],  # 上下文相关记忆
+                "token_estimate": ...,  # 估算 token 数
+                "cached": ...  # 是否命中缓存
             }
         """
-        # 1. 获取架构决策记忆（按重要性排序）
-        decisions = self.retrieve_memories(
-            project_id=project_id,
-            category=MemoryCategory.DECISION,
-            limit=5
-        )
-
-        # 2. 获取解决方案记忆（按重要性排序）
-        solutions = self.retrieve_memories(
-            project_id=project_id,
-            category=MemoryCategory.SOLUTION,
-            limit=10
-        )
-
-        # 3. 获取重要知识（importance >= 7）
-        important_knowledge = self._query_important_memories(
+        return self.knowledge_bundles.build(
             project_id=project_id,
-            min_importance=7,
-            limit=5
-        )
-
-        # 4. 获取最近记忆（时间排序）
-        recent_memories = self._query_recent_memories(
-            project_id=project_id,
-            days=7,
-            limit=10
+            context=context,
+            limit=limit,
+            token_budget=token_budget
         )
 
-        # 5. 如果有上下文，使用语义搜索获取相关记忆
-        related_memories = []
-        if context and self.ultra_memory_enabled:
-            related_memories = self.retrieve_memories(
-                project_id=project_id,
-                query=context,
-                limit=10
-            )
-
-        return {
-            "project_id": project_id,
-            "decisions": decisions,
-            "solutions": solutions,
-            "important_knowledge": important_knowledge,
-            "recent_memories": recent_memories,
-            "related_memories": related_memories,
-            "total_inherited": (
-                len(decisions) +
-                len(solutions) +
-                len(important_knowledge) +
-                len(recent_memories) +
-                len(related_memories)
-            ),
-            "inherited_at": datetime.now().isoformat()
-        }
-
     # ========================================================================
     # 记忆关系管理
     # ========================================================================
@@ -772,7 +830,7 @@ class ProjectMemoryService:
             "created_at": datetime.now().isoformat()
         }
 
-        if self.state_manager:
+        if self.persist:
             self._save_relation_to_db(relation_data)
 
         return relation_data
@@ -781,7 +839,8 @@ class ProjectMemoryService:
         self,
         memory_id: str,
         relation_types: Optional[List[str]] = None,
-        min_strength: float = 0.5
+        min_strength: float = 0.5,
+        depth: int = 1
     ) -> List[Dict[str, Any]]:
         """
         获取相关记忆
@@ -789,143 +848,209 @@ class ProjectMemoryService:
         Args:
             memory_id: 记忆ID
             relation_types: 关系类型过滤
-            min_strength: 最小关系强度
+            min_strength: 最小关系强度（逐边过滤）
+            depth: 最大跳数；1 为直接关联（每条关系一项），
+                   大于1时每个记忆一项，按最强路径强度排序并附带 path/hops
 
         Returns:
             相关记忆列表
         """
-        if not self.state_manager:
+        if not self.persist:
             return []
 
-        return self._query_related_memories(
-            memory_id=memory_id,
-            relation_types=relation_types,
-            min_strength=min_strength
+        project_id = self.relation_graph.get_project_id(memory_id)
+        if project_id is None:
+            return []
+        graph = self.relation_graph.get(project_id)
+
+        if depth <= 1:
+            neighbors = graph.neighbors(memory_id, relation_types, min_strength)
+            memories = self._fetch_memories([neighbor for _, neighbor in neighbors])
+            return [
+                {**memories[neighbor], "relation_type": edge.relation_type,
+                 "strength": edge.strength, "hops": 1}
+                for edge, neighbor in neighbors
+                if neighbor in memories
+            ]
+
+        paths = graph.strongest_paths(
+            memory_id, relation_types, min_strength, max_depth=depth
         )
+        ranked = sorted(paths.items(), key=lambda item: -item[1][0])
+        memories = self._fetch_memories([node for node, _ in ranked])
+        return [
+            {**memories[node], "strength": round(strength, 6),
+             "hops": len(path) - 1, "path": path}
+            for node, (strength, path) in ranked
+            if node in memories
+        ]
 
-    # ========================================================================
-    # 记忆统计
-    # ========================================================================
-
-    def get_memory_stats(self, project_id: str) -> Dict[str, Any]:
+    def get_memory_graph(
+        self,
+        project_id: str,
+        relation_types: Optional[List[str]] = None,
+        min_strength: float = 0.0,
+        include_isolated: bool = True,
+        center_id: Optional[str] = None,
+        depth: int = 1
+    ) -> Dict[str, Any]:
         """
-        获取项目记忆统计
+        获取项目记忆关系图（知识星图一次请求渲染）
 
         Args:
             project_id: 项目ID
+            relation_types: 关系类型过滤
+            min_strength: 最小关系强度
+            include_isolated: 是否包含没有关系的记忆
+            center_id: 中心记忆ID（提供时只返回其k跳邻域）
+            depth: 邻域跳数
 
         Returns:
-            统计信息
+            {"nodes": [...], "links": [...], "component_count": ..., ...}
         """
-        if not self.state_manager:
-            return {}
+        graph = self.relation_graph.get(project_id)
+        return graph.to_dict(relation_types, min_strength, include_isolated, center_id, depth)
+
+    def find_memory_path(
+        self,
+        project_id: str,
+        source_memory_id: str,
+        target_memory_id: str,
+        relation_types: Optional[List[str]] = None,
+        min_strength: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        查找两个记忆之间的最强关联路径（路径强度为各边强度乘积）
 
-        return self._query_memory_stats(project_id)
+        Returns:
+            {"found": bool, "path": [节点...], "strength": float, "hops": int}
+        """
+        graph = self.relation_graph.get(project_id)
+        paths = graph.strongest_paths(
+            source_memory_id, relation_types, min_strength, target_id=target_memory_id
+        )
+        if target_memory_id not in paths:
+            return {"found": False, "path": [], "strength": 0.0, "hops": 0}
+        strength, path = paths[target_memory_id]
+        return {
+            "found": True,
+            "path": [graph.nodes[node] for node in path],
+            "strength": round(strength, 6),
+            "hops": len(path) - 1
+        }
 
     # ========================================================================
-    # 内部辅助方法
+    # 压实与归档
     # ========================================================================
 
-    def _store_to_ultra_memory(
+    def compact_memories(
         self,
         project_id: str,
-        content: str,
-        metadata: Dict[str, Any]
-    ) -> Optional[str]:
-        """存储到Ultra Memory Cloud
+        older_than_days: int = 90,
+        max_importance: int = 3,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        压实项目记忆：合并近似重复记忆，归档低重要性且从未被检索的旧记忆
+
+        Args:
+            project_id: 项目ID
+            older_than_days: 归档的最小记忆年龄（天）
+            max_importance: 归档的最大重要性
+            dry_run: 只返回将要合并/归档的记忆
 
-        使用ultra-memory-mcp的store_memory工具
+        Returns:
+            压实报告
         """
-        try:
-            import httpx
+        # 先汇总检索历史，避免归档刚被检索过的记忆
+        self.retrieval_analytics.rollup()
+        return self.compactor.compact(
+            project_id,
+            older_than_days=older_than_days,
+            max_importance=max_importance,
+            dry_run=dry_run
+        )
 
-            # Ultra Memory MCP URL
-            url = "http://13.158.83.99:7000/store"  # Ultra Memory HTTP API
+    def list_archived_memories(
+        self,
+        project_id: str,
+        limit: int = 100,
+        reason: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """列出归档记忆（merged: 被合并的重复记忆，stale: 冷数据）"""
+        return self.compactor.list_archive(project_id, limit=limit, reason=reason)
 
-            # 准备请求数据（Ultra Memory HTTP API格式）
-            # 使用wanxin_ultra namespace访问所有9801条记忆
-            memory_id = f"taskflow_{project_id}_{int(datetime.now().timestamp())}"
-            payload = {
-                "namespace": "wanxin_ultra",  # 使用wanxin用户的namespace，可访问所有记忆
-                "id": memory_id,
-                "content": content,
-                "metadata": {
-                    **metadata,
-                    "project_id": project_id,
-                    "stored_at": datetime.now().isoformat(),
-                    "source": "project_memory_service"
-                }
-            }
+    def restore_archived_memory(self, project_id: str, memory_id: str) -> Optional[Dict[str, Any]]:
+        """从归档恢复记忆及其关系，归档不存在时返回None"""
+        memory = self.compactor.restore(project_id, memory_id)
+        return self._parse_memory_row(memory) if memory is not None else None
 
-            # 发送请求
-            response = httpx.post(url, json=payload, timeout=10)
+    # ========================================================================
+    # 记忆统计
+    # ========================================================================
 
-            if response.status_code == 200:
-                result = response.json()
-                # Ultra Memory HTTP API返回格式: {success: true, data: {id: "xxx"}}
-                if result.get("success"):
-                    data = result.get("data", {})
-                    memory_id = data.get("id")
-                    if memory_id:
-                        print(f"✅ Ultra Memory存储成功: {memory_id}")
-                return memory_id
-                print(f"Ultra Memory存储失败: 未返回ID")
-                return None
-            else:
-                print(f"Ultra Memory存储失败: {response.status_code}")
-                return None
+    def get_memory_stats(self, project_id: str) -> Dict[str, Any]:
+        """
+        获取项目记忆统计（读取触发器维护的汇总行）
 
-        except Exception as e:
-            print(f"Ultra Memory连接错误: {e}")
-            # 如果MCP不可用，返回本地生成的ID
-            return f"ultra-{uuid.uuid4().hex[:12]}"
+        Args:
+            project_id: 项目ID
+
+        Returns:
+            统计信息：总数、按类型/分类计数、重要性分档与直方图
+        """
+        if not self.persist:
+            return {}
 
-    def _store_to_session_memory(
+        return self.memory_stats.get(project_id)
+
+    def rebuild_memory_stats(self, project_id: Optional[str] = None) -> int:
+        """从原始记忆重建统计，返回重建的项目数"""
+        return self.memory_stats.rebuild(project_id)
+
+    def get_memory_overview(
         self,
         project_id: str,
-        title: str,
-        content: str,
-        context: Optional[Dict[str, Any]]
-    ) -> Optional[str]:
-        """存储到Session Memory
-
-        使用Session Memory的Tasks API创建任务
+        category: Optional[str] = None,
+        memory_type: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
         """
-        try:
-            import httpx
+        获取记忆列表与统计（Dashboard 记忆页一次加载）
 
-            # Session Memory Tasks API
-            url = "http://13.158.83.99:4000/api/tasks/match"
+        同一连接、同一事务内读取，列表与统计对应同一快照；不写检索历史。
 
-            # 准备请求数据（Session Memory Tasks API格式）
-            payload = {
-                "user_id": "taskflow",
-                "platform": "taskflow-system",
-                "workspace_path": f"/projects/{project_id}",
-                "message": f"{title}: {content}"
-            }
-
-            # 发送请求
-            response = httpx.post(url, json=payload, timeout=10)
+        Args:
+            project_id: 项目ID
+            category: 记忆分类过滤
+            memory_type: 记忆类型过滤
+            limit: 返回数量限制
 
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("success"):
-                    task_data = result["data"]["task"]
-                    task_id = task_data["task_id"]
-                    print(f"✅ Session Memory任务创建成功: {task_id}")
-                    return task_id
-                else:
-                    print(f"Session Memory存储失败")
-                    return None
-            else:
-                print(f"Session Memory存储失败: {response.status_code}")
-                return None
+        Returns:
+            {"project_id", "memories", "count", "stats"}
+        """
+        filters = {
+            "category": category,
+            "memory_type": memory_type,
+            "tags": None,
+            "limit": limit,
+            "tag_mode": TAG_MODE_ANY,
+            "task_id": None,
+            "issue_id": None
+        }
+        with self._get_connection():
+            memories = self._retrieve_local(project_id, None, filters)
+            stats = self.memory_stats.get(project_id)
+        return {
+            "project_id": project_id,
+            "memories": memories,
+            "count": len(memories),
+            "stats": stats
+        }
 
-        except Exception as e:
-            print(f"Session Memory连接错误: {e}")
-            # 如果API不可用，返回本地生成的ID
-            return f"session-{uuid.uuid4().hex[:12]}"
+    # ========================================================================
+    # 内部辅助方法
+    # ========================================================================
 
     def _query_from_ultra_memory(
         self,
@@ -935,24 +1060,27 @@ class ProjectMemoryService:
     ) -> List[Dict[str, Any]]:
         """从Ultra Memory查询
 
-        使用ultra-memory-mcp的retrieve_memories工具
+        使用ultra-memory-mcp的retrieve_memories工具。
+        连续失败后熔断，冷却期内直接返回空结果，不再等待超时。
         """
+        if not self.remote_search_breaker.allow():
+            return []
+
         try:
             import httpx
 
-            # Ultra Memory MCP URL
-            url = "http://13.158.83.99:7000/search"  # Ultra Memory HTTP API
+            # Ultra Memory HTTP API
+            url = f"{DEFAULT_ULTRA_MEMORY_URL.rstrip('/')}/search"
 
             # 准备请求数据（Ultra Memory HTTP API格式）
-            # 使用wanxin_ultra namespace搜索所有9801条记忆
             payload = {
-                "namespace": "wanxin_ultra",  # 使用wanxin用户的namespace
+                "namespace": DEFAULT_ULTRA_NAMESPACE,
                 "query": query,
                 "limit": top_k
             }
 
             # 发送请求
-            response = httpx.post(url, json=payload, timeout=10)
+            response = httpx.post(url, json=payload, timeout=self.REMOTE_SEARCH_TIMEOUT)
 
             if response.status_code == 200:
                 result = response.json()
@@ -976,13 +1104,16 @@ class ProjectMemoryService:
                         "external_memory_id": mem.get("id")
                     })
 
+                self.remote_search_breaker.record_success()
                 return formatted_memories
             else:
                 print(f"Ultra Memory查询失败: {response.status_code}")
+                self.remote_search_breaker.record_failure()
                 return []
 
         except Exception as e:
             print(f"Ultra Memory查询错误: {e}")
+            self.remote_search_breaker.record_failure()
             return []
 
     def _format_adr(
@@ -1023,8 +1154,9 @@ class ProjectMemoryService:
         return mapping.get(severity.lower(), 5)
 
     def _save_memory_to_db(self, memory_data: Dict[str, Any]) -> None:
-        """保存记忆到数据库"""
+        """保存记忆到数据库（统计由触发器在同一事务内更新）"""
         with self._get_connection() as conn:
+            ensure_memory_stats_tables(self._pool, conn)
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO project_memories (
@@ -1142,22 +1274,41 @@ class ProjectMemoryService:
         return solution_id
 
     def _save_relation_to_db(self, relation_data: Dict[str, Any]) -> None:
-        """保存关系到数据库"""
+        """保存关系到数据库（提交后增量更新关系图）"""
+        edge = RelationEdge(
+            id=relation_data["id"],
+            source_memory_id=relation_data["source_memory_id"],
+            target_memory_id=relation_data["target_memory_id"],
+            relation_type=relation_data["relation_type"],
+            strength=relation_data["strength"]
+        )
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO memory_relations (
-                    id, source_memory_id, target_memory_id,
-                    relation_type, strength, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                relation_data["id"],
-                relation_data["source_memory_id"],
-                relation_data["target_memory_id"],
-                relation_data["relation_type"],
-                relation_data["strength"],
-                relation_data["created_at"]
-            ))
+            row = conn.execute(
+                "SELECT project_id FROM project_memories WHERE id = ?",
+                (edge.source_memory_id,)
+            ).fetchone()
+            if row is None:
+                self._insert_relation(conn, relation_data)
+                return
+            with self.relation_graph.track(conn, row["project_id"], lambda graph: graph.add_edge(edge)):
+                self._insert_relation(conn, relation_data)
+
+    @staticmethod
+    def _insert_relation(conn, relation_data: Dict[str, Any]) -> None:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO memory_relations (
+                id, source_memory_id, target_memory_id,
+                relation_type, strength, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            relation_data["id"],
+            relation_data["source_memory_id"],
+            relation_data["target_memory_id"],
+            relation_data["relation_type"],
+            relation_data["strength"],
+            relation_data["created_at"]
+        ))
 
     def _query_memories_from_db(
         self,
@@ -1165,30 +1316,28 @@ class ProjectMemoryService:
         category: Optional[str],
         memory_type: Optional[str],
         tags: Optional[List[str]],
-        limit: int
+        limit: int,
+        tag_mode: str = TAG_MODE_ANY,
+        task_id: Optional[str] = None,
+        issue_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """从数据库查询记忆"""
         with self._get_connection() as conn:
+            ensure_memory_link_tables(self._pool, conn)
             cursor = conn.cursor()
 
-            # 构建查询条件
-            conditions = ["project_id = ?"]
-            params = [project_id]
-
-            if category:
-                conditions.append("category = ?")
-                params.append(category)
-
-            if memory_type:
-                conditions.append("memory_type = ?")
-                params.append(memory_type)
-
-            # TODO: 标签过滤需要JSON查询（SQLite 3.38+）
-            # 暂时跳过tags过滤
-
-            where_clause = " AND ".join(conditions)
+            # 构建查询条件（标签/任务/问题过滤走副表索引）
+            where_clause, params = build_memory_filters(
+                project_id=project_id,
+                category=category,
+                memory_type=memory_type,
+                tags=tags,
+                tag_mode=tag_mode,
+                task_id=task_id,
+                issue_id=issue_id
+            )
             query = f"""
-                SELECT * FROM project_memories
+                SELECT * FROM project_memories pm
                 WHERE {where_clause}
                 ORDER BY importance DESC, created_at DESC
                 LIMIT ?
@@ -1199,184 +1348,77 @@ class ProjectMemoryService:
             rows = cursor.fetchall()
 
             # 转换为字典列表
-            memories = []
-            for row in rows:
-                memory = dict(row)
-                # 解析JSON字段
-                if memory.get('context'):
-                    try:
-                        memory['context'] = json.loads(memory['context'])
-                    except:
-                        pass
-                if memory.get('tags'):
-                    try:
-                        memory['tags'] = json.loads(memory['tags'])
-                    except:
-                        memory['tags'] = []
-                if memory.get('related_tasks'):
-                    try:
-                        memory['related_tasks'] = json.loads(memory['related_tasks'])
-                    except:
-                        memory['related_tasks'] = []
-                if memory.get('related_issues'):
-                    try:
-                        memory['related_issues'] = json.loads(memory['related_issues'])
-                    except:
-                        memory['related_issues'] = []
-                memories.append(memory)
-
-            return memories
-
-    def _query_important_memories(
-        self,
-        project_id: str,
-        min_importance: int,
-        limit: int
-    ) -> List[Dict[str, Any]]:
-        """查询重要记忆"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM project_memories
-                WHERE project_id = ? AND importance >= ?
-                ORDER BY importance DESC, created_at DESC
-                LIMIT ?
-            """, (project_id, min_importance, limit))
-
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-
-    def _query_recent_memories(
-        self,
-        project_id: str,
-        days: int,
-        limit: int
-    ) -> List[Dict[str, Any]]:
-        """查询最近记忆"""
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM project_memories
-                WHERE project_id = ? AND created_at >= ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (project_id, cutoff_date, limit))
-
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-
-    def _query_related_memories(
-        self,
-        memory_id: str,
-        relation_types: Optional[List[str]],
-        min_strength: float
-    ) -> List[Dict[str, Any]]:
-        """查询相关记忆"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # 构建查询条件
-            conditions = ["(mr.source_memory_id = ? OR mr.target_memory_id = ?)"]
-            params = [memory_id, memory_id]
-
-            if relation_types:
-                placeholders = ",".join("?" * len(relation_types))
-                conditions.append(f"mr.relation_type IN ({placeholders})")
-                params.extend(relation_types)
-
-            conditions.append("mr.strength >= ?")
-            params.append(min_strength)
-
-            where_clause = " AND ".join(conditions)
+            return [self._parse_memory_row(row) for row in rows]
+
+    # JSON列及解析失败时的默认值（context 解析失败保留原文）
+    _JSON_LIST_FIELDS = ("tags", "related_tasks", "related_issues")
+
+    @classmethod
+    def _parse_memory_row(cls, row) -> Dict[str, Any]:
+        """记忆行转换为字典并解析JSON字段（空值与空数组不解析）"""
+        memory = dict(row)
+        raw = memory.get('context')
+        if raw:
+            try:
+                memory['context'] = json.loads(raw)
+            except ValueError:
+                pass
+        for field in cls._JSON_LIST_FIELDS:
+            raw = memory.get(field)
+            if not raw or raw == "[]":
+                continue
+            try:
+                memory[field] = json.loads(raw)
+            except ValueError:
+                memory[field] = []
+        return memory
 
-            # 查询关联的记忆
-            query = f"""
-                SELECT pm.*, mr.relation_type, mr.strength
-                FROM memory_relations mr
-                JOIN project_memories pm ON (
-                    CASE
-                        WHEN mr.source_memory_id = ? THEN pm.id = mr.target_memory_id
-                        ELSE pm.id = mr.source_memory_id
-                    END
-                )
-                WHERE {where_clause}
-                ORDER BY mr.strength DESC, pm.importance DESC
-            """
-            params.insert(0, memory_id)
+    def get_tag_counts(self, project_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        获取项目标签及记忆数量（按数量降序）
 
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+        Args:
+            project_id: 项目ID
+            limit: 返回数量限制
 
-    def _query_memory_stats(self, project_id: str) -> Dict[str, Any]:
-        """查询记忆统计"""
+        Returns:
+            [{"tag": ..., "count": ...}]
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # 尝试从统计表获取
-            cursor.execute("""
-                SELECT * FROM memory_stats WHERE project_id = ?
-            """, (project_id,))
-            row = cursor.fetchone()
-
-            if row:
-                return dict(row)
-
-            # 如果不存在，实时计算
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as total_memories,
-                    SUM(CASE WHEN memory_type = 'session' THEN 1 ELSE 0 END) as session_memories,
-                    SUM(CASE WHEN memory_type = 'ultra' THEN 1 ELSE 0 END) as ultra_memories,
-                    SUM(CASE WHEN memory_type = 'decision' THEN 1 ELSE 0 END) as decision_memories,
-                    SUM(CASE WHEN memory_type = 'solution' THEN 1 ELSE 0 END) as solution_memories
-                FROM project_memories
+            ensure_memory_link_tables(self._pool, conn)
+            rows = conn.execute("""
+                SELECT tag, COUNT(*) AS count
+                FROM memory_tags
                 WHERE project_id = ?
-            """, (project_id,))
-
-            row = cursor.fetchone()
-            return dict(row) if row else {}
+                GROUP BY tag
+                ORDER BY count DESC, tag
+                LIMIT ?
+            """, (project_id, limit)).fetchall()
+        return [{"tag": row["tag"], "count": row["count"]} for row in rows]
 
-    def _update_memory_stats(self, project_id: str, memory_type: str) -> None:
-        """更新记忆统计"""
+    def _fetch_memories(self, memory_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """按ID批量读取记忆（解析JSON字段）"""
+        memories: Dict[str, Dict[str, Any]] = {}
+        unique_ids = list(dict.fromkeys(memory_ids))
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-
-            # 检查统计记录是否存在
-            cursor.execute("""
-                SELECT project_id FROM memory_stats WHERE project_id = ?
-            """, (project_id,))
-            exists = cursor.fetchone() is not None
-
-            if exists:
-                # 更新现有统计
-                update_field = f"{memory_type}_memories" if memory_type != "knowledge" else "total_memories"
-                cursor.execute(f"""
-                    UPDATE memory_stats
-                    SET total_memories = total_memories + 1,
-                        {update_field} = {update_field} + 1,
-                        last_updated = ?
-                    WHERE project_id = ?
-                """, (datetime.now().isoformat(), project_id))
-            else:
-                # 创建新统计记录
-                cursor.execute("""
-                    INSERT INTO memory_stats (
-                        project_id, total_memories, session_memories,
-                        ultra_memories, decision_memories, solution_memories,
-                        last_updated
-                    ) VALUES (?, 1, 0, 0, 0, 0, ?)
-                """, (project_id, datetime.now().isoformat()))
+            # 分批避免超过SQLite参数上限
+            for start in range(0, len(unique_ids), 500):
+                batch = unique_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row in conn.execute(
+                    f"SELECT * FROM project_memories WHERE id IN ({placeholders})", batch
+                ):
+                    memories[row["id"]] = self._parse_memory_row(row)
+        return memories
 
     def _record_retrieval(
         self,
         project_id: str,
         query: Optional[str],
-        memory_ids: List[str]
+        memory_ids: List[str],
+        filters: Optional[Dict[str, Any]] = None
     ) -> None:
-        """记录检索历史"""
+        """记录检索历史（filters 为检索参数，缓存预热时按原参数重放）"""
         if not query or not memory_ids:
             return
 
@@ -1385,14 +1427,18 @@ class ProjectMemoryService:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO memory_retrievals (
-                    id, project_id, query, memory_ids, retrieved_at
-                ) VALUES (?, ?, ?, ?, ?)
+                INSERT INTO memory_retrieval_history (
+                    id, project_id, query_text, query_type, filters,
+                    memory_ids, result_count, retrieved_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 retrieval_id,
                 project_id,
                 query,
+                "semantic" if self.search_index.embedder is not None else "keyword",
+                encode_filters(filters or {}),
                 json.dumps(memory_ids),
+                len(memory_ids),
                 datetime.now().isoformat()
             ))
 
@@ -1422,15 +1468,21 @@ def create_project_memory_service(
     state_manager=None,
     db_path: str = "database/data/tasks.db",
     session_memory_enabled: bool = True,
-    ultra_memory_enabled: bool = True
+    ultra_memory_enabled: bool = True,
+    remote_search_enabled: bool = False,
+    search_embedder: Optional[Embedder] = None,
+    persist: bool = True
 ) -> ProjectMemoryService:
     """创建项目记忆服务实例
 
     Args:
-        state_manager: 状态管理器（弃用，保留兼容性）
+        state_manager: 状态管理器（弃用，不再影响行为）
         db_path: 数据库文件路径
         session_memory_enabled: 是否启用Session Memory
         ultra_memory_enabled: 是否启用Ultra Memory Cloud
+        remote_search_enabled: 检索时是否额外查询Ultra Memory
+        search_embedder: 本地向量化函数（可用 create_sentence_transformer_embedder 创建）
+        persist: 是否将记忆与关系写入本地数据库
 
     Returns:
         ProjectMemoryService实例
@@ -1439,6 +1491,9 @@ def create_project_memory_service(
         state_manager=state_manager,
         db_path=db_path,
         session_memory_enabled=session_memory_enabled,
-        ultra_memory_enabled=ultra_memory_enabled
+        ultra_memory_enabled=ultra_memory_enabled,
+        remote_search_enabled=remote_search_enabled,
+        search_embedder=search_embedder,
+        persist=persist
     )
 
@@ -51,7 +51,8 @@ class EventHelper:
         self,
         project_id: str = "TASKFLOW",
         actor: Optional[str] = None,
-        source: str = EventSource.SYSTEM
+        source: str = EventSource.SYSTEM,
+        write_behind: bool = False
     ):
         """
         初始化事件助手
@@ -60,11 +61,12 @@ class EventHelper:
             project_id: 项目ID，默认TASKFLOW
             actor: 默认操作者
             source: 事件来源（system/user/ai/external）
+            write_behind: 是否使用写后队列异步落库（不阻塞调用方）
         """
         self.project_id = project_id
         self.default_actor = actor
         self.default_source = source
-        self.emitter = create_event_emitter()
+        self.emitter = create_event_emitter(write_behind=write_behind)
     
     # ========================================================================
     # 任务生命周期事件 (Task Lifecycle Events)
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 架构师事件流自动监听脚本
-监听项目文件变化，自动添加事件到architect_events.json
+监听项目文件变化，自动添加事件到架构师事件日志（documents.db）
 
 监听内容：
 1. 完成报告（*.md）
@@ -12,7 +12,6 @@
 """
 import os
 import sys
-import json
 import time
 from pathlib import Path
 from datetime import datetime
@@ -21,7 +20,11 @@ from watchdog.events import FileSystemEventHandler
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent
-EVENTS_FILE = PROJECT_ROOT / "apps" / "dashboard" / "automation-data" / "architect_events.json"
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.event_journal import DASHBOARD_DATA_DIR, FEED_DB_NAME, get_feed  # noqa: E402
+
+EVENTS_FILE = DASHBOARD_DATA_DIR / FEED_DB_NAME
 
 # 监听的目录
 WATCH_DIRS = [
@@ -121,32 +124,14 @@ class ArchitectEventHandler(FileSystemEventHandler):
             })
     
     def add_event(self, event_type, icon, content, metadata):
-        """添加事件到JSON文件"""
+        """追加事件到架构师事件日志"""
         try:
-            # 读取现有数据
-            with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            events = data.get("events", [])
-            
-            # 生成新事件
-            event_id = f"auto-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-            new_event = {
-                "id": event_id,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            get_feed("architect_events").append({
+                "id": f"auto-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
                 "type": event_type,
                 "content": content,
                 "metadata": metadata
-            }
-            
-            # 添加到列表
-            events.append(new_event)
-            data["events"] = events
-            
-            # 写入文件
-            with open(EVENTS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
+            })
             print(f"✅ 事件已记录: {content}")
             
         except Exception as e:
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 实时脉动自动监听脚本（全角色）
-监听项目文件变化，自动添加所有角色的事件到realtime_pulse_events.json
+监听项目文件变化，自动添加所有角色的事件到实时脉动事件日志（documents.db）
 
 监听内容：
 1. 完成报告（全栈工程师、架构师等）
@@ -14,7 +14,6 @@
 """
 import os
 import sys
-import json
 import time
 from pathlib import Path
 from datetime import datetime
@@ -23,7 +22,11 @@ from watchdog.events import FileSystemEventHandler
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent
-PULSE_FILE = PROJECT_ROOT / "apps" / "dashboard" / "automation-data" / "realtime_pulse_events.json"
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.event_journal import DASHBOARD_DATA_DIR, FEED_DB_NAME, get_feed  # noqa: E402
+
+PULSE_FILE = DASHBOARD_DATA_DIR / FEED_DB_NAME
 
 # 监听的目录
 WATCH_DIRS = [
@@ -207,21 +210,9 @@ class RealtimePulseHandler(FileSystemEventHandler):
             )
     
     def add_pulse_event(self, role, actor, event_type, category, title, description, tags, task_id, metadata):
-        """添加事件到realtime_pulse_events.json"""
+        """追加事件到实时脉动事件日志（ID、时间戳、角色/分类统计由日志维护）"""
         try:
-            # 读取现有数据
-            with open(PULSE_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            events = data.get("events", [])
-            
-            # 生成新事件ID
-            event_id = f"pulse-{str(len(events) + 1).zfill(3)}"
-            
-            # 构建新事件
-            new_event = {
-                "id": event_id,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            get_feed("realtime_pulse").append({
                 "role": role,
                 "actor": actor,
                 "type": event_type,
@@ -230,48 +221,11 @@ class RealtimePulseHandler(FileSystemEventHandler):
                 "description": description,
                 "tags": tags,
                 "task_id": task_id
-            }
-            
-            # 添加到列表
-            events.append(new_event)
-            
-            # 更新统计
-            stats = self.calculate_stats(events)
-            data["events"] = events
-            data["stats"] = stats
-            
-            # 写入文件
-            with open(PULSE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
+            })
             print(f"✅ [{role}] 事件已记录: {title}")
             
         except Exception as e:
             print(f"❌ 添加事件失败: {e}")
-    
-    def calculate_stats(self, events):
-        """计算统计数据"""
-        today = datetime.now().strftime("%Y-%m-%d")
-        today_events = [e for e in events if e["timestamp"].startswith(today)]
-        
-        # 按角色统计
-        roles = {}
-        for event in events:
-            role = event.get("role", "未知")
-            roles[role] = roles.get(role, 0) + 1
-        
-        # 按分类统计
-        categories = {}
-        for event in events:
-            category = event.get("category", "其他")
-            categories[category] = categories.get(category, 0) + 1
-        
-        return {
-            "total_events": len(events),
-            "today_events": len(today_events),
-            "roles": roles,
-            "categories": categories
-        }
 
 def main():
     """主函数"""
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对话关键词分类器基准测试
+
+生成中文对话轮次（随机常用汉字 + 少量关键词 + 换行），测量
+ConversationClassifier 单进程吞吐与 classify_turns() 进程池吞吐。
+
+用法:
+    python scripts/benchmarks/bench_conversation_classifier.py
+    python scripts/benchmarks/bench_conversation_classifier.py --turns 20000 --workers 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.conversation_classifier import (  # noqa: E402
+    KEYWORD_SETS,
+    classify_turns,
+    get_default_classifier,
+    shutdown_process_pool,
+)
+
+COMMON_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经"
+
+
+def build_paragraph(rng: random.Random, length: int, keyword_count: int) -> str:
+    keywords = [word for words in KEYWORD_SETS.values() for word in words]
+    chars = [rng.choice(COMMON_CHARS) for _ in range(length)]
+    for _ in range(keyword_count):
+        chars.insert(rng.randrange(len(chars)), rng.choice(keywords))
+    for _ in range(length // 60):
+        chars.insert(rng.randrange(len(chars)), "\n")
+    return "".join(chars)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对话关键词分类器基准")
+    parser.add_argument("--turns", type=int, default=10000, help="对话轮次数")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    turns = [
+        (build_paragraph(rng, rng.randint(20, 150), rng.randint(0, 2)),
+         build_paragraph(rng, rng.randint(200, 1500), rng.randint(0, 8)))
+        for _ in range(args.turns)
+    ]
+    avg_chars = sum(len(u) + len(a) for u, a in turns) // len(turns)
+
+    classifier = get_default_classifier()
+    start = time.perf_counter()
+    inline = [classifier.classify(user_input, ai_response) for user_input, ai_response in turns]
+    inline_seconds = time.perf_counter() - start
+
+    # 首次调用包含进程池启动，取第二次
+    classify_turns(turns[:2000], workers=args.workers, parallel_threshold=1)
+    start = time.perf_counter()
+    pooled = classify_turns(turns, workers=args.workers, parallel_threshold=1)
+    pooled_seconds = time.perf_counter() - start
+    shutdown_process_pool()
+
+    assert [c.to_dict() for c in inline] == [c.to_dict() for c in pooled]
+    recordable = sum(1 for c in inline if c.should_record)
+
+    print("=" * 60)
+    print(f"对话分类基准（{args.turns} turns, avg {avg_chars} chars, {os.cpu_count()} CPUs）")
+    print("=" * 60)
+    print(f"single process: {args.turns / inline_seconds:10.0f} turns/s")
+    print(f"process pool:   {args.turns / pooled_seconds:10.0f} turns/s")
+    print(f"recordable:     {recordable / args.turns:10.1%}")
+
+
+if __name__ == "__main__":
+    main()
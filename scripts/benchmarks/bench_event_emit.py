@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件发射吞吐基准测试
+
+对比两种连接方式下 EventEmitter.emit 的吞吐（emits/sec）：
+1. legacy: 每次调用新建 sqlite3 连接（旧实现）
+2. pooled: 共享连接池（WAL + synchronous=NORMAL + 预编译语句缓存）
+
+用法:
+    python scripts/benchmarks/bench_event_emit.py
+    python scripts/benchmarks/bench_event_emit.py --events 5000
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.event_service import EventEmitter, EventStore, EventCategory  # noqa: E402
+from services.db_pool import close_all_pools  # noqa: E402
+
+EVENTS_MIGRATION = PROJECT_ROOT / "database" / "migrations" / "004_add_events_tables.sql"
+
+
+class LegacyEventStore(EventStore):
+    """旧实现：每次调用新建连接（rollback journal，默认synchronous）"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        # 旧实现中 save 与 update_stats 各自开连接
+        yield None
+
+    def after_commit(self, callback) -> None:
+        # 每次调用各自提交，回调立即执行
+        callback()
+
+
+def init_db(db_path: Path) -> None:
+    """按迁移004建表"""
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(EVENTS_MIGRATION.read_text(encoding="utf-8"))
+    conn.commit()
+    conn.close()
+
+
+def run(store: EventStore, count: int) -> float:
+    """发射 count 个事件，返回 emits/sec"""
+    emitter = EventEmitter(event_store=store)
+    start = time.perf_counter()
+    for i in range(count):
+        emitter.emit(
+            project_id="BENCH",
+            event_type="task.updated",
+            title=f"bench event {i}",
+            category=EventCategory.TASK,
+            data={"i": i},
+        )
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EventEmitter.emit 吞吐基准")
+    parser.add_argument("--events", type=int, default=2000, help="每种模式发射的事件数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = Path(tmp) / "legacy.db"
+        pooled_db = Path(tmp) / "pooled.db"
+        init_db(legacy_db)
+        init_db(pooled_db)
+
+        legacy_rate = run(LegacyEventStore(str(legacy_db)), args.events)
+        pooled_rate = run(EventStore(str(pooled_db)), args.events)
+        close_all_pools()
+
+    print("=" * 60)
+    print(f"EventEmitter.emit 基准（{args.events} events）")
+    print("=" * 60)
+    print(f"legacy (connect-per-call): {legacy_rate:10.1f} emits/sec")
+    print(f"pooled (WAL + pool):       {pooled_rate:10.1f} emits/sec")
+    print(f"speedup:                   {pooled_rate / legacy_rate:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
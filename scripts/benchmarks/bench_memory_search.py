@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目记忆本地检索基准测试
+
+在临时数据库中生成中文记忆语料，测量 ProjectMemoryService 本地检索
+（FTS5 BM25 + 重要性/时间融合排序）的单次查询延迟分位数。
+
+语料由随机常用汉字组成的词表拼接，每个查询含2~3个词。
+
+用法:
+    python scripts/benchmarks/bench_memory_search.py
+    python scripts/benchmarks/bench_memory_search.py --memories 20000 --queries 500
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.project_memory_service import ProjectMemoryService  # noqa: E402
+from services.db_pool import close_all_pools  # noqa: E402
+
+MEMORY_SCHEMA = PROJECT_ROOT / "database" / "schemas" / "v5_project_memory_schema.sql"
+
+
+def build_vocabulary(rng: random.Random, size: int = 3000) -> list:
+    """由常用汉字区间随机组成双字词"""
+    return ["".join(chr(rng.randint(0x4E00, 0x5FFF)) for _ in range(2)) for _ in range(size)]
+
+
+def init_db(db_path: Path, count: int, rng: random.Random, vocabulary: list) -> None:
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(MEMORY_SCHEMA.read_text(encoding="utf-8"))
+    rows = []
+    for i in range(count):
+        title = "".join(rng.choice(vocabulary) for _ in range(4))
+        content = "，".join("".join(rng.choice(vocabulary) for _ in range(6)) for _ in range(10))
+        rows.append((
+            f"MEM-{i:06d}", "BENCH", "knowledge", "knowledge", title, content,
+            json.dumps([rng.choice(["perf", "db", "api", "ui"])]),
+            rng.randint(1, 10), f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T00:00:00"
+        ))
+    conn.executemany("""
+        INSERT INTO project_memories (
+            id, project_id, memory_type, category, title, content, tags, importance, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="项目记忆本地检索基准")
+    parser.add_argument("--memories", type=int, default=10000, help="记忆数量")
+    parser.add_argument("--queries", type=int, default=300, help="查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "memories.db"
+        init_db(db_path, args.memories, rng, vocabulary)
+
+        service = ProjectMemoryService(db_path=str(db_path), ultra_memory_enabled=False)
+        start = time.perf_counter()
+        indexed = service.search_index.sync()
+        index_seconds = time.perf_counter() - start
+
+        latencies = []
+        hits = 0
+        for _ in range(args.queries):
+            query = "".join(rng.choice(vocabulary) for _ in range(rng.randint(2, 3)))
+            start = time.perf_counter()
+            results = service.retrieve_memories(project_id="BENCH", query=query, limit=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += bool(results)
+        close_all_pools()
+
+    print("=" * 60)
+    print(f"记忆本地检索基准（{args.memories} memories, {args.queries} queries）")
+    print("=" * 60)
+    print(f"index build: {indexed} memories in {index_seconds:.2f}s")
+    print(f"p50:         {percentile(latencies, 0.5):8.2f} ms")
+    print(f"p95:         {percentile(latencies, 0.95):8.2f} ms")
+    print(f"max:         {max(latencies):8.2f} ms")
+    print(f"hit rate:    {hits / args.queries:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
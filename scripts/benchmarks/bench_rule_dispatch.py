@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则分发基准测试
+
+对比 RuleEngine 在 1k / 10k 条规则下的单事件分发耗时：
+1. linear: 逐条调用 Rule.matches（旧实现）
+2. indexed: RuleEngine.match_rules（精确哈希桶 + 通配符前缀树）
+
+规则集混合精确模式（约80%）与通配符模式（约20%），每个事件只命中少量规则。
+
+用法:
+    python scripts/benchmarks/bench_rule_dispatch.py
+    python scripts/benchmarks/bench_rule_dispatch.py --events 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "apps" / "api" / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.rule_engine import Rule, RuleEngine  # noqa: E402
+
+DOMAINS = ["task", "issue", "feature", "deploy", "decision", "knowledge", "test", "architect"]
+VERBS = ["created", "updated", "completed", "approved", "rejected", "discovered", "started", "failed"]
+
+
+def build_engine(rule_count: int, seed: int = 42) -> RuleEngine:
+    """构建含 rule_count 条规则的引擎"""
+    rng = random.Random(seed)
+    engine = RuleEngine()
+    for i in range(rule_count):
+        domain = f"{rng.choice(DOMAINS)}{rng.randrange(rule_count // 8 or 1)}"
+        if rng.random() < 0.8:
+            pattern = f"{domain}.{rng.choice(VERBS)}"
+        elif rng.random() < 0.5:
+            pattern = f"{domain}.*"
+        else:
+            pattern = f"{domain}.*ed"
+        engine.register_rule(Rule(
+            rule_id=f"BENCH-{i:05d}",
+            name=f"bench rule {i}",
+            description="",
+            event_type_pattern=pattern,
+            condition={"severity": ["info", "warning"]} if i % 3 == 0 else None
+        ))
+    return engine
+
+
+def build_events(rule_count: int, count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"EVT-{i}",
+            "event_type": f"{rng.choice(DOMAINS)}{rng.randrange(rule_count // 8 or 1)}.{rng.choice(VERBS)}",
+            "severity": rng.choice(["info", "warning", "error"])
+        }
+        for i in range(count)
+    ]
+
+
+def time_dispatch(match, events: list) -> float:
+    """返回单事件平均耗时（微秒）"""
+    start = time.perf_counter()
+    for event in events:
+        match(event)
+    return (time.perf_counter() - start) / len(events) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RuleEngine 规则分发基准")
+    parser.add_argument("--events", type=int, default=5000, help="每种规模分发的事件数")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"RuleEngine 分发基准（每种规模 {args.events} events）")
+    print("=" * 72)
+    print(f"{'rules':>8} {'linear us/evt':>15} {'indexed us/evt':>16} {'speedup':>9} {'avg matched':>12}")
+
+    for rule_count in (1000, 10000):
+        engine = build_engine(rule_count)
+        events = build_events(rule_count, args.events)
+        rules = engine.rules
+
+        linear = time_dispatch(lambda e: [r for r in rules if r.matches(e)], events)
+        indexed = time_dispatch(engine.match_rules, events)
+
+        # 两种方式结果必须一致
+        for event in events[:500]:
+            expected = [r.rule_id for r in rules if r.matches(event)]
+            assert [r.rule_id for r in engine.match_rules(event)] == expected
+
+        matched = sum(len(engine.match_rules(e)) for e in events) / len(events)
+        print(f"{rule_count:>8} {linear:>15.1f} {indexed:>16.2f} {linear / indexed:>8.0f}x {matched:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
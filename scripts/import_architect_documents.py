@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+架构师数据导入脚本
+
+把 apps/dashboard/automation-data 下的旧 JSON 文件导入 automation-data/documents.db：
+- design_confirmations.json、architect_monitor.json、architect-conversations.json -> 文档集合
+- architect_events.json、realtime_pulse_events.json、engineer_events.json -> 事件日志
+每个文件只导入一次，Dashboard / 透视塔API 启动时也会自动执行。
+
+用法:
+    python scripts/import_architect_documents.py                 # 默认数据目录
+    python scripts/import_architect_documents.py path/to/data    # 指定数据目录
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "apps" / "dashboard" / "src"))
+
+from industrial_dashboard.architect_store import DEFAULT_DATA_DIR, create_architect_store  # noqa: E402
+from services.event_journal import FEEDS, get_feed  # noqa: E402
+
+
+def main() -> None:
+    data_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DATA_DIR
+    store = create_architect_store(data_dir, import_legacy=False)
+    results = store.import_legacy_files()
+    if not results:
+        print(f"未找到旧 JSON 文件: {data_dir}")
+    for filename, count in results.items():
+        if count is None:
+            print(f"- {filename}: 已导入过，跳过")
+        else:
+            print(f"✓ {filename}: 导入 {count} 个文档")
+    for name in FEEDS:
+        stats = get_feed(name, data_dir).get_stats()
+        print(f"✓ 事件日志 {name}: {stats['entries']} 条（最新序号 {stats['latest_seq']}）")
+    print(f"数据库: {data_dir / 'documents.db'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+外部记忆系统本地替身服务（测试用）
+
+模拟 Ultra Memory HTTP API 与 Session Memory Tasks API，供 MemorySyncWorker
+及远程检索在本地联调/测试，不访问真实远程服务：
+- POST /store              Ultra Memory 存储，返回 {success, data: {id}}
+- POST /search             Ultra Memory 检索（按子串匹配已存储内容）
+- POST /api/tasks/match    Session Memory 创建任务，返回 {success, data: {task: {task_id}}}
+- GET  /stats              请求计数与已存储数量
+
+可注入延迟与失败率以验证重试、退避与熔断。
+
+用法:
+    python scripts/memory_sync_stub_server.py --port 7070
+    python scripts/memory_sync_stub_server.py --port 7070 --latency 2 --failure-rate 0.3
+
+    ULTRA_MEMORY_URL=http://127.0.0.1:7070 SESSION_MEMORY_URL=http://127.0.0.1:7070 \\
+        python apps/api/src/main.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """替身服务状态（线程安全）"""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.lock = threading.Lock()
+        self.memories = {}
+        self.tasks = {}
+        self.requests = 0
+        self.failures = 0
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+        def _send(self, status: int, body) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._send(404, {"success": False, "error": "not found"})
+                return
+            with state.lock:
+                self._send(200, {
+                    "success": True,
+                    "requests": state.requests,
+                    "failures": state.failures,
+                    "memories": len(state.memories),
+                    "tasks": len(state.tasks)
+                })
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"success": False, "error": "invalid json"})
+                return
+
+            if state.latency:
+                time.sleep(state.latency)
+            with state.lock:
+                state.requests += 1
+                if random.random() < state.failure_rate:
+                    state.failures += 1
+                    self._send(503, {"success": False, "error": "injected failure"})
+                    return
+
+            if self.path == "/store":
+                memory_id = payload.get("id") or f"ultra-{uuid.uuid4().hex[:12]}"
+                with state.lock:
+                    state.memories[memory_id] = payload
+                self._send(200, {"success": True, "data": {"id": memory_id}})
+            elif self.path == "/search":
+                query = payload.get("query") or ""
+                limit = int(payload.get("limit") or 10)
+                with state.lock:
+                    results = [
+                        {"id": memory_id, "content": memory.get("content", ""),
+                         "title": (memory.get("metadata") or {}).get("title", ""), "score": 1.0}
+                        for memory_id, memory in state.memories.items()
+                        if query in memory.get("content", "")
+                    ][:limit]
+                self._send(200, {"success": True, "results": results})
+            elif self.path == "/api/tasks/match":
+                task_id = f"task-{uuid.uuid4().hex[:12]}"
+                with state.lock:
+                    state.tasks[task_id] = payload
+                self._send(200, {"success": True, "data": {"task": {"task_id": task_id}}})
+            else:
+                self._send(404, {"success": False, "error": "not found"})
+
+    return Handler
+
+
+def create_stub_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency: float = 0.0,
+    failure_rate: float = 0.0
+) -> ThreadingHTTPServer:
+    """
+    创建替身服务（port=0 时自动分配端口，见 server.server_address）
+
+    Returns:
+        ThreadingHTTPServer；server.state 为 StubState
+    """
+    state = StubState(latency=latency, failure_rate=failure_rate)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="外部记忆系统本地替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="返回503的概率（0~1）")
+    args = parser.parse_args()
+
+    server = create_stub_server(args.host, args.port, args.latency, args.failure_rate)
+    print(f"Memory stub server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
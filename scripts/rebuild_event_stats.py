@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+event_stats 对账脚本
+
+从 project_events 原始数据重建 event_stats 计数（含今日/本周/本月时间桶）。
+
+用法:
+    python scripts/rebuild_event_stats.py              # 重建全部项目
+    python scripts/rebuild_event_stats.py TASKFLOW     # 只重建指定项目
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.event_service import create_event_store  # noqa: E402
+
+DB_PATH = PROJECT_ROOT / "database" / "data" / "tasks.db"
+
+
+def main() -> None:
+    project_id = sys.argv[1] if len(sys.argv) > 1 else None
+    store = create_event_store(db_path=str(DB_PATH))
+    rebuilt = store.rebuild_stats(project_id)
+    target = project_id or "全部项目"
+    print(f"✓ event_stats 已重建: {target}（{rebuilt} 个项目）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+memory_stats_summary 对账脚本
+
+从 project_memories 原始数据重建项目记忆统计（按类型/分类计数与重要性直方图）。
+
+用法:
+    python scripts/rebuild_memory_stats.py              # 重建全部项目
+    python scripts/rebuild_memory_stats.py TASKFLOW     # 只重建指定项目
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+
+from services.db_pool import get_connection_pool  # noqa: E402
+from services.memory_stats import MemoryStatsStore  # noqa: E402
+
+DB_PATH = PROJECT_ROOT / "database" / "data" / "tasks.db"
+
+
+def main() -> None:
+    project_id = sys.argv[1] if len(sys.argv) > 1 else None
+    store = MemoryStatsStore(get_connection_pool(str(DB_PATH)))
+    rebuilt = store.rebuild(project_id)
+    target = project_id or "全部项目"
+    print(f"✓ memory_stats_summary 已重建: {target}（{rebuilt} 个项目）")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,20 +7,27 @@
 
 import time
 import sqlite3
-import json
 import re
+import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# 架构师事件日志（documents.db，见 services.event_journal）
+core_domain_path = Path(__file__).resolve().parent.parent / "packages" / "core-domain" / "src"
+if str(core_domain_path) not in sys.path:
+    sys.path.insert(0, str(core_domain_path))
+
+from services.event_journal import get_feed
+
 class SmartTaskDetector(FileSystemEventHandler):
     """智能任务检测器"""
     
     def __init__(self, db_path, project_root):
         self.db_path = db_path
         self.project_root = Path(project_root)
-        self.events_file = self.project_root / "apps/dashboard/automation-data/architect_events.json"
+        self.events = get_feed("architect_events", self.project_root / "apps/dashboard/automation-data")
         self.last_dispatch_task = None  # 记录最近派发的任务
         self.code_changes = {}  # 记录代码变化
         
@@ -179,29 +186,16 @@ class SmartTaskDetector(FileSystemEventHandler):
     
     def record_event(self, task_id, event_type):
         """记录事件"""
-        try:
-            with open(self.events_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            data = {"events": []}
-        
         content_map = {
             "auto_start": f"[自动检测] 任务{task_id}检测到编码活动，自动标记为进行中",
             "auto_complete": f"[自动检测] 任务{task_id}检测到完成报告，自动标记为已完成"
         }
         
-        event = {
-            "id": f"event-{len(data.get('events', [])) + 1:03d}",
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        self.events.append({
             "type": "auto_detection",
             "icon": "🤖",
             "content": content_map.get(event_type, f"[自动] {task_id}")
-        }
-        
-        data.setdefault("events", []).append(event)
-        
-        with open(self.events_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        })
 
 def start_smart_detector():
     """启动智能检测器"""
@@ -7,20 +7,27 @@
 
 import time
 import sqlite3
-import json
 import re
+import sys
 from pathlib import Path
 from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+# 架构师事件日志（documents.db，见 services.event_journal）
+core_domain_path = Path(__file__).resolve().parent.parent / "packages" / "core-domain" / "src"
+if str(core_domain_path) not in sys.path:
+    sys.path.insert(0, str(core_domain_path))
+
+from services.event_journal import get_feed
+
 class TaskAutoMonitor(FileSystemEventHandler):
     """任务自动监控器"""
     
     def __init__(self, db_path, project_root):
         self.db_path = db_path
         self.project_root = Path(project_root)
-        self.events_file = self.project_root / "apps/dashboard/automation-data/architect_events.json"
+        self.events = get_feed("architect_events", self.project_root / "apps/dashboard/automation-data")
         self.processed_files = set()  # 避免重复处理
         
     def on_created(self, event):
@@ -175,15 +182,7 @@ class TaskAutoMonitor(FileSystemEventHandler):
     def add_event(self, event_type, icon, content, metadata=None):
         """添加事件到事件流"""
         try:
-            if not self.events_file.exists():
-                data = {"events": []}
-            else:
-                with open(self.events_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            
             event = {
-                "id": f"event-{len(data.get('events', [])) + 1:03d}",
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "type": event_type,
                 "icon": icon,
                 "content": content
@@ -192,10 +191,7 @@ class TaskAutoMonitor(FileSystemEventHandler):
             if metadata:
                 event["metadata"] = metadata
             
-            data.setdefault("events", []).append(event)
-            
-            with open(self.events_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.events.append(event)
                 
         except Exception as e:
             print(f"[ERROR] 记录事件失败: {e}")
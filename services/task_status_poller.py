@@ -7,7 +7,6 @@
 
 import sqlite3
 import time
-import json
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
@@ -17,6 +16,7 @@ core_domain_path = Path(__file__).resolve().parent.parent / "packages" / "core-d
 if str(core_domain_path) not in sys.path:
     sys.path.insert(0, str(core_domain_path))
 
+from services.event_journal import get_feed
 from services.event_service import (
     create_event_emitter,
     EventCategory,
@@ -30,7 +30,7 @@ class TaskStatusPoller:
     def __init__(self, db_path, project_root):
         self.db_path = db_path
         self.project_root = Path(project_root)
-        self.events_file = self.project_root / "apps/dashboard/automation-data/architect_events.json"
+        self.events = get_feed("architect_events", self.project_root / "apps/dashboard/automation-data")
         try:
             self._event_emitter = create_event_emitter(db_path=str(self.db_path))
         except Exception:
@@ -137,15 +137,7 @@ class TaskStatusPoller:
     def record_event(self, task_id, status):
         """记录事件"""
         try:
-            if not self.events_file.exists():
-                data = {"events": []}
-            else:
-                with open(self.events_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            
-            event = {
-                "id": f"event-{len(data.get('events', [])) + 1:03d}",
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            self.events.append({
                 "type": "auto_status_change",
                 "icon": "🤖",
                 "content": f"[自动] 任务{task_id}状态已自动更新为{status}",
@@ -154,12 +146,7 @@ class TaskStatusPoller:
                     "status": status,
                     "auto": True
                 }
-            }
-            
-            data.setdefault("events", []).append(event)
-            
-            with open(self.events_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            })
         except Exception as e:
             print(f"[ERROR] 记录事件失败: {e}")
 
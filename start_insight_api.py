@@ -8,7 +8,9 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 import json
+import sys
 from datetime import datetime
+from typing import Optional
 import uvicorn
 
 app = FastAPI(title="透视塔API", version="1.0.0")
@@ -30,6 +32,25 @@ def load_json_file(file_path: Path):
     with open(file_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+# 架构师事件/监控/对话与 Dashboard 共用 automation-data/documents.db
+sys.path.insert(0, str(Path(__file__).parent / "apps" / "dashboard" / "src"))
+from industrial_dashboard.architect_store import create_architect_store
+from services.event_journal import DEFAULT_PAGE_SIZE, get_feed
+
+_architect_store = None
+
+def get_architect_store():
+    """架构师数据存储（首次使用时创建，并导入尚未导入的旧JSON文件）"""
+    global _architect_store
+    if _architect_store is None:
+        _architect_store = create_architect_store(DATA_DIR)
+    return _architect_store
+
+def feed_response(name: str, after: Optional[int], limit: int, event_type: Optional[str]):
+    """事件流接口响应（?after=<seq>&limit= 游标读取，见 EventJournal.page）"""
+    page = get_feed(name, DATA_DIR).page(after, limit, event_type)
+    return {"success": True, **page, "updated_at": datetime.now().isoformat()}
+
 @app.get("/")
 async def root():
     return {
@@ -180,22 +201,15 @@ async def get_features_summary():
     }
 
 @app.get("/api/architect/events")
-async def get_architect_events():
+async def get_architect_events(after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE, type: Optional[str] = None):
     """获取架构师事件流"""
-    data = load_json_file(DATA_DIR / "architect_events.json")
-    events = data.get("events", [])
-
-    return {
-        "success": True,
-        "total": len(events),
-        "events": events,
-        "updated_at": datetime.now().isoformat()
-    }
+    get_architect_store()
+    return feed_response("architect_events", after, limit, type)
 
 @app.get("/api/architect/monitor")
 async def get_architect_monitor():
     """获取架构师监控数据"""
-    data = load_json_file(DATA_DIR / "architect_monitor.json")
+    data = get_architect_store().get_monitor()
 
     return {
         "success": True,
@@ -206,9 +220,9 @@ async def get_architect_monitor():
 @app.get("/api/architect/conversations")
 async def get_architect_conversations():
     """获取架构师对话历史"""
-    data = load_json_file(DATA_DIR / "architect-conversations.json")
-    sessions = data.get("sessions", [])
-    stats = data.get("stats", {})
+    data = get_architect_store().get_conversations()
+    sessions = data["sessions"]
+    stats = data["stats"]
 
     return {
         "success": True,
@@ -222,10 +236,10 @@ async def get_architect_conversations():
 async def get_dashboard_overview():
     """获取Dashboard主页统计数据"""
     # 加载各种数据
-    architect_monitor = load_json_file(DATA_DIR / "architect_monitor.json")
-    architect_events = load_json_file(DATA_DIR / "architect_events.json")
-    architect_conversations = load_json_file(DATA_DIR / "architect-conversations.json")
-    pulse_events = load_json_file(DATA_DIR / "realtime_pulse_events.json")
+    store = get_architect_store()
+    architect_monitor = store.get_monitor(include_sessions=False)
+    architect_events = store.events
+    architect_conversations = store.get_conversations()
 
     # 计算任务统计（从architect_monitor中获取）
     project_info = architect_monitor.get("project_info", {})
@@ -239,8 +253,8 @@ async def get_dashboard_overview():
     token_usage = architect_monitor.get("token_usage", {})
     token_used = token_usage.get("used", 0)
 
-    # 事件数（从architect_events）
-    total_architect_events = len(architect_events.get("events", []))
+    # 事件数（从架构师事件日志）
+    total_architect_events = architect_events.count()
 
     # 会话数和消息数
     conversations = architect_conversations.get("sessions", [])
@@ -251,9 +265,8 @@ async def get_dashboard_overview():
     total_memories = 45
     memory_decisions = 12
 
-    # 今日增量
+    # 今日增量（时间索引 + 类型索引）
     today = datetime.now().strftime("%Y-%m-%d")
-    today_events = [e for e in architect_events.get("events", []) if e.get("timestamp", "").startswith(today)]
 
     return {
         "success": True,
@@ -264,8 +277,8 @@ async def get_dashboard_overview():
             "completed_tasks": completed_tasks,
             "cancelled_tasks": cancelled_tasks,
             "token_used": token_used,
-            "today_pending_change": len([e for e in today_events if e.get("type") == "task_create"]),
-            "today_completed_change": len([e for e in today_events if e.get("type") == "task_complete"])
+            "today_pending_change": architect_events.count(event_type="task_create", since=today),
+            "today_completed_change": architect_events.count(event_type="task_complete", since=today)
         },
         "new_stats": {
             "total_events": total_architect_events,
@@ -273,23 +286,15 @@ async def get_dashboard_overview():
             "total_messages": total_messages,
             "total_memories": total_memories,
             "memory_decisions": memory_decisions,
-            "today_events_change": len(today_events)
+            "today_events_change": architect_events.count(since=today)
         },
         "updated_at": datetime.now().isoformat()
     }
 
 @app.get("/api/engineer/events")
-async def get_engineer_events():
+async def get_engineer_events(after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE, type: Optional[str] = None):
     """获取全栈工程师事件流"""
-    data = load_json_file(DATA_DIR / "engineer_events.json")
-    events = data.get("events", [])
-
-    return {
-        "success": True,
-        "total": len(events),
-        "events": events,
-        "updated_at": datetime.now().isoformat()
-    }
+    return feed_response("engineer_events", after, limit, type)
 
 @app.get("/api/engineer/conversations")
 async def get_engineer_conversations():
@@ -748,39 +753,27 @@ async def get_memories():
         return {"success": False, "error": str(e), "memories": []}
 
 @app.get("/api/pulse/events")
-async def get_pulse_events():
+async def get_pulse_events(after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE, type: Optional[str] = None):
     """获取实时脉动事件流（全角色）"""
-    data = load_json_file(DATA_DIR / "realtime_pulse_events.json")
-    events = data.get("events", [])
-    stats = data.get("stats", {})
-
-    # 按时间倒序排列
-    events_sorted = sorted(events, key=lambda x: x.get("timestamp", ""), reverse=True)
-
-    return {
-        "success": True,
-        "total": len(events_sorted),
-        "events": events_sorted,
-        "stats": stats,
-        "updated_at": datetime.now().isoformat()
+    response = feed_response("realtime_pulse", after, limit, type)
+
+    # 统计：角色/分类计数由事件日志维护，今日事件走时间索引
+    journal = get_feed("realtime_pulse", DATA_DIR)
+    counts = journal.get_counts()
+    response["stats"] = {
+        "total_events": response["total"],
+        "today_events": journal.count(since=datetime.now().strftime("%Y-%m-%d")),
+        "roles": counts.get("role", {}),
+        "categories": counts.get("category", {})
     }
+    return response
 
 @app.post("/api/architect/save-conversation")
 async def save_conversation(conversation: dict):
     """保存新的对话记录"""
     try:
-        file_path = DATA_DIR / "architect-conversations.json"
-
-        # 读取现有数据
-        data = load_json_file(file_path)
-        sessions = data.get("sessions", [])
-
-        # 生成新的session_id
-        session_id = f"conv-{str(len(sessions) + 1).zfill(3)}"
-
-        # 构建新对话记录
+        # 构建新对话记录（session_id 由存储按计数器生成：conv-001...）
         new_session = {
-            "session_id": session_id,
             "title": conversation.get("title", "未命名对话"),
             "project_id": conversation.get("project_id", "TASKFLOW"),
             "model": conversation.get("model", "claude-3-5-sonnet-4"),
@@ -791,28 +784,11 @@ async def save_conversation(conversation: dict):
             "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "participants": conversation.get("participants", ["用户", "AI架构师"]),
             "summary": conversation.get("summary", ""),
-            "messages": [],
             "started_at": conversation.get("started_at", datetime.now().isoformat()),
             "last_active": datetime.now().isoformat(),
             "tags": conversation.get("tags", [])
         }
-
-        # 添加到列表
-        sessions.append(new_session)
-
-        # 更新统计
-        data["sessions"] = sessions
-        data["stats"] = {
-            "total_conversations": len(sessions),
-            "active_conversations": sum(1 for s in sessions if s.get("status") == "active"),
-            "total_tokens": sum(s.get("total_tokens", 0) for s in sessions),
-            "total_messages": sum(s.get("messages_count", 0) for s in sessions),
-            "last_updated": datetime.now().isoformat()
-        }
-
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        session_id = get_architect_store().create_session(new_session, id_template="conv-{n:03d}")["session_id"]
 
         return {
             "success": True,
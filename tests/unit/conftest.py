@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+pytest配置文件（单元测试）
+
+单元测试直接针对 packages/core-domain 与 apps（api、dashboard）下的服务模块，不依赖运行中的服务
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+
+# 添加服务模块路径
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "packages" / "core-domain" / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "apps" / "api" / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "apps" / "dashboard" / "src"))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """临时数据库文件路径"""
+    return str(tmp_path / "test.db")
+
+
+MIGRATIONS_DIR = PROJECT_ROOT / "database" / "migrations"
+SCHEMAS_DIR = PROJECT_ROOT / "database" / "schemas"
+
+
+def apply_migrations(db_path: str, *names: str) -> None:
+    """按顺序执行指定的迁移脚本"""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for name in names:
+            conn.executescript((MIGRATIONS_DIR / name).read_text(encoding="utf-8"))
+    finally:
+        conn.close()
+
+
+def apply_schema_table(db_path: str, schema: str, table: str) -> None:
+    """只执行 schema 文件中指定表的建表语句（完整 schema 与迁移后的表结构不兼容）"""
+    import re
+    import sqlite3
+
+    text = (SCHEMAS_DIR / schema).read_text(encoding="utf-8")
+    match = re.search(rf"CREATE TABLE IF NOT EXISTS {table} \(.*?\n\);", text, re.S)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(match.group(0))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def events_db(db_path):
+    """包含事件表的临时数据库"""
+    apply_migrations(
+        db_path,
+        "004_add_events_tables.sql",
+        "006_event_stats_time_buckets.sql",
+        "007_event_query_indexes.sql",
+        "008_event_consumer_offsets.sql",
+    )
+    return db_path
+
+
+@pytest.fixture
+def memory_db(db_path):
+    """包含项目记忆相关表的临时数据库"""
+    apply_migrations(
+        db_path,
+        "003_add_project_memories.sql",
+        "005_add_project_memory_tables.sql",
+        "010_memory_search_index.sql",
+        "011_memory_sync_outbox.sql",
+        "012_memory_links.sql",
+        "013_memory_inheritance.sql",
+        "014_memory_graph.sql",
+        "015_memory_retrieval_analytics.sql",
+        "016_memory_compaction.sql",
+        "017_memory_stats_summary.sql",
+    )
+    # 迁移 005 只有说明没有建表语句，检索历史表取自 v5 schema
+    apply_schema_table(db_path, "v5_project_memory_schema.sql", "memory_retrieval_history")
+    return db_path
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+规则动作执行器单元测试：超时不重复执行非幂等动作，在途执行数上限
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.action_executor import ActionExecutor, ActionOutcome, RetryPolicy
+from services.rule_engine import Rule, RuleEngine, RuleExecutionError
+
+
+EVENT = {"id": "EVT-1", "event_type": "task.completed"}
+
+
+def _rule(action, **options):
+    return Rule(
+        rule_id=options.pop("rule_id", "rule"),
+        name="rule",
+        description="",
+        event_type_pattern="task.completed",
+        action=action,
+        **options
+    )
+
+
+@pytest.fixture
+def executor():
+    executor = ActionExecutor(max_workers=4, default_timeout=0.05)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def _blocking_action(release: threading.Event, calls: list):
+    def action(event, engine):
+        calls.append(event["id"])
+        release.wait(5)
+    return action
+
+
+def test_timed_out_action_is_not_retried_unless_idempotent(executor):
+    release = threading.Event()
+    calls = []
+    rule = _rule(_blocking_action(release, calls), retry=RetryPolicy(max_attempts=3, backoff_seconds=0))
+
+    outcome = asyncio.run(executor.run(rule, EVENT, None))
+    release.set()
+
+    assert outcome is ActionOutcome.TIMED_OUT
+    assert calls == ["EVT-1"]
+    assert rule.stats["retry_count"] == 0
+
+
+def test_idempotent_action_is_retried_after_timeout(executor):
+    release = threading.Event()
+    calls = []
+    rule = _rule(
+        _blocking_action(release, calls),
+        retry=RetryPolicy(max_attempts=3, backoff_seconds=0),
+        idempotent=True,
+        max_concurrency=3
+    )
+
+    outcome = asyncio.run(executor.run(rule, EVENT, None))
+    release.set()
+
+    assert outcome is ActionOutcome.TIMED_OUT
+    assert len(calls) == 3
+
+
+def test_in_flight_cap_keeps_stuck_actions_from_filling_the_pool(executor):
+    release = threading.Event()
+    calls = []
+    rule = _rule(_blocking_action(release, calls), max_concurrency=1)
+
+    first = asyncio.run(executor.run(rule, EVENT, None))
+    second = asyncio.run(executor.run(rule, EVENT, None))
+
+    assert (first, second) == (ActionOutcome.TIMED_OUT, ActionOutcome.FAILED)
+    assert len(calls) == 1
+    assert rule.stats["rejected_count"] == 1
+    assert executor.in_flight("rule") == 1
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while executor.in_flight("rule") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.in_flight("rule") == 0
+
+
+def test_engine_only_offers_safe_rules_for_redelivery(executor):
+    release = threading.Event()
+    engine = RuleEngine(executor=executor)
+
+    def failing(event, engine):
+        raise RuntimeError("boom")
+
+    engine.register_rule(_rule(failing, rule_id="failing"))
+    engine.register_rule(_rule(_blocking_action(release, []), rule_id="stuck"))
+
+    with pytest.raises(RuleExecutionError) as info:
+        asyncio.run(engine.process_event(EVENT))
+    release.set()
+
+    assert sorted(info.value.failed_rule_ids) == ["failing", "stuck"]
+    assert info.value.retry_rule_ids == ["failing"]
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+对话分类器单元测试：一次扫描返回全部重叠命中，判定规则与批量（进程池）分类一致
+"""
+
+import random
+
+import pytest
+
+from services.conversation_classifier import (
+    KEYWORD_SETS,
+    ConversationClassifier,
+    KeywordAutomaton,
+    classify_turns,
+    shutdown_process_pool,
+)
+
+
+def _substring_matches(automaton, text):
+    """逐关键词子串查找（参照实现）"""
+    matches = set()
+    for word in automaton.labels:
+        start = text.find(word)
+        while start != -1:
+            matches.add((start, start + len(word), word))
+            start = text.find(word, start + 1)
+    return matches
+
+
+def _random_text(rng, keywords, length=120):
+    filler = "的一是在不了有和人这中大为上个我要时来用们到作地出就分对成会可"
+    parts = [rng.choice(filler) for _ in range(length)]
+    for _ in range(rng.randint(0, 8)):
+        parts.insert(rng.randrange(len(parts) + 1), rng.choice(keywords))
+    return "".join(parts)
+
+
+@pytest.fixture
+def classifier():
+    return ConversationClassifier()
+
+
+def test_single_pass_reports_every_overlapping_match():
+    automaton = KeywordAutomaton({
+        "a": ("架构决策", "决策", "策略"),
+        "b": ("abc", "bcd", "cde", "b"),
+    })
+    text = "架构决策略 abcde"
+
+    matches = list(automaton.iter_matches(text))
+
+    assert len(matches) == len(set(matches))
+    assert set(matches) == _substring_matches(automaton, text)
+
+
+def test_matches_agree_with_substring_search_on_random_turns():
+    automaton = KeywordAutomaton(KEYWORD_SETS)
+    keywords = [word for words in KEYWORD_SETS.values() for word in words]
+    rng = random.Random(11)
+
+    for _ in range(300):
+        text = _random_text(rng, keywords).lower()
+        matches = list(automaton.iter_matches(text))
+        assert len(matches) == len(set(matches))
+        assert set(matches) == _substring_matches(automaton, text)
+
+
+def test_decision_turn_is_recorded_with_boosted_importance(classifier):
+    result = classifier.classify(
+        "这个怎么处理？",
+        "经过评估，我们决定采用SQLite连接池。\n其他细节略。\n这是重要的架构决策，注意WAL模式。",
+        include_spans=True,
+    )
+
+    assert result.should_record
+    assert (result.memory_type, result.category) == ("decision", "decision")
+    assert result.importance == 10
+    assert result.keywords == ["决定", "采用", "架构决策", "决策", "重要"]
+    assert result.refined_content == "经过评估，我们决定采用SQLite连接池。\n这是重要的架构决策，注意WAL模式。"
+    assert {"source": "ai", "start": 9, "end": 11, "keyword": "采用", "labels": ["decision", "refine"]} in result.spans
+
+
+def test_recording_rules(classifier):
+    forced = classifier.classify("请记住这个端口号", "好的")
+    assert forced.should_record
+    assert (forced.memory_type, forced.keywords) == ("knowledge", ["强制记录"])
+
+    solution = classifier.classify("", "已修复 bug")
+    assert solution.should_record
+    assert (solution.category, solution.importance) == ("solution", 7)
+
+    single_knowledge = classifier.classify("", "一点笔记")
+    assert not single_knowledge.should_record
+    assert single_knowledge.scores["knowledge"] == 1
+
+    nothing = classifier.classify("你好", "你好，" * 200)
+    assert not nothing.should_record
+    assert nothing.refined_content == ("你好，" * 200)[:300]
+
+
+def test_batch_classification_matches_inline_results(classifier):
+    keywords = [word for words in KEYWORD_SETS.values() for word in words]
+    rng = random.Random(5)
+    turns = [(_random_text(rng, keywords, 30), _random_text(rng, keywords, 200)) for _ in range(60)]
+    expected = [classifier.classify(user, ai, include_spans=True).to_dict() for user, ai in turns]
+
+    try:
+        pooled = classify_turns(turns, include_spans=True, workers=2, chunk_size=16, parallel_threshold=1)
+    finally:
+        shutdown_process_pool()
+
+    assert [result.to_dict() for result in pooled] == expected
+    assert [result.to_dict() for result in classify_turns(turns, include_spans=True)] == expected
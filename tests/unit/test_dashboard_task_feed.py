@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Dashboard 任务列表单元测试：按看板修订号返回 ETag/304，?since= 只返回其后变更（含删除）的任务
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from automation.models import Task, TaskStatus
+from automation.state_manager import StateManager
+from industrial_dashboard.adapters import StateManagerAdapter
+from industrial_dashboard.dashboard import IndustrialDashboard
+from industrial_dashboard.data_provider import DataProvider, StatsData, TaskData
+
+
+class ListOnlyProvider(DataProvider):
+    """不支持修订号的数据提供器（旧行为：每次全量）"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_stats(self):
+        return StatsData()
+
+    def get_tasks(self):
+        self.calls += 1
+        return [TaskData(id="task-1", title="任务", created_at="2026-01-01T00:00:00")]
+
+
+class CountingAdapter(StateManagerAdapter):
+    def __init__(self, state_manager):
+        super().__init__(state_manager)
+        self.calls = 0
+
+    def get_tasks(self):
+        self.calls += 1
+        return super().get_tasks()
+
+
+def _client(provider):
+    # 只挂载路由，不初始化事件流/记忆/文档存储等与任务列表无关的组件
+    dashboard = IndustrialDashboard.__new__(IndustrialDashboard)
+    dashboard.data_provider = provider
+    dashboard._task_feed_cache = None
+    dashboard.app = FastAPI()
+    dashboard._setup_routes()
+    return TestClient(dashboard.app)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = StateManager(db_path=str(tmp_path / "state.db"), events_db_path=str(tmp_path / "events.db"))
+    manager.create_task(Task(id="task-1.1", title="第一个任务"))
+    manager.create_task(Task(id="task-1.2", title="第二个任务"))
+    return manager
+
+
+def test_full_feed_revalidates_with_etag(manager):
+    provider = CountingAdapter(manager)
+    client = _client(provider)
+
+    first = client.get("/api/tasks")
+    revision = manager.get_board_revision()
+    assert first.status_code == 200
+    assert first.headers["etag"] == f'"tasks-{revision}"'
+    assert first.headers["x-board-revision"] == str(revision)
+    assert {task["id"] for task in first.json()} == {"task-1.1", "task-1.2"}
+
+    not_modified = client.get("/api/tasks", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # 同一修订号的响应体只序列化一次
+    assert client.get("/api/tasks").content == first.content
+    assert provider.calls == 1
+
+    manager.update_task_status("task-1.1", TaskStatus.COMPLETED)
+    changed = client.get("/api/tasks", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] == f'"tasks-{manager.get_board_revision()}"'
+    assert provider.calls == 2
+
+
+def test_since_returns_only_changed_and_deleted_tasks(manager):
+    client = _client(StateManagerAdapter(manager))
+    revision = int(client.get("/api/tasks").headers["x-board-revision"])
+
+    assert client.get(f"/api/tasks?since={revision}").json() == {
+        "revision": revision, "tasks": [], "deleted": [], "full": False
+    }
+
+    manager.update_task_status("task-1.2", TaskStatus.IN_PROGRESS)
+    manager.create_task(Task(id="task-1.3", title="第三个任务"))
+    conn = sqlite3.connect(str(manager.db_path))
+    conn.execute("DELETE FROM tasks WHERE id = 'task-1.1'")
+    conn.commit()
+    conn.close()
+
+    delta = client.get(f"/api/tasks?since={revision}").json()
+    assert delta["revision"] == manager.get_board_revision() > revision
+    assert {task["id"]: task["status"] for task in delta["tasks"]} == {"task-1.2": "in_progress", "task-1.3": "pending"}
+    assert delta["deleted"] == ["task-1.1"]
+
+    assert client.get(f"/api/tasks?since={delta['revision']}").json()["tasks"] == []
+
+
+def test_provider_without_revision_keeps_full_list_behaviour():
+    provider = ListOnlyProvider()
+    client = _client(provider)
+
+    response = client.get("/api/tasks")
+    assert "etag" not in response.headers
+    assert [task["id"] for task in response.json()] == ["task-1"]
+
+    delta = client.get("/api/tasks?since=5").json()
+    assert delta["full"] is True and delta["revision"] is None
+    assert [task["id"] for task in delta["tasks"]] == ["task-1"]
+    assert provider.calls == 2
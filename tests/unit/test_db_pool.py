@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+连接池单元测试：嵌套事务回滚与提交后回调
+"""
+
+import pytest
+
+from services.db_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_connections=2)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+    yield pool
+    pool.close()
+
+
+def _names(pool):
+    with pool.connection() as conn:
+        return [row["name"] for row in conn.execute("SELECT name FROM items ORDER BY name")]
+
+
+def test_nested_write_before_outer_write_is_rolled_back_with_outer(pool):
+    """外层尚未写入时打开的嵌套连接，外层回滚后其写入也应撤销"""
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            with pool.connection() as inner:
+                inner.execute("INSERT INTO items VALUES ('inner')")
+            raise RuntimeError("outer failed")
+
+    assert _names(pool) == []
+
+
+def test_inner_failure_only_rolls_back_inner_savepoint(pool):
+    with pool.connection() as outer:
+        outer.execute("INSERT INTO items VALUES ('outer')")
+        with pytest.raises(ValueError):
+            with pool.connection() as inner:
+                inner.execute("INSERT INTO items VALUES ('inner')")
+                raise ValueError("inner failed")
+
+    assert _names(pool) == ["outer"]
+
+
+def test_call_after_commit_runs_once_after_outermost_commit(pool):
+    calls = []
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO items VALUES ('a')")
+        with pool.connection():
+            pool.call_after_commit(lambda: calls.append("inner"))
+        pool.call_after_commit(lambda: calls.append("outer"))
+        assert calls == []
+
+    assert calls == ["inner", "outer"]
+
+
+def test_call_after_commit_dropped_on_rollback(pool):
+    calls = []
+    with pool.connection():
+        with pytest.raises(ValueError):
+            with pool.connection():
+                pool.call_after_commit(lambda: calls.append("rolled back savepoint"))
+                raise ValueError("inner failed")
+        pool.call_after_commit(lambda: calls.append("committed"))
+
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pool.call_after_commit(lambda: calls.append("rolled back transaction"))
+            raise RuntimeError("outer failed")
+
+    assert calls == ["committed"]
+
+
+def test_call_after_commit_outside_transaction_runs_immediately(pool):
+    calls = []
+    pool.call_after_commit(lambda: calls.append("now"))
+    assert calls == ["now"]
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+文档存储单元测试：合并更新在SQL内完成，读改写不丢更新，追加按计数器生成ID并执行保留策略，旧数据只导入一次
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from industrial_dashboard.architect_store import TOKEN_SESSIONS_RETENTION, create_architect_store
+from services.db_pool import get_connection_pool
+from services.document_store import DocumentStore
+
+
+def _write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def store(db_path):
+    return DocumentStore(get_connection_pool(db_path))
+
+
+def test_patch_merges_nested_fields_and_removes_nulls(store):
+    designs = store.collection("designs")
+    designs.put("first", {})
+    designs.put("ux", {"status": "pending", "meta": {"owner": "a", "round": 1}, "images": [1, 2]})
+
+    merged = designs.patch("ux", {"status": "approved", "meta": {"round": 2, "owner": None}, "images": [3]})
+
+    assert merged == {"status": "approved", "meta": {"round": 2}, "images": [3]}
+    assert designs.get("ux") == merged
+    assert designs.patch("ui", {"status": "approved", "note": None}) == {"status": "approved"}
+    # 合并不改变插入顺序
+    assert [doc.get("status") for doc in designs.list(newest_first=False)] == [None, "approved", "approved"]
+
+
+def test_concurrent_updates_are_not_lost(store):
+    counters = store.collection("counters")
+
+    def increment():
+        for _ in range(25):
+            counters.update("hits", lambda doc: {"n": doc["n"] + 1}, default={"n": 0})
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counters.get("hits") == {"n": 100}
+
+
+def test_update_mutating_in_place_writes_default_copy(store):
+    default = {"images": []}
+    designs = store.collection("designs")
+
+    designs.update("ux", lambda doc: doc["images"].append("a.png"), default=default)
+
+    assert designs.get("ux") == {"images": ["a.png"]}
+    assert default == {"images": []}
+
+
+def test_append_ids_follow_counter_and_retention(store, db_path):
+    events = store.collection("events", id_template="event-{n}", max_documents=3)
+    for index in range(5):
+        events.append({"index": index})
+
+    assert [doc["id"] for doc in events.list()] == ["event-5", "event-4", "event-3"]
+    assert events.count() == 3
+
+    events.clear()
+    events.append({"index": 5}, doc_id="event-10")
+    assert events.append({"index": 6})["id"] == "event-11"
+
+    events.reserve_ids(["legacy-20", "no-number"])
+    assert events.append({"index": 7})["id"] == "event-21"
+
+    aged = store.collection("aged", max_age_days=1)
+    aged.put("old", {"v": 1})
+    aged.put("new", {"v": 2})
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE documents SET created_at = ? WHERE doc_id = 'old'", (time.time() - 2 * 86400,))
+    conn.commit()
+    conn.close()
+    assert aged.trim() == 1
+    assert aged.list() == [{"v": 2}]
+
+
+def test_find_uses_json_fields(store):
+    messages = store.collection("messages")
+    messages.ensure_index("session_id")
+    messages.put("s1/m1", {"session_id": "s1", "meta": {"role": "user"}})
+    messages.put("s2/m1", {"session_id": "s2", "meta": {"role": "ai"}})
+    messages.put("s1/m2", {"session_id": "s1", "meta": {"role": "ai"}})
+
+    assert messages.find(session_id="s1") == [
+        {"session_id": "s1", "meta": {"role": "ai"}},
+        {"session_id": "s1", "meta": {"role": "user"}},
+    ]
+    assert messages.count(where={"meta.role": "ai"}) == 2
+    with pytest.raises(ValueError):
+        messages.find(**{"session_id') OR 1=1 --": "x"})
+
+
+def test_import_once_registers_source_and_rolls_back_failures(store):
+    docs = store.collection("docs")
+
+    def load():
+        docs.put("a", {"v": 1})
+        docs.put("b", {"v": 2})
+        return 2
+
+    assert store.import_once("legacy.json", load) == 2
+    assert store.import_once("legacy.json", load) is None
+
+    def broken():
+        docs.put("c", {"v": 3})
+        raise RuntimeError("损坏的文件")
+
+    with pytest.raises(RuntimeError):
+        store.import_once("broken.json", broken)
+
+    assert docs.get("c") is None
+    assert [row["source"] for row in store.get_imports()] == ["legacy.json"]
+
+
+def test_architect_store_imports_legacy_files_once(tmp_path):
+    sessions = [{"timestamp": f"2026-01-01 10:00:{i:02d}", "tokens": i} for i in range(TOKEN_SESSIONS_RETENTION + 5)]
+    _write_json(tmp_path / "design_confirmations.json", {"ux": {"images": [], "status": "pending"}})
+    _write_json(tmp_path / "architect_monitor.json", {
+        "token_usage": {"used": 500, "total": 1000, "sessions": sessions},
+        "events": [{"id": "event-1", "content": "旧"}]
+    })
+    _write_json(tmp_path / "architect-conversations.json", {"sessions": [{
+        "session_id": "session-007",
+        "created_at": "2026-01-01",
+        "messages": [{"id": "msg-001", "content": "你好", "tokens": 3}]
+    }]})
+    _write_json(tmp_path / "architect_events.json", {"events": [
+        {"id": "event-2", "timestamp": "2026-01-01 10:00:02", "type": "review", "content": "新"},
+        {"id": "event-1", "timestamp": "2026-01-01 10:00:01", "type": "review", "content": "旧"},
+    ]})
+
+    architect = create_architect_store(tmp_path)
+
+    monitor = architect.get_monitor()
+    assert "events" not in monitor
+    assert monitor["token_usage"]["used"] == 500
+    assert len(monitor["token_usage"]["sessions"]) == TOKEN_SESSIONS_RETENTION
+    assert monitor["token_usage"]["sessions"][0] == sessions[0]
+    assert architect.confirm_design("ux")["status"] == "approved"
+
+    assert [event["id"] for event in architect.list_events()] == ["event-2", "event-1"]
+    assert architect.add_event("review", "追加")["id"] == "event-3"
+
+    message = architect.add_message("session-007", {"content": "继续", "tokens": 4})
+    assert message["id"] == "msg-002"
+    session = architect.get_session("session-007")
+    assert (session["messages_count"], session["total_tokens"]) == (2, 4)
+    assert [m["content"] for m in session["messages"]] == ["你好", "继续"]
+    assert architect.create_session({"title": "新会话"})["session_id"] == "session-008"
+
+    # 再次打开：已导入的文件不重复导入
+    assert architect.import_legacy_files() == {
+        "design_confirmations.json": None, "architect_monitor.json": None, "architect-conversations.json": None
+    }
+    assert architect.get_monitor()["token_usage"]["used"] == 500
+    assert architect.get_conversations()["stats"]["total_conversations"] == 2
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+事件日志单元测试：按段轮换并整段裁剪，游标分页不漏不重，旧 JSON 事件流只导入一次且之后的ID不冲突
+"""
+
+import json
+
+import pytest
+
+from services.db_pool import get_connection_pool
+from services.event_journal import EventJournal, get_feed
+
+
+def _journal(db_path, **options):
+    return EventJournal(get_connection_pool(db_path), "feed", **options)
+
+
+def _write_events(path, events):
+    path.write_text(json.dumps({"events": events}, ensure_ascii=False), encoding="utf-8")
+
+
+def test_segments_rotate_and_expire_whole(db_path):
+    journal = _journal(db_path, segment_size=3, max_segments=2, count_fields=("role",))
+    for index in range(7):
+        journal.append({"type": "tick", "role": "dev" if index % 2 else "qa", "index": index})
+
+    stats = journal.get_stats()
+    # 第7条写入第3段时删除第1段；序号不回退
+    assert [(s["segment"], s["first_seq"], s["last_seq"]) for s in stats["segments"]] == [(2, 4, 6), (3, 7, 7)]
+    assert (stats["latest_seq"], stats["entries"], stats["oldest_seq"]) == (7, 4, 4)
+    assert journal.count() == journal.count(event_type="tick") == 4
+    assert journal.get_counts() == {"role": {"dev": 2, "qa": 2}}
+
+    assert journal.append({"type": "tick"})["id"] == "event-8"
+
+
+def test_age_retention_drops_old_segments_on_rotation(db_path):
+    journal = _journal(db_path, segment_size=2, max_segments=None, max_age_days=1)
+    journal.append({"timestamp": "2020-01-01 00:00:00"})
+    journal.append({"timestamp": "2020-01-01 00:00:01"})
+    journal.append({})
+
+    assert [event["seq"] for event in journal.latest()] == [3]
+    assert journal.latest(since="2020-01-01 00:00:00", limit=5)[0]["seq"] == 3
+
+
+def test_cursor_paging_returns_every_event_once(db_path):
+    journal = _journal(db_path, segment_size=4, max_segments=None)
+    for index in range(10):
+        journal.append({"type": "a" if index % 3 else "b", "index": index})
+
+    latest = journal.page(limit=3)
+    assert [event["seq"] for event in latest["events"]] == [10, 9, 8]
+    assert latest["latest_seq"] == 10
+
+    seen, after = [], 0
+    while True:
+        page = journal.page(after=after, limit=4)
+        seen.extend(event["index"] for event in page["events"])
+        after = page["next_after"]
+        if not page["has_more"]:
+            break
+    assert seen == list(range(10))
+    assert journal.page(after=after)["events"] == []
+    assert journal.page(after=after)["next_after"] == 10
+
+    typed = journal.page(after=0, event_type="b")
+    assert [event["index"] for event in typed["events"]] == [0, 3, 6, 9]
+
+
+def test_page_reports_truncated_cursor(db_path):
+    journal = _journal(db_path, segment_size=2, max_segments=2)
+    for index in range(6):
+        journal.append({"index": index})
+
+    assert journal.page(after=1)["truncated"] is True
+    assert journal.page(after=2)["truncated"] is False
+    assert [event["index"] for event in journal.page(after=2)["events"]] == [2, 3, 4, 5]
+    assert journal.page(after=0, limit=0)["events"][0]["seq"] == 3
+
+
+def test_legacy_feed_is_imported_once_in_time_order(tmp_path):
+    _write_events(tmp_path / "realtime_pulse_events.json", [
+        {"id": "pulse-007", "timestamp": "2026-01-01 10:00:03", "role": "dev", "category": "code"},
+        {"id": "pulse-002", "timestamp": "2026-01-01 10:00:02", "role": "qa", "category": "test"},
+        {"timestamp": "2026-01-01 10:00:01", "role": "dev", "category": "test"},
+    ])
+
+    feed = get_feed("realtime_pulse", tmp_path)
+
+    events = feed.read_after(0)
+    assert [event["timestamp"][-2:] for event in events] == ["01", "02", "03"]
+    assert events[0]["id"] == "pulse-001"
+    assert feed.get_counts() == {"role": {"dev": 2, "qa": 1}, "category": {"code": 1, "test": 2}}
+    # 旧ID占用的序号之后继续编号
+    assert feed.append({"role": "dev"})["id"] == "pulse-008"
+
+    # 同库重新打开同名日志：已导入的来源不再导入
+    reopened = EventJournal(get_connection_pool(str(tmp_path / "documents.db")), "realtime_pulse", id_template="pulse-{seq:03d}")
+    assert reopened.import_once("realtime_pulse_events.json", lambda: pytest.fail("不应重复读取旧文件")) is None
+    assert reopened.count() == 4
+
+
+def test_missing_legacy_file_registers_empty_import(tmp_path):
+    feed = get_feed("engineer_events", tmp_path)
+
+    assert feed.count() == 0
+    assert feed.append({"type": "build"})["id"] == "eng-001"
+    assert get_feed("engineer_events", tmp_path) is feed
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+事件监听器单元测试：失败事件不被跳过（重试 → 死信 → 推进高水位线）
+"""
+
+import asyncio
+
+import pytest
+
+from services.event_listener import EventListener
+from services.event_service import EventEmitter, EventStore
+from services.rule_engine import RuleExecutionError
+
+
+class FakeRuleEngine:
+    """按事件标题决定失败的规则引擎"""
+
+    def __init__(self, failing_titles=()):
+        self.failing_titles = set(failing_titles)
+        self.calls = []
+
+    async def process_event(self, event, rule_ids=None):
+        self.calls.append((event["title"], rule_ids))
+        if event["title"] in self.failing_titles:
+            raise RuleExecutionError(event["id"], ["notify"])
+
+
+@pytest.fixture
+def store(events_db):
+    return EventStore(events_db)
+
+
+def _emit(store, *titles):
+    emitter = EventEmitter(store)
+    return [emitter.emit("PROJ", "task.created", title) for title in titles]
+
+
+def _listener(store, engine):
+    listener = EventListener(event_store=store, project_id="PROJ", max_retries=2, retry_backoff=0)
+    listener.set_rule_engine(engine)
+    listener.last_rowid = 0
+    listener.is_running = True
+    return listener
+
+
+def test_failed_event_is_retried_then_dead_lettered_before_advancing(store):
+    _emit(store, "a", "b", "c")
+    engine = FakeRuleEngine(failing_titles={"b"})
+    listener = _listener(store, engine)
+
+    asyncio.run(listener._poll_and_process())
+
+    assert [title for title, _ in engine.calls] == ["a", "b", "b", "b", "c"]
+    # 重试只重新执行失败的规则
+    assert engine.calls[2][1] == ["notify"]
+    dead_letters = listener.get_dead_letters()
+    assert [d["attempts"] for d in dead_letters] == [3]
+    assert store.get_consumer_offset(listener.offset_key) == store.get_max_rowid()
+
+
+def test_offset_stops_before_event_that_cannot_be_dead_lettered(store, monkeypatch):
+    _emit(store, "a", "b", "c")
+    engine = FakeRuleEngine(failing_titles={"b"})
+    listener = _listener(store, engine)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(store, "save_dead_letter", fail)
+    asyncio.run(listener._poll_and_process())
+
+    assert "c" not in [title for title, _ in engine.calls]
+    first_rowid = store.read_since(0, "PROJ", 1)[0][0]["rowid"]
+    assert store.get_consumer_offset(listener.offset_key) == first_rowid
+
+    # 下一次处理从失败事件重新开始
+    monkeypatch.undo()
+    engine.failing_titles.clear()
+    engine.calls.clear()
+    asyncio.run(listener._poll_and_process())
+    assert [title for title, _ in engine.calls] == ["b", "c"]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+事件查询单元测试：(occurred_at, id) 游标分页在时间相同的事件间稳定翻页
+"""
+
+import pytest
+
+from services.event_bus import EventBus
+from services.event_service import EventEmitter, EventStore
+
+
+@pytest.fixture
+def store(events_db):
+    store = EventStore(events_db)
+    emitter = EventEmitter(event_store=store, event_bus=EventBus())
+    # 每个时间戳 3 个事件，分页边界会落在并列事件中间
+    for minute in range(4):
+        for i in range(3):
+            emitter.emit(
+                "PROJ", "task.updated", f"事件{minute}-{i}",
+                category="task" if i % 2 == 0 else "issue",
+                occurred_at=f"2026-01-01T10:0{minute}:00",
+            )
+    emitter.emit("OTHER", "task.updated", "其他项目", occurred_at="2026-01-01T10:01:00")
+    return store
+
+
+def _paginate(store, page_size, **filters):
+    pages, after = [], None
+    while True:
+        page = store.query("PROJ", limit=page_size, after=after, **filters)
+        if not page:
+            return pages
+        pages.append(page)
+        after = EventStore.decode_cursor(EventStore.encode_cursor(page[-1]))
+
+
+@pytest.mark.parametrize("direction", ["DESC", "ASC"])
+def test_cursor_pages_cover_ties_without_gaps_or_duplicates(store, direction):
+    full = store.query("PROJ", limit=100, order_direction=direction)
+    pages = _paginate(store, 5, order_direction=direction)
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert [event["id"] for page in pages for event in page] == [event["id"] for event in full]
+
+    keys = [(event["occurred_at"], event["id"]) for event in full]
+    assert keys == sorted(keys, reverse=direction == "DESC")
+
+
+def test_cursor_respects_filters(store):
+    pages = _paginate(store, 2, category="task")
+    events = [event for page in pages for event in page]
+
+    assert len(events) == 8
+    assert {event["event_category"] for event in events} == {"task"}
+    assert len({event["id"] for event in events}) == 8
+
+
+def test_cursor_ignores_offset(store):
+    first = store.query("PROJ", limit=4)
+    after = (first[-1]["occurred_at"], first[-1]["id"])
+
+    assert store.query("PROJ", limit=4, offset=50, after=after) == store.query("PROJ", limit=4, offset=4)
+
+
+def test_invalid_cursor_and_ordering_are_rejected(store):
+    with pytest.raises(ValueError):
+        EventStore.decode_cursor("not-a-cursor")
+    with pytest.raises(ValueError):
+        store.query("PROJ", order_by="title")
+    with pytest.raises(ValueError):
+        store.query("PROJ", order_direction="sideways")
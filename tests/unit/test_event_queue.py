@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+写后事件发射器单元测试：与 EventEmitter.emit 的调用方式兼容
+"""
+
+import asyncio
+
+import pytest
+
+from services.event_queue import DurabilityMode, WriteBehindEventEmitter
+from services.event_service import EventStore
+
+
+@pytest.fixture
+def emitter(events_db):
+    emitter = WriteBehindEventEmitter(EventStore(events_db), durability=DurabilityMode.AWAIT_COMMIT)
+    yield emitter
+    emitter.close()
+
+
+def test_emit_accepts_positional_arguments(emitter):
+    event = emitter.emit("PROJ", "task.created", "标题", "描述", {"k": 1}, "task")
+
+    assert event["description"] == "描述"
+    assert event["event_category"] == "task"
+    stored = emitter.event_store.query("PROJ")
+    assert [e["id"] for e in stored] == [event["id"]]
+
+
+def test_emit_async_accepts_positional_arguments(emitter):
+    event = asyncio.run(emitter.emit_async("PROJ", "task.created", "标题", "描述", {"k": 1}, "task"))
+
+    assert event["description"] == "描述"
+    assert event["event_category"] == "task"
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+事件统计单元测试：event_stats 单条 upsert 增量与日/周/月时间桶
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from services.event_bus import EventBus
+from services.event_service import EventEmitter, EventStore
+
+
+COUNTER_COLUMNS = (
+    "total_events",
+    "task_events", "issue_events", "decision_events", "deployment_events", "system_events",
+    "info_events", "warning_events", "error_events", "critical_events",
+    "events_today", "events_this_week", "events_this_month",
+)
+
+
+@pytest.fixture
+def store(events_db):
+    return EventStore(events_db)
+
+
+@pytest.fixture
+def emitter(store):
+    return EventEmitter(event_store=store, event_bus=EventBus())
+
+
+def _counters(stats):
+    return {column: stats[column] for column in COUNTER_COLUMNS}
+
+
+def test_incremental_stats_match_rebuild(store, emitter):
+    long_ago = (datetime.now() - timedelta(days=400)).isoformat()
+    emitter.emit("PROJ", "task.created", "任务", category="task")
+    emitter.emit("PROJ", "issue.discovered", "问题", category="issue", severity="error")
+    emitter.emit("PROJ", "custom.event", "通用", category="general", severity="unknown")
+    emitter.emit("PROJ", "task.completed", "旧任务", category="task", occurred_at=long_ago)
+    emitter.emit_batch("PROJ", [
+        {"event_type": "decision.made", "title": "决策", "category": "decision", "severity": "warning"},
+        {"event_type": "deploy.failed", "title": "部署", "category": "deployment", "severity": "critical"},
+    ])
+    emitter.emit("OTHER", "task.created", "其他项目", category="task")
+
+    incremental = _counters(store.get_stats("PROJ"))
+    assert incremental["total_events"] == 6
+    assert incremental["task_events"] == 2
+    assert incremental["system_events"] == 1
+    assert incremental["info_events"] == 3
+    assert incremental["events_today"] == incremental["events_this_month"] == 5
+
+    assert store.rebuild_stats("PROJ") == 1
+    assert _counters(store.get_stats("PROJ")) == incremental
+    assert store.get_stats("OTHER")["total_events"] == 1
+
+
+def test_concurrent_upserts_do_not_lose_updates(store, emitter):
+    def emit_many():
+        for i in range(25):
+            emitter.emit("PROJ", "task.updated", f"事件{i}", category="task")
+
+    threads = [threading.Thread(target=emit_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = store.get_stats("PROJ")
+    assert stats["total_events"] == stats["task_events"] == stats["events_today"] == 100
+
+
+def test_stale_time_buckets_read_as_zero_and_reset_on_next_event(store, emitter, monkeypatch):
+    emitter.emit("PROJ", "task.created", "今天", category="task")
+    emitter.emit("PROJ", "task.created", "今天", category="task")
+
+    # 40 天后：日、ISO周、月都已换桶
+    later = EventStore._bucket_keys(date.today() + timedelta(days=40))
+    monkeypatch.setattr(store, "_current_buckets", lambda: later)
+
+    stats = store.get_stats("PROJ")
+    assert stats["total_events"] == 2
+    assert (stats["events_today"], stats["events_this_week"], stats["events_this_month"]) == (0, 0, 0)
+
+    emitter.emit("PROJ", "task.created", "40天后", category="task",
+                 occurred_at=(datetime.now() + timedelta(days=40)).isoformat())
+
+    stats = store.get_stats("PROJ")
+    assert stats["total_events"] == 3
+    assert (stats["events_today"], stats["events_this_week"], stats["events_this_month"]) == (1, 1, 1)
+    assert (stats["stats_day"], stats["stats_week"], stats["stats_month"]) == later
+
+
+def test_get_stats_rebuilds_missing_row_once(store, emitter):
+    emitter.emit("PROJ", "task.created", "任务", category="task")
+    with store.transaction() as conn:
+        conn.execute("DELETE FROM event_stats")
+
+    assert store.get_stats("PROJ")["total_events"] == 1
+    assert store.get_stats("EMPTY") == {}
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+事件推送中心单元测试：单读取任务扇出、按客户端过滤、Last-Event-ID 补发与慢客户端断开
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from industrial_dashboard.event_stream_hub import EventStreamHub, StreamFilter
+from services.event_bus import EventBus
+from services.event_service import EventEmitter, EventStore
+
+
+@pytest.fixture
+def bus():
+    return EventBus()
+
+
+@pytest.fixture
+def store(events_db):
+    return EventStore(events_db)
+
+
+@pytest.fixture
+def emitter(store, bus):
+    return EventEmitter(event_store=store, event_bus=bus)
+
+
+def _hub(store, bus, **kwargs):
+    # 追赶间隔放长，确保事件由总线唤醒送达
+    return EventStreamHub(store, project_id="PROJ", catch_up_interval=30.0, event_bus=bus, **kwargs)
+
+
+async def _drain(subscription, count):
+    events = []
+    for _ in range(count):
+        event = await subscription.get(timeout=2.0)
+        assert event is not None
+        events.append(event)
+    return events
+
+
+def test_events_are_read_once_and_fanned_out_per_filter(store, bus, emitter):
+    async def scenario():
+        hub = _hub(store, bus)
+        everything = await hub.subscribe(StreamFilter())
+        issues = await hub.subscribe(StreamFilter.from_params(category="issue", severity="error, critical"))
+
+        emitter.emit("PROJ", "task.created", "任务", category="task")
+        emitter.emit("PROJ", "issue.discovered", "严重问题", category="issue", severity="critical")
+        emitter.emit("PROJ", "issue.discovered", "提示", category="issue", severity="info")
+        emitter.emit("OTHER", "issue.discovered", "其他项目", category="issue", severity="critical")
+
+        received = await _drain(everything, 3)
+        matched = await _drain(issues, 1)
+        assert await issues.get(timeout=0.2) is None
+        return hub, received, matched
+
+    hub, received, matched = asyncio.run(scenario())
+
+    assert [event["title"] for event in received] == ["任务", "严重问题", "提示"]
+    assert [event["title"] for event in matched] == ["严重问题"]
+    assert hub.stats["events_read"] == 3
+    assert hub.stats["events_delivered"] == 4
+
+
+def test_reconnect_replays_missed_events_after_last_event_id(store, bus, emitter):
+    emitter.emit("PROJ", "task.created", "已收到", category="task")
+    emitter.emit("PROJ", "task.created", "错过1", category="task")
+    emitter.emit("PROJ", "issue.discovered", "错过但被过滤", category="issue")
+    emitter.emit("PROJ", "task.created", "错过2", category="task")
+    first_rowid = store.read_since(0, "PROJ", 1)[0][0]["rowid"]
+
+    async def scenario():
+        hub = _hub(store, bus)
+        subscription = await hub.subscribe(StreamFilter.from_params(category="task"), last_event_id=first_rowid)
+        replayed = await _drain(subscription, 2)
+        emitter.emit("PROJ", "task.created", "实时", category="task")
+        live = await _drain(subscription, 1)
+        return replayed, live
+
+    replayed, live = asyncio.run(scenario())
+
+    assert [event["title"] for event in replayed] == ["错过1", "错过2"]
+    assert [event["title"] for event in live] == ["实时"]
+    assert live[0]["rowid"] > replayed[-1]["rowid"]
+
+
+def test_backlog_over_limit_asks_client_to_reset(store, bus, emitter):
+    for i in range(5):
+        emitter.emit("PROJ", "task.created", f"事件{i}", category="task")
+
+    async def scenario():
+        hub = _hub(store, bus, max_backlog=3)
+        subscription = await hub.subscribe(StreamFilter(), last_event_id=0)
+        return subscription.backlog
+
+    assert asyncio.run(scenario()) == [{"reset": True}]
+
+
+def test_slow_client_is_dropped_when_its_queue_overflows(store, bus, emitter):
+    async def scenario():
+        hub = _hub(store, bus, max_queue_size=2)
+        slow = await hub.subscribe(StreamFilter())
+        issues = await hub.subscribe(StreamFilter.from_params(category="issue"))
+        emitter.emit_batch("PROJ", [
+            {"event_type": "task.updated", "title": f"事件{i}", "category": "task"} for i in range(3)
+        ] + [{"event_type": "issue.discovered", "title": "问题", "category": "issue"}])
+        received = await _drain(issues, 1)
+        return hub, slow, issues, received
+
+    hub, slow, issues, received = asyncio.run(scenario())
+
+    assert slow.lagged and not issues.lagged
+    assert [event["title"] for event in received] == ["问题"]
+    assert hub.get_stats()["subscribers"] == 1
+    assert hub.stats["lagged_clients"] == 1
+
+
+def test_format_sse_uses_rowid_as_event_id():
+    message = EventStreamHub.format_sse({"rowid": 42, "title": "事件"})
+
+    header, data = message.rstrip("\n").split("\ndata: ")
+    assert header == "id: 42\nevent: event"
+    assert json.loads(data) == {"rowid": 42, "title": "事件"}
+    assert message.endswith("\n\n")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+检索统计单元测试：检索历史按 rowid 游标增量汇总，热点缓存随项目版本号失效并可按统计预热
+"""
+
+import sqlite3
+
+import pytest
+
+from services.memory_analytics import HotMemoryCache
+from services.project_memory_service import ProjectMemoryService
+
+
+def _create(service, title, **kwargs):
+    return service.create_memory(
+        project_id="PROJ", memory_type="session", category="knowledge", title=title, content=title, **kwargs
+    )
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def service(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+    _create(service, "连接池配置", tags=["db"])
+    _create(service, "连接池监控")
+    _create(service, "前端样式")
+    return service
+
+
+def test_rollup_counts_each_history_row_once(service):
+    analytics = service.retrieval_analytics
+    service.retrieve_memories("PROJ", query="连接池")
+    service.retrieve_memories("PROJ", query="  连接池 ")
+    service.retrieve_memories("PROJ", query="连接池", tags=["db"])
+
+    assert analytics.rollup() == {"rows": 3, "projects": ["PROJ"]}
+    assert analytics.rollup() == {"rows": 0, "projects": []}
+
+    queries = analytics.get_top_queries("PROJ")
+    assert [(q["query"].strip(), q["count"], q["avg_results"]) for q in queries] == [("连接池", 2, 2.0), ("连接池", 1, 1.0)]
+    assert queries[1]["filters"]["tags"] == ["db"]
+
+    service.retrieve_memories("PROJ", query="前端")
+    assert analytics.rollup()["rows"] == 1
+
+    hits = {m["title"]: m["hits"] for m in analytics.get_hot_memories("PROJ")}
+    assert hits == {"连接池配置": 3, "连接池监控": 2, "前端样式": 1}
+
+
+def test_hot_memories_skip_deleted_memories(service, memory_db):
+    service.retrieve_memories("PROJ", query="前端")
+    service.retrieval_analytics.rollup()
+
+    _execute(memory_db, "DELETE FROM project_memories WHERE title = '前端样式'")
+
+    assert service.retrieval_analytics.get_hot_memories("PROJ") == []
+
+
+def test_query_cache_is_invalidated_by_memory_writes(service, memory_db):
+    first = service.retrieve_memories("PROJ", query="连接池", record_retrieval=False)
+    first[0]["title"] = "调用方修改"
+    second = service.retrieve_memories("PROJ", query="连接池", record_retrieval=False)
+
+    assert service.hot_cache.stats["query_hits"] == 1
+    assert sorted(m["title"] for m in second) == ["连接池监控", "连接池配置"]
+
+    _execute(memory_db, "UPDATE project_memories SET title = '连接池参数' WHERE title = '连接池配置'")
+    third = service.retrieve_memories("PROJ", query="连接池", record_retrieval=False)
+
+    assert service.hot_cache.stats["query_hits"] == 1
+    assert "连接池参数" in [m["title"] for m in third]
+
+
+def test_warm_hot_cache_replays_top_queries(service, memory_db):
+    memory_id = service.retrieve_memories("PROJ", query="连接池", tags=["db"])[0]["id"]
+    service.retrieval_analytics.rollup()
+
+    fresh = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+    assert fresh.warm_hot_cache("PROJ") == {"queries": 1, "memories": 1}
+
+    history_rows = fresh.retrieval_analytics.rollup()["rows"]
+    fresh.retrieve_memories("PROJ", query="连接池", tags=["db"], record_retrieval=False)
+    assert fresh.get_memory("PROJ", memory_id)["title"] == "连接池配置"
+
+    stats = fresh.hot_cache.get_stats()
+    assert history_rows == 0
+    assert (stats["query_hits"], stats["memory_hits"], stats["warmed"]) == (1, 1, 2)
+
+
+def test_hot_cache_regions_are_bounded_lru():
+    cache = HotMemoryCache(max_queries=2, max_memories=1, max_projects=2)
+    for key in ("a", "b", "c"):
+        cache.put_query("P1", 1, (key,), [{"id": key}])
+    cache.put_memory("P1", 1, {"id": "m1"})
+    cache.put_memory("P1", 1, {"id": "m2"})
+
+    assert cache.get_query("P1", 1, ("a",)) is None
+    assert cache.get_query("P1", 1, ("c",)) == [{"id": "c"}]
+    assert cache.get_memory("P1", 1, "m1") is None
+    assert cache.get_query("P1", 2, ("c",)) is None
+
+    cache.put_memory("P2", 1, {"id": "x"})
+    cache.put_memory("P3", 1, {"id": "y"})
+    cache.put_memory("P1", 2, {"id": "z"})
+    assert cache.get_memory("P2", 1, "x") is None
+    assert cache.get_stats()["projects"] == 2
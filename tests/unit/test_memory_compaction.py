@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+记忆压实单元测试：MinHash LSH 候选在 Jaccard 阈值上的召回，合并/归档/恢复后数据一致
+"""
+
+import json
+import random
+import sqlite3
+
+import pytest
+
+from services import memory_compaction
+from services.memory_compaction import (
+    LSH_BANDS,
+    LSH_ROWS,
+    jaccard,
+    decompress_payload,
+    lsh_candidate_probability,
+    minhash,
+    shingles,
+)
+from services.project_memory_service import ProjectMemoryService
+
+
+THRESHOLD = 0.85
+
+WORDS = (
+    "任务 完成 报告 架构师 审查 数据库 连接池 事件 监听器 规则 通知 记忆 检索 索引 缓存 "
+    "dashboard api sqlite wal commit rollback savepoint listener rule action timeout retry "
+    "TASK-101 TASK-202 REQ-007 用户 确认 部署 测试 通过 失败 修复 性能 优化 延迟 吞吐"
+).split()
+
+
+def _near_duplicate_pairs(count, seed=7):
+    """模拟自动记录的近似重复：同一模板文本替换/插入少量词"""
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        base = [rng.choice(WORDS) for _ in range(rng.randint(30, 80))]
+        edited = list(base)
+        for _ in range(rng.randint(1, 4)):
+            position = rng.randrange(len(edited))
+            if rng.random() < 0.5:
+                edited[position] = rng.choice(WORDS)
+            else:
+                edited.insert(position, rng.choice(WORDS))
+        left, right = " ".join(base), " ".join(edited)
+        if jaccard(shingles(left), shingles(right)) >= THRESHOLD:
+            pairs.append((left, right))
+    return pairs
+
+
+def _is_candidate(left, right, bands=LSH_BANDS, rows=LSH_ROWS):
+    a, b = minhash(shingles(left)), minhash(shingles(right))
+    return any(a[band * rows:(band + 1) * rows] == b[band * rows:(band + 1) * rows] for band in range(bands))
+
+
+def test_lsh_parameters_fit_the_similarity_threshold():
+    assert lsh_candidate_probability(THRESHOLD) > 0.9999
+    assert lsh_candidate_probability(0.3) < 0.1
+
+
+def test_candidate_recall_on_near_duplicates_above_threshold():
+    pairs = _near_duplicate_pairs(200)
+
+    found = sum(_is_candidate(left, right) for left, right in pairs)
+
+    assert found / len(pairs) >= 0.99
+
+
+@pytest.fixture
+def service(memory_db):
+    return ProjectMemoryService(db_path=memory_db)
+
+
+def test_find_duplicates_merges_near_duplicates_and_keeps_distinct_memories(service):
+    content, near = _near_duplicate_pairs(1, seed=3)[0]
+    rng = random.Random(4)
+    other = " ".join(rng.choice(WORDS) for _ in range(60))
+
+    ids = [
+        service.create_memory(
+            project_id="PROJ", memory_type="session", category="decision", title="自动记录", content=text
+        )["id"]
+        for text in (content, near, other)
+    ]
+
+    assert service.compactor.find_duplicates("PROJ") == [sorted(ids[:2])]
+
+
+def _create(service, content, **kwargs):
+    fields = {"memory_type": "session", "category": "decision", "title": "自动记录"}
+    fields.update(kwargs)
+    return service.create_memory(project_id="PROJ", content=content, **fields)["id"]
+
+
+def _query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _side_table(db_path, table, column, memory_id):
+    return sorted(row[column] for row in _query(db_path, f"SELECT {column} FROM {table} WHERE memory_id = ?", (memory_id,)))
+
+
+def test_compact_merges_cluster_into_survivor(service, memory_db):
+    content, near = _near_duplicate_pairs(1, seed=5)[0]
+    survivor = _create(service, content, importance=8, tags=["sqlite"], related_tasks=["TASK-1"])
+    duplicate = _create(service, near, importance=4, tags=["wal", "sqlite"], related_tasks=["TASK-2"])
+    other = _create(service, " ".join(random.Random(6).choice(WORDS) for _ in range(60)), category="knowledge")
+    service.create_memory_relation(survivor, other, "related", strength=0.4)
+    service.create_memory_relation(duplicate, other, "related", strength=0.9)
+    service.compactor.find_stale("PROJ")  # 补齐使用统计列后写入计数
+    _execute(memory_db, "UPDATE project_memories SET access_count = 2, reference_count = 1 WHERE id = ?", (survivor,))
+    _execute(memory_db, "UPDATE project_memories SET access_count = 3, reference_count = 4 WHERE id = ?", (duplicate,))
+
+    report = service.compactor.compact("PROJ")
+
+    assert report["merged"] == 1 and report["archived"] == 0
+    row = _query(memory_db, "SELECT * FROM project_memories WHERE id = ?", (survivor,))[0]
+    assert row["importance"] == 8
+    assert (row["access_count"], row["reference_count"]) == (5, 5)
+    assert sorted(json.loads(row["tags"])) == ["sqlite", "wal"]
+    assert _side_table(memory_db, "memory_tags", "tag", survivor) == ["sqlite", "wal"]
+    assert _side_table(memory_db, "memory_task_links", "task_id", survivor) == ["TASK-1", "TASK-2"]
+    assert _side_table(memory_db, "memory_tags", "tag", duplicate) == []
+    assert _query(memory_db, "SELECT id FROM project_memories WHERE id = ?", (duplicate,)) == []
+
+    relations = _query(memory_db, "SELECT source_memory_id, target_memory_id, strength FROM memory_relations")
+    assert relations == [{"source_memory_id": survivor, "target_memory_id": other, "strength": 0.9}]
+
+    archived = _query(memory_db, "SELECT * FROM memory_archive WHERE memory_id = ?", (duplicate,))[0]
+    assert (archived["reason"], archived["merged_into"]) == ("merged", survivor)
+    payload = decompress_payload(archived["codec"], archived["payload"])
+    assert payload["memory"]["content"] == near
+    assert [r["target_memory_id"] for r in payload["relations"]] == [other]
+
+    stats = service.memory_stats.get("PROJ")
+    assert stats["total_memories"] == 2
+    assert stats["by_category"]["decision"] == 1
+
+
+def test_archive_and_restore_round_trip(service, memory_db):
+    stale = _create(service, "旧的自动记录 连接池 调试", importance=2, tags=["debug"], related_issues=["ISSUE-9"])
+    keep = _create(service, "架构决策 共享连接池 WAL", importance=9)
+    service.create_memory_relation(stale, keep, "related", strength=0.7)
+    _execute(memory_db, "UPDATE project_memories SET created_at = '2020-01-01T00:00:00' WHERE id = ?", (stale,))
+    original = _query(memory_db, "SELECT * FROM project_memories WHERE id = ?", (stale,))[0]
+
+    report = service.compactor.compact("PROJ", older_than_days=30)
+
+    assert report["archived"] == 1
+    assert _query(memory_db, "SELECT id FROM project_memories WHERE id = ?", (stale,)) == []
+    assert _query(memory_db, "SELECT id FROM memory_relations") == []
+    assert _side_table(memory_db, "memory_tags", "tag", stale) == []
+    assert service.memory_stats.get("PROJ")["total_memories"] == 1
+    listed = service.compactor.list_archive("PROJ")
+    assert [(item["memory_id"], item["reason"]) for item in listed] == [(stale, "stale")]
+
+    restored = service.compactor.restore("PROJ", stale)
+
+    assert restored["id"] == stale
+    row = _query(memory_db, "SELECT * FROM project_memories WHERE id = ?", (stale,))[0]
+    assert row == {**original, "access_count": row["access_count"], "reference_count": row["reference_count"]}
+    assert _side_table(memory_db, "memory_tags", "tag", stale) == ["debug"]
+    assert _side_table(memory_db, "memory_issue_links", "issue_id", stale) == ["ISSUE-9"]
+    relations = _query(memory_db, "SELECT source_memory_id, target_memory_id, strength FROM memory_relations")
+    assert relations == [{"source_memory_id": stale, "target_memory_id": keep, "strength": 0.7}]
+    assert service.memory_stats.get("PROJ")["total_memories"] == 2
+    assert service.compactor.list_archive("PROJ") == []
+    assert service.compactor.restore("PROJ", stale) is None
+
+
+def test_archive_falls_back_to_zlib_without_zstandard(service, memory_db, monkeypatch):
+    monkeypatch.setattr(memory_compaction, "zstandard", None)
+    memory_id = _create(service, "低重要性的旧记录", importance=1)
+
+    with service.compactor._get_connection() as conn:
+        assert service.compactor.archive(conn, [memory_id]) == 1
+
+    row = _query(memory_db, "SELECT codec, payload FROM memory_archive WHERE memory_id = ?", (memory_id,))[0]
+    assert row["codec"] == "zlib"
+    assert decompress_payload(row["codec"], row["payload"])["memory"]["content"] == "低重要性的旧记录"
+    assert service.compactor.restore("PROJ", memory_id)["id"] == memory_id
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+记忆关系图单元测试：提交后的增量更新不修改已发布的图
+"""
+
+import threading
+
+import pytest
+
+from services.project_memory_service import ProjectMemoryService
+
+
+@pytest.fixture
+def service(memory_db):
+    return ProjectMemoryService(db_path=memory_db)
+
+
+def _create(service, title):
+    return service.create_memory(
+        project_id="PROJ",
+        memory_type="session",
+        category="decision",
+        title=title,
+        content=title
+    )["id"]
+
+
+def test_incremental_update_replaces_graph_instead_of_mutating_it(service):
+    first, second = _create(service, "a"), _create(service, "b")
+    published = service.relation_graph.get("PROJ")
+
+    service.create_memory_relation(first, second, "related")
+    updated = service.relation_graph.get("PROJ")
+
+    assert updated is not published
+    assert published.edges == {}
+    assert published.adjacency[first] == []
+    assert len(updated.edges) == 1
+    assert updated.version > published.version
+
+
+def test_readers_traverse_while_writer_updates(service):
+    memory_ids = [_create(service, f"m{i}") for i in range(20)]
+    graph_store = service.relation_graph
+    graph_store.get("PROJ")
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                graph = graph_store._graphs.get("PROJ") or graph_store.get("PROJ")
+                graph.to_dict()
+                graph.k_hop(memory_ids[0], 3)
+            except Exception as e:  # pragma: no cover - 失败时记录
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for index in range(1, len(memory_ids)):
+            service.create_memory_relation(memory_ids[index - 1], memory_ids[index], "related")
+            _create(service, f"n{index}")
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert errors == []
+    assert len(graph_store.get("PROJ").edges) == len(memory_ids) - 1
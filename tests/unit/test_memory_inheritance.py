@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+知识继承包单元测试：单次查询的分区去重、按版本号失效的缓存、token 预算裁剪
+"""
+
+import sqlite3
+
+import pytest
+
+from services.memory_inheritance import estimate_tokens
+from services.project_memory_service import ProjectMemoryService
+
+
+def _create(service, title, category="knowledge", importance=5, content=None):
+    return service.create_memory(
+        project_id="PROJ",
+        memory_type="session",
+        category=category,
+        title=title,
+        content=content or f"{title}的详细说明",
+        importance=importance,
+    )
+
+
+def _titles(bundle, section):
+    return [memory["title"] for memory in bundle[section]]
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def service(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+    _create(service, "采用连接池", category="decision", importance=9)
+    _create(service, "修复锁等待", category="solution", importance=8)
+    _create(service, "核心约束", importance=7)
+    _create(service, "日常笔记", importance=3)
+    return service
+
+
+def test_sections_are_deduplicated_by_priority(service):
+    bundle = service.inherit_knowledge("PROJ")
+
+    assert _titles(bundle, "decisions") == ["采用连接池"]
+    assert _titles(bundle, "solutions") == ["修复锁等待"]
+    # 决策/方案同样满足重要性与时间条件，只出现在优先级更高的分区
+    assert _titles(bundle, "important_knowledge") == ["核心约束"]
+    assert _titles(bundle, "recent_memories") == ["日常笔记"]
+    assert bundle["related_memories"] == []
+    assert bundle["total_inherited"] == 4
+    assert bundle["cached"] is False
+
+
+def test_cache_is_invalidated_by_writes_from_any_connection(service, memory_db):
+    service.inherit_knowledge("PROJ")
+    assert service.inherit_knowledge("PROJ")["cached"] is True
+
+    # 只改不影响内容的列，版本号不变
+    _execute(memory_db, "UPDATE project_memories SET updated_at = datetime('now')")
+    assert service.inherit_knowledge("PROJ")["cached"] is True
+
+    _execute(memory_db, "UPDATE project_memories SET title = '改用WAL' WHERE title = '采用连接池'")
+    bundle = service.inherit_knowledge("PROJ")
+    assert bundle["cached"] is False
+    assert _titles(bundle, "decisions") == ["改用WAL"]
+
+    _create(service, "新的决策", category="decision", importance=6)
+    bundle = service.inherit_knowledge("PROJ")
+    assert bundle["cached"] is False
+    assert _titles(bundle, "decisions") == ["改用WAL", "新的决策"]
+
+    stats = service.knowledge_bundles.get_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_other_projects_keep_their_cached_bundle(service):
+    service.create_memory(project_id="OTHER", memory_type="session", category="decision", title="其他", content="其他")
+    service.inherit_knowledge("OTHER")
+
+    _create(service, "本项目新记忆")
+
+    assert service.inherit_knowledge("OTHER")["cached"] is True
+
+
+def test_token_budget_trims_lower_priority_sections(service):
+    full = service.inherit_knowledge("PROJ")
+    decision_tokens = estimate_tokens("采用连接池") + estimate_tokens("采用连接池的详细说明")
+
+    bundle = service.inherit_knowledge("PROJ", token_budget=decision_tokens)
+
+    assert _titles(bundle, "decisions") == ["采用连接池"]
+    assert bundle["total_inherited"] == 1
+    assert bundle["trimmed"] == full["total_inherited"] - 1
+    assert bundle["token_estimate"] == decision_tokens
+
+
+def test_context_adds_related_memories_not_already_inherited(service, memory_db):
+    old = _create(service, "连接池参数", importance=1, content="连接池大小与超时配置")
+    # 超出"最近记忆"窗口，只能通过上下文检索进入继承包
+    _execute(memory_db, "UPDATE project_memories SET created_at = datetime('now', '-30 days') WHERE id = ?", (old["id"],))
+
+    bundle = service.inherit_knowledge("PROJ", context="连接池")
+
+    assert _titles(bundle, "decisions") == ["采用连接池"]
+    assert _titles(bundle, "related_memories") == ["连接池参数"]
+    assert bundle["total_inherited"] == 5
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+记忆标签/关联副表单元测试：触发器在插入、更新、删除后同步副表，过滤走副表
+"""
+
+import sqlite3
+
+import pytest
+
+from conftest import apply_migrations
+from services.db_pool import get_connection_pool
+from services.memory_links import ensure_memory_link_tables
+from services.project_memory_service import ProjectMemoryService
+
+
+def _side_tables(db_path, memory_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return tuple(
+            sorted(row[0] for row in conn.execute(
+                f"SELECT {column} FROM {table} WHERE memory_id = ?", (memory_id,)
+            ))
+            for table, column in (
+                ("memory_tags", "tag"),
+                ("memory_task_links", "task_id"),
+                ("memory_issue_links", "issue_id"),
+            )
+        )
+    finally:
+        conn.close()
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _insert_raw(db_path, memory_id, tags, tasks="[]", issues="[]"):
+    _execute(db_path, """
+        INSERT INTO project_memories (
+            id, project_id, memory_type, category, title, content, tags, related_tasks, related_issues
+        ) VALUES (?, 'PROJ', 'session', 'knowledge', '标题', '内容', ?, ?, ?)
+    """, (memory_id, tags, tasks, issues))
+
+
+@pytest.fixture
+def service(memory_db):
+    return ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+
+
+def _create(service, title, **kwargs):
+    return service.create_memory(
+        project_id="PROJ", memory_type="session", category="knowledge", title=title, content=title, **kwargs
+    )
+
+
+def test_side_tables_follow_insert_update_and_delete(memory_db):
+    _insert_raw(memory_db, "MEM-1", '["api", "db", "api"]', '["TASK-1"]', '["ISSUE-1"]')
+    assert _side_tables(memory_db, "MEM-1") == (["api", "db"], ["TASK-1"], ["ISSUE-1"])
+
+    _execute(memory_db, """
+        UPDATE project_memories SET tags = '["ui"]', related_tasks = '["TASK-2", "TASK-3"]', related_issues = NULL
+        WHERE id = 'MEM-1'
+    """)
+    assert _side_tables(memory_db, "MEM-1") == (["ui"], ["TASK-2", "TASK-3"], [])
+
+    # 非法 JSON 按空数组处理，而不是让写入失败
+    _execute(memory_db, "UPDATE project_memories SET tags = 'not json' WHERE id = 'MEM-1'")
+    assert _side_tables(memory_db, "MEM-1") == ([], ["TASK-2", "TASK-3"], [])
+
+    _execute(memory_db, "DELETE FROM project_memories WHERE id = 'MEM-1'")
+    assert _side_tables(memory_db, "MEM-1") == ([], [], [])
+
+
+def test_tag_task_and_issue_filters_use_side_tables(service):
+    both = _create(service, "两个标签", tags=["api", "db"], related_tasks=["TASK-1"])
+    api = _create(service, "只有api", tags=["api"], related_issues=["ISSUE-9"])
+    _create(service, "无标签")
+
+    def ids(**filters):
+        memories = service.retrieve_memories("PROJ", limit=10, record_retrieval=False, **filters)
+        return sorted(memory["id"] for memory in memories)
+
+    assert ids(tags=["api", "db"]) == sorted([both["id"], api["id"]])
+    assert ids(tags=["api", "db"], tag_mode="all") == [both["id"]]
+    assert ids(task_id="TASK-1") == [both["id"]]
+    assert ids(issue_id="ISSUE-9") == [api["id"]]
+    assert service.get_tag_counts("PROJ") == [{"tag": "api", "count": 2}, {"tag": "db", "count": 1}]
+
+    with pytest.raises(ValueError):
+        ids(tags=["api"], tag_mode="most")
+
+
+def test_side_tables_are_created_and_backfilled_on_old_databases(db_path):
+    apply_migrations(db_path, "003_add_project_memories.sql")
+    _insert_raw(db_path, "MEM-old", '["legacy"]', '["TASK-7"]')
+
+    pool = get_connection_pool(db_path)
+    with pool.connection() as conn:
+        ensure_memory_link_tables(pool, conn)
+
+    assert _side_tables(db_path, "MEM-old") == (["legacy"], ["TASK-7"], [])
+
+    _insert_raw(db_path, "MEM-new", '["fresh"]')
+    assert _side_tables(db_path, "MEM-new") == (["fresh"], [], [])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+记忆检索单元测试：FTS5 全文召回与过滤、触发器驱动的索引同步、可选向量召回
+"""
+
+import sqlite3
+
+import pytest
+
+from services.memory_search import build_match_query, segment_text
+from services.project_memory_service import ProjectMemoryService
+
+
+# 概念维度：存储 / 界面 / 部署
+CONCEPTS = (
+    ("数据库", "连接池", "sqlite", "持久化", "存储"),
+    ("前端", "界面", "按钮", "样式"),
+    ("部署", "发布", "上线"),
+)
+
+
+def fake_embedder(texts):
+    """按概念词出现次数生成向量，模拟与字面无关的语义相似"""
+    return [[float(sum(text.lower().count(word) for word in words)) + 0.01 for words in CONCEPTS] for text in texts]
+
+
+def _create(service, title, content, project_id="PROJ", **kwargs):
+    kwargs.setdefault("category", "knowledge")
+    return service.create_memory(
+        project_id=project_id, memory_type="session", title=title, content=content, **kwargs
+    )
+
+
+def _titles(results):
+    return [memory["title"] for memory in results]
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def service(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+    _create(service, "采用SQLite连接池", "所有服务共享同一个数据库连接池", category="decision", tags=["database"])
+    _create(service, "前端按钮样式", "统一界面按钮的圆角与配色", tags=["frontend"])
+    _create(service, "部署流程", "发布前先在预发环境验证连接池配置", category="decision", tags=["ops"])
+    _create(service, "其他项目的连接池", "不应出现在本项目结果中", project_id="OTHER")
+    return service
+
+
+def test_segment_text_splits_cjk_into_bigrams():
+    assert segment_text("架构决策 SQLite-WAL") == ["架构", "构决", "决策", "sqlite", "wal"]
+    assert segment_text("池") == ["池"]
+    assert build_match_query("连接池 连接") == '"连接" OR "接池"'
+    assert build_match_query("池") == '"池"*'
+    assert build_match_query("  ,, ") is None
+
+
+def test_full_text_search_ranks_title_matches_and_applies_filters(service):
+    index = service.search_index
+
+    results = index.search("PROJ", "连接池")
+    assert _titles(results) == ["采用SQLite连接池", "部署流程"]
+    assert all(memory["scores"]["semantic"] == 0.0 for memory in results)
+    assert results[0]["scores"]["text"] == 1.0
+
+    assert _titles(index.search("PROJ", "连接池", tags=["ops"])) == ["部署流程"]
+    assert _titles(index.search("PROJ", "连接池", category="knowledge")) == []
+    assert _titles(index.search("PROJ", "sqlite")) == ["采用SQLite连接池"]
+    assert _titles(index.search("OTHER", "连接池")) == ["其他项目的连接池"]
+    assert index.search("PROJ", "不存在的词语") == []
+
+
+def test_index_follows_writes_made_outside_the_service(service, memory_db):
+    index = service.search_index
+    index.sync()
+
+    _execute(memory_db, """
+        INSERT INTO project_memories (id, project_id, memory_type, category, title, content)
+        VALUES ('MEM-raw', 'PROJ', 'session', 'knowledge', '缓存策略', '热点记忆放在进程内缓存')
+    """)
+    assert _titles(index.search("PROJ", "缓存")) == ["缓存策略"]
+
+    _execute(memory_db, "UPDATE project_memories SET title = '索引策略', content = '倒排索引' WHERE id = 'MEM-raw'")
+    assert index.search("PROJ", "缓存") == []
+    assert _titles(index.search("PROJ", "倒排索引")) == ["索引策略"]
+
+    _execute(memory_db, "DELETE FROM project_memories WHERE id = 'MEM-raw'")
+    assert index.search("PROJ", "倒排索引") == []
+    stats = index.get_stats()
+    assert (stats["indexed_memories"], stats["pending_memories"]) == (4, 0)
+
+
+def test_embedder_adds_semantic_recall_without_lexical_overlap(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False, search_embedder=fake_embedder)
+    _create(service, "采用SQLite连接池", "所有服务共享同一个数据库连接池")
+    _create(service, "前端按钮样式", "统一界面按钮的圆角与配色")
+
+    results = service.search_index.search("PROJ", "持久化")
+
+    assert _titles(results)[0] == "采用SQLite连接池"
+    assert results[0]["scores"]["text"] == 0.0
+    assert results[0]["scores"]["semantic"] > 0.9
+    assert results[0]["relevance"] > results[1]["relevance"]
+    assert service.search_index.get_stats()["embedded_memories"] == 2
+
+
+def test_embedder_failure_falls_back_to_full_text(memory_db):
+    def broken_embedder(texts):
+        raise RuntimeError("model unavailable")
+
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False, search_embedder=broken_embedder)
+    _create(service, "采用SQLite连接池", "所有服务共享同一个数据库连接池")
+
+    results = service.search_index.search("PROJ", "连接池")
+
+    assert _titles(results) == ["采用SQLite连接池"]
+    assert service.search_index.get_stats()["embedded_memories"] == 0
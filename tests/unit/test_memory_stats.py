@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+记忆统计单元测试：触发器维护的 memory_stats_summary 在插入、更新、删除后与重建结果一致
+"""
+
+import sqlite3
+
+import pytest
+
+from conftest import apply_migrations
+from services.project_memory_service import ProjectMemoryService
+
+
+def _execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _insert(db_path, memory_id, memory_type, category, importance, created_at, project_id="PROJ", verb="INSERT"):
+    _execute(db_path, f"""
+        {verb} INTO project_memories (id, project_id, memory_type, category, title, content, importance, created_at)
+        VALUES (?, ?, ?, ?, '标题', '内容', ?, ?)
+    """, (memory_id, project_id, memory_type, category, importance, created_at))
+
+
+def _stats(service, project_id="PROJ"):
+    stats = service.get_memory_stats(project_id)
+    stats.pop("last_updated")
+    return stats
+
+
+def _assert_matches_rebuild(service, project_id="PROJ"):
+    incremental = _stats(service, project_id)
+    service.rebuild_memory_stats(project_id)
+    assert _stats(service, project_id) == incremental
+    return incremental
+
+
+@pytest.fixture
+def service(memory_db):
+    return ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+
+
+def test_summary_row_follows_insert_update_and_delete(service, memory_db):
+    _insert(memory_db, "M1", "decision", "architecture", 9, "2026-01-01 10:00:00")
+    _insert(memory_db, "M2", "session", "knowledge", None, "2026-01-02 10:00:00")
+    _insert(memory_db, "M3", "custom", "misc", 42, "2026-01-03 10:00:00")
+
+    stats = _assert_matches_rebuild(service)
+    assert stats["total_memories"] == 3
+    assert stats["by_type"] == {
+        "session": 1, "ultra": 0, "decision": 1, "solution": 0, "knowledge": 0, "other": 1
+    }
+    assert stats["by_category"]["other"] == 1
+    assert stats["importance_histogram"]["5"] == 1 and stats["importance_histogram"]["10"] == 1
+    assert stats["by_importance"]["critical (9-10)"] == 2
+    assert stats["avg_importance"] == 8.0
+    assert stats["last_memory_created_at"] == "2026-01-03 10:00:00"
+
+    _execute(memory_db, "UPDATE project_memories SET memory_type = 'solution', category = 'solution', importance = 2 WHERE id = 'M1'")
+    stats = _assert_matches_rebuild(service)
+    assert (stats["solution_memories"], stats["decision_memories"]) == (1, 0)
+    assert stats["by_importance"]["low (1-4)"] == 1
+
+    _execute(memory_db, "DELETE FROM project_memories WHERE id = 'M3'")
+    stats = _assert_matches_rebuild(service)
+    assert stats["total_memories"] == 2
+    assert stats["last_memory_created_at"] == "2026-01-02 10:00:00"
+
+
+def test_moving_a_memory_between_projects_updates_both_rows(service, memory_db):
+    _insert(memory_db, "M1", "session", "knowledge", 5, "2026-01-01 10:00:00")
+    _insert(memory_db, "M2", "session", "knowledge", 5, "2026-01-02 10:00:00")
+
+    _execute(memory_db, "UPDATE project_memories SET project_id = 'OTHER' WHERE id = 'M2'")
+
+    assert _assert_matches_rebuild(service)["total_memories"] == 1
+    assert _assert_matches_rebuild(service, "OTHER")["total_memories"] == 1
+    assert service.get_memory_stats("OTHER")["last_memory_created_at"] == "2026-01-02 10:00:00"
+
+
+def test_rebuild_repairs_drift_from_replace_conflicts(service, memory_db):
+    _insert(memory_db, "M1", "session", "knowledge", 5, "2026-01-01 10:00:00")
+    _insert(memory_db, "M2", "ultra", "decision", 7, "2026-01-02 10:00:00")
+
+    # REPLACE 冲突删除不触发删除触发器（未开启 recursive_triggers），被替换行的计数不会扣除
+    _insert(memory_db, "M1", "decision", "decision", 8, "2026-01-01 10:00:00", verb="INSERT OR REPLACE")
+    assert service.get_memory_stats("PROJ")["total_memories"] == 3
+
+    assert service.rebuild_memory_stats("PROJ") == 1
+    stats = service.get_memory_stats("PROJ")
+    assert stats["total_memories"] == 2
+    assert stats["by_type"]["decision"] == 1 and stats["by_type"]["session"] == 0
+
+
+def test_service_writes_are_counted(service):
+    service.create_memory(project_id="PROJ", memory_type="ultra", category="decision", title="决策", content="内容", importance=8)
+
+    stats = _assert_matches_rebuild(service)
+    assert (stats["total_memories"], stats["ultra_memories"], stats["avg_importance"]) == (1, 1, 8.0)
+
+
+def test_summary_is_backfilled_on_databases_without_migration_017(db_path):
+    apply_migrations(db_path, "003_add_project_memories.sql")
+    _insert(db_path, "M1", "session", "knowledge", 6, "2026-01-01 10:00:00")
+
+    service = ProjectMemoryService(db_path=db_path, ultra_memory_enabled=False)
+
+    assert service.get_memory_stats("PROJ")["total_memories"] == 1
+    _insert(db_path, "M2", "session", "knowledge", 6, "2026-01-02 10:00:00")
+    assert _assert_matches_rebuild(service)["total_memories"] == 2
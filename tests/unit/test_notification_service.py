@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+通知服务单元测试：SQLite 持久化、触发器维护的总数/未读计数与保留压缩
+"""
+
+import sqlite3
+
+import pytest
+
+from conftest import apply_migrations
+from services.notification_service import NotificationService, NotificationType
+
+
+@pytest.fixture
+def service(db_path):
+    return NotificationService(max_notifications=10, db_path=db_path)
+
+
+def _actual_counts(db_path, type_filter=None):
+    where = "WHERE type = ?" if type_filter else ""
+    params = (type_filter,) if type_filter else ()
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(read = 0), 0) FROM notifications {where}", params
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def _assert_counters_match_rows(service, db_path):
+    total, unread = _actual_counts(db_path)
+    assert (service.get_count(), service.get_unread_count()) == (total, unread)
+    for notification_type in NotificationType:
+        _, unread = _actual_counts(db_path, notification_type.value)
+        assert service.get_unread_count(notification_type.value) == unread
+
+
+def test_notifications_persist_across_service_instances(service, db_path):
+    first = service.send_notification("任务完成", "TASK-1", type=NotificationType.SUCCESS, data={"task_id": "TASK-1"})
+    service.send_notification("注意", "磁盘空间不足", type="warning", priority=2)
+
+    reopened = NotificationService(max_notifications=10, db_path=db_path)
+    notifications = reopened.get_notifications()
+
+    assert [n["title"] for n in notifications] == ["注意", "任务完成"]
+    assert notifications[1] == first
+    assert reopened.get_unread_count() == 2
+
+
+def test_unread_counters_follow_read_delete_and_clear(service, db_path):
+    ids = [service.send_notification(f"信息{i}", "内容")["id"] for i in range(3)]
+    ids += [service.send_notification(f"错误{i}", "内容", type="error")["id"] for i in range(2)]
+    _assert_counters_match_rows(service, db_path)
+
+    assert service.mark_as_read(ids[0])
+    assert service.mark_as_read(ids[0])
+    assert not service.mark_as_read("NOTIF-missing")
+    assert service.get_unread_count() == 4
+    assert service.get_unread_count("info") == 2
+    _assert_counters_match_rows(service, db_path)
+
+    assert service.delete_notification(ids[0])
+    assert service.delete_notification(ids[3])
+    assert service.get_count() == 3
+    assert service.get_unread_count("error") == 1
+    _assert_counters_match_rows(service, db_path)
+
+    assert [n["id"] for n in service.get_notifications(unread_only=True, type_filter="info")] == [ids[2], ids[1]]
+
+    assert service.clear_all(type_filter="info") == 2
+    _assert_counters_match_rows(service, db_path)
+    assert service.mark_all_as_read() == 1
+    _assert_counters_match_rows(service, db_path)
+
+    stats = service.get_stats()
+    assert stats["total_sent"] == 5
+    assert (stats["info_count"], stats["error_count"]) == (3, 2)
+    assert (stats["current_count"], stats["unread_count"]) == (1, 0)
+
+
+def test_retention_compaction_keeps_newest_notifications(service, db_path):
+    # 上限 10 + 余量 1：第 12 条写入时压缩回 10 条
+    sent = [service.send_notification(f"通知{i}", "内容")["id"] for i in range(12)]
+
+    assert service.get_count() == 10
+    assert [n["id"] for n in service.get_notifications(limit=100)] == sent[:1:-1]
+    assert service.stats["compactions"] == 1
+    assert service.get_stats()["total_sent"] == 12
+    _assert_counters_match_rows(service, db_path)
+
+    service.max_notifications = 4
+    assert service.compact() == 6
+    assert service.get_count() == 4
+    _assert_counters_match_rows(service, db_path)
+
+
+def test_service_works_on_migrated_database(db_path):
+    apply_migrations(db_path, "009_notifications.sql")
+    service = NotificationService(db_path=db_path)
+
+    service.send_notification("迁移", "已建表", type="info")
+
+    assert service.get_unread_count() == 1
+    _assert_counters_match_rows(service, db_path)
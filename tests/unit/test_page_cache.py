@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+页面缓存单元测试：页面按缓存键只渲染一次，版本号/模板修改即重新渲染，指纹资源支持 ETag/304 与压缩
+"""
+
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import industrial_dashboard.dashboard as dashboard_module
+from industrial_dashboard.dashboard import IndustrialDashboard
+from industrial_dashboard.page_cache import ASSET_CACHE_CONTROL, AssetStore, PageCache
+
+
+STYLE = "body { color: #e0e0e0; }" * 60
+SCRIPT = "console.log('dashboard');" * 60
+
+
+def _request(**headers):
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+
+def _page(version):
+    return (
+        f"<html><head><style>{STYLE}</style></head><body>"
+        f"<!-- <script>alert('disabled')</script> -->"
+        f'<script type="application/json">{{"version": "{version}"}}</script>'
+        f"<script>{SCRIPT}</script></body></html>"
+    )
+
+
+@pytest.fixture
+def cache():
+    return PageCache(AssetStore())
+
+
+def test_page_is_rendered_once_per_key(cache):
+    renders = []
+
+    def render():
+        renders.append(1)
+        return _page("v1")
+
+    first = cache.get(("home", "v1"), render)
+    assert cache.get(("home", "v1"), render) is first
+    cache.get(("home", "v2"), render)
+
+    stats = cache.get_stats()
+    assert len(renders) == 2
+    assert (stats["hits"], stats["misses"], stats["renders"]) == (1, 2, {"home": 2})
+    # 两个版本共用同一份样式与脚本
+    assert stats["assets"] == 2
+
+
+def test_inline_blocks_are_extracted_except_comments_and_data(cache):
+    html = cache.get(("home", "v1"), lambda: _page("v1")).variants["identity"].decode("utf-8")
+
+    assert STYLE not in html and SCRIPT not in html
+    assert "<!-- <script>alert('disabled')</script> -->" in html
+    assert '<script type="application/json">{"version": "v1"}</script>' in html
+    assert html.index('<link rel="stylesheet" href="/static/assets/') < html.index('<script src="/static/assets/')
+
+
+def test_lru_evicts_oldest_page():
+    cache = PageCache(AssetStore(), max_entries=2)
+    cache.get(("a",), lambda: "a")
+    cache.get(("b",), lambda: "b")
+    cache.get(("a",), lambda: "a")
+    cache.get(("c",), lambda: "c")
+
+    cache.get(("a",), lambda: "a")
+    cache.get(("b",), lambda: "b")
+    assert cache.get_stats()["renders"] == {"a": 1, "b": 2, "c": 1}
+
+
+def test_template_file_edit_invalidates_cached_page(cache, tmp_path):
+    template = tmp_path / "page.html"
+    template.write_text("<p>旧</p>", encoding="utf-8")
+    missing = tmp_path / "missing.html"
+
+    assert cache.get_file([missing, template], "fallback").variants["identity"] == "<p>旧</p>".encode("utf-8")
+    assert cache.get_stats()["hits"] == 0
+    cache.get_file([missing, template], "fallback")
+    assert cache.get_stats()["hits"] == 1
+
+    template.write_text("<p>新</p>", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.get_file([missing, template], "fallback").variants["identity"] == "<p>新</p>".encode("utf-8")
+
+    assert cache.get_file([missing], "fallback").variants["identity"] == b"fallback"
+
+
+def test_cached_body_revalidates_and_negotiates_encoding(cache):
+    page = cache.get(("home", "v1"), lambda: _page("v1") + "<p>" + "内容" * 600 + "</p>")
+
+    identity = page.respond(_request())
+    assert identity.status_code == 200
+    assert identity.headers["etag"] == page.etag
+    assert identity.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in identity.headers
+
+    compressed = page.respond(_request(accept_encoding="deflate, gzip;q=0.5"))
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == identity.body
+    assert "content-encoding" not in page.respond(_request(accept_encoding="gzip;q=0")).headers
+
+    assert page.respond(_request(if_none_match=f'"other", {page.etag}')).status_code == 304
+    assert page.respond(_request(if_none_match="*")).status_code == 304
+    assert page.respond(_request(if_none_match='"other"')).status_code == 200
+
+
+class FixedVersion:
+    """版本号管理（时间戳版本号在同一秒内不变，测试中手动指定）"""
+
+    def __init__(self, version):
+        self.version = version
+
+    def get_version(self):
+        return self.version
+
+
+def _client(monkeypatch):
+    renders = []
+
+    def render(title, subtitle, cache_version=None):
+        renders.append(cache_version)
+        return _page(cache_version)
+
+    monkeypatch.setattr(dashboard_module, "get_mission_control_dashboard", render)
+    # 只挂载路由，不初始化与页面缓存无关的组件
+    dashboard = IndustrialDashboard.__new__(IndustrialDashboard)
+    dashboard.title, dashboard.subtitle = "标题", "副标题"
+    dashboard.version_manager = FixedVersion("v1")
+    dashboard.page_cache = PageCache(AssetStore())
+    dashboard.app = FastAPI()
+    dashboard._setup_routes()
+    return dashboard, TestClient(dashboard.app), renders
+
+
+def test_dashboard_page_and_assets_revalidate(monkeypatch):
+    dashboard, client, renders = _client(monkeypatch)
+
+    first = client.get("/")
+    assert first.status_code == 200
+    assert client.get("/", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert len(renders) == 1
+
+    asset_url = next(url for url in first.text.split('"') if url.startswith("/static/assets/") and url.endswith(".js"))
+    asset = client.get(asset_url)
+    assert asset.status_code == 200
+    assert asset.text == SCRIPT
+    assert asset.headers["cache-control"] == ASSET_CACHE_CONTROL
+    assert client.get(asset_url, headers={"If-None-Match": asset.headers["etag"]}).status_code == 304
+    assert client.get("/static/assets/unknown.js").status_code == 404
+
+    # 版本号变化：旧 ETag 不再命中，页面重新渲染，内容不变的资源沿用原地址
+    dashboard.version_manager.version = "v2"
+    second = client.get("/", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert renders == ["v1", "v2"]
+    assert asset_url in second.text
+
+    stats = client.get("/api/page-cache").json()
+    assert (stats["pages"], stats["misses"], stats["assets"]) == (2, 2, 2)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+项目记忆服务单元测试：发件箱只登记已保存到本地的记忆；只读检索不写检索历史
+"""
+
+import sqlite3
+
+from services.project_memory_service import ProjectMemoryService
+
+
+def _count(db_path, table):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _create_ultra_memory(service):
+    return service.create_memory(
+        project_id="PROJ",
+        memory_type="ultra",
+        category="decision",
+        title="采用SQLite连接池",
+        content="所有服务共享同一个连接池"
+    )
+
+
+def test_memory_saved_locally_is_enqueued_for_sync(memory_db):
+    service = ProjectMemoryService(db_path=memory_db)
+
+    memory = _create_ultra_memory(service)
+
+    assert memory["sync_status"] == "pending"
+    assert _count(memory_db, "project_memories") == 1
+    assert _count(memory_db, "memory_sync_outbox") == 1
+
+
+def test_memory_not_saved_locally_is_not_enqueued(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, persist=False)
+
+    memory = _create_ultra_memory(service)
+
+    assert memory["sync_status"] is None
+    assert _count(memory_db, "project_memories") == 0
+    assert _count(memory_db, "memory_sync_outbox") == 0
+
+
+def test_retrieve_without_recording_leaves_history_untouched(memory_db):
+    service = ProjectMemoryService(db_path=memory_db, ultra_memory_enabled=False)
+    _create_ultra_memory(service)
+
+    memories = service.retrieve_memories("PROJ", query="连接池", record_retrieval=False)
+
+    assert [m["title"] for m in memories] == ["采用SQLite连接池"]
+    assert _count(memory_db, "memory_retrieval_history") == 0
+
+    service.retrieve_memories("PROJ", query="连接池")
+
+    assert _count(memory_db, "memory_retrieval_history") == 1
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+规则引擎单元测试：RuleIndex 精确/通配符分发，修改模式后重新索引
+"""
+
+import pytest
+
+from services.action_executor import ActionExecutor
+from services.rule_engine import Rule, RuleEngine, RuleIndex
+
+
+def _rule(rule_id, pattern):
+    return Rule(rule_id=rule_id, name=rule_id, description="", event_type_pattern=pattern)
+
+
+def _ids(rules):
+    return [rule.rule_id for rule in rules]
+
+
+@pytest.fixture
+def engine():
+    executor = ActionExecutor(max_workers=1)
+    yield RuleEngine(executor=executor)
+    executor.shutdown(wait=False)
+
+
+def test_index_dispatches_exact_and_wildcard_rules_in_registration_order():
+    index = RuleIndex()
+    for rule_id, pattern in [
+        ("all", "*"),
+        ("task-exact", "task.completed"),
+        ("task-any", "task.*"),
+        ("suffix", "*.completed"),
+        ("middle", "task.*.done"),
+        ("issue", "issue.*"),
+    ]:
+        index.add(_rule(rule_id, pattern))
+
+    assert _ids(index.candidates("task.completed")) == ["all", "task-exact", "task-any", "suffix"]
+    assert _ids(index.candidates("task.review.done")) == ["all", "task-any", "middle"]
+    assert _ids(index.candidates("issue.completed")) == ["all", "suffix", "issue"]
+    assert _ids(index.candidates("deploy.started")) == ["all"]
+
+
+def test_removed_rules_are_no_longer_dispatched():
+    index = RuleIndex()
+    index.add(_rule("exact", "task.completed"))
+    index.add(_rule("wildcard", "task.*"))
+
+    assert index.remove("wildcard").rule_id == "wildcard"
+    assert index.remove("wildcard") is None
+    assert _ids(index.candidates("task.completed")) == ["exact"]
+
+    index.remove("exact")
+    assert index.candidates("task.completed") == []
+
+
+def test_changing_pattern_of_registered_rule_reindexes_it(engine):
+    first = _rule("first", "task.completed")
+    second = _rule("second", "issue.resolved")
+    engine.register_rule(first)
+    engine.register_rule(second)
+
+    first.event_type_pattern = "issue.*"
+
+    assert _ids(engine.match_rules({"event_type": "task.completed"})) == []
+    assert _ids(engine.match_rules({"event_type": "issue.resolved"})) == ["first", "second"]
+
+    first.event_type_pattern = "issue.resolved"
+    second.event_type_pattern = "issue.*"
+
+    assert _ids(engine.match_rules({"event_type": "issue.resolved"})) == ["first", "second"]
+
+
+def test_unregistered_rule_pattern_change_does_not_touch_index(engine):
+    rule = _rule("rule", "task.completed")
+    engine.register_rule(rule)
+    engine.unregister_rule("rule")
+
+    rule.event_type_pattern = "task.*"
+
+    assert engine.match_rules({"event_type": "task.completed"}) == []
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+任务状态管理单元测试：触发器维护的状态计数与重建结果一致，缓存不写回失效前的快照
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from automation import state_manager as state_manager_module
+from automation.models import Task, TaskStatus
+from automation.state_manager import StateManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return StateManager(db_path=str(tmp_path / "state.db"), events_db_path=str(tmp_path / "events.db"))
+
+
+def _counts_from_tasks(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+    finally:
+        conn.close()
+
+
+def test_status_counters_follow_insert_update_and_delete(manager, monkeypatch):
+    monkeypatch.setattr(state_manager_module, "STATUS_COUNTS_TTL", 0.0)
+    for i in range(4):
+        assert manager.create_task(Task(id=f"task-1.{i}", title=f"任务{i}"))
+    manager.update_task_status("task-1.0", TaskStatus.IN_PROGRESS)
+    manager.update_task_status("task-1.1", TaskStatus.COMPLETED)
+    manager.update_task_status("task-1.1", TaskStatus.COMPLETED)
+
+    assert manager.get_status_counts() == {"pending": 2, "in_progress": 1, "completed": 1}
+
+    conn = sqlite3.connect(str(manager.db_path))
+    conn.execute("DELETE FROM tasks WHERE id IN ('task-1.0', 'task-1.2')")
+    conn.commit()
+    conn.close()
+
+    expected = _counts_from_tasks(str(manager.db_path))
+    assert manager.get_status_counts() == expected == {"pending": 1, "completed": 1}
+
+    manager.rebuild_status_counts()
+    assert manager.get_status_counts() == expected
+
+
+def test_reader_started_before_invalidation_does_not_cache_its_snapshot(manager):
+    manager.create_task(Task(id="task-1.0", title="任务"))
+    read_connection = manager._get_connection
+
+    @contextmanager
+    def read_then_concurrent_update():
+        with read_connection() as conn:
+            yield conn
+        # 读取完成、写回缓存之前，另一线程提交状态变更并使缓存失效
+        writer = threading.Thread(target=writer_manager.update_task_status, args=("task-1.0", TaskStatus.COMPLETED))
+        writer.start()
+        writer.join()
+
+    # 写线程使用原始连接，避免再次触发并发更新
+    writer_manager = StateManager(db_path=str(manager.db_path), events_db_path=str(manager.db_path.parent / "events.db"))
+    manager._get_connection = read_then_concurrent_update
+    assert manager.get_status_counts() == {"pending": 1}
+    manager._get_connection = read_connection
+
+    assert manager.get_status_counts() == {"completed": 1}